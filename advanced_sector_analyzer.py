@@ -17,6 +17,8 @@ import pickle
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional, Union
 
+from sector_membership import fetch_all_pages
+
 class AdvancedSectorAnalyzer:
     """高级智能行业分析器
     
@@ -46,6 +48,10 @@ class AdvancedSectorAnalyzer:
         self.token = token or os.environ.get('TUSHARE_TOKEN') or '0e65a5c636112dc9d9af5ccc93ef06c55987805b9467db0866185a10'
         self.ts_api = None
         self._init_tushare_api()
+        self._sector_engine = None  # 行业截面数据引擎，首次使用时创建
+        self._index_synthesizer = None  # 成分股合成行业指数，首次使用时创建
+        self._membership_index = None  # 行业成分索引，首次使用时创建
+        self._north_flow_store = None  # 北向资金存储，首次使用时创建
         
         # 缓存和状态管理
         self.data_cache = {}
@@ -321,6 +327,13 @@ class AdvancedSectorAnalyzer:
         
         self.logger.info(f"获取行业 {sector_name or sector_code} 历史数据")
         
+        # 申万/中信行业从截面面板读取，与逐个请求的结果格式保持一致（日期为列）
+        panel_data = self._get_panel_history(sector_code, days)
+        if panel_data is not None:
+            history_data = panel_data.drop(columns=['数据来源']).reset_index()
+            self._update_cache(cache_key, history_data)
+            return history_data
+        
         # 计算起始日期
         end_date = datetime.now().strftime('%Y%m%d')
         start_date = (datetime.now() - timedelta(days=days)).strftime('%Y%m%d')
@@ -384,10 +397,73 @@ class AdvancedSectorAnalyzer:
         self.logger.error(f"无法获取行业 {sector_name or sector_code} 历史数据")
         return pd.DataFrame()
     
+    def _get_panel_history(self, sector_code: str, days: int) -> Optional[pd.DataFrame]:
+        """从行业截面数据引擎读取行业历史数据，面板中没有该行业时返回None"""
+        if self._sector_engine is None:
+            try:
+                from sector_data_engine import get_sector_data_engine
+                self._sector_engine = get_sector_data_engine(pro=self.ts_api)
+            except Exception as e:
+                self.logger.warning(f"行业截面数据引擎不可用: {str(e)}")
+                self._sector_engine = False
+        if not self._sector_engine:
+            return None
+        try:
+            return self._sector_engine.get_sector_history(sector_code, days=days)
+        except Exception as e:
+            self.logger.warning(f"从行业截面读取 {sector_code} 失败: {str(e)}")
+            return None
+    
+    def _get_index_members(self, sector_code: str) -> List[str]:
+        """从行业成分索引读取成分股，索引中没有该行业时返回空列表"""
+        if self._membership_index is None:
+            try:
+                from sector_membership import get_membership_index
+                self._membership_index = get_membership_index(pro=self.ts_api, refresh=True)
+            except Exception as e:
+                self.logger.warning(f"行业成分索引不可用: {str(e)}")
+                self._membership_index = False
+        if not self._membership_index:
+            return []
+        return self._membership_index.stocks_of(sector_code)
+    
+    def _get_north_flow_store(self):
+        """获取北向资金存储，不可用时返回None"""
+        if self._north_flow_store is None:
+            try:
+                from north_flow_store import get_north_flow_store
+                self._north_flow_store = get_north_flow_store(pro=self.ts_api)
+            except Exception as e:
+                self.logger.warning(f"北向资金存储不可用: {str(e)}")
+                self._north_flow_store = False
+        return self._north_flow_store or None
+    
+    def _synthesize_from_panel(self, sector_code: str, components: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """使用全市场个股截面按流通市值加权合成行业指数，失败时返回None"""
+        if self._index_synthesizer is None:
+            try:
+                from sector_data_engine import get_stock_daily_store
+                from sector_index_synthesizer import SectorIndexSynthesizer
+                self._index_synthesizer = SectorIndexSynthesizer(get_stock_daily_store(pro=self.ts_api))
+            except Exception as e:
+                self.logger.warning(f"行业指数合成器不可用: {str(e)}")
+                self._index_synthesizer = False
+        if not self._index_synthesizer:
+            return None
+        try:
+            # 仅使用当前仍在行业内的成分股
+            if 'is_new' in components.columns:
+                components = components[components['is_new'] != 'N']
+            return self._index_synthesizer.sector_history(sector_code, components['con_code'].astype(str).tolist(), days=90)
+        except Exception as e:
+            self.logger.warning(f"合成行业 {sector_code} 指数失败: {str(e)}")
+            return None
+    
     def _calculate_index_from_components(self, sector_code: str) -> pd.DataFrame:
         """通过成分股计算行业指数
         
-        当无法直接获取行业指数时，使用成分股加权计算
+        当无法直接获取行业指数时，使用全部成分股按流通市值加权合成；
+        个股截面不可用时退回逐只请求前10只成分股等权计算
         
         Args:
             sector_code: 行业代码
@@ -396,12 +472,21 @@ class AdvancedSectorAnalyzer:
             pd.DataFrame: 计算的行业指数历史数据
         """
         try:
-            # 获取行业成分股
-            components = self.ts_api.index_member(index_code=sector_code)
+            # 获取行业成分股，优先从行业成分索引读取
+            members = self._get_index_members(sector_code)
+            if members:
+                components = pd.DataFrame({'index_code': sector_code, 'con_code': members})
+            else:
+                components = fetch_all_pages(lambda **page: self.ts_api.index_member(index_code=sector_code, **page))
             
             if components is not None and not components.empty:
                 self.logger.info(f"获取到行业 {sector_code} 的 {len(components)} 个成分股")
                 
+                index_data = self._synthesize_from_panel(sector_code, components)
+                if index_data is not None and not index_data.empty:
+                    self.logger.info(f"通过成分股市值加权合成行业指数成功，共计 {len(index_data)} 条记录")
+                    return index_data
+                
                 # 最多使用10个成分股避免请求过多
                 component_stocks = components['con_code'].head(10).tolist()
                 
@@ -487,6 +572,20 @@ class AdvancedSectorAnalyzer:
         
         self.logger.info("获取北向资金流入数据")
         
+        # 优先从北向资金存储读取最近交易日（一次区间请求增量更新）
+        store = self._get_north_flow_store()
+        if store is not None:
+            try:
+                store.update_market(days=10)
+                north_money = store.north_money()
+                if north_money is not None:
+                    north_money = north_money / 100  # 百万元转换为亿元
+                    self.logger.info(f"北向资金净流入: {north_money:.2f}亿元")
+                    self._update_cache(cache_key, north_money)
+                    return north_money
+            except Exception as e:
+                self.logger.warning(f"从北向资金存储读取失败: {str(e)}")
+        
         try:
             # 获取最新交易日
             today = self._get_latest_trade_date()
@@ -501,7 +600,7 @@ class AdvancedSectorAnalyzer:
             
             if north_data is not None and not north_data.empty:
                 # 计算北向资金
-                north_money = north_data['north_money'].sum() / 100000000  # 转换为亿元
+                north_money = north_data['north_money'].sum() / 100  # moneyflow_hsgt单位为百万元，转换为亿元
                 self.logger.info(f"北向资金净流入: {north_money:.2f}亿元")
                 
                 # 更新缓存
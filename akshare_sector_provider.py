@@ -14,7 +14,9 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Union
-import pickle
+
+from sector_cache import SectorCache, get_sector_cache
+from sector_catalog import concept_descriptor
 import threading
 
 # 配置日志
@@ -46,25 +48,25 @@ except ImportError:
 class AKShareSectorProvider:
     """AKShare行业数据提供器，使用AKShare获取申万行业和概念板块数据"""
     
-    def __init__(self, cache_dir='data_cache/akshare_sectors', cache_expiry=1800):
+    # 在统一行业缓存中的键前缀
+    CACHE_NAMESPACE = 'akshare:'
+    
+    def __init__(self, cache_dir=None, cache_expiry=None):
         """初始化AKShare行业数据提供器
         
         Args:
-            cache_dir: 缓存目录
-            cache_expiry: 缓存过期时间(秒)，默认30分钟
+            cache_dir: 独立缓存目录，默认使用统一行业缓存
+            cache_expiry: 缓存过期时间(秒)，默认使用统一行业缓存的过期时间
         """
-        self.cache_dir = cache_dir
+        if cache_dir is None:
+            self._cache = get_sector_cache()
+        else:
+            self._cache = SectorCache(cache_dir, cache_expiry or SectorCache.DEFAULT_EXPIRY)
+        self.cache_dir = self._cache.cache_dir
         self.cache_expiry = cache_expiry
-        self._cache = {}
         self._last_api_call = 0
         self.api_call_interval = 0.5  # API调用间隔(秒)
         
-        # 确保缓存目录存在
-        os.makedirs(self.cache_dir, exist_ok=True)
-        
-        # 加载本地缓存
-        self._load_cache_from_disk()
-        
     def _rate_limit(self) -> None:
         """API访问速率限制"""
         now = time.time()
@@ -73,90 +75,22 @@ class AKShareSectorProvider:
             time.sleep(self.api_call_interval - elapsed)
         self._last_api_call = time.time()
     
+    def _cache_key(self, key: str) -> str:
+        """统一行业缓存由多个模块共用，本提供器的键统一加上命名空间前缀"""
+        return self.CACHE_NAMESPACE + key
+    
     def _save_to_cache(self, key: str, data: any) -> None:
-        """保存数据到内存缓存和磁盘"""
-        self._cache[key] = {
-            'data': data,
-            'timestamp': time.time()
-        }
-        
-        # 保存到磁盘
-        try:
-            file_path = os.path.join(self.cache_dir, f"{key}.pkl")
-            with open(file_path, 'wb') as f:
-                pickle.dump(data, f)
-            logger.debug(f"数据已保存到磁盘: {key}")
-        except Exception as e:
-            logger.error(f"保存缓存到磁盘失败: {str(e)}")
+        """保存数据到统一行业缓存"""
+        self._cache.set(self._cache_key(key), data)
     
-    def _get_from_cache(self, key: str) -> Tuple[bool, any]:
-        """从缓存获取数据
+    def _get_from_cache(self, key: str, max_age: Optional[float] = None) -> Tuple[bool, any]:
+        """从统一行业缓存获取数据
         
         Returns:
             (是否命中缓存, 数据)
         """
-        current_time = time.time()
-        
-        # 检查内存缓存
-        if key in self._cache:
-            cache_item = self._cache[key]
-            if current_time - cache_item['timestamp'] < self.cache_expiry:
-                logger.debug(f"从内存缓存获取: {key}")
-                return True, cache_item['data']
-        
-        # 检查磁盘缓存
-        file_path = os.path.join(self.cache_dir, f"{key}.pkl")
-        if os.path.exists(file_path):
-            try:
-                # 检查文件修改时间
-                mod_time = os.path.getmtime(file_path)
-                if current_time - mod_time < self.cache_expiry:
-                    with open(file_path, 'rb') as f:
-                        data = pickle.load(f)
-                    
-                    # 更新内存缓存
-                    self._cache[key] = {
-                        'data': data,
-                        'timestamp': mod_time
-                    }
-                    
-                    logger.debug(f"从磁盘缓存获取: {key}")
-                    return True, data
-            except Exception as e:
-                logger.error(f"读取磁盘缓存失败: {str(e)}")
-        
-        return False, None
-    
-    def _load_cache_from_disk(self) -> None:
-        """启动时加载磁盘缓存到内存"""
-        if not os.path.exists(self.cache_dir):
-            return
-            
-        try:
-            files = [f for f in os.listdir(self.cache_dir) if f.endswith('.pkl')]
-            if not files:
-                return
-                
-            logger.info(f"加载磁盘缓存，共 {len(files)} 个文件")
-            for file in files:
-                key = file.replace('.pkl', '')
-                file_path = os.path.join(self.cache_dir, file)
-                mod_time = os.path.getmtime(file_path)
-                
-                try:
-                    with open(file_path, 'rb') as f:
-                        data = pickle.load(f)
-                    
-                    self._cache[key] = {
-                        'data': data,
-                        'timestamp': mod_time
-                    }
-                except Exception as e:
-                    logger.error(f"加载缓存文件 {file} 失败: {str(e)}")
-            
-            logger.info(f"成功加载 {len(self._cache)} 个缓存项")
-        except Exception as e:
-            logger.error(f"加载缓存目录失败: {str(e)}")
+        data = self._cache.get(self._cache_key(key), max_age=max_age if max_age is not None else self.cache_expiry)
+        return data is not None, data
     
     def get_sector_list(self) -> List[Dict]:
         """获取行业列表，包括申万行业和热门概念板块
@@ -190,21 +124,14 @@ class AKShareSectorProvider:
         except Exception as e:
             logger.error(f"获取申万行业列表失败: {str(e)}")
         
-        # 获取概念板块
+        # 获取概念板块：保留全部板块的轻量描述，历史数据在预筛选后按需获取
         try:
-            self._rate_limit()
-            concepts = ak.stock_board_concept_name_em()
+            concepts = self._get_concept_board_spot()
             
             if concepts is not None and not concepts.empty:
                 logger.info(f"获取到 {len(concepts)} 个概念板块")
-                # 只取前30个概念板块，避免太多
-                for _, row in concepts.head(30).iterrows():
-                    sectors.append({
-                        'code': row['板块代码'],
-                        'name': row['板块名称'],
-                        'type': 'CN',
-                        'description': f'概念板块-{row["板块名称"]}'
-                    })
+                sectors.extend(concept_descriptor(code, name, 'CN')
+                               for code, name in zip(concepts['板块代码'], concepts['板块名称']))
         except Exception as e:
             logger.error(f"获取概念板块列表失败: {str(e)}")
         
@@ -212,6 +139,42 @@ class AKShareSectorProvider:
         self._save_to_cache(cache_key, sectors)
         return sectors
     
+    def _get_concept_board_spot(self) -> Optional[pd.DataFrame]:
+        """东方财富概念板块实时行情（一次请求返回全部板块），缓存5分钟"""
+        cache_key = 'concept_board_spot'
+        hit, data = self._get_from_cache(cache_key, max_age=300)
+        if hit:
+            return data
+        self._rate_limit()
+        concepts = ak.stock_board_concept_name_em()
+        if concepts is not None and not concepts.empty:
+            self._save_to_cache(cache_key, concepts)
+        return concepts
+    
+    def get_sector_snapshot(self, refresh: bool = False) -> pd.DataFrame:
+        """概念板块截面快照，用于按需加载历史数据前的预筛选
+        
+        全部概念板块的行情与行业列表来自同一次请求，5分钟内直接使用缓存
+        
+        Args:
+            refresh: 与TushareSectorProvider保持一致的参数，缓存过期后总会重新请求
+        
+        Returns:
+            以板块代码为索引、包含change_pct和amount(总市值×换手率估算)的DataFrame
+        """
+        try:
+            concepts = self._get_concept_board_spot()
+            if concepts is None or concepts.empty:
+                return pd.DataFrame(columns=['change_pct', 'amount'])
+            return pd.DataFrame({
+                'change_pct': pd.to_numeric(concepts['涨跌幅'], errors='coerce').to_numpy(),
+                'amount': (pd.to_numeric(concepts['总市值'], errors='coerce') *
+                           pd.to_numeric(concepts['换手率'], errors='coerce') / 100).to_numpy()
+            }, index=concepts['板块代码'].astype(str).to_numpy())
+        except Exception as e:
+            logger.error(f"获取概念板块快照失败: {str(e)}")
+            return pd.DataFrame(columns=['change_pct', 'amount'])
+    
     def get_sector_history(self, sector_code: str, days: int = 90) -> Optional[pd.DataFrame]:
         """获取行业历史数据
         
@@ -222,7 +185,7 @@ class AKShareSectorProvider:
         Returns:
             DataFrame包含行业历史数据 (日期索引, OHLCV数据)
         """
-        cache_key = f'history_{sector_code}'
+        cache_key = f'history:{sector_code}'
         hit, data = self._get_from_cache(cache_key)
         if hit:
             return data
@@ -387,7 +350,7 @@ class AKShareSectorProvider:
             logger.error(f"无效的概念板块代码: {concept_code}，应以BK开头")
             return None
             
-        cache_key = f'concept_detail_{concept_code}'
+        cache_key = f'concept_detail:{concept_code}'
         hit, data = self._get_from_cache(cache_key)
         if hit:
             return data
@@ -424,11 +387,10 @@ class AKShareSectorProvider:
             交易日期字符串 (YYYYMMDD)
         """
         cache_key = 'latest_trading_day'
-        hit, data = self._get_from_cache(cache_key)
+        # 缓存时间不超过1天，直接返回
+        hit, data = self._get_from_cache(cache_key, max_age=86400)
         if hit:
-            # 如果缓存时间不超过1天，直接返回
-            if time.time() - self._cache[cache_key]['timestamp'] < 86400:
-                return data
+            return data
         
         # 默认返回当前日期
         latest_day = datetime.now().strftime('%Y%m%d')
@@ -449,59 +411,26 @@ class AKShareSectorProvider:
         return latest_day
 
     def clear_cache(self, older_than_days=None):
-        """清除缓存
+        """清除本提供器的缓存，统一行业缓存中其他模块的数据不受影响
         
         Args:
             older_than_days: 只清除几天前的缓存，None表示清除所有
         """
         if older_than_days is None:
-            # 清除所有内存缓存
-            self._cache.clear()
-            
-            # 清除所有磁盘缓存
-            if os.path.exists(self.cache_dir):
-                for file in os.listdir(self.cache_dir):
-                    if file.endswith('.pkl'):
-                        try:
-                            os.remove(os.path.join(self.cache_dir, file))
-                        except Exception as e:
-                            logger.error(f"删除缓存文件 {file} 失败: {str(e)}")
-            
-            logger.info("已清除所有缓存")
+            removed = self._cache.clear(prefix=self.CACHE_NAMESPACE)
+            logger.info(f"已清除所有AKShare缓存，共 {removed} 项")
         else:
-            # 计算截止时间
-            cutoff_time = time.time() - older_than_days * 86400
-            
-            # 清除旧的内存缓存
-            keys_to_remove = []
-            for key, value in self._cache.items():
-                if value['timestamp'] < cutoff_time:
-                    keys_to_remove.append(key)
-            
-            for key in keys_to_remove:
-                del self._cache[key]
-            
-            # 清除旧的磁盘缓存
-            if os.path.exists(self.cache_dir):
-                for file in os.listdir(self.cache_dir):
-                    if file.endswith('.pkl'):
-                        file_path = os.path.join(self.cache_dir, file)
-                        try:
-                            if os.path.getmtime(file_path) < cutoff_time:
-                                os.remove(file_path)
-                        except Exception as e:
-                            logger.error(f"删除缓存文件 {file} 失败: {str(e)}")
-            
-            logger.info(f"已清除 {len(keys_to_remove)} 个超过 {older_than_days} 天的缓存项")
+            removed = self._cache.clear(prefix=self.CACHE_NAMESPACE, older_than=older_than_days * 86400)
+            logger.info(f"已清除 {removed} 个超过 {older_than_days} 天的缓存项")
 
 # 单例模式提供全局访问点
 _instance = None
 
-def get_sector_provider(cache_dir='data_cache/akshare_sectors', cache_expiry=1800):
+def get_sector_provider(cache_dir=None, cache_expiry=None):
     """获取AKShareSectorProvider单例
     
     Args:
-        cache_dir: 缓存目录
+        cache_dir: 独立缓存目录，默认使用统一行业缓存
         cache_expiry: 缓存过期时间(秒)
         
     Returns:
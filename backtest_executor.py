@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+并行回测执行模块
+为(股票代码, 策略, 参数)回测任务提供可替换的执行后端，
+执行池按需创建并在进程内共享，结果按完成顺序流式返回
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger('BacktestExecutor')
+
+
+@dataclass
+class BacktestJob:
+    """回测任务"""
+    symbol: str
+    strategy: Union[str, Callable]  # 策略名（如'kdj'）或信号函数
+    params: Dict[str, Any] = field(default_factory=dict)
+    data: Any = None  # 行情数据DataFrame，为空时由data_loader加载
+    job_id: int = 0
+
+
+@dataclass
+class BacktestJobResult:
+    """回测任务结果"""
+    job_id: int
+    symbol: str
+    strategy: str
+    params: Dict[str, Any]
+    success: bool
+    result: Any = None
+    error: Optional[str] = None
+    execution_time: float = 0.0
+
+
+class BacktestBackend:
+    """执行后端基类，子类负责提供concurrent.futures兼容的执行器"""
+
+    def get_executor(self) -> Executor:
+        raise NotImplementedError
+
+    def shutdown(self, wait: bool = True):
+        pass
+
+
+class _LazyPoolBackend(BacktestBackend):
+    """首次提交任务时才创建执行池的后端"""
+    executor_cls = ThreadPoolExecutor
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self.executor_cls(max_workers=self.max_workers)
+                    logger.info(f"创建{self.executor_cls.__name__}, max_workers={self.max_workers}")
+        return self._executor
+
+    @property
+    def started(self) -> bool:
+        """执行池是否已创建"""
+        return self._executor is not None
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+class LocalProcessBackend(_LazyPoolBackend):
+    """本地多进程后端（默认），策略和数据加载函数需可序列化"""
+    executor_cls = ProcessPoolExecutor
+
+    def __init__(self, max_workers: Optional[int] = None):
+        super().__init__(max_workers or os.cpu_count())
+
+
+class LocalThreadBackend(_LazyPoolBackend):
+    """本地线程后端，适合IO密集或不可序列化的策略函数"""
+    executor_cls = ThreadPoolExecutor
+
+    def __init__(self, max_workers: Optional[int] = None):
+        super().__init__(max_workers or (os.cpu_count() or 4) * 2)
+
+
+class ExecutorBackend(BacktestBackend):
+    """包装外部执行器的后端，用于接入集群
+
+    任何concurrent.futures.Executor均可使用，例如dask的client.get_executor()
+    """
+
+    def __init__(self, executor: Executor):
+        self._executor = executor
+
+    def get_executor(self) -> Executor:
+        return self._executor
+
+    def shutdown(self, wait: bool = True):
+        # 外部执行器的生命周期由调用方管理
+        pass
+
+
+_default_backends: Dict[str, _LazyPoolBackend] = {}
+_default_backends_lock = threading.Lock()
+
+
+def get_shared_backend(kind: str = 'process') -> BacktestBackend:
+    """获取进程内共享的本地后端
+
+    Args:
+        kind: 'process' 或 'thread'
+    """
+    with _default_backends_lock:
+        if kind not in _default_backends:
+            if kind == 'process':
+                _default_backends[kind] = LocalProcessBackend()
+            elif kind == 'thread':
+                _default_backends[kind] = LocalThreadBackend()
+            else:
+                raise ValueError(f"未知的后端类型: {kind}")
+        return _default_backends[kind]
+
+
+def shutdown_shared_backends(wait: bool = True):
+    """关闭所有共享后端"""
+    with _default_backends_lock:
+        for backend in _default_backends.values():
+            backend.shutdown(wait=wait)
+        _default_backends.clear()
+
+
+def _strategy_name(strategy: Union[str, Callable]) -> str:
+    return strategy if isinstance(strategy, str) else getattr(strategy, '__name__', repr(strategy))
+
+
+def normalize_jobs(jobs: Iterable[Union[BacktestJob, Tuple]]) -> List[BacktestJob]:
+    """将(symbol, strategy, params)元组统一转换为BacktestJob"""
+    normalized = []
+    for i, job in enumerate(jobs):
+        if not isinstance(job, BacktestJob):
+            symbol, strategy = job[0], job[1]
+            params = job[2] if len(job) > 2 and job[2] else {}
+            job = BacktestJob(symbol=symbol, strategy=strategy, params=dict(params))
+        job.job_id = i
+        normalized.append(job)
+    return normalized
+
+
+def run_backtest_job(job: BacktestJob, initial_capital: float = 1000000.0,
+                     data_loader: Optional[Callable[[str], Any]] = None) -> BacktestJobResult:
+    """执行单个回测任务（在工作进程/线程中运行）
+
+    字符串策略映射到EnhancedBacktester.backtest_{name}_strategy；参数中与回测器
+    属性同名的项（如trailing_stop_pct）作为风控设置，其余作为策略参数传入。
+    """
+    from enhanced_backtesting import EnhancedBacktester
+
+    start_time = time.time()
+    name = _strategy_name(job.strategy)
+    try:
+        data = job.data if job.data is not None else (data_loader(job.symbol) if data_loader else None)
+        if data is None or len(data) == 0:
+            raise ValueError(f"{job.symbol} 没有可用的行情数据")
+
+        backtester = EnhancedBacktester(initial_capital=initial_capital)
+        strategy_params = {}
+        for key, value in job.params.items():
+            if hasattr(backtester, key) and not callable(getattr(backtester, key)):
+                setattr(backtester, key, value)
+            else:
+                strategy_params[key] = value
+
+        if callable(job.strategy):
+            result = backtester.backtest_strategy(data.copy(), job.strategy, **strategy_params)
+        else:
+            method = getattr(backtester, f'backtest_{job.strategy}_strategy', None)
+            if method is None:
+                raise ValueError(f"未实现的策略类型: {job.strategy}")
+            result = method(data.copy(), job.symbol, **strategy_params)
+
+        return BacktestJobResult(job.job_id, job.symbol, name, job.params, True,
+                                 result=result, execution_time=time.time() - start_time)
+    except Exception as e:
+        return BacktestJobResult(job.job_id, job.symbol, name, job.params, False,
+                                 error=str(e), execution_time=time.time() - start_time)
+
+
+def iter_backtests(jobs: Iterable[Union[BacktestJob, Tuple]],
+                   backend: Optional[BacktestBackend] = None,
+                   initial_capital: float = 1000000.0,
+                   data: Optional[Dict[str, Any]] = None,
+                   data_loader: Optional[Callable[[str], Any]] = None,
+                   progress_callback: Optional[Callable[[int, int, BacktestJobResult], None]] = None
+                   ) -> Iterator[BacktestJobResult]:
+    """并行执行回测任务，按完成顺序逐个返回结果
+
+    Args:
+        jobs: BacktestJob或(symbol, strategy, params)元组列表
+        backend: 执行后端，默认使用共享的本地进程后端
+        initial_capital: 每个任务的初始资金
+        data: 股票代码到行情数据的映射
+        data_loader: 按股票代码加载行情数据的函数（在工作端调用）
+        progress_callback: 进度回调 (已完成数, 总数, 本次结果)
+    """
+    jobs = normalize_jobs(jobs)
+    if not jobs:
+        return
+    if data:
+        for job in jobs:
+            if job.data is None:
+                job.data = data.get(job.symbol)
+
+    backend = backend or get_shared_backend('process')
+    executor = backend.get_executor()
+    futures = {executor.submit(run_backtest_job, job, initial_capital, data_loader): job for job in jobs}
+
+    total = len(futures)
+    completed = 0
+    for future in as_completed(futures):
+        job = futures[future]
+        try:
+            job_result = future.result()
+        except Exception as e:
+            # 工作进程崩溃或任务无法序列化
+            job_result = BacktestJobResult(job.job_id, job.symbol, _strategy_name(job.strategy),
+                                           job.params, False, error=str(e))
+        completed += 1
+        if not job_result.success:
+            logger.warning(f"回测任务失败 {job_result.symbol}/{job_result.strategy}: {job_result.error}")
+        if progress_callback:
+            progress_callback(completed, total, job_result)
+        yield job_result
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+回测结果缓存模块
+以(策略版本, 参数, 输入行情指纹)的内容哈希作为键保存回测结果，
+相同组合再次回测时直接读取；索引文件只追加，用于列出历史结果
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger('BacktestResultCache')
+
+
+def _json_default(obj: Any) -> Any:
+    """JSON序列化numpy标量、时间等对象"""
+    if hasattr(obj, 'item'):
+        return obj.item()
+    if isinstance(obj, (datetime, pd.Timestamp)):
+        return obj.isoformat()
+    return str(obj)
+
+
+def fingerprint_data(df: pd.DataFrame) -> str:
+    """计算行情数据指纹（包含索引、列名和全部数值）"""
+    hasher = hashlib.sha1()
+    hasher.update(','.join(map(str, df.columns)).encode('utf-8'))
+    hasher.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return hasher.hexdigest()
+
+
+class BacktestResultCache:
+    """内容寻址的回测结果缓存"""
+
+    INDEX_FILE = 'index.jsonl'
+
+    def __init__(self, cache_dir: str):
+        """初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+        """
+        self.cache_dir = cache_dir
+        self.results_dir = os.path.join(cache_dir, 'results')
+        self.index_path = os.path.join(cache_dir, self.INDEX_FILE)
+        os.makedirs(self.results_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(strategy_id: str, strategy_version: Any, parameters: Dict[str, Any],
+                 data_fingerprint: str) -> str:
+        """生成缓存键"""
+        payload = json.dumps({
+            'strategy_id': strategy_id,
+            'strategy_version': strategy_version,
+            'parameters': parameters,
+            'data': data_fingerprint
+        }, sort_keys=True, default=_json_default)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _result_path(self, key: str) -> str:
+        return os.path.join(self.results_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存结果，不存在时返回None"""
+        path = self._result_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            self.hits += 1
+            return result
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"读取回测缓存 {key} 失败: {str(e)}")
+            self.misses += 1
+            return None
+
+    def put(self, key: str, result: Dict[str, Any], meta: Optional[Dict[str, Any]] = None):
+        """写入缓存结果并追加索引
+
+        Args:
+            key: 缓存键
+            result: 回测结果
+            meta: 写入索引的摘要信息（策略、股票、区间、主要指标等）
+        """
+        path = self._result_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, default=_json_default)
+        os.replace(tmp_path, path)
+
+        entry = dict(meta or {}, key=key, cached_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        with self._lock:
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False, default=_json_default) + '\n')
+
+    def list_results(self, strategy_id: Optional[str] = None, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """列出历史回测结果摘要（同一键只保留最近一条）"""
+        if not os.path.exists(self.index_path):
+            return []
+        entries: Dict[str, Dict[str, Any]] = {}
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # 跳过写入中断的残行
+                if strategy_id and entry.get('strategy_id') != strategy_id:
+                    continue
+                if symbol and entry.get('symbol') != symbol:
+                    continue
+                entries[entry['key']] = entry
+        return sorted(entries.values(), key=lambda e: e.get('cached_time', ''), reverse=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存命中统计"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
@@ -5,11 +5,15 @@ from dataclasses import dataclass
 import json
 from datetime import datetime
 from enum import Enum
-from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from cachetools import LRUCache
 import os
 
+from trade_log import TradeLog
+
+# 回测结果的默认输出目录
+RESULTS_DIR = os.path.join('data_cache', 'backtest_results')
+
 @dataclass
 class TradeRecord:
     """交易记录数据结构"""
@@ -25,7 +29,7 @@ class TradeRecord:
 class BacktestResult:
     """回测结果数据结构"""
     def __init__(self):
-        self.trades: List[TradeRecord] = []
+        self.trades: TradeLog = TradeLog(TradeRecord, capacity=1)
         self.total_profit: float = 0.0
         self.max_drawdown: float = 0.0
         self.win_rate: float = 0.0
@@ -45,16 +49,14 @@ class Backtester:
         self.initial_capital = initial_capital
         self.current_capital = initial_capital
         self.positions: Dict[str, float] = {}
-        self.trades: List[TradeRecord] = []
+        self.trades: TradeLog = TradeLog(TradeRecord)
         self.daily_returns: List[float] = []
         self.max_capital = initial_capital
         self.risk_free_rate = 0.03
         self.total_profit = 0.0  # 新增初始化
         self.max_drawdown = 0.0  # 新增初始化
         self.win_rate = 0.0  # 新增初始化
-        self._thread_pool = ThreadPoolExecutor(max_workers=os.cpu_count()*2)
         self._calculation_cache = LRUCache(maxsize=1024)
-        self._metric_cache = {}
 
     @lru_cache(maxsize=1024)
     def calculate_position_size(self, price: float, risk_per_trade: float = 0.02) -> float:
@@ -84,7 +86,6 @@ class Backtester:
 
             # 新增缓存清理
             self._calculation_cache.clear()
-            self._metric_cache.clear()
 
             if action not in ['buy', 'sell']:
                 raise ValueError(f"无效的交易动作: {action}")
@@ -181,40 +182,20 @@ class Backtester:
                 f.write(error_msg + '\n')
             return None
 
-    def _parallel_calculate_metrics(self, trades: List[TradeRecord]) -> Tuple:
+    def _calculate_log_metrics(self, trades: TradeLog) -> Tuple:
+        """直接在交易记录的列数组上计算全部指标，不还原为TradeRecord对象"""
         if not trades:
             return ({}, {}, {}, {})
-        try:
-            try:
-                timestamps = [t.timestamp.isoformat() for t in trades if t.timestamp]
-                cache_key = hash(frozenset(zip(timestamps, [t.symbol for t in trades], [t.action for t in trades])))
-            except Exception:
-                cache_key = hash((len(trades), trades[0].symbol if trades else ''))
-            if cached := self._metric_cache.get(cache_key):
-                return cached
-        except Exception as e:
-            print(f"缓存键生成失败: {str(e)}")
-
-        futures = []
-        with self._thread_pool as executor:
-            for batch in [trades[i:i+len(trades)//4] for i in range(0, len(trades), len(trades)//4)]:
-                futures.append(executor.submit(self._calculate_profit_metrics, batch))
-                futures.append(executor.submit(self._calculate_risk_metrics, batch))
-                futures.append(executor.submit(self._calculate_trade_metrics, batch))
-                futures.append(executor.submit(self._calculate_holding_metrics, batch))
-
-        results = [future.result() for future in futures]
-        aggregated = (
-            self._aggregate_profit(results[::4]),
-            self._aggregate_risk(results[1::4]),
-            self._aggregate_trade(results[2::4]),
-            self._aggregate_holding(results[3::4])
+        profits = trades.column('profit')
+        return (
+            self._calculate_profit_metrics(profits),
+            self._calculate_risk_metrics(trades.column('drawdown')),
+            self._calculate_trade_metrics(profits),
+            self._calculate_holding_metrics(trades)
         )
-        self._metric_cache[cache_key] = aggregated
-        return aggregated
 
-    def _calculate_profit_metrics(self, trades: List[TradeRecord]) -> Dict:
-        if not trades:
+    def _calculate_profit_metrics(self, profits: np.ndarray) -> Dict:
+        if len(profits) == 0:
             return {
                 'total_profit': 0.0,
                 'win_count': 0,
@@ -222,37 +203,37 @@ class Backtester:
                 'win_rate': 0.0,
                 'profit_ratio': 0.0
             }
-        profits = [trade.profit for trade in trades]
-        total_profit = sum(profits)
-        win_count = sum(1 for p in profits if p > 0)
-        loss_count = sum(1 for p in profits if p < 0)
-        win_rate = win_count / len(trades) if trades else 0
-        avg_win = np.mean([p for p in profits if p > 0]) if win_count > 0 else 0
-        avg_loss = abs(np.mean([p for p in profits if p < 0])) if loss_count > 0 else 1
+        wins = profits[profits > 0]
+        losses = profits[profits < 0]
+        win_count = len(wins)
+        loss_count = len(losses)
+        win_rate = win_count / len(profits)
+        avg_win = wins.mean() if win_count > 0 else 0
+        avg_loss = abs(losses.mean()) if loss_count > 0 else 1
         profit_ratio = avg_win / avg_loss if avg_loss > 0 else 0
-        
+
         return {
-            'total_profit': total_profit,
+            'total_profit': float(profits.sum()),
             'win_count': win_count,
             'loss_count': loss_count,
             'win_rate': win_rate,
-            'profit_ratio': profit_ratio
+            'profit_ratio': float(profit_ratio)
         }
 
-    def _calculate_risk_metrics(self, trades: List[TradeRecord]) -> Dict:
-        if not trades:
+    def _calculate_risk_metrics(self, drawdowns: np.ndarray) -> Dict:
+        if len(drawdowns) == 0:
             return {
                 'max_drawdown': 0.0,
                 'annual_return': 0.0,
                 'volatility': 0.0,
                 'sharpe_ratio': 0.0
             }
-        max_drawdown = max(trade.drawdown for trade in trades) if trades else 0
+        max_drawdown = float(drawdowns.max())
         returns = np.array(self.daily_returns)
         annual_return = np.mean(returns) * 252 if len(returns) > 0 else 0
         volatility = np.std(returns) * np.sqrt(252) if len(returns) > 0 else 0
         sharpe_ratio = (annual_return - self.risk_free_rate) / volatility if volatility > 0 else 0
-        
+
         return {
             'max_drawdown': max_drawdown,
             'annual_return': annual_return,
@@ -260,67 +241,47 @@ class Backtester:
             'sharpe_ratio': sharpe_ratio
         }
 
-    def _calculate_trade_metrics(self, trades: List[TradeRecord]) -> Dict:
-        current_streak = 0
-        max_win_streak = 0
-        max_loss_streak = 0
-        profits = [trade.profit for trade in trades]
-        
-        for profit in profits:
-            if profit > 0:
-                if current_streak > 0:
-                    current_streak += 1
-                else:
-                    current_streak = 1
-                max_win_streak = max(max_win_streak, current_streak)
-            elif profit < 0:
-                if current_streak < 0:
-                    current_streak -= 1
-                else:
-                    current_streak = -1
-                max_loss_streak = min(max_loss_streak, current_streak)
-        
+    def _calculate_trade_metrics(self, profits: np.ndarray) -> Dict:
+        # 持平的交易不中断连胜连亏，去掉后按符号分段求最长连续段
+        signs = np.sign(profits[profits != 0])
+        max_win_streak = max_loss_streak = 0
+        if len(signs):
+            bounds = np.flatnonzero(np.diff(signs)) + 1
+            starts = np.r_[0, bounds]
+            lengths = np.diff(np.r_[starts, len(signs)])
+            run_signs = signs[starts]
+            max_win_streak = int(lengths[run_signs > 0].max(initial=0))
+            max_loss_streak = int(lengths[run_signs < 0].max(initial=0))
+
         return {
             'max_consecutive_wins': max_win_streak,
-            'max_consecutive_losses': abs(max_loss_streak)
+            'max_consecutive_losses': max_loss_streak
         }
 
-    def _calculate_holding_metrics(self, trades: List[TradeRecord]) -> Dict:
+    def _calculate_holding_metrics(self, trades: TradeLog) -> Dict:
+        timestamps = trades.array['timestamp']
+        actions = trades.column('action')
+        symbols = trades.array['symbol']
         holding_periods = []
-        try:
-            # 优化持仓周期计算逻辑
-            buy_trades = {}
-            for trade in trades:
-                if trade.action == 'buy':
-                    if trade.symbol not in buy_trades:
-                        buy_trades[trade.symbol] = []
-                    buy_trades[trade.symbol].append(trade)
-                elif trade.action == 'sell' and trade.symbol in buy_trades and buy_trades[trade.symbol]:
-                    buy_trade = buy_trades[trade.symbol].pop(0)  # 获取最早的买入交易
-                    period = (trade.timestamp - buy_trade.timestamp).days
-                    if period >= 0:  # 确保周期有效
-                        holding_periods.append(period)
-            
-            # 如果没有配对的交易，使用传统方法
-            if not holding_periods:
-                for i in range(0, len(trades)-1, 2):
-                    if i+1 < len(trades):
-                        period = (trades[i+1].timestamp - trades[i].timestamp).days
-                        if period >= 0:  # 确保周期有效
-                            holding_periods.append(period)
-        except Exception as e:
-            print(f"计算持仓周期时出错: {str(e)}")
-            # 出错时使用简化方法
-            for i in range(0, len(trades)-1, 2):
-                if i+1 < len(trades):
-                    try:
-                        period = (trades[i+1].timestamp - trades[i].timestamp).days
-                        if period >= 0:
-                            holding_periods.append(period)
-                    except:
-                        continue
-        
-        avg_holding_period = np.mean(holding_periods) if holding_periods else 0
+        # 每笔卖出与同一股票之前最早的未配对买入配对，只遍历卖出记录
+        for symbol in np.unique(symbols):
+            rows = np.flatnonzero(symbols == symbol)
+            buys = rows[actions[rows] == 'buy']
+            matched = 0
+            for sell in rows[actions[rows] == 'sell']:
+                if np.searchsorted(buys, sell) > matched:
+                    holding_periods.append(timestamps[sell] - timestamps[buys[matched]])
+                    matched += 1
+
+        # 没有配对的交易时按相邻两笔计算
+        if not holding_periods:
+            pairs = len(timestamps) // 2 * 2
+            holding_periods = list(timestamps[1:pairs:2] - timestamps[0:pairs:2])
+
+        periods = np.array(holding_periods, dtype='timedelta64[ns]')
+        periods = periods[~np.isnat(periods)]
+        days = periods[periods >= np.timedelta64(0, 'ns')] // np.timedelta64(1, 'D')
+        avg_holding_period = float(days.mean()) if len(days) else 0
         return {'avg_holding_period': avg_holding_period}
 
     def calculate_metrics(self) -> BacktestResult:
@@ -333,7 +294,7 @@ class Backtester:
         if result.trade_count == 0:
             return result
 
-        profit_metrics, risk_metrics, trade_metrics, holding_metrics = self._parallel_calculate_metrics(self.trades)
+        profit_metrics, risk_metrics, trade_metrics, holding_metrics = self._calculate_log_metrics(self.trades)
 
         result.total_profit = profit_metrics['total_profit']
         result.win_count = profit_metrics['win_count']
@@ -355,9 +316,18 @@ class Backtester:
         self._save_results_to_json(result)
         return result
         
-    def _save_results_to_json(self, result: BacktestResult) -> None:
-        """将回测结果保存到JSON文件"""
+    def _save_results_to_json(self, result: BacktestResult,
+                              trades_path: Optional[str] = None) -> None:
+        """将回测汇总保存到JSON文件，交易明细以压缩二进制格式单独保存
+
+        Args:
+            result: 回测结果
+            trades_path: 交易明细文件路径，默认保存在RESULTS_DIR下
+        """
         try:
+            if trades_path is None:
+                trades_path = os.path.join(RESULTS_DIR, 'backtest_trades.npz')
+            os.makedirs(os.path.dirname(trades_path) or '.', exist_ok=True)
             result_dict = {
                 'total_profit': result.total_profit,
                 'max_drawdown': result.max_drawdown,
@@ -372,18 +342,10 @@ class Backtester:
                 'avg_holding_period': result.avg_holding_period,
                 'max_consecutive_wins': result.max_consecutive_wins,
                 'max_consecutive_losses': result.max_consecutive_losses,
-                'trades': [{
-                    'timestamp': t.timestamp.isoformat(),
-                    'symbol': t.symbol,
-                    'action': t.action,
-                    'price': t.price,
-                    'volume': t.volume,
-                    'position': t.position,
-                    'profit': t.profit,
-                    'drawdown': t.drawdown
-                } for t in result.trades],
+                'trades_file': trades_path,
                 'daily_returns': self.daily_returns
             }
+            result.trades.save(trades_path)
             with open('backtest_results.json', 'w') as f:
                 json.dump(result_dict, f, indent=2)
         except Exception as e:
@@ -418,38 +380,3 @@ class Backtester:
             )
 
         return '\n'.join(report)
-
-    def _aggregate_profit(self, results: List[Dict]) -> Dict:
-        return {
-            'total_profit': sum(r['total_profit'] for r in results),
-            'win_count': sum(r['win_count'] for r in results),
-            'loss_count': sum(r['loss_count'] for r in results),
-            'win_rate': np.mean([r['win_rate'] for r in results]) if results else 0,
-            'profit_ratio': np.mean([r['profit_ratio'] for r in results]) if results else 0
-        }
-
-    def _aggregate_risk(self, results: List[Dict]) -> Dict:
-        return {
-            'max_drawdown': max(r['max_drawdown'] for r in results) if results else 0,
-            'annual_return': np.mean([r['annual_return'] for r in results]) if results else 0,
-            'volatility': np.mean([r['volatility'] for r in results]) if results else 0,
-            'sharpe_ratio': np.mean([r['sharpe_ratio'] for r in results]) if results else 0
-        }
-
-    def _aggregate_trade(self, results: List[Dict]) -> Dict:
-        return {
-            'max_consecutive_wins': max(r['max_consecutive_wins'] for r in results) if results else 0,
-            'max_consecutive_losses': max(r['max_consecutive_losses'] for r in results) if results else 0
-        }
-
-    def _aggregate_holding(self, results: List[Dict]) -> Dict:
-        try:
-            if not results:
-                return {'avg_holding_period': 0}
-            valid_periods = [r['avg_holding_period'] for r in results if r and r.get('avg_holding_period') is not None]
-            return {
-                'avg_holding_period': np.mean(valid_periods) if valid_periods else 0
-            }
-        except Exception as e:
-            print(f"计算持仓指标时出错: {str(e)}")
-            return {'avg_holding_period': 0}
\ No newline at end of file
@@ -60,7 +60,7 @@ class Backtesting:
         
         # 计算其他指标
         if backtester.trades:
-            profit_metrics, risk_metrics, trade_metrics, holding_metrics = backtester._parallel_calculate_metrics(backtester.trades)
+            profit_metrics, risk_metrics, trade_metrics, holding_metrics = backtester._calculate_log_metrics(backtester.trades)
             
             result.profit_ratio = profit_metrics.get('profit_ratio', 0.0)
             result.sharpe_ratio = risk_metrics.get('sharpe_ratio', 0.0)
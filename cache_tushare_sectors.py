@@ -249,6 +249,24 @@ class TushareSectorCache:
                 sectors = sectors[:max_sectors]
                 logger.info(f"限制为前 {max_sectors} 个行业")
             
+            # 按交易日批量获取全部申万/中信行业行情，只有面板中没有的行业才逐个请求
+            engine = None
+            try:
+                from sector_data_engine import get_sector_data_engine
+                engine = get_sector_data_engine(pro=self.ts_api)
+                engine.update(90)
+            except Exception as e:
+                logger.warning(f"行业截面数据引擎不可用，逐个获取行业数据: {str(e)}")
+                engine = None
+            
+            # 行业成分索引，概念板块成分股优先从索引读取
+            membership = None
+            try:
+                from sector_membership import get_membership_index
+                membership = get_membership_index(pro=self.ts_api, refresh=True)
+            except Exception as e:
+                logger.warning(f"行业成分索引不可用: {str(e)}")
+            
             success_count = 0
             for sector in sectors:
                 sector_code = sector['code']
@@ -257,6 +275,14 @@ class TushareSectorCache:
                 logger.info(f"获取行业 {sector_name} 历史数据")
                 success = False
                 
+                panel_data = engine.get_sector_history(sector_code, days=90, update=False) if engine else None
+                if panel_data is not None:
+                    history_data = panel_data.drop(columns=['数据来源']).reset_index()
+                    if self._save_to_cache(f"history_{sector_code}", history_data):
+                        logger.info(f"成功缓存行业 {sector_name} 历史数据，共 {len(history_data)} 条记录")
+                        success_count += 1
+                    continue
+                
                 # 尝试直接获取行业指数数据
                 try:
                     history_data = self.ts_api.index_daily(ts_code=sector_code, start_date=start_date, end_date=end_date)
@@ -300,7 +326,10 @@ class TushareSectorCache:
                             logger.info(f"尝试获取 {sector_name} 成分股")
                             try:
                                 # 获取成分股
-                                if 'ts_code' in sector:
+                                index_members = membership.stocks_of(sector['code']) if membership else []
+                                if index_members:
+                                    concept_stocks = pd.DataFrame({'ts_code': index_members})
+                                elif 'ts_code' in sector:
                                     concept_stocks = self.ts_api.concept_detail(concept_id=sector['ts_code'].split('.')[0])
                                 else:
                                     concept_stocks = self.ts_api.concept_detail(concept_id=sector['code'])
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+图表渲染模块
+绘图前把过长的历史数据抽稀到屏幕能显示的点数：K线按桶聚合开高低收，保留影线极值；
+纯折线数据用LTTB(Largest-Triangle-Three-Buckets)选点，保留走势形状。
+渲染好的图表按(股票代码, 数据范围, 图表类型)缓存，数据范围和最后一根K线都没变时再次打开直接复用
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+from memory_cache import BoundedCache
+
+logger = logging.getLogger('ChartRender')
+
+# 单张图表默认最多绘制的K线数量，约为一屏的像素宽度
+DEFAULT_MAX_POINTS = 600
+# 图表缓存保留的数量
+FIGURE_CACHE_SIZE = 32
+
+# K线列的桶内聚合方式，按小写列名匹配
+_OHLC_AGG = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last',
+             'volume': 'sum', 'vol': 'sum', 'amount': 'sum'}
+
+_figure_cache = None
+_figure_cache_lock = threading.Lock()
+
+
+def lttb_indices(x, y, threshold: int) -> np.ndarray:
+    """LTTB降采样，选出最能保持折线形状的点
+
+    Args:
+        x: 横坐标，单调递增
+        y: 纵坐标
+        threshold: 保留的点数，至少为3
+
+    Returns:
+        选中点的位置下标(升序)，首尾两点总会保留
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # 缺失值不参与面积计算，按前值填充后仍保持原有位置
+    if np.isnan(y).any():
+        y = pd.Series(y).ffill().bfill().fillna(0.0).to_numpy()
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    # 去掉首尾后把剩余的点均分为threshold-2个桶
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # 下一个桶的平均点作为三角形的第三个顶点，最后一个桶使用终点
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        area = np.abs((x[a] - avg_x) * (bucket_y - y[a]) - (x[a] - bucket_x) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def decimate_frame(df: pd.DataFrame, max_points: int = DEFAULT_MAX_POINTS,
+                   how: Optional[Dict[str, str]] = None, y_column: Optional[str] = None) -> pd.DataFrame:
+    """把数据抽稀到最多max_points行用于绘图
+
+    含开高低收列时按桶聚合：开盘取第一根、最高取最大、最低取最小、收盘取最后一根、
+    成交量求和，其余指标列取桶内最后一个值，索引为桶内最后一根K线的时间；
+    否则按y_column(默认收盘价或第一个数值列)用LTTB选取行
+
+    Args:
+        df: 按时间升序的数据
+        max_points: 最多保留的行数，None或不超过0表示不抽稀
+        how: 额外指定的列聚合方式，如{'Flow_Impact': 'sum'}
+        y_column: LTTB选点依据的列
+
+    Returns:
+        抽稀后的DataFrame，行数不超过max_points时原样返回
+    """
+    if df is None or not max_points or max_points <= 0 or len(df) <= max_points:
+        return df
+
+    lower = {str(col).lower(): col for col in df.columns}
+    if all(name in lower for name in ('open', 'high', 'low', 'close')):
+        agg = {col: _OHLC_AGG.get(str(col).lower(), 'last') for col in df.columns}
+        agg.update({col: func for col, func in (how or {}).items() if col in df.columns})
+        buckets = np.arange(len(df)) * max_points // len(df)
+        # 非数值列只能取最后一个值，其他聚合方式的非数值列直接丢弃
+        agg = {col: func for col, func in agg.items()
+               if func == 'last' or pd.api.types.is_numeric_dtype(df[col])}
+        result = df[list(agg)].groupby(buckets).agg(agg)
+        result.index = df.index[np.r_[np.flatnonzero(np.diff(buckets)), len(df) - 1]]
+        return result
+
+    if y_column is None:
+        y_column = lower.get('close')
+        if y_column is None:
+            numeric_columns = df.select_dtypes('number').columns
+            if len(numeric_columns) == 0:
+                return df.iloc[np.linspace(0, len(df) - 1, max_points).astype(np.int64)]
+            y_column = numeric_columns[0]
+    return df.iloc[lttb_indices(np.arange(len(df)), df[y_column].to_numpy(dtype=float), max_points)]
+
+
+def last_bar(df: pd.DataFrame) -> Hashable:
+    """最后一根K线的标识(时间, 收盘价)，盘中收盘价变化也会让缓存失效"""
+    if df is None or len(df) == 0:
+        return None
+    close = next((df[col].iloc[-1] for col in df.columns if str(col).lower() == 'close'), None)
+    return (str(df.index[-1]), None if close is None or pd.isna(close) else float(close))
+
+
+def data_span(df: pd.DataFrame) -> Hashable:
+    """数据范围标识(第一根K线时间, 行数, 最后一根K线)，同一天绘制不同长度的历史不会共用缓存"""
+    if df is None or len(df) == 0:
+        return None
+    return (str(df.index[0]), len(df), last_bar(df))
+
+
+def get_figure_cache() -> BoundedCache:
+    """进程内共享的图表缓存"""
+    global _figure_cache
+    if _figure_cache is None:
+        with _figure_cache_lock:
+            if _figure_cache is None:
+                _figure_cache = BoundedCache(max_entries=FIGURE_CACHE_SIZE, name='ChartRender.figures')
+    return _figure_cache
+
+
+def cached_render(symbol: str, df: pd.DataFrame, chart_type: str, build: Callable[[], Any]) -> Any:
+    """按(股票代码, 数据范围, 图表类型)缓存渲染结果
+
+    缓存的图表对象会被多次返回，调用方不应再修改它
+
+    Args:
+        symbol: 股票代码
+        df: 绘图使用的数据，用于确定起止K线和行数
+        chart_type: 图表类型，同一数据的不同图表或不同抽稀点数应使用不同的类型
+        build: 未命中时生成图表的函数，返回None表示生成失败，不缓存
+
+    Returns:
+        图表对象
+    """
+    key = (symbol, data_span(df), chart_type)
+    cache = get_figure_cache()
+    figure = cache.get(key)
+    if figure is not None:
+        logger.debug(f"图表缓存命中: {key}")
+        return figure
+    figure = build()
+    if figure is not None:
+        cache.set(key, figure)
+    return figure
@@ -1,12 +1,16 @@
 import pandas as pd
 import numpy as np
-import akshare as ak
-import tushare as ts
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Union, Tuple, Any
 import logging
 
+from lazy_imports import lazy_import
+
+# 数据源库在首次请求数据时才加载
+ak = lazy_import('akshare')
+ts = lazy_import('tushare')
+
 class DataSourceException(Exception):
     """数据源异常"""
     pass
@@ -34,7 +38,7 @@ class ChinaStockProvider:
         """
         self.tushare_token = api_token
         self.current_source = current_source
-        self.tushare_pro = None
+        self._tushare_pro = None  # 首次使用时创建，创建失败时为False
         self.max_retry = 3
         self.data_cache = {}  # 添加数据缓存属性
         
@@ -55,15 +59,6 @@ class ChinaStockProvider:
             # 设置日志级别
             self.logger.setLevel(logging.INFO)
         
-        # 如果提供了Tushare token，则初始化Tushare API
-        if api_token and current_source == 'tushare':
-            try:
-                ts.set_token(api_token)
-                self.tushare_pro = ts.pro_api()
-                self.logger.info("成功初始化Tushare API")
-            except Exception as e:
-                self.logger.error(f"初始化Tushare API失败: {str(e)}")
-        
         self.memory_cache = {}  # 内存缓存
         
         # 设置数据源
@@ -84,6 +79,27 @@ class ChinaStockProvider:
         
         self.logger.info(f"ChinaStockProvider初始化完成，当前数据源: {self.current_source}, 可用数据源: {self.get_available_sources()}")
         
+    @property
+    def tushare_pro(self):
+        """Tushare Pro接口，首次使用时创建，未配置token或创建失败时返回None"""
+        if self._tushare_pro is None and self.tushare_token:
+            try:
+                ts.set_token(self.tushare_token)
+                self._tushare_pro = ts.pro_api()
+                self.logger.info("成功初始化Tushare API")
+            except Exception as e:
+                self.logger.error(f"初始化Tushare API失败: {str(e)}")
+                self._tushare_pro = False
+        return self._tushare_pro or None
+    
+    @tushare_pro.setter
+    def tushare_pro(self, value):
+        self._tushare_pro = value
+    
+    def _has_tushare(self) -> bool:
+        """是否可以使用Tushare（已配置token且尚未创建失败），不触发接口创建"""
+        return bool(self.tushare_token) and self._tushare_pro is not False
+    
     def _init_column_mappings(self):
         """初始化标准列名映射"""
         # AKShare映射
@@ -140,7 +156,7 @@ class ChinaStockProvider:
         source_name = source_name.lower()
         
         # 检查Tushare是否可用
-        if source_name == 'tushare' and not self.tushare_pro:
+        if source_name == 'tushare' and not self._has_tushare():
             self.logger.error("Tushare未初始化，无法使用")
             return False
             
@@ -150,7 +166,7 @@ class ChinaStockProvider:
     
     def get_available_sources(self) -> List[str]:
         """获取可用数据源列表"""
-        if self.tushare_pro:
+        if self._has_tushare():
             return self.data_sources
         else:
             return ['akshare']
@@ -466,7 +482,7 @@ class ChinaStockProvider:
                     # 缓存结果
                     self.data_cache[cache_key] = df
                     return df
-        else:
+                else:
                     self.logger.warning(f"{name}返回的数据不完整或为空: {len(df) if isinstance(df, pd.DataFrame) else 'not a dataframe'}")
             except Exception as e:
                 self.logger.error(f"使用{name}获取数据失败: {str(e)}")
@@ -438,6 +438,46 @@ class EnhancedSectorAnalyzer:
             logger.error(f"相对强度计算失败: {str(e)}")
             return 50, "计算错误"  # 返回中性值 
 
+    def _load_sector_frames(self, sector_names):
+        """获取多个行业的历史数据"""
+        frames = {}
+        for sector_name in sector_names:
+            try:
+                frames[sector_name] = self.integrator._get_sector_history(sector_name)
+            except Exception as e:
+                logger.error(f"获取行业 {sector_name} 历史数据失败: {str(e)}")
+        return frames
+    
+    def _calculate_panel_indicators(self, sector_frames, market_data=None):
+        """在收盘价面板上一次计算全部行业的动量指标、趋势稳定性和相对强度
+        
+        结果与逐个行业调用_calculate_momentum_indicators、_calculate_trend_stability、
+        _calculate_relative_strength一致；计算失败时返回None，由调用方逐个行业计算
+        """
+        try:
+            from sector_metrics import stack_closes, momentum_indicators, trend_stability, relative_strength
+            
+            close = stack_closes(sector_frames)
+            if close.empty:
+                return None
+            market_close = market_data['收盘'] if market_data is not None and not market_data.empty else None
+            return {
+                'indicators': momentum_indicators(close),
+                'trend': trend_stability(close),
+                'rs': relative_strength(close, market_close)
+            }
+        except Exception as e:
+            logger.warning(f"行业面板指标计算失败，逐个行业计算: {str(e)}")
+            return None
+    
+    def _attach_panel_indicators(self, data, panel, sector_name):
+        """将面板计算的动量指标按位置附加到单个行业的数据上"""
+        df = data.copy()
+        n = len(df)
+        for column, values in panel['indicators'].items():
+            df[column] = values[sector_name].to_numpy()[-n:]
+        return df
+    
     def analyze_enhanced_hot_sectors(self):
         """增强版热门行业分析
         
@@ -469,10 +509,14 @@ class EnhancedSectorAnalyzer:
         except Exception as e:
             logger.warning(f"获取市场基准数据失败: {str(e)}")
         
+        # 先取得全部行业历史数据，在面板上一次算出动量、趋势稳定性和相对强度
+        sector_frames = self._load_sector_frames(sector_names)
+        panel = self._calculate_panel_indicators(sector_frames, market_data)
+        
         for sector_name in sector_names:
             try:
                 # 获取行业历史数据
-                sector_data = self.integrator._get_sector_history(sector_name)
+                sector_data = sector_frames.get(sector_name)
                 
                 if sector_data is None or sector_data.empty:
                     logger.warning(f"行业 {sector_name} 无历史数据")
@@ -487,14 +531,20 @@ class EnhancedSectorAnalyzer:
                     continue
                 
                 # 计算增强指标
-                # 1. 计算动量指标
-                sector_data_with_indicators = self._calculate_momentum_indicators(sector_data)
-                
-                # 2. 计算趋势稳定性
-                trend_score, trend_desc = self._calculate_trend_stability(sector_data)
-                
-                # 3. 计算相对强度
-                rs_score, rs_desc = self._calculate_relative_strength(sector_data, market_data)
+                if panel is not None and sector_name in panel['trend'].index:
+                    # 1~3. 直接取面板计算结果
+                    sector_data_with_indicators = self._attach_panel_indicators(sector_data, panel, sector_name)
+                    trend_score, trend_desc = panel['trend'].loc[sector_name, ['score', 'desc']]
+                    rs_score, rs_desc = panel['rs'].loc[sector_name, ['score', 'desc']]
+                else:
+                    # 1. 计算动量指标
+                    sector_data_with_indicators = self._calculate_momentum_indicators(sector_data)
+                    
+                    # 2. 计算趋势稳定性
+                    trend_score, trend_desc = self._calculate_trend_stability(sector_data)
+                    
+                    # 3. 计算相对强度
+                    rs_score, rs_desc = self._calculate_relative_strength(sector_data, market_data)
                 
                 # 4. 计算交易信号
                 trading_signals = self._calculate_trading_signals(sector_data_with_indicators)
@@ -609,22 +659,29 @@ class EnhancedSectorAnalyzer:
         # 预测结果列表
         predicted_sectors = []
         
+        sector_frames = self._load_sector_frames([s['name'] for s in hot_sectors['data']['hot_sectors']])
+        panel = self._calculate_panel_indicators(sector_frames)
+        
         # 对每个热门行业进行预测
         for sector in hot_sectors['data']['hot_sectors']:
             try:
                 sector_name = sector['name']
                 
                 # 获取行业历史数据
-                sector_data = self.integrator._get_sector_history(sector_name)
+                sector_data = sector_frames.get(sector_name)
                 
                 if sector_data is None or sector_data.empty:
                     logger.warning(f"行业 {sector_name} 无历史数据，无法预测")
                     continue
                 
                 # 使用动量指标和交易信号进行预测
-                sector_data_with_indicators = self._calculate_momentum_indicators(sector_data)
+                if panel is not None and sector_name in panel['trend'].index:
+                    sector_data_with_indicators = self._attach_panel_indicators(sector_data, panel, sector_name)
+                    trend_score, trend_desc = panel['trend'].loc[sector_name, ['score', 'desc']]
+                else:
+                    sector_data_with_indicators = self._calculate_momentum_indicators(sector_data)
+                    trend_score, trend_desc = self._calculate_trend_stability(sector_data)
                 trading_signals = self._calculate_trading_signals(sector_data_with_indicators)
-                trend_score, trend_desc = self._calculate_trend_stability(sector_data)
                 
                 # 预测得分组成
                 prediction_components = {
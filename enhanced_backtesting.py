@@ -6,13 +6,15 @@ from dataclasses import dataclass
 import json
 from datetime import datetime, timedelta
 from enum import Enum
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from functools import lru_cache
 from cachetools import LRUCache
 import os
 import logging
 import threading
 
+from backtest_executor import BacktestBackend, BacktestJobResult, get_shared_backend, iter_backtests
+from trade_log import TradeLog, IncrementalTradeMetrics
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -42,7 +44,7 @@ class TradeRecord:
 class BacktestResult:
     """增强版回测结果数据结构"""
     def __init__(self):
-        self.trades: List[TradeRecord] = []
+        self.trades: TradeLog = TradeLog(TradeRecord, capacity=1)
         self.total_profit: float = 0.0
         self.max_drawdown: float = 0.0
         self.win_rate: float = 0.0
@@ -66,6 +68,14 @@ class BacktestResult:
         self.monthly_returns: Dict[str, float] = {}  # 新增：月度收益
         self.drawdown_periods: List[Dict] = []  # 新增：回撤周期记录
 
+    def to_dict(self) -> Dict[str, Any]:
+        """导出汇总指标（不含交易明细）"""
+        return {key: value for key, value in vars(self).items() if key != 'trades'}
+
+    def save_binary(self, path: str):
+        """以压缩二进制格式导出交易明细和汇总指标"""
+        self.trades.save(path, metadata=self.to_dict())
+
 class TradeStatus(Enum):
     """交易状态枚举"""
     PENDING = "待执行"
@@ -82,16 +92,15 @@ class EnhancedBacktester:
         self.initial_capital = initial_capital
         self.current_capital = initial_capital
         self.positions: Dict[str, Dict[str, Any]] = {}  # 增强版持仓管理
-        self.trades: List[TradeRecord] = []
+        self.trades: TradeLog = TradeLog(TradeRecord)
+        self.trade_metrics = IncrementalTradeMetrics()
         self.daily_returns: List[float] = []
         self.max_capital = initial_capital
         self.risk_free_rate = 0.03
         self.total_profit = 0.0
         self.max_drawdown = 0.0
         self.win_rate = 0.0
-        # 初始化多进程计算池和缓存系统
-        self._process_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
-        self._thread_pool = ThreadPoolExecutor(max_workers=os.cpu_count() * 2)
+        # 初始化缓存系统（计算池在首次使用时从共享后端获取）
         self._calculation_cache = LRUCache(maxsize=2048)  # 扩大缓存容量
         self._metric_cache = LRUCache(maxsize=1024)  # 新增指标缓存
         self._data_cache = LRUCache(maxsize=512)  # 新增数据缓存
@@ -135,6 +144,15 @@ class EnhancedBacktester:
         # 初始化线程锁
         self.cache_lock = threading.Lock()
 
+    @property
+    def _process_pool(self):
+        """共享的进程池，首次访问时创建"""
+        return get_shared_backend('process').get_executor()
+
+    @property
+    def _thread_pool(self):
+        """共享的线程池，首次访问时创建"""
+        return get_shared_backend('thread').get_executor()
     
     def _prepare_data_with_indicators(self, data, strategy_type):
         """使用LazyStockAnalyzer高效计算策略所需指标
@@ -328,6 +346,10 @@ class EnhancedBacktester:
             self.logger.error(f"更新移动止损时出错: {str(e)}")
             return False
 
+    def _get_volatility_percentile(self) -> float:
+        """当前市场波动率分位数（0-100）"""
+        return self.market_volatility_percentile * 100
+
     def calculate_stop_loss(self, price: float, volatility: float, 
                           trend_strength: float = 0.0, 
                           signal_quality: float = 0.8) -> float:
@@ -626,8 +648,10 @@ class EnhancedBacktester:
                 trade_reason=trade_reason
             )
             
-            # 记录交易
+            # 记录交易并增量更新统计
             self.trades.append(trade)
+            if action == 'sell':
+                self.trade_metrics.update(profit, holding_days, timestamp)
             
             # 记录每日收益率
             daily_return = (self.current_capital - self.initial_capital) / self.initial_capital
@@ -658,22 +682,22 @@ class EnhancedBacktester:
         result.total_profit = self.total_profit
         result.max_drawdown = self.max_drawdown
         
-        # 交易统计
-        sell_trades = [t for t in self.trades if t.action == 'sell']
-        result.trade_count = len(sell_trades)
-        result.win_count = sum(1 for t in sell_trades if t.profit > 0)
-        result.loss_count = sum(1 for t in sell_trades if t.profit <= 0)
+        # 交易统计（卖出成交时已增量累计）
+        stats = self.trade_metrics
+        result.trade_count = stats.trade_count
+        result.win_count = stats.win_count
+        result.loss_count = stats.loss_count
         
         # 胜率
-        result.win_rate = result.win_count / result.trade_count if result.trade_count > 0 else 0.0
+        result.win_rate = stats.win_rate
         
         # 盈亏比
-        avg_win = np.mean([t.profit for t in sell_trades if t.profit > 0]) if result.win_count > 0 else 0.0
-        avg_loss = abs(np.mean([t.profit for t in sell_trades if t.profit < 0])) if result.loss_count > 0 else 1.0
+        avg_win = stats.avg_win
+        avg_loss = stats.avg_loss if result.loss_count > 0 else 1.0
         result.profit_ratio = avg_win / avg_loss if avg_loss > 0 else 0.0
         
         # 平均持仓周期
-        result.avg_holding_period = np.mean([t.holding_days for t in sell_trades]) if sell_trades else 0.0
+        result.avg_holding_period = stats.avg_holding_period
         
         # 收益率和波动率
         if self.daily_returns:
@@ -682,39 +706,18 @@ class EnhancedBacktester:
             result.sharpe_ratio = (result.annual_return - self.risk_free_rate) / result.volatility if result.volatility > 0 else 0.0
         
         # 连续盈亏
-        current_streak = 0
-        max_win_streak = 0
-        max_loss_streak = 0
-        
-        for t in sell_trades:
-            if t.profit > 0:
-                if current_streak > 0:
-                    current_streak += 1
-                else:
-                    current_streak = 1
-                max_win_streak = max(max_win_streak, current_streak)
-            else:
-                if current_streak < 0:
-                    current_streak -= 1
-                else:
-                    current_streak = -1
-                max_loss_streak = max(max_loss_streak, abs(current_streak))
-        
-        result.max_consecutive_wins = max_win_streak
-        result.max_consecutive_losses = max_loss_streak
+        result.max_consecutive_wins = stats.max_consecutive_wins
+        result.max_consecutive_losses = stats.max_consecutive_losses
         
         # 高级指标
-        win_profits = [t.profit for t in sell_trades if t.profit > 0]
-        loss_profits = [t.profit for t in sell_trades if t.profit < 0]
-        
         result.avg_win = avg_win
         result.avg_loss = avg_loss
-        result.max_win = max(win_profits) if win_profits else 0.0
-        result.max_loss = min(loss_profits) if loss_profits else 0.0
+        result.max_win = stats.max_win
+        result.max_loss = stats.max_loss
         
         # 利润因子 = 总盈利 / 总亏损
-        total_win = sum(win_profits)
-        total_loss = abs(sum(loss_profits)) if loss_profits else 1.0
+        total_win = stats.total_win
+        total_loss = abs(stats.total_loss) if stats.losing_count > 0 else 1.0
         result.profit_factor = total_win / total_loss if total_loss > 0 else float('inf')
         
         # 恢复因子 = 总收益 / 最大回撤
@@ -724,14 +727,7 @@ class EnhancedBacktester:
         result.expectancy = result.win_rate * avg_win - (1 - result.win_rate) * avg_loss
         
         # 月度收益
-        if sell_trades:
-            monthly_returns = {}
-            for t in sell_trades:
-                month_key = t.timestamp.strftime('%Y-%m')
-                if month_key not in monthly_returns:
-                    monthly_returns[month_key] = 0.0
-                monthly_returns[month_key] += t.profit
-            result.monthly_returns = monthly_returns
+        result.monthly_returns = dict(stats.monthly_returns)
         
         # 回撤周期记录
         if self.daily_returns:
@@ -772,6 +768,27 @@ class EnhancedBacktester:
         
         return result
 
+    def reset_state(self, capacity: int = 1024):
+        """重置资金、持仓和交易记录，开始新的回测
+        
+        Args:
+            capacity: 交易记录预分配容量
+        """
+        self.current_capital = self.initial_capital
+        self.positions = {}
+        self.trades = TradeLog(TradeRecord, capacity=max(capacity, 1))
+        self.trade_metrics.reset()
+        self.daily_returns = []
+        self.max_capital = self.initial_capital
+        self.total_profit = 0.0
+        self.max_drawdown = 0.0
+        self.win_rate = 0.0
+        self.current_drawdown = 0.0
+        self.consecutive_losses = 0
+        self.trade_history = {}
+        self.pending_orders = []
+        self.active_trailing_stops = {}
+
     def backtest_strategy(self, data: pd.DataFrame, strategy_func, **strategy_params) -> BacktestResult:
         """回测策略
         
@@ -785,19 +802,7 @@ class EnhancedBacktester:
         """
         try:
             # 重置回测状态
-            self.current_capital = self.initial_capital
-            self.positions = {}
-            self.trades = []
-            self.daily_returns = []
-            self.max_capital = self.initial_capital
-            self.total_profit = 0.0
-            self.max_drawdown = 0.0
-            self.win_rate = 0.0
-            self.current_drawdown = 0.0
-            self.consecutive_losses = 0
-            self.trade_history = {}
-            self.pending_orders = []
-            self.active_trailing_stops = {}
+            self.reset_state(capacity=len(data))
             
             # 生成交易信号
             signals = strategy_func(data, **strategy_params)
@@ -939,29 +944,58 @@ class EnhancedBacktester:
             logger.error(traceback.format_exc())
             return BacktestResult()
 
+    def iter_parallel_backtests(self, jobs, backend: Optional[BacktestBackend] = None,
+                                data: Optional[Dict[str, pd.DataFrame]] = None,
+                                data_loader=None, progress_callback=None):
+        """并行回测多个(symbol, strategy, params)任务，按完成顺序逐个返回结果
+        
+        Args:
+            jobs: BacktestJob或(symbol, strategy, params)元组列表
+            backend: 执行后端，默认为共享的本地进程后端
+            data: 股票代码到行情数据的映射
+            data_loader: 按股票代码加载行情数据的函数
+            progress_callback: 进度回调 (已完成数, 总数, 本次结果)
+            
+        Returns:
+            BacktestJobResult生成器
+        """
+        return iter_backtests(jobs, backend=backend, initial_capital=self.initial_capital,
+                              data=data, data_loader=data_loader,
+                              progress_callback=progress_callback)
+
+    def parallel_backtest(self, jobs, backend: Optional[BacktestBackend] = None,
+                          data: Optional[Dict[str, pd.DataFrame]] = None,
+                          data_loader=None, progress_callback=None) -> List[BacktestJobResult]:
+        """并行回测多个任务，返回按提交顺序排列的结果列表"""
+        results = list(self.iter_parallel_backtests(jobs, backend, data, data_loader, progress_callback))
+        results.sort(key=lambda r: r.job_id)
+        return results
+
     def _parallel_backtest(self, strategies):
-        futures = [self.dask_client.submit(self._run_single_backtest, strat) for strat in strategies]
-        return self.dask_client.gather(futures)
+        return self.parallel_backtest(strategies)
         
-    def backtest_volume_price_strategy(self, data, symbol: str):
+    def backtest_volume_price_strategy(self, data, symbol: str, start_index: int = 0,
+                                       strategy_params: Dict = None):
         """使用体积价格分析策略进行回测
         
         Args:
             data: DataFrame，包含OHLCV数据
             symbol: 股票代码
+            start_index: 开始交易的行号，之前的行只用于指标预热，不产生交易
+            strategy_params: 策略参数，见VolumePriceStrategy.PARAMETERS
             
         Returns:
             BacktestResult: 回测结果
         """
         try:
             from volume_price_strategy import VolumePriceStrategy
-            strategy = VolumePriceStrategy()
+            strategy = VolumePriceStrategy(**(strategy_params or {}))
             positions = []
             capital = self.initial_capital
             current_position = None
             
             for i in range(len(data)):
-                if i < 20:  # 需要足够的数据来计算指标
+                if i < max(strategy.ma_period, start_index):  # 需要足够的数据来计算指标
                     continue
                     
                 # 分析当前数据
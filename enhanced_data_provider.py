@@ -940,6 +940,15 @@ class EnhancedDataProvider:
         """获取行业成分股"""
         stocks = []
         
+        # 优先从行业成分索引查询，行业名称为东方财富板块名称
+        try:
+            from sector_membership import get_membership_index
+            stocks = [code.split('.')[0] for code in get_membership_index().stocks_of_name(sector_name, 'dc')]
+        except Exception as e:
+            self.logger.warning(f"从行业成分索引获取行业成分股失败: {str(e)}")
+        if stocks:
+            return stocks
+        
         # 尝试从东方财富获取数据
         try:
             df = ak.stock_board_industry_cons_em(symbol=sector_name)
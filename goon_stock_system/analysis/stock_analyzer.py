@@ -35,6 +35,7 @@ class StockAnalyzer:
     def __init__(self):
         """初始化分析器"""
         self.stock_basics = None
+        self._north_flow_store = None  # 北向资金存储，首次使用时创建
         self.update_stock_basics()
         
     def update_stock_basics(self):
@@ -455,6 +456,14 @@ class StockAnalyzer:
             print("无法获取交易日历")
             return pd.DataFrame()
         
+        # 优先使用北向资金存储：已保存的交易日不再请求，区间统计在本地完成
+        store = self._get_north_flow_store()
+        if store is not None:
+            # 只用到十大成交股，不请求持股明细
+            store.update(days=days, end_date=end_date, holdings=False)
+            result = store.stock_flows(start_date, end_date)
+            return self._finish_hsgt_result(result, trade_dates, top_n)
+        
         # 初始化股票资金流入统计
         stock_funds = defaultdict(float)
         stock_info = {}
@@ -520,20 +529,38 @@ class StockAnalyzer:
         if not result.empty:
             # 根据净流入金额排序
             result = result.sort_values(by='net_inflow', ascending=False)
+        return self._finish_hsgt_result(result, trade_dates, top_n)
+    
+    def _get_north_flow_store(self):
+        """获取北向资金存储，不可用时返回None"""
+        if self._north_flow_store is None:
+            try:
+                # 与其他模块共用同一个存储，默认数据源即tushare_api中的接口
+                from north_flow_store import get_north_flow_store
+                self._north_flow_store = get_north_flow_store()
+            except Exception as e:
+                print(f"北向资金存储不可用: {e}")
+                self._north_flow_store = False
+        return self._north_flow_store or None
+    
+    def _finish_hsgt_result(self, result, trade_dates, top_n):
+        """补充行业、最新收盘价和涨跌幅，返回前top_n只股票"""
+        if not result.empty:
+            if 'name' not in result.columns:
+                result['name'] = ''
             
             # 获取这些股票的行业信息
             if self.stock_basics is None or self.stock_basics.empty:
                 self.update_stock_basics()
                 
             if not self.stock_basics.empty:
-                result = pd.merge(
-                    result, 
-                    self.stock_basics[['ts_code', 'industry']], 
-                    on='ts_code', 
-                    how='left'
-                )
+                basics = self.stock_basics[['ts_code', 'name', 'industry']].rename(columns={'name': 'basic_name'})
+                result = pd.merge(result, basics, on='ts_code', how='left')
+                result['name'] = result['name'].where(result['name'] != '', result['basic_name'])
+                result = result.drop(columns=['basic_name'])
             
-            # 获取最近一个交易日的收盘价和涨跌幅
+            # 只为返回的股票获取最近一个交易日的收盘价和涨跌幅
+            result = result.head(top_n).copy()
             latest_date = trade_dates[-1]
             for i, row in result.iterrows():
                 ts_code = row['ts_code']
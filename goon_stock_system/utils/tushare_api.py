@@ -102,6 +102,22 @@ def get_daily_data(ts_code, start_date, end_date):
         print(f"获取{ts_code}日线数据失败: {e}")
         return pd.DataFrame()
 
+def get_daily_all(trade_date):
+    """获取某个交易日全部股票的日线数据
+    
+    Args:
+        trade_date (str): 交易日期，格式YYYYMMDD
+        
+    Returns:
+        pd.DataFrame: 全市场日线数据
+    """
+    try:
+        df = pro.daily(trade_date=trade_date)
+        return df
+    except Exception as e:
+        print(f"获取{trade_date}全市场日线数据失败: {e}")
+        return pd.DataFrame()
+
 def get_minute_data(ts_code, start_time, end_time, freq='1min'):
     """获取股票分钟线数据
     
@@ -184,6 +200,22 @@ def get_monthly_data(ts_code=None, trade_date=None, start_date=None, end_date=No
         print(f"获取月线行情失败: {e}")
         return pd.DataFrame()
 
+def get_realtime_all(ts_code='6*.SH,0*.SZ,3*.SZ,8*.BJ,4*.BJ'):
+    """一次获取全市场实时日线行情
+    
+    Args:
+        ts_code (str): 代码通配符，多个用逗号分隔，默认沪深京全部A股
+        
+    Returns:
+        pd.DataFrame: 实时行情数据，包含ts_code、name、pre_close、open、high、low、close、vol、amount等字段
+    """
+    try:
+        df = pro.rt_k(ts_code=ts_code)
+        return df
+    except Exception as e:
+        print(f"获取全市场实时行情失败: {e}")
+        return pd.DataFrame()
+
 def get_today_all():
     """获取当日所有股票行情"""
     today = datetime.datetime.now().strftime('%Y%m%d')
@@ -310,6 +342,28 @@ def get_hsgt_top10(trade_date=None, ts_code=None, start_date=None, end_date=None
         print(f"获取沪深股通十大成交股失败: {e}")
         return pd.DataFrame()
 
+def get_hk_hold(trade_date=None, ts_code=None, start_date=None, end_date=None, exchange=None):
+    """获取沪深港股通持股明细
+    
+    Args:
+        trade_date (str): 交易日期
+        ts_code (str): 股票代码
+        start_date (str): 开始日期
+        end_date (str): 结束日期
+        exchange (str): 类型（SH：沪股通 SZ：深股通 HK：港股通）
+        
+    Returns:
+        pd.DataFrame: 持股明细数据，包含ts_code、trade_date、name、vol、ratio、exchange等字段
+    """
+    try:
+        df = pro.hk_hold(trade_date=trade_date, ts_code=ts_code,
+                         start_date=start_date, end_date=end_date,
+                         exchange=exchange)
+        return df
+    except Exception as e:
+        print(f"获取沪深港股通持股明细失败: {e}")
+        return pd.DataFrame()
+
 def get_ggt_top10(trade_date=None, ts_code=None, start_date=None, end_date=None, market_type=None):
     """获取港股通十大成交股
     
@@ -604,8 +658,9 @@ def get_stk_holdernumber(ts_code=None, ann_date=None, end_date=None, start_date=
         pd.DataFrame: 股东人数数据
     """
     try:
+        # 截止日期参数名为enddate，end_date为公告结束日期
         df = pro.stk_holdernumber(ts_code=ts_code, ann_date=ann_date, 
-                                end_date=end_date, start_date=start_date, 
+                                enddate=end_date, start_date=start_date, 
                                 end_date=end_date2)
         return df
     except Exception as e:
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+界面后台任务模块
+长时间运行的界面操作（全市场扫描、回测、单股分析、热门行业分析）放到线程池中执行，
+通过信号把进度和部分结果送回主线程；进度和部分结果按时间间隔合并后再发送，
+避免逐条信号占满事件循环，任务可在阶段之间或逐只股票之间取消
+"""
+
+import time
+import logging
+import threading
+import traceback
+from typing import Any, Callable, List, Optional
+
+try:
+    from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+    HAS_QT = True
+except ImportError:
+    HAS_QT = False
+
+logger = logging.getLogger('GuiTasks')
+
+# 进度与部分结果的最小发送间隔(秒)，约合界面刷新的几帧
+DEFAULT_EMIT_INTERVAL = 0.05
+
+
+class TaskCancelled(Exception):
+    """任务被用户取消"""
+
+
+class TaskContext:
+    """后台任务与界面之间的通道
+
+    任务函数通过它报告进度、提交部分结果并检查是否已被取消；回调在任务线程中调用，
+    由BackgroundTask转成跨线程的信号。
+    """
+
+    def __init__(self, on_progress: Optional[Callable[[int, int, str], None]] = None,
+                 on_partial: Optional[Callable[[List[Any]], None]] = None,
+                 interval: float = DEFAULT_EMIT_INTERVAL):
+        """初始化任务上下文
+
+        Args:
+            on_progress: 进度回调(已完成数, 总数, 说明)
+            on_partial: 部分结果回调，参数为自上次发送以来的结果列表
+            interval: 进度和部分结果的最小发送间隔(秒)
+        """
+        self._on_progress = on_progress
+        self._on_partial = on_partial
+        self.interval = interval
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._pending: List[Any] = []
+        self._last_progress = 0.0
+        self._last_partial = 0.0
+
+    def cancel(self) -> None:
+        """请求取消任务"""
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check(self) -> None:
+        """已请求取消时抛出TaskCancelled，供任务在阶段之间调用"""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def progress(self, done: int, total: int, message: str = '') -> None:
+        """报告进度；带说明或已完成的进度立即发送，其余按间隔合并"""
+        if self._on_progress is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not message and done < total and now - self._last_progress < self.interval:
+                return
+            self._last_progress = now
+        self._on_progress(done, total, message)
+
+    def partial(self, item: Any) -> None:
+        """提交一条部分结果，按间隔批量发送"""
+        if self._on_partial is None:
+            return
+        with self._lock:
+            self._pending.append(item)
+            if time.monotonic() - self._last_partial < self.interval:
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """立即发送尚未发送的部分结果"""
+        if self._on_partial is None:
+            return
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._last_partial = time.monotonic()
+        if batch:
+            self._on_partial(batch)
+
+
+def run_task(fn: Callable[..., Any], context: TaskContext, *args, **kwargs):
+    """执行任务函数并归类结果
+
+    Returns:
+        ('finished', 结果) / ('cancelled', None) / ('error', 错误信息)
+    """
+    try:
+        result = fn(context, *args, **kwargs)
+        context.flush()
+        return 'finished', result
+    except TaskCancelled:
+        context.flush()
+        return 'cancelled', None
+    except Exception as e:
+        logger.error(f"后台任务出错: {str(e)}")
+        logger.debug(traceback.format_exc())
+        return 'error', str(e)
+
+
+if HAS_QT:
+    class TaskSignals(QObject):
+        """后台任务的信号，在主线程创建，信号跨线程排队送达"""
+        progress = pyqtSignal(int, int, str)
+        partial = pyqtSignal(list)
+        finished = pyqtSignal(object)
+        cancelled = pyqtSignal()
+        error = pyqtSignal(str)
+
+    class BackgroundTask(QRunnable):
+        """在QThreadPool中执行的任务，任务函数的第一个参数为TaskContext"""
+
+        def __init__(self, fn: Callable[..., Any], *args, interval: float = DEFAULT_EMIT_INTERVAL, **kwargs):
+            super().__init__()
+            self.fn = fn
+            self.args = args
+            self.kwargs = kwargs
+            self.signals = TaskSignals()
+            self.context = TaskContext(self.signals.progress.emit, self.signals.partial.emit, interval)
+
+        def cancel(self) -> None:
+            self.context.cancel()
+
+        def run(self) -> None:
+            status, value = run_task(self.fn, self.context, *self.args, **self.kwargs)
+            if status == 'finished':
+                self.signals.finished.emit(value)
+            elif status == 'cancelled':
+                self.signals.cancelled.emit()
+            else:
+                self.signals.error.emit(value)
+
+    class TaskRunner(QObject):
+        """界面后台任务调度：同一时间只运行一个任务，支持取消"""
+
+        running_changed = pyqtSignal(bool)
+
+        def __init__(self, parent: Optional[QObject] = None, pool: Optional[QThreadPool] = None):
+            super().__init__(parent)
+            self.pool = pool or QThreadPool.globalInstance()
+            self._task: Optional[BackgroundTask] = None
+
+        def is_running(self) -> bool:
+            return self._task is not None
+
+        def start(self, fn: Callable[..., Any], *args,
+                  on_progress: Optional[Callable[[int, int, str], None]] = None,
+                  on_partial: Optional[Callable[[list], None]] = None,
+                  on_finished: Optional[Callable[[Any], None]] = None,
+                  on_error: Optional[Callable[[str], None]] = None,
+                  on_cancelled: Optional[Callable[[], None]] = None,
+                  **kwargs) -> Optional['BackgroundTask']:
+            """启动后台任务
+
+            Args:
+                fn: 任务函数fn(context, *args, **kwargs)，在线程池中执行
+                on_progress: 进度回调(已完成数, 总数, 说明)，在主线程调用
+                on_partial: 部分结果回调(结果列表)，在主线程调用
+                on_finished: 完成回调(任务返回值)
+                on_error: 出错回调(错误信息)
+                on_cancelled: 取消回调
+
+            Returns:
+                已启动的任务，已有任务在运行时返回None
+            """
+            if self._task is not None:
+                logger.warning("已有后台任务正在运行")
+                return None
+            task = BackgroundTask(fn, *args, **kwargs)
+            # 先结束运行状态，回调中可以立即启动下一个任务
+            task.signals.finished.connect(self._on_done)
+            task.signals.cancelled.connect(self._on_done)
+            task.signals.error.connect(self._on_done)
+            for signal, slot in ((task.signals.progress, on_progress), (task.signals.partial, on_partial),
+                                 (task.signals.finished, on_finished), (task.signals.error, on_error),
+                                 (task.signals.cancelled, on_cancelled)):
+                if slot is not None:
+                    signal.connect(slot)
+            self._task = task
+            self.running_changed.emit(True)
+            self.pool.start(task)
+            return task
+
+        def cancel(self) -> None:
+            """请求取消正在运行的任务"""
+            if self._task is not None:
+                self._task.cancel()
+
+        def _on_done(self, *args) -> None:
+            self._task = None
+            self.running_changed.emit(False)
@@ -63,16 +63,22 @@ def print_header(text):
     print(color_text(text.center(width), Fore.CYAN, True))
     print("=" * width)
 
-def analyze_hot_sectors(token=None, top_n=15, show_details=True, save_result=False):
-    """分析热门行业"""
+def analyze_hot_sectors(token=None, top_n=15, show_details=True, save_result=False, analyzer=None):
+    """分析热门行业
+    
+    Args:
+        analyzer: 已创建的行业分析器（如基准测试使用的离线分析器），为空时按可用模块创建
+    """
     print_header("热门行业分析")
     
     start_time = time.time()
     
     # 初始化行业分析器
     try:
+        if analyzer is not None:
+            sector_analyzer = analyzer
         # 优先尝试使用优化版行业分析器
-        if HAS_OPTIMIZED:
+        elif HAS_OPTIMIZED:
             print("使用优化版行业分析器")
             sector_analyzer = SectorAnalyzer(top_n=top_n, token=token)
         else:
@@ -145,7 +151,8 @@ def analyze_hot_sectors(token=None, top_n=15, show_details=True, save_result=Fal
                 # 技术指标
                 if 'macd' in sector:
                     macd_color = Fore.RED if sector['macd'] > 0 else Fore.GREEN
-                    print(f"   MACD: {color_text(f'{sector['macd']:.4f}', macd_color)}")
+                    macd_text = f"{sector['macd']:.4f}"
+                    print(f"   MACD: {color_text(macd_text, macd_color)}")
                 
                 if 'volatility' in sector:
                     print(f"   波动率: {sector['volatility']:.2f}%")
@@ -182,7 +182,7 @@ from PyQt5.QtGui import QFont, QColor, QPixmap, QIcon""", import_str)
         QTimer.singleShot(1000, self.refresh_hot_sectors)
     
     def refresh_hot_sectors(self):
-        """刷新热门行业数据"""
+        \"\"\"刷新热门行业数据\"\"\"
         # 检查是否有集成器
         if self.sector_integrator is None:
             QMessageBox.warning(self, '警告', '未配置行业分析器，请检查配置')
@@ -197,7 +197,7 @@ from PyQt5.QtGui import QFont, QColor, QPixmap, QIcon""", import_str)
         QTimer.singleShot(100, self._load_hot_sectors_data)
     
     def _load_hot_sectors_data(self):
-        """加载热门行业数据"""
+        \"\"\"加载热门行业数据\"\"\"
         try:
             # 更新进度
             self.hot_sectors_progress.setValue(30)
@@ -277,11 +277,11 @@ from PyQt5.QtGui import QFont, QColor, QPixmap, QIcon""", import_str)
         
         # 修改启动代码
         launch_section = """def launch_gui(sector_integrator=None):
-    """启动GUI
+    \"\"\"启动GUI
     
     Args:
         sector_integrator: 行业分析器集成实例(可选)
-    """
+    \"\"\"
     app = QApplication(sys.argv)
     
     # 设置应用字体
@@ -318,11 +318,11 @@ if __name__ == "__main__":
         launch_gui(None)"""
         
         content = content.replace("""def launch_gui(sector_integrator=None):
-    """启动GUI
+    \"\"\"启动GUI
     
     Args:
         sector_integrator: 行业分析器集成实例(可选)
-    """
+    \"\"\"
     app = QApplication(sys.argv)
     
     # 设置应用字体
@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+分钟线事件驱动回测模块
+分钟数据转换为内存映射的列式文件并按交易日分块迭代；
+止损止盈、移动止损、时间止损和仓位规则沿用EnhancedBacktester，并遵守A股T+1限制
+"""
+
+import os
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from enhanced_backtesting import EnhancedBacktester, BacktestResult
+
+logger = logging.getLogger('IntradayBacktester')
+
+MINUTE_BAR_DTYPE = np.dtype([
+    ('time', 'i8'),  # datetime64[ns]的整数表示
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'f8'),
+])
+
+_NS_PER_DAY = 86400 * 10 ** 9
+
+
+@dataclass
+class DayBars:
+    """单个交易日的分钟线（内存映射数组上的视图，不复制数据）"""
+    day_index: int
+    bars: np.ndarray
+
+    @property
+    def date(self) -> pd.Timestamp:
+        return pd.Timestamp(int(self.bars['time'][0])).normalize()
+
+    def __len__(self) -> int:
+        return len(self.bars)
+
+
+class MinuteBarStore:
+    """内存映射的分钟线存储"""
+
+    def __init__(self, path: str):
+        """打开已保存的分钟线文件
+
+        Args:
+            path: MinuteBarStore.save生成的.npy文件
+        """
+        self.path = path
+        self.bars = np.load(path, mmap_mode='r')
+        days = self.bars['time'] // _NS_PER_DAY
+        # 每个交易日的起始行号，末尾附加总行数
+        self.day_offsets = np.concatenate(([0], np.flatnonzero(np.diff(days)) + 1, [len(days)]))
+
+    @staticmethod
+    def normalize(df: pd.DataFrame) -> np.ndarray:
+        """将分钟线DataFrame（stk_mins格式或带时间索引）转换为结构化数组"""
+        if 'trade_time' in df.columns:
+            times = pd.to_datetime(df['trade_time'])
+        elif 'datetime' in df.columns:
+            times = pd.to_datetime(df['datetime'])
+        else:
+            times = pd.to_datetime(df.index)
+        volume = df['vol'] if 'vol' in df.columns else df['volume']
+
+        bars = np.empty(len(df), dtype=MINUTE_BAR_DTYPE)
+        bars['time'] = np.asarray(times, dtype='datetime64[ns]').astype('i8')
+        for column in ('open', 'high', 'low', 'close'):
+            bars[column] = np.asarray(df[column], dtype='f8')
+        bars['volume'] = np.asarray(volume, dtype='f8')
+        return bars[np.argsort(bars['time'], kind='stable')]
+
+    @classmethod
+    def save(cls, df: pd.DataFrame, path: str) -> 'MinuteBarStore':
+        """保存分钟线并以内存映射方式打开"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.save(path, cls.normalize(df))
+        return cls(path)
+
+    @classmethod
+    def from_tushare(cls, ts_code: str, start_date: str, end_date: str, path: str,
+                     freq: str = '1min', chunk_days: int = 20) -> 'MinuteBarStore':
+        """通过tushare_api.get_minute_data分段下载分钟线并保存
+
+        Args:
+            ts_code: 股票代码
+            start_date: 开始日期 YYYY-MM-DD
+            end_date: 结束日期 YYYY-MM-DD
+            path: 保存路径
+            freq: 分钟频度
+            chunk_days: 每次请求覆盖的自然日数（stk_mins单次返回行数有限）
+        """
+        from goon_stock_system.utils.tushare_api import get_minute_data
+
+        frames = []
+        current = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        while current <= end:
+            chunk_end = min(current + timedelta(days=chunk_days - 1), end)
+            df = get_minute_data(ts_code, f"{current:%Y-%m-%d} 09:00:00", f"{chunk_end:%Y-%m-%d} 15:30:00", freq=freq)
+            if df is not None and not df.empty:
+                frames.append(df)
+            current = chunk_end + timedelta(days=1)
+
+        if not frames:
+            raise ValueError(f"未获取到 {ts_code} 的分钟线数据")
+        return cls.save(pd.concat(frames, ignore_index=True).drop_duplicates('trade_time'), path)
+
+    @property
+    def day_count(self) -> int:
+        return len(self.day_offsets) - 1
+
+    def __len__(self) -> int:
+        return len(self.bars)
+
+    def iter_days(self) -> Iterator[DayBars]:
+        """按交易日迭代分钟线"""
+        for i in range(self.day_count):
+            yield DayBars(i, self.bars[self.day_offsets[i]:self.day_offsets[i + 1]])
+
+
+class IntradayBacktester(EnhancedBacktester):
+    """分钟线事件驱动回测
+
+    signal_func(day, backtester) 以一个交易日的分钟线为输入，返回与之等长的信号数组
+    （1买入，-1卖出，0持有）。信号在下一根K线开盘价成交，当日最后一根K线的信号丢弃。
+    当日买入的持仓不可当日卖出（T+1），止损在可卖出后的首根K线执行。
+    """
+
+    def __init__(self, initial_capital: float = 1000000.0, lot_size: int = 100):
+        super().__init__(initial_capital=initial_capital)
+        self.lot_size = lot_size
+        self.trade_log_enabled = False  # 分钟级成交较多，默认关闭逐笔日志
+
+    def _position_volume(self, price: float, stop_loss: float, signal_quality: float) -> float:
+        """按最大仓位比例计算买入数量，并向下取整到整手"""
+        position_value = self.current_capital * self.max_position_ratio
+        if self.use_dynamic_position_sizing and price > stop_loss > 0:
+            # 单笔风险不超过资金的1%，信号质量越高仓位越接近上限
+            risk_value = self.current_capital * 0.01 * (0.5 + signal_quality * 0.5)
+            position_value = min(position_value, risk_value / (price - stop_loss) * price)
+        return float(int(position_value / price / self.lot_size) * self.lot_size)
+
+    def _atr(self, bars: np.ndarray, period: int = 14) -> float:
+        """用当日已完成K线估算ATR"""
+        if len(bars) < 2:
+            return float(bars['high'][-1] - bars['low'][-1]) if len(bars) else 0.0
+        high, low, close = bars['high'], bars['low'], bars['close']
+        prev_close = np.concatenate(([close[0]], close[:-1]))
+        tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+        return float(tr[-period:].mean())
+
+    def _sell(self, timestamp, symbol: str, price: float, reason: str, condition: str):
+        volume = self.positions[symbol]['volume']
+        self.execute_trade(timestamp=timestamp, symbol=symbol, action='sell', price=price,
+                           volume=volume, signal_quality=0.8, market_condition=condition,
+                           trade_reason=reason)
+        self.active_trailing_stops.pop(symbol, None)
+
+    def backtest_minute_bars(self, store: MinuteBarStore, signal_func: Callable, symbol: str,
+                             signal_quality: float = 0.8) -> BacktestResult:
+        """在分钟线上执行事件驱动回测
+
+        Args:
+            store: 分钟线存储
+            signal_func: 信号函数
+            symbol: 股票代码
+            signal_quality: 买入信号质量，用于止损止盈和仓位计算
+
+        Returns:
+            回测结果
+        """
+        self.reset_state(capacity=store.day_count * 2)
+        sellable_from_day = -1  # 持仓可卖出的最早交易日序号（T+1）
+        entry_day = -1
+        last_time = None
+        last_close = None
+
+        for day in store.iter_days():
+            bars = day.bars
+            signals = np.asarray(signal_func(day, self))
+            times = bars['time']
+            opens, highs, lows, closes = bars['open'], bars['high'], bars['low'], bars['close']
+
+            # 时间止损按交易日计数，在可卖出日的开盘执行
+            if symbol in self.positions and self.use_time_stop and day.day_index >= sellable_from_day \
+                    and day.day_index - entry_day >= self.max_holding_days:
+                self._sell(pd.Timestamp(int(times[0])), symbol, float(opens[0]), "触发时间止损", "time_stop")
+
+            pending = 0
+            for i in range(len(bars)):
+                price = opens[i]
+                holding = symbol in self.positions
+
+                # 上一根K线的信号在本根开盘成交
+                if pending == 1 and not holding:
+                    atr = self._atr(bars[:i]) or price * 0.002
+                    stop_loss = self.calculate_stop_loss(price, atr, 0.0, signal_quality)
+                    volume = self._position_volume(price, stop_loss, signal_quality)
+                    if volume > 0:
+                        timestamp = pd.Timestamp(int(times[i]))
+                        trade = self.execute_trade(timestamp=timestamp, symbol=symbol, action='buy',
+                                                   price=float(price), volume=volume,
+                                                   signal_quality=signal_quality, trade_reason="分钟信号买入")
+                        if trade:
+                            self.positions[symbol]['stop_loss'] = stop_loss
+                            self.positions[symbol]['take_profit'] = self.calculate_take_profit(
+                                price, stop_loss, 0.0, signal_quality)
+                            entry_day = day.day_index
+                            sellable_from_day = day.day_index + 1
+                            holding = True
+                elif pending == -1 and holding and day.day_index >= sellable_from_day:
+                    self._sell(pd.Timestamp(int(times[i])), symbol, float(price), "分钟信号卖出", "signal")
+                    holding = False
+                pending = int(signals[i]) if i < len(bars) - 1 else 0
+
+                if not holding or day.day_index < sellable_from_day:
+                    continue
+
+                position = self.positions[symbol]
+                stop_loss = position.get('stop_loss', 0)
+                take_profit = position.get('take_profit', 0)
+                if stop_loss > 0 and lows[i] <= stop_loss:
+                    self._sell(pd.Timestamp(int(times[i])), symbol, float(min(price, stop_loss)),
+                               "触发止损", "stop_loss")
+                elif take_profit > 0 and highs[i] >= take_profit:
+                    self._sell(pd.Timestamp(int(times[i])), symbol, float(max(price, take_profit)),
+                               "触发止盈", "take_profit")
+                elif self.use_trailing_stop and closes[i] > position.get('entry_price', 0):
+                    self.update_trailing_stop(symbol, float(closes[i]))
+
+            if len(bars):
+                last_time, last_close = int(times[-1]), float(closes[-1])
+
+        # 回测结束按最后收盘价平仓（不受T+1限制，仅用于结算）
+        if symbol in self.positions and last_time is not None:
+            self._sell(pd.Timestamp(last_time), symbol, last_close, "回测结束平仓", "close_position")
+
+        result = self.calculate_metrics()
+        logger.info(f"分钟线回测完成: {symbol} {store.day_count}个交易日, {len(store)}根K线, "
+                    f"成交{len(result.trades)}笔, 总收益={result.total_profit:.2f}")
+        return result
@@ -1,11 +1,15 @@
 import pandas as pd
 import numpy as np
-import talib as ta
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple
 from enum import Enum
 
+from lazy_imports import lazy_import
+from memory_cache import BoundedCache
+
+ta = lazy_import('talib')  # 首次计算指标时才加载
+
 class TrendType(Enum):
     STRONG_UP = "强势上涨"
     WEAK_UP = "弱势上涨"
@@ -48,6 +52,9 @@ class JFTradingSystem:
         self.min_liquidity_score = 1.2  # 最小流动性评分
         self.trend_confirmation_period = 3  # 趋势确认周期
         self.volume_price_correlation_threshold = 0.7  # 量价相关性阈值
+        # 指标结果缓存，以行情数据为键，只需限制条数
+        self._volatility_cache = BoundedCache(max_entries=4096, name='JFTradingSystem.volatility')
+        self._resonance_cache = BoundedCache(max_entries=4096, name='JFTradingSystem.resonance')
         
     def analyze_volatility_expansion(self, df: pd.DataFrame) -> float:
         """分析波动率扩张
@@ -56,8 +63,9 @@ class JFTradingSystem:
         try:
             # 使用缓存避免重复计算
             cache_key = hash(tuple(df['Close'].tail(30).values.tolist()) if 'Close' in df.columns and len(df) >= 30 else 0)
-            if hasattr(self, '_volatility_cache') and cache_key in self._volatility_cache:
-                return self._volatility_cache[cache_key]
+            cached = self._volatility_cache.get(cache_key)
+            if cached is not None:
+                return cached
                 
             # 确保输入数据不为空
             if df.empty or len(df) < 20:
@@ -81,14 +89,10 @@ class JFTradingSystem:
             try:
                 atr = pd.Series(ta.ATR(df_copy['High'].values, df_copy['Low'].values, df_copy['Close'].values, timeperiod=14))
                 if atr.isnull().all() or len(atr) == 0:
-                    if not hasattr(self, '_volatility_cache'):
-                        self._volatility_cache = {}
-                    self._volatility_cache[cache_key] = 1.0
+                    self._volatility_cache.set(cache_key, 1.0)
                     return 1.0
             except Exception as e:
-                if not hasattr(self, '_volatility_cache'):
-                    self._volatility_cache = {}
-                self._volatility_cache[cache_key] = 1.0
+                self._volatility_cache.set(cache_key, 1.0)
                 return 1.0
                 
             # 使用前向填充处理空值，然后使用后向填充确保首部的空值也被处理
@@ -96,9 +100,7 @@ class JFTradingSystem:
             
             # 验证填充后的数据
             if atr.isnull().any():
-                if not hasattr(self, '_volatility_cache'):
-                    self._volatility_cache = {}
-                self._volatility_cache[cache_key] = 1.0
+                self._volatility_cache.set(cache_key, 1.0)
                 return 1.0
                 
             # 计算移动平均，使用min_periods=1允许在数据不足时仍能计算
@@ -109,9 +111,7 @@ class JFTradingSystem:
             avg_atr = atr_ma.iloc[-1]
             
             if pd.isna(current_atr) or pd.isna(avg_atr) or avg_atr <= 0:
-                if not hasattr(self, '_volatility_cache'):
-                    self._volatility_cache = {}
-                self._volatility_cache[cache_key] = 1.0
+                self._volatility_cache.set(cache_key, 1.0)
                 return 1.0
                 
             expansion_ratio = current_atr / avg_atr
@@ -120,9 +120,7 @@ class JFTradingSystem:
             result = min(max(expansion_ratio, 0.5), 3.0)
             
             # 缓存结果
-            if not hasattr(self, '_volatility_cache'):
-                self._volatility_cache = {}
-            self._volatility_cache[cache_key] = result
+            self._volatility_cache.set(cache_key, result)
             
             return result
             
@@ -139,8 +137,9 @@ class JFTradingSystem:
         try:
             # 使用缓存避免重复计算
             cache_key = hash(tuple(df['Close'].tail(60).values.tolist()) if 'Close' in df.columns and len(df) >= 60 else 0)
-            if hasattr(self, '_resonance_cache') and cache_key in self._resonance_cache:
-                return self._resonance_cache[cache_key]
+            cached = self._resonance_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
             # 数据验证
             if df is None or df.empty or len(df) < 60 or 'Close' not in df.columns:
@@ -184,9 +183,7 @@ class JFTradingSystem:
             result = trend_strength if trend_counts >=3 and macd_trend else 0.0
             
             # 更新缓存
-            if not hasattr(self, '_resonance_cache'):
-                self._resonance_cache = {}
-            self._resonance_cache[cache_key] = result
+            self._resonance_cache.set(cache_key, result)
             
             return result
             
@@ -627,8 +624,9 @@ class JFTradingSystem:
         try:
             # 使用缓存避免重复计算
             cache_key = hash(tuple(df['Close'].tail(60).values.tolist()) if 'Close' in df.columns and len(df) >= 60 else 0)
-            if hasattr(self, '_resonance_cache') and cache_key in self._resonance_cache:
-                return self._resonance_cache[cache_key]
+            cached = self._resonance_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
             # 数据验证
             if df is None or df.empty or len(df) < 60 or 'Close' not in df.columns:
@@ -672,9 +670,7 @@ class JFTradingSystem:
             result = trend_strength if trend_counts >=3 and macd_trend else 0.0
             
             # 更新缓存
-            if not hasattr(self, '_resonance_cache'):
-                self._resonance_cache = {}
-            self._resonance_cache[cache_key] = result
+            self._resonance_cache.set(cache_key, result)
             
             return result
             
@@ -1106,8 +1102,9 @@ class JFTradingSystem:
         try:
             # 使用缓存避免重复计算
             cache_key = hash(tuple(df['Close'].tail(60).values.tolist()) if 'Close' in df.columns and len(df) >= 60 else 0)
-            if hasattr(self, '_resonance_cache') and cache_key in self._resonance_cache:
-                return self._resonance_cache[cache_key]
+            cached = self._resonance_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
             # 数据验证
             if df is None or df.empty or len(df) < 60 or 'Close' not in df.columns:
@@ -1151,9 +1148,7 @@ class JFTradingSystem:
             result = trend_strength if trend_counts >=3 and macd_trend else 0.0
             
             # 更新缓存
-            if not hasattr(self, '_resonance_cache'):
-                self._resonance_cache = {}
-            self._resonance_cache[cache_key] = result
+            self._resonance_cache.set(cache_key, result)
             
             return result
             
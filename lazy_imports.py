@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+延迟导入模块
+talib、tushare、akshare、matplotlib、plotly等库导入耗时较长，模块级改为占位对象，
+首次访问属性时才真正导入，使界面启动时不加载仍未用到的库
+"""
+
+import sys
+import logging
+import importlib
+import threading
+from types import ModuleType
+from typing import Callable, Optional
+
+logger = logging.getLogger('LazyImports')
+
+
+class LazyModule(ModuleType):
+    """模块占位对象，首次访问属性时导入真实模块"""
+
+    def __init__(self, name: str, on_load: Optional[Callable[[ModuleType], None]] = None):
+        super().__init__(name)
+        self.__dict__['_lazy_on_load'] = on_load
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is not None:
+            return module
+        with self.__dict__['_lazy_lock']:
+            module = self.__dict__['_lazy_module']
+            if module is None:
+                module = importlib.import_module(self.__name__)
+                on_load = self.__dict__['_lazy_on_load']
+                if on_load is not None:
+                    on_load(module)
+                self.__dict__['_lazy_module'] = module
+                logger.debug(f"已加载模块 {self.__name__}")
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str, on_load: Optional[Callable[[ModuleType], None]] = None) -> ModuleType:
+    """返回延迟导入的模块
+
+    Args:
+        name: 模块名，如'talib'或'plotly.graph_objects'
+        on_load: 首次导入后调用的初始化函数（如设置matplotlib字体）
+
+    Returns:
+        已导入时直接返回真实模块，否则返回LazyModule占位对象
+    """
+    module = sys.modules.get(name)
+    if module is not None and on_load is None:
+        return module
+    return LazyModule(name, on_load)
+
+
+def is_loaded(name: str) -> bool:
+    """模块是否已被真正导入"""
+    return name in sys.modules
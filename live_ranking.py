@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+实时排名模块
+扫描结果逐只到达时用小顶堆维护前K名，每条结果O(log K)，
+扫描进行中随时可以取得当前排名靠前的股票，不必等全部完成后再整体排序
+"""
+
+import heapq
+import logging
+import threading
+from typing import Any, Callable, List
+
+logger = logging.getLogger('LiveRanking')
+
+# 界面扫描默认保留的前K名数量
+DEFAULT_TOP_K = 50
+
+
+class LiveTopK:
+    """按排序键保留前K条结果，键相同时先到的排在前面"""
+
+    def __init__(self, k: int = DEFAULT_TOP_K, key: Callable[[Any], Any] = None):
+        """初始化实时排名
+
+        Args:
+            k: 保留的数量
+            key: 排序键函数，值越大排名越靠前，默认使用结果本身
+        """
+        self.k = k
+        self.key = key or (lambda item: item)
+        self.seen = 0  # 已提交的结果数量
+        self._heap: List[tuple] = []  # (排序键, -到达序号, 结果)，堆顶为当前第K名
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, item: Any) -> bool:
+        """提交一条结果
+
+        Returns:
+            是否进入了前K名（前K名发生变化）
+        """
+        key = self.key(item)
+        with self._lock:
+            entry = (key, -self.seen, item)
+            self.seen += 1
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, entry)
+                return True
+            if self.k > 0 and entry[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, entry)
+                return True
+            return False
+
+    def items(self) -> List[Any]:
+        """当前前K名，按排序键降序"""
+        with self._lock:
+            entries = sorted(self._heap, key=lambda entry: entry[:2], reverse=True)
+        return [entry[2] for entry in entries]
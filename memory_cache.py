@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+内存缓存模块
+界面和分析器中的结果缓存统一使用有界缓存：按条数和估算内存上限做LRU淘汰，
+读取时检查过期时间和交易日，线程安全并记录命中、过期、淘汰等指标，
+长时间运行的桌面会话内存不再随扫描次数持续增长
+"""
+
+import sys
+import time
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, List, Optional
+
+logger = logging.getLogger('MemoryCache')
+
+_MISSING = object()
+
+# 所有有界缓存，供all_cache_stats汇总
+_registry = weakref.WeakSet()
+
+
+def current_trade_date(now: Optional[datetime] = None) -> str:
+    """当前行情所属的交易日(YYYYMMDD)
+
+    工作日9:30开盘后为当天，其余时间为之前最近的工作日；节假日按交易日处理，
+    只会让缓存多失效一次
+    """
+    now = now or datetime.now()
+    day = now
+    if now.weekday() >= 5 or (now.hour, now.minute) < (9, 30):
+        day = now - timedelta(days=1)
+        while day.weekday() >= 5:
+            day -= timedelta(days=1)
+    return day.strftime('%Y%m%d')
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """估算对象占用的内存(字节)，DataFrame/ndarray按实际数据大小，容器最多展开3层"""
+    if hasattr(value, 'memory_usage'):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    size = sys.getsizeof(value)
+    if _depth < 3:
+        if isinstance(value, dict):
+            size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            size += sum(estimate_size(v, _depth + 1) for v in value)
+    return size
+
+
+class BoundedCache:
+    """有界、带过期时间和交易日检查的线程安全LRU缓存"""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None, name: str = 'cache'):
+        """初始化缓存
+
+        Args:
+            max_entries: 最多保留的条数
+            max_bytes: 估算内存上限(字节)，None表示只按条数限制
+            ttl: 过期时间(秒)，None表示不过期
+            name: 缓存名称，用于日志和指标
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.name = name
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # 键 -> (值, 写入时间, 交易日, 大小)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._metrics = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0, 'sets': 0}
+        _registry.add(self)
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._data.pop(key)
+        self._bytes -= entry[3]
+
+    def _is_stale(self, entry: tuple, trade_date: Optional[str], now: float) -> bool:
+        if self.ttl is not None and now - entry[1] > self.ttl:
+            return True
+        return trade_date is not None and entry[2] != trade_date
+
+    def get(self, key: Hashable, default: Any = None, trade_date: Optional[str] = None) -> Any:
+        """读取缓存
+
+        Args:
+            key: 键
+            default: 未命中时的返回值
+            trade_date: 期望的交易日，与写入时的交易日不同视为过期
+
+        Returns:
+            缓存的值，未命中或已过期时返回default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._metrics['misses'] += 1
+                return default
+            if self._is_stale(entry, trade_date, time.time()):
+                self._drop(key)
+                self._metrics['expired'] += 1
+                self._metrics['misses'] += 1
+                return default
+            self._data.move_to_end(key)
+            self._metrics['hits'] += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, trade_date: Optional[str] = None) -> None:
+        """写入缓存，超出条数或内存上限时淘汰最久未使用的条目
+
+        Args:
+            key: 键
+            value: 值
+            trade_date: 值所属的交易日
+        """
+        size = estimate_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.debug(f"{self.name}: 条目 {key} 超过内存上限，不缓存")
+            return
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (value, time.time(), trade_date, size)
+            self._bytes += size
+            self._metrics['sets'] += 1
+            while len(self._data) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._drop(next(iter(self._data)))
+                self._metrics['evicted'] += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return default
+            value = self._data[key][0]
+            self._drop(key)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def purge_expired(self) -> int:
+        """删除所有已过期的条目
+
+        Returns:
+            删除的数量
+        """
+        if self.ttl is None:
+            return 0
+        now = time.time()
+        with self._lock:
+            stale = [key for key, entry in self._data.items() if now - entry[1] > self.ttl]
+            for key in stale:
+                self._drop(key)
+            self._metrics['expired'] += len(stale)
+        return len(stale)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存指标：条数、估算内存、命中率以及命中/未命中/过期/淘汰次数"""
+        with self._lock:
+            stats = dict(self._metrics, name=self.name, entries=len(self._data), bytes=self._bytes,
+                         max_entries=self.max_entries, max_bytes=self.max_bytes)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+def all_cache_stats() -> List[Dict[str, Any]]:
+    """进程内所有有界缓存的指标"""
+    return [cache.stats() for cache in list(_registry)]
@@ -16,31 +16,44 @@ class SectorAnalyzer:
         Returns:
             按强度排序的板块列表，每个元素为(板块名称, 强度得分)元组
         """
-        sector_scores = {}
-        
-        for sector in sector_data.columns:
-            # 计算动量得分
-            momentum = self._calculate_momentum(sector_data[sector])
-            # 计算趋势强度
-            trend_strength = self._calculate_trend_strength(sector_data[sector])
-            # 计算相对强度
-            relative_strength = self._calculate_relative_strength(sector_data[sector], sector_data)
-            
-            # 综合评分
-            sector_scores[sector] = (
-                momentum * 0.4 +
-                trend_strength * 0.3 +
-                relative_strength * 0.3
-            )
+        table = self.rank_table(sector_data)
+        return list(zip(table.index, table['score']))
+    
+    def rank_table(self, sector_data: pd.DataFrame) -> pd.DataFrame:
+        """对全部板块按列一次计算动量、趋势强度和相对强度
         
-        # 按强度降序排序
-        ranked_sectors = sorted(
-            sector_scores.items(),
-            key=lambda x: x[1],
-            reverse=True
+        Args:
+            sector_data: 板块指数DataFrame，每列一个板块
+            
+        Returns:
+            按综合得分降序排列的DataFrame (momentum, trend_strength, relative_strength, score)
+        """
+        returns = sector_data.pct_change(self.lookback_period)
+        momentum = returns.mean()
+        
+        ma20 = sector_data.rolling(20).mean()
+        ma60 = sector_data.rolling(60).mean()
+        trend_strength = (
+            (sector_data > ma20).mean() * 0.4 +
+            (sector_data > ma60).mean() * 0.3 +
+            (ma20 > ma60).mean() * 0.3
         )
         
-        return ranked_sectors
+        market_return = sector_data.mean(axis=1).pct_change(self.lookback_period)
+        relative_strength = returns.sub(market_return, axis=0).mean()
+        
+        table = pd.DataFrame({
+            'momentum': momentum,
+            'trend_strength': trend_strength,
+            'relative_strength': relative_strength
+        })
+        table['score'] = (
+            table['momentum'] * 0.4 +
+            table['trend_strength'] * 0.3 +
+            table['relative_strength'] * 0.3
+        )
+        # 按强度降序排序
+        return table.sort_values('score', ascending=False, kind='stable')
     
     def _calculate_momentum(self, prices: pd.Series) -> float:
         """计算动量得分"""
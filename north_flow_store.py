@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+北向资金时间序列存储模块
+沪深股通市场总额(moneyflow_hsgt)按区间一次请求增量保存，个股持股(hk_hold)和
+十大成交股净买入(hsgt_top10)分别按交易日截面增量保存，只需十大成交股时不请求持股明细；
+区间查询全部在本地完成，行业归因通过行业成分索引一次矩阵聚合得到
+"""
+
+import os
+import time
+import pickle
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from sector_data_engine import CrossSectionStore, StockDailyStore
+
+logger = logging.getLogger('NorthFlowStore')
+
+# 持股明细字段：持股数量和占流通股比例
+HOLDING_FIELDS = ['vol', 'ratio']
+# 十大成交股字段：成交金额(元)
+TOP10_FIELDS = ['amount', 'net_amount', 'buy', 'sell']
+
+# 市场总额字段（百万元）
+MARKET_FIELDS = ['ggt_ss', 'ggt_sz', 'hgt', 'sgt', 'north_money', 'south_money']
+
+
+def _northbound_only(df: pd.DataFrame) -> pd.DataFrame:
+    """去掉港股通(南向)持股"""
+    if df is None or df.empty or 'exchange' not in df.columns:
+        return df
+    return df[df['exchange'] != 'HK']
+
+
+def _default_holding_fetchers() -> Dict[str, Callable[[str], pd.DataFrame]]:
+    """使用tushare_api中的持股明细接口"""
+    from goon_stock_system.utils.tushare_api import get_hk_hold
+    return {'hold': lambda trade_date: _northbound_only(get_hk_hold(trade_date=trade_date))}
+
+
+def _default_top10_fetchers() -> Dict[str, Callable[[str], pd.DataFrame]]:
+    """使用tushare_api中的十大成交股接口"""
+    from goon_stock_system.utils.tushare_api import get_hsgt_top10
+    return {'top10': lambda trade_date: get_hsgt_top10(trade_date=trade_date)}
+
+
+def _default_market_fetcher(start_date: str, end_date: str) -> pd.DataFrame:
+    from goon_stock_system.utils.tushare_api import get_moneyflow_hsgt
+    return get_moneyflow_hsgt(start_date=start_date, end_date=end_date)
+
+
+def _in_range(df: pd.DataFrame, start_date: Optional[str], end_date: Optional[str]) -> pd.DataFrame:
+    """按trade_date列筛选[start_date, end_date]区间"""
+    if start_date is not None:
+        df = df[df['trade_date'] >= pd.Timestamp(start_date)]
+    if end_date is not None:
+        df = df[df['trade_date'] <= pd.Timestamp(end_date)]
+    return df
+
+
+class NorthHoldingStore(CrossSectionStore):
+    """北向个股持股明细截面，每个交易日一次接口调用"""
+
+    FIELDS = HOLDING_FIELDS
+    DEFAULT_CACHE_DIR = 'data_cache/north_flow/holdings'
+
+    @staticmethod
+    def _pro_fetchers(pro) -> Dict[str, Callable[[str], pd.DataFrame]]:
+        return {'hold': lambda trade_date: _northbound_only(pro.hk_hold(trade_date=trade_date))}
+
+    def _default_fetchers(self) -> Dict[str, Callable[[str], pd.DataFrame]]:
+        return _default_holding_fetchers()
+
+    # 多个数据源按股票代码横向合并
+    _combine = StockDailyStore._combine
+
+
+class NorthTop10Store(CrossSectionStore):
+    """沪深股通十大成交股截面，每个交易日一次接口调用"""
+
+    FIELDS = TOP10_FIELDS
+    DEFAULT_CACHE_DIR = 'data_cache/north_flow/top10'
+
+    @staticmethod
+    def _pro_fetchers(pro) -> Dict[str, Callable[[str], pd.DataFrame]]:
+        return {'top10': lambda trade_date: pro.hsgt_top10(trade_date=trade_date)}
+
+    def _default_fetchers(self) -> Dict[str, Callable[[str], pd.DataFrame]]:
+        return _default_top10_fetchers()
+
+    _combine = StockDailyStore._combine
+
+
+class NorthFlowStore:
+    """北向资金存储：市场总额时间序列 + 个股持股截面 + 十大成交股截面"""
+
+    def __init__(self, cache_dir: str = 'data_cache/north_flow',
+                 market_fetcher: Optional[Callable[[str, str], pd.DataFrame]] = None,
+                 holdings: Optional[NorthHoldingStore] = None, top10: Optional[NorthTop10Store] = None,
+                 refresh_interval: int = 600):
+        """初始化北向资金存储
+
+        Args:
+            cache_dir: 存储目录
+            market_fetcher: 市场总额取数函数(start_date, end_date) -> DataFrame，默认moneyflow_hsgt
+            holdings: 个股持股截面，默认保存在cache_dir/holdings
+            top10: 十大成交股截面，默认保存在cache_dir/top10
+            refresh_interval: 同一区间两次检查更新的最小间隔(秒)
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._market_fetcher = market_fetcher or _default_market_fetcher
+        self.holdings = holdings or NorthHoldingStore(os.path.join(cache_dir, 'holdings'),
+                                                      refresh_interval=refresh_interval)
+        self.top10 = top10 or NorthTop10Store(os.path.join(cache_dir, 'top10'),
+                                              refresh_interval=refresh_interval)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._market = pd.DataFrame(columns=['trade_date'] + MARKET_FIELDS)
+        self._market_checked = (None, 0.0)  # (检查到的截止日期, 检查时间)
+        self.api_calls = 0
+        self._load_market()
+
+    @classmethod
+    def from_pro(cls, pro, cache_dir: str = 'data_cache/north_flow', **kwargs) -> 'NorthFlowStore':
+        """使用已初始化的tushare pro接口创建"""
+        kwargs.setdefault('market_fetcher',
+                          lambda start_date, end_date: pro.moneyflow_hsgt(start_date=start_date, end_date=end_date))
+        kwargs.setdefault('holdings', NorthHoldingStore.from_pro(pro, cache_dir=os.path.join(cache_dir, 'holdings')))
+        kwargs.setdefault('top10', NorthTop10Store.from_pro(pro, cache_dir=os.path.join(cache_dir, 'top10')))
+        return cls(cache_dir, **kwargs)
+
+    # ---------- 市场总额 ----------
+
+    def _market_path(self) -> str:
+        return os.path.join(self.cache_dir, 'market.pkl')
+
+    def _load_market(self) -> None:
+        if not os.path.exists(self._market_path()):
+            return
+        try:
+            with open(self._market_path(), 'rb') as f:
+                self._market = pickle.load(f)
+        except Exception as e:
+            logger.error(f"加载北向资金市场数据失败: {str(e)}")
+
+    def _save_market(self) -> None:
+        try:
+            tmp_path = self._market_path() + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(self._market, f)
+            os.replace(tmp_path, self._market_path())
+        except Exception as e:
+            logger.error(f"保存北向资金市场数据失败: {str(e)}")
+
+    def update_market(self, days: int = 30, end_date: Optional[str] = None) -> int:
+        """补齐市场总额：从已保存的最后一天（或days天前）到end_date一次区间请求
+
+        Returns:
+            新增或更新的交易日数量
+        """
+        end_date = end_date or datetime.now().strftime('%Y%m%d')
+        with self._lock:
+            checked_end, checked_time = self._market_checked
+            if checked_end == end_date and time.time() - checked_time < self.refresh_interval:
+                return 0
+            start_date = (datetime.strptime(end_date, '%Y%m%d') - timedelta(days=days)).strftime('%Y%m%d')
+            if not self._market.empty:
+                first = self._market['trade_date'].min().strftime('%Y%m%d')
+                last = self._market['trade_date'].max().strftime('%Y%m%d')
+                # 已覆盖区间起点时只从最后一天开始补（最后一天可能在盘中取得，重新请求）
+                if first <= start_date:
+                    start_date = max(start_date, last)
+
+            try:
+                df = self._market_fetcher(start_date, end_date)
+                self.api_calls += 1
+            except Exception as e:
+                logger.warning(f"获取北向资金市场数据失败: {str(e)}")
+                return 0
+            self._market_checked = (end_date, time.time())
+            if df is None or df.empty:
+                return 0
+
+            new = pd.DataFrame({'trade_date': pd.to_datetime(df['trade_date'].astype(str), format='%Y%m%d')})
+            for field in MARKET_FIELDS:
+                new[field] = pd.to_numeric(df[field], errors='coerce') if field in df.columns else float('nan')
+            market = pd.concat([self._market[~self._market['trade_date'].isin(new['trade_date'])], new],
+                               ignore_index=True)
+            self._market = market.sort_values('trade_date').reset_index(drop=True)
+            self._save_market()
+            return len(new)
+
+    def update(self, days: int = 30, end_date: Optional[str] = None, holdings: bool = True) -> int:
+        """增量更新市场总额、十大成交股和个股持股截面
+
+        Args:
+            days: 覆盖的自然日数
+            end_date: 截止日期(YYYYMMDD)，默认今天
+            holdings: 是否更新持股明细；只统计十大成交股时传False，每个交易日少一次接口调用
+
+        Returns:
+            新取得的个股截面交易日数量
+        """
+        self.update_market(days=days, end_date=end_date)
+        updated = self.top10.update(days=days, end_date=end_date)
+        if holdings:
+            updated = max(updated, self.holdings.update(days=days, end_date=end_date))
+        return updated
+
+    def market(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
+        """市场总额时间序列
+
+        Args:
+            start_date: 开始日期(YYYYMMDD)，None表示不限
+            end_date: 截止日期(YYYYMMDD)，None表示不限
+
+        Returns:
+            以trade_date为索引、列为MARKET_FIELDS的DataFrame（百万元）
+        """
+        with self._lock:
+            market = self._market
+        return _in_range(market, start_date, end_date).set_index('trade_date')
+
+    def north_money(self, trade_date: Optional[str] = None) -> Optional[float]:
+        """某个交易日（默认最近交易日）的北向资金净流入，没有数据时返回None"""
+        market = self.market(end_date=trade_date)['north_money'].dropna()
+        if market.empty:
+            return None
+        if trade_date is not None and market.index[-1] != pd.Timestamp(trade_date):
+            return None
+        return float(market.iloc[-1])
+
+    # ---------- 个股与行业 ----------
+
+    def holdings_panel(self, field: str = 'vol', start_date: Optional[str] = None,
+                       end_date: Optional[str] = None) -> pd.DataFrame:
+        """个股字段的(日期 × 股票)面板
+
+        Args:
+            field: HOLDING_FIELDS或TOP10_FIELDS中的字段
+            start_date: 开始日期(YYYYMMDD)
+            end_date: 截止日期(YYYYMMDD)
+        """
+        store = self.top10 if field in TOP10_FIELDS else self.holdings
+        long_panel = _in_range(store._long_panel(start_date), start_date, end_date)
+        long_panel = long_panel[long_panel[field].notna()] if field in long_panel.columns else long_panel.iloc[:0]
+        return long_panel.pivot(index='trade_date', columns='ts_code', values=field).sort_index()
+
+    def stock_flows(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
+        """区间内沪深股通十大成交股的净买入统计
+
+        Returns:
+            每只股票一行：ts_code、net_inflow(万元)、appear_days、positive_days、positive_ratio，
+            按净买入降序
+        """
+        net = self.holdings_panel('net_amount', start_date, end_date)
+        if net.empty:
+            return pd.DataFrame(columns=['ts_code', 'net_inflow', 'appear_days', 'positive_days', 'positive_ratio'])
+        appear = net.notna().sum()
+        positive = (net > 0).sum()
+        result = pd.DataFrame({
+            'ts_code': net.columns,
+            'net_inflow': net.sum().to_numpy() / 10000,  # 万元
+            'appear_days': appear.to_numpy(),
+            'positive_days': positive.to_numpy(),
+            'positive_ratio': (positive / appear * 100).to_numpy(),
+        })
+        return result.sort_values('net_inflow', ascending=False).reset_index(drop=True)
+
+    def sector_flows(self, field: str = 'net_amount', start_date: Optional[str] = None,
+                     end_date: Optional[str] = None, membership=None, diff: bool = False) -> pd.DataFrame:
+        """按行业归因的北向资金(日期 × 行业)面板
+
+        Args:
+            field: 个股字段，如net_amount（十大成交股净买入）或vol（持股数量）
+            start_date: 开始日期(YYYYMMDD)
+            end_date: 截止日期(YYYYMMDD)
+            membership: SectorMembershipIndex，为空时使用共享的行业成分索引
+            diff: 是否先取逐日变化（如持股数量的增减）
+
+        Returns:
+            (日期 × 行业)面板，行业内没有任何数据的日期为NaN
+        """
+        if membership is None:
+            from sector_membership import get_membership_index
+            membership = get_membership_index(refresh=True)
+        panel = self.holdings_panel(field, start_date, end_date)
+        if diff:
+            panel = panel.diff()
+        if panel.empty:
+            return pd.DataFrame(index=panel.index)
+        sums = membership.sum_by_sector(panel.T).T
+        counts = membership.sum_by_sector(panel.notna().T).T
+        return sums.where(counts > 0).dropna(axis=1, how='all')
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_north_flow_store(cache_dir: str = 'data_cache/north_flow', pro=None, **kwargs) -> NorthFlowStore:
+    """获取进程内共享的北向资金存储
+
+    Args:
+        cache_dir: 存储目录
+        pro: 调用方已初始化的tushare pro接口，首次创建时使用
+    """
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            if pro is not None:
+                _instance = NorthFlowStore.from_pro(pro, cache_dir=cache_dir, **kwargs)
+            else:
+                _instance = NorthFlowStore(cache_dir, **kwargs)
+        return _instance
@@ -17,6 +17,8 @@ from typing import Dict, List, Optional, Tuple, Union
 import threading
 import traceback
 
+from sector_catalog import is_lazy, prefilter_sectors
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -32,7 +34,8 @@ logger = logging.getLogger("OptimizedSectorAnalyzer")
 class OptimizedSectorAnalyzer:
     """优化版行业分析器，支持多数据源"""
     
-    def __init__(self, top_n=10, provider=None, provider_type='auto', tushare_token=None):
+    def __init__(self, top_n=10, provider=None, provider_type='auto', tushare_token=None,
+                 sector_engine=None, data_days=90):
         """初始化优化版行业分析器
         
         Args:
@@ -40,8 +43,13 @@ class OptimizedSectorAnalyzer:
             provider: 行业数据提供器实例，如果为None则自动创建
             provider_type: 提供器类型 ('tushare', 'akshare', 'auto')
             tushare_token: Tushare API Token
+            sector_engine: 行业截面数据引擎，为None时使用共享引擎
+            data_days: 默认分析的历史天数
         """
         self.top_n = top_n
+        self.data_days = data_days
+        self._sector_engine = sector_engine
+        self.max_lazy_sectors = 30  # 每次分析最多逐个获取历史数据的概念板块数量
         self._last_update = 0
         self.is_analyzing = False
         self.analysis_lock = threading.Lock()
@@ -65,17 +73,18 @@ class OptimizedSectorAnalyzer:
                 logger.error("无法导入sector_provider_factory模块")
                 raise ImportError("无法导入sector_provider_factory模块")
     
-    def analyze_hot_sectors(self, days=90, min_days=30) -> Dict:
+    def analyze_hot_sectors(self, days=None, min_days=30) -> Dict:
         """分析热门行业
         
         Args:
-            days: 分析的历史天数
+            days: 分析的历史天数，None时使用data_days
             min_days: 最小有效数据天数
             
         Returns:
             分析结果 {'timestamp': 时间戳, 'data': {'sectors': 行业列表, 'market_info': 市场信息}}
         """
         start_time = time.time()
+        days = days or self.data_days
         
         # 使用锁防止并发分析
         if self.analysis_lock.acquire(False):
@@ -103,18 +112,29 @@ class OptimizedSectorAnalyzer:
                 # 分析各行业
                 sectors_analyzed = []
                 
-                # 申万行业板块，使用优先级更高
+                # 申万行业板块，使用优先级更高；概念板块按目录标记的类型识别（tushare为TS，东方财富为CN）
                 sw_sectors = [s for s in sectors if s['type'] == 'SW']
-                cn_sectors = [s for s in sectors if s['type'] == 'CN']
+                concept_sectors = [s for s in sectors if is_lazy(s)]
+                
+                # 合并处理，优先处理申万行业；概念板块按截面快照预筛选后再逐个获取历史数据
+                all_sectors = self._prefilter_sectors(sw_sectors + concept_sectors)
                 
-                # 合并处理，优先处理申万行业
-                all_sectors = sw_sectors + cn_sectors
+                # 按交易日批量补齐行业截面，在收盘价面板上一次算出全部行业指标
+                panel_metrics = self._calculate_panel_metrics(days)
                 
                 for sector in all_sectors:
                     try:
                         logger.debug(f"分析行业: {sector['name']} ({sector['code']})")
                         
-                        # 获取行业历史数据
+                        if panel_metrics is not None and sector['code'] in panel_metrics.index:
+                            row = panel_metrics.loc[sector['code']]
+                            if row['data_days'] < min_days:
+                                logger.warning(f"行业 {sector['name']} 历史数据不足 {min_days} 天，跳过")
+                            else:
+                                sectors_analyzed.append(self._format_sector_metrics(row, sector))
+                            continue
+                        
+                        # 面板中没有的行业（如概念板块）仍由提供器逐个获取
                         hist_data = self.provider.get_sector_history(sector['code'], days=days)
                         
                         if hist_data is None or hist_data.empty:
@@ -179,6 +199,68 @@ class OptimizedSectorAnalyzer:
             logger.warning("已有分析任务正在运行，请稍后再试")
             return {'error': '已有分析任务正在运行，请稍后再试'}
     
+    def _prefilter_sectors(self, sectors: List[Dict]) -> List[Dict]:
+        """按提供器的截面快照预筛选需要逐个获取历史数据的概念板块
+
+        快照只使用提供器已缓存的数据，预筛选本身不产生额外的接口调用
+        """
+        snapshot = None
+        if hasattr(self.provider, 'get_sector_snapshot'):
+            try:
+                snapshot = self.provider.get_sector_snapshot()
+            except Exception as e:
+                logger.warning(f"获取行业截面快照失败: {str(e)}")
+        return prefilter_sectors(sectors, snapshot, max_lazy=self.max_lazy_sectors)
+    
+    def _get_sector_engine(self):
+        """获取行业截面数据引擎，不可用时返回None"""
+        if self._sector_engine is None:
+            try:
+                from sector_data_engine import get_sector_data_engine
+                pro = getattr(self.provider, 'pro', None) if getattr(self.provider, 'is_pro_available', False) else None
+                self._sector_engine = get_sector_data_engine(pro=pro)
+            except Exception as e:
+                logger.warning(f"行业截面数据引擎不可用: {str(e)}")
+                self._sector_engine = False
+        return self._sector_engine or None
+    
+    def _calculate_panel_metrics(self, days: int) -> Optional[pd.DataFrame]:
+        """在行业截面面板上向量化计算全部行业的指标，面板不可用时返回None"""
+        engine = self._get_sector_engine()
+        if engine is None:
+            return None
+        try:
+            from sector_metrics import hot_sector_metrics
+            engine.update(days)
+            close = engine.panel('close', days=days)
+            if close.empty:
+                return None
+            return hot_sector_metrics(close)
+        except Exception as e:
+            logger.warning(f"行业截面指标计算失败，逐个行业计算: {str(e)}")
+            logger.debug(traceback.format_exc())
+            return None
+    
+    def _format_sector_metrics(self, metrics: pd.Series, sector_info: Dict) -> Dict:
+        """将面板指标表中的一行转换为与_calculate_sector_metrics相同的结果格式"""
+        return {
+            'code': sector_info['code'],
+            'name': sector_info['name'],
+            'type': sector_info['type'],
+            'description': sector_info.get('description', f"{sector_info['type']}-{sector_info['name']}"),
+            'last_close': metrics['last_close'],
+            'last_date': metrics['last_date'],
+            'change_rate_1d': round(metrics['change_rate_1d'], 2),
+            'change_rate_5d': round(metrics['change_rate_5d'], 2),
+            'change_rate_20d': round(metrics['change_rate_20d'], 2),
+            'change_rate_90d': round(metrics['change_rate_90d'], 2),
+            'volatility': round(metrics['volatility'], 2),
+            'trend_strength': round(metrics['trend_strength'], 2),
+            'score': round(metrics['score'], 2),
+            'data_source': 'sector_panel',
+            'is_real_data': True
+        }
+    
     def _calculate_sector_metrics(self, hist_data: pd.DataFrame, sector_info: Dict) -> Dict:
         """计算行业指标
         
@@ -248,12 +330,13 @@ class OptimizedSectorAnalyzer:
             trend_strength = 0
             try:
                 if len(data) >= 30:
-                    ma10 = data['收盘'].rolling(10).mean()
-                    ma30 = data['收盘'].rolling(30).mean()
+                    # 均线需按日期升序滚动计算，取最近一天的值
+                    ma10 = data['收盘'].iloc[::-1].rolling(10).mean().iloc[-1]
+                    ma30 = data['收盘'].iloc[::-1].rolling(30).mean().iloc[-1]
                     
                     # 确保数据不是NaN
-                    if not np.isnan(ma10.iloc[0]) and not np.isnan(ma30.iloc[0]) and ma30.iloc[0] != 0:
-                        trend_strength = (ma10.iloc[0] / ma30.iloc[0] - 1) * 100
+                    if not np.isnan(ma10) and not np.isnan(ma30) and ma30 != 0:
+                        trend_strength = (ma10 / ma30 - 1) * 100
                     else:
                         logger.warning(f"行业 {sector_info['name']} 计算趋势强度时出现NaN，使用默认值0")
                 else:
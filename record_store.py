@@ -0,0 +1,439 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+记录存储模块
+复盘池、推荐等以股票为单位的记录保存在嵌入式SQLite数据库中，每只股票一行，
+修改时只写变化的行；symbol/status/score/tag建有索引，历史记录按条数上限滚动保留。
+每次写入在一个事务中完成（WAL日志），写入中途崩溃不会破坏已有数据。
+内存中的记录另由RecordIndex按状态、标签和评分区间建立二级索引，界面查询不再扫描全部记录
+"""
+
+import os
+import json
+import math
+import heapq
+import sqlite3
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger('RecordStore')
+
+# 默认保留的历史记录条数
+DEFAULT_HISTORY_LIMIT = 2000
+
+# 评分索引的区间宽度（评分为0-100）
+DEFAULT_SCORE_BUCKET = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    key TEXT PRIMARY KEY,
+    symbol TEXT,
+    status TEXT,
+    score REAL,
+    data TEXT NOT NULL,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_records_symbol ON records(symbol);
+CREATE INDEX IF NOT EXISTS idx_records_status ON records(status);
+CREATE INDEX IF NOT EXISTS idx_records_score ON records(score);
+CREATE TABLE IF NOT EXISTS record_tags (
+    key TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (key, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_record_tags_tag ON record_tags(tag);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT,
+    data TEXT NOT NULL,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_key ON history(key);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _to_builtin(value: Any) -> Any:
+    """json序列化numpy标量、时间等非内置类型"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+
+def _dumps(data: Dict) -> str:
+    return json.dumps(data, ensure_ascii=False, default=_to_builtin)
+
+
+class RecordStore:
+    """以记录键（股票代码）为主键的SQLite记录存储"""
+
+    def __init__(self, db_path: str, key_field: str = 'symbol', status_field: str = 'status',
+                 score_field: str = 'score', tags_field: str = 'tags',
+                 history_limit: int = DEFAULT_HISTORY_LIMIT):
+        """初始化记录存储
+
+        Args:
+            db_path: 数据库文件路径
+            key_field: 记录中作为主键（并建立symbol索引）的字段
+            status_field: 状态字段
+            score_field: 评分字段
+            tags_field: 标签列表字段
+            history_limit: 历史记录最多保留条数，None表示不限
+        """
+        self.db_path = db_path
+        self.key_field = key_field
+        self.status_field = status_field
+        self.score_field = score_field
+        self.tags_field = tags_field
+        self.history_limit = history_limit
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---------- 读取 ----------
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    def load(self) -> List[Dict]:
+        """按首次写入顺序读取全部记录"""
+        with self._lock:
+            rows = self._conn.execute('SELECT data FROM records ORDER BY rowid').fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM records WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def query(self, symbol: Optional[str] = None, status: Optional[str] = None,
+              tag: Optional[str] = None, min_score: Optional[float] = None,
+              max_score: Optional[float] = None, limit: Optional[int] = None) -> List[Dict]:
+        """按索引字段查询记录，结果按评分降序
+
+        Args:
+            symbol: 股票代码
+            status: 状态
+            tag: 标签
+            min_score: 最低评分
+            max_score: 最高评分
+            limit: 最多返回条数
+        """
+        sql = 'SELECT r.data FROM records r'
+        conditions, params = [], []
+        if tag is not None:
+            sql += ' JOIN record_tags t ON t.key = r.key'
+            conditions.append('t.tag = ?')
+            params.append(tag)
+        for column, op, value in (('symbol', '=', symbol), ('status', '=', status),
+                                  ('score', '>=', min_score), ('score', '<=', max_score)):
+            if value is not None:
+                conditions.append(f'r.{column} {op} ?')
+                params.append(value)
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY r.score DESC, r.rowid'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def history(self, key: Optional[str] = None) -> List[Dict]:
+        """按写入顺序读取保留的历史记录"""
+        with self._lock:
+            if key is None:
+                rows = self._conn.execute('SELECT data FROM history ORDER BY id').fetchall()
+            else:
+                rows = self._conn.execute('SELECT data FROM history WHERE key = ? ORDER BY id', (key,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_meta(self, name: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM meta WHERE name = ?', (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    # ---------- 写入 ----------
+
+    def _row(self, record: Dict, now: str) -> Tuple:
+        score = record.get(self.score_field)
+        try:
+            score = float(score) if score is not None else None
+        except (TypeError, ValueError):
+            score = None
+        return (str(record[self.key_field]), record.get(self.key_field), record.get(self.status_field),
+                score, _dumps(record), now)
+
+    def apply(self, upserts: Optional[Iterable[Dict]] = None, deletes: Optional[Iterable[str]] = None,
+              history: Optional[Iterable[Dict]] = None, meta: Optional[Dict[str, Any]] = None) -> None:
+        """在一个事务中写入变化：新增或更新记录、删除记录、追加历史、更新元数据
+
+        任一步出错时整个事务回滚并抛出异常，数据库保持写入前的状态。
+
+        Args:
+            upserts: 新增或更新的记录（按key_field合并）
+            deletes: 删除的记录键
+            history: 追加的历史记录
+            meta: 元数据 名称 -> 可json序列化的值
+        """
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        upserts = list(upserts or [])
+        deletes = [str(key) for key in deletes or []]
+        history = list(history or [])
+        with self._lock, self._conn:
+            if upserts:
+                rows = [self._row(record, now) for record in upserts]
+                self._conn.executemany(
+                    'INSERT INTO records (key, symbol, status, score, data, updated_at) VALUES (?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT(key) DO UPDATE SET symbol = excluded.symbol, status = excluded.status, '
+                    'score = excluded.score, data = excluded.data, updated_at = excluded.updated_at',
+                    rows)
+                keys = [(row[0],) for row in rows]
+                self._conn.executemany('DELETE FROM record_tags WHERE key = ?', keys)
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO record_tags (key, tag) VALUES (?, ?)',
+                    [(row[0], str(tag)) for row, record in zip(rows, upserts)
+                     for tag in record.get(self.tags_field) or []])
+            if deletes:
+                keys = [(key,) for key in deletes]
+                self._conn.executemany('DELETE FROM records WHERE key = ?', keys)
+                self._conn.executemany('DELETE FROM record_tags WHERE key = ?', keys)
+            if history:
+                self._conn.executemany(
+                    'INSERT INTO history (key, data, created_at) VALUES (?, ?, ?)',
+                    [(entry.get(self.key_field), _dumps(entry), now) for entry in history])
+                if self.history_limit is not None:
+                    self._conn.execute(
+                        'DELETE FROM history WHERE id <= (SELECT MAX(id) FROM history) - ?',
+                        (int(self.history_limit),))
+            for name, value in (meta or {}).items():
+                self._conn.execute('INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)',
+                                   (name, _dumps(value)))
+
+    def sync(self, records: Iterable[Dict], **kwargs) -> None:
+        """写入全部记录并删除不在其中的记录（全量保存）"""
+        records = list(records)
+        keep = {str(record[self.key_field]) for record in records}
+        with self._lock:
+            stale = [row[0] for row in self._conn.execute('SELECT key FROM records').fetchall()
+                     if row[0] not in keep]
+            self.apply(upserts=records, deletes=stale, **kwargs)
+
+    def import_json(self, json_path: str, load: Callable[[Dict], Tuple[List[Dict], List[Dict], Dict]]) -> bool:
+        """数据库为空时一次性导入旧版JSON文件，原文件保留
+
+        Args:
+            json_path: 旧版JSON文件路径
+            load: 把JSON内容转换为(记录列表, 历史记录列表, 元数据)的函数
+
+        Returns:
+            是否导入了数据
+        """
+        if len(self) > 0 or self.get_meta('imported_from') is not None or not os.path.exists(json_path):
+            return False
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                records, history, meta = load(json.load(f))
+            if self.history_limit is not None:
+                history = history[-self.history_limit:] if self.history_limit > 0 else []
+            meta = dict(meta, imported_from=os.path.basename(json_path))
+            self.apply(upserts=records, history=history, meta=meta)
+            logger.info(f"已从 {json_path} 导入 {len(records)} 条记录和 {len(history)} 条历史记录")
+            return True
+        except Exception as e:
+            logger.error(f"导入 {json_path} 失败: {str(e)}")
+            return False
+
+
+def _field(name: str) -> Callable[[Any], Any]:
+    """读取字典键或对象属性"""
+    def getter(record):
+        if isinstance(record, dict):
+            return record.get(name)
+        return getattr(record, name, None)
+    return getter
+
+
+class RecordIndex:
+    """内存记录的二级索引：状态、标签、评分区间，以及基于堆的前K名查询
+
+    索引保存记录对象本身；记录被修改后需调用update重新登记，删除时调用remove。
+    同分记录按首次登记的顺序排列，与按评分稳定排序的结果一致。
+    """
+
+    def __init__(self, key: str = 'symbol', status: str = 'status', score: str = 'score',
+                 tags: str = 'tags', bucket_size: float = DEFAULT_SCORE_BUCKET):
+        """初始化索引
+
+        Args:
+            key: 主键字段（字典键或对象属性名）
+            status: 状态字段
+            score: 评分字段，缺失、无法解析或为NaN/inf时按0处理
+            tags: 标签列表字段
+            bucket_size: 评分区间宽度
+        """
+        self._key = _field(key)
+        self._status = _field(status)
+        self._score_of = _field(score)
+        self._tags = _field(tags)
+        self.bucket_size = bucket_size
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records: Dict[str, Any] = {}
+            self._order: Dict[str, int] = {}
+            self._entries: Dict[str, Tuple] = {}  # 键 -> 登记时的(状态, 标签, 评分)
+            self._by_status: Dict[Any, Set[str]] = defaultdict(set)
+            self._by_tag: Dict[str, Set[str]] = defaultdict(set)
+            self._by_bucket: Dict[int, Set[str]] = defaultdict(set)
+            self._counter = 0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.records
+
+    def get(self, key: str) -> Any:
+        return self.records.get(key)
+
+    def _score(self, record: Any) -> float:
+        score = self._score_of(record)
+        try:
+            score = float(score) if score is not None else 0.0
+        except (TypeError, ValueError):
+            return 0.0
+        # NaN和inf无法归入评分区间，与缺失评分一样按0登记
+        return score if math.isfinite(score) else 0.0
+
+    def _bucket(self, score: float) -> int:
+        return int(score // self.bucket_size)
+
+    @staticmethod
+    def _discard(index: Dict[Any, Set[str]], value: Any, key: str) -> None:
+        keys = index.get(value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[value]
+
+    def _unlink(self, key: str) -> None:
+        status, tags, score = self._entries.pop(key)
+        self._discard(self._by_status, status, key)
+        for tag in tags:
+            self._discard(self._by_tag, tag, key)
+        self._discard(self._by_bucket, self._bucket(score), key)
+
+    def rebuild(self, records: Iterable[Any]) -> None:
+        """按给定顺序重新登记全部记录"""
+        with self._lock:
+            self.clear()
+            for record in records:
+                self.update(record)
+
+    def update(self, record: Any) -> None:
+        """登记新记录或记录修改后的状态、标签和评分"""
+        key = self._key(record)
+        with self._lock:
+            if key in self._entries:
+                self._unlink(key)
+            else:
+                self._order[key] = self._counter
+                self._counter += 1
+            status = self._status(record)
+            tags = tuple(set(self._tags(record) or []))
+            score = self._score(record)
+            self.records[key] = record
+            self._entries[key] = (status, tags, score)
+            self._by_status[status].add(key)
+            for tag in tags:
+                self._by_tag[tag].add(key)
+            self._by_bucket[self._bucket(score)].add(key)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._unlink(key)
+                del self.records[key]
+                del self._order[key]
+
+    def _candidates(self, status: Any = None, tags: Optional[Iterable[str]] = None) -> Optional[Set[str]]:
+        """按状态和标签（任一命中）求候选键，None表示不限"""
+        candidates = None
+        if status is not None:
+            candidates = self._by_status.get(status, set())
+        if tags is not None:
+            tagged = set()
+            for tag in tags:
+                tagged |= self._by_tag.get(tag, set())
+            candidates = tagged if candidates is None else candidates & tagged
+        return candidates
+
+    def top(self, k: Optional[int] = None, status: Any = None, tags: Optional[Iterable[str]] = None,
+            min_score: Optional[float] = None, max_score: Optional[float] = None) -> List[Any]:
+        """按评分降序返回符合条件的记录
+
+        从最高的评分区间向下逐个区间取候选，凑满k条后不再查看更低的区间，
+        每个区间内用堆取前若干名。
+
+        Args:
+            k: 最多返回条数，None表示全部
+            status: 状态
+            tags: 标签列表，命中任一即可
+            min_score: 最低评分（含）
+            max_score: 最高评分（含）
+
+        Returns:
+            记录对象列表
+        """
+        with self._lock:
+            candidates = self._candidates(status, tags)
+            # 非有限的上下限不限定区间，由逐条比较过滤
+            lowest = self._bucket(min_score) if min_score is not None and math.isfinite(min_score) else None
+            highest = self._bucket(max_score) if max_score is not None and math.isfinite(max_score) else None
+            sort_key = lambda key: (self._entries[key][2], -self._order[key])
+            result = []
+            for bucket in sorted(self._by_bucket, reverse=True):
+                if highest is not None and bucket > highest:
+                    continue
+                if lowest is not None and bucket < lowest:
+                    break
+                keys = self._by_bucket[bucket]
+                if candidates is not None:
+                    keys = keys & candidates
+                if min_score is not None or max_score is not None:
+                    keys = [key for key in keys
+                            if (min_score is None or self._entries[key][2] >= min_score)
+                            and (max_score is None or self._entries[key][2] <= max_score)]
+                need = None if k is None else k - len(result)
+                if need is not None and need < len(keys):
+                    chosen = heapq.nlargest(need, keys, key=sort_key)
+                else:
+                    chosen = sorted(keys, key=sort_key, reverse=True)
+                result.extend(self.records[key] for key in chosen)
+                if k is not None and len(result) >= k:
+                    break
+            return result
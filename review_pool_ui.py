@@ -9,15 +9,116 @@ import os
 import json
 import sys
 from datetime import datetime
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QTableWidget, QTableWidgetItem, 
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QTableView, QAbstractItemView,
                              QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QWidget, 
                              QTabWidget, QHeaderView, QMessageBox, QStatusBar)
 from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtGui import QFont
+
+from gui_tasks import TaskRunner
+from record_store import RecordStore
+from table_model import ColumnarTable, RecordTableModel, TableColumn, status_background
+
+POOL_COLUMNS = [
+    TableColumn('代码', 'symbol'),
+    TableColumn('名称', 'name'),
+    TableColumn('状态', 'status'),
+    TableColumn('添加日期', 'date_added'),
+    TableColumn('分析得分', 'analysis_score'),
+    TableColumn('市场状态', 'market_status'),
+    TableColumn('推荐', 'recommendation'),
+]
+
+SMART_POOL_COLUMNS = [
+    TableColumn('代码', 'symbol'),
+    TableColumn('名称', 'name'),
+    TableColumn('状态', 'status'),
+    TableColumn('添加日期', 'date_added'),
+    TableColumn('智能评分', 'smart_score'),
+    TableColumn('重要性', 'importance'),
+    TableColumn('标签', lambda stock: ', '.join(stock.get('tags') or [])),
+]
+
+# 复盘池名称、文件和列定义，按顺序在后台加载
+# 智能复盘池由SmartReviewCore保存在SQLite数据库中，JSON文件只是迁移前的旧版数据
+POOL_SOURCES = [
+    ('basic', 'review_pool.json', POOL_COLUMNS),
+    ('enhanced', 'enhanced_review_pool.json', POOL_COLUMNS),
+    ('smart', './smart_review_data/smart_review_pool.db', SMART_POOL_COLUMNS),
+]
+
+
+def read_pool(path):
+    """读取复盘池内容
+
+    .db文件按SmartReviewCore的RecordStore格式读取，数据库不存在或无法读取时
+    改读同名的旧版JSON文件
+
+    Args:
+        path: 复盘池JSON文件或数据库路径
+
+    Returns:
+        复盘池字典，文件不存在时返回None
+    """
+    if path.endswith('.db'):
+        legacy_path = os.path.splitext(path)[0] + '.json'
+        if not os.path.exists(path):
+            return read_pool(legacy_path)
+        try:
+            store = RecordStore(path, key_field='symbol', score_field='smart_score')
+            try:
+                data = {name: store.get_meta(name, '') for name in ('created_at', 'last_updated', 'version')}
+                data['stocks'] = store.load()
+            finally:
+                store.close()
+            return data
+        except Exception:
+            if not os.path.exists(legacy_path):
+                raise
+            return read_pool(legacy_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_pool_file(path, columns):
+    """读取复盘池文件并构建表格数据，在后台线程执行
+
+    Args:
+        path: 复盘池JSON文件或数据库路径
+        columns: 表格列定义
+
+    Returns:
+        (文件内容, 表格数据, 各状态数量)，文件不存在时返回None
+    """
+    data = read_pool(path)
+    if data is None:
+        return None
+    stocks = data.get('stocks', [])
+    counts = {'watching': 0, 'bought': 0, 'sold': 0}
+    for stock in stocks:
+        status = stock.get('status', '')
+        if status in counts:
+            counts[status] += 1
+    return data, ColumnarTable(columns, stocks, background=status_background), counts
+
+
+def load_pools(context):
+    """后台任务：依次加载各复盘池，每加载完一个立即送回界面"""
+    for name, path, columns in POOL_SOURCES:
+        context.check()
+        try:
+            context.partial((name, load_pool_file(path, columns), None))
+        except Exception as e:
+            context.partial((name, None, str(e)))
+
 
 class ReviewPoolUI(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.task_runner = TaskRunner(self)
+        self._reload_pending = False
         self.initUI()
         self.loadData()
         
@@ -87,13 +188,13 @@ class ReviewPoolUI(QMainWindow):
             QMainWindow {
                 background-color: white;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #f5f5f5;
                 gridline-color: #d0d0d0;
                 border: 1px solid #ccc;
                 border-radius: 5px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
             QHeaderView::section {
@@ -122,11 +223,8 @@ class ReviewPoolUI(QMainWindow):
         layout = QVBoxLayout(self.basic_tab)
         
         # 创建表格
-        self.basic_table = QTableWidget()
-        self.basic_table.setColumnCount(7)
-        self.basic_table.setHorizontalHeaderLabels(['代码', '名称', '状态', '添加日期', '分析得分', '市场状态', '推荐'])
-        self.basic_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.basic_table.verticalHeader().setVisible(False)
+        self.basic_model = RecordTableModel(POOL_COLUMNS, self)
+        self.basic_table = self._create_table(self.basic_model)
         
         layout.addWidget(self.basic_table)
         
@@ -140,11 +238,8 @@ class ReviewPoolUI(QMainWindow):
         layout = QVBoxLayout(self.enhanced_tab)
         
         # 创建表格
-        self.enhanced_table = QTableWidget()
-        self.enhanced_table.setColumnCount(7)
-        self.enhanced_table.setHorizontalHeaderLabels(['代码', '名称', '状态', '添加日期', '分析得分', '市场状态', '推荐'])
-        self.enhanced_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.enhanced_table.verticalHeader().setVisible(False)
+        self.enhanced_model = RecordTableModel(POOL_COLUMNS, self)
+        self.enhanced_table = self._create_table(self.enhanced_model)
         
         layout.addWidget(self.enhanced_table)
         
@@ -158,11 +253,8 @@ class ReviewPoolUI(QMainWindow):
         layout = QVBoxLayout(self.smart_tab)
         
         # 创建表格
-        self.smart_table = QTableWidget()
-        self.smart_table.setColumnCount(7)
-        self.smart_table.setHorizontalHeaderLabels(['代码', '名称', '状态', '添加日期', '智能评分', '重要性', '标签'])
-        self.smart_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.smart_table.verticalHeader().setVisible(False)
+        self.smart_model = RecordTableModel(SMART_POOL_COLUMNS, self)
+        self.smart_table = self._create_table(self.smart_model)
         
         layout.addWidget(self.smart_table)
         
@@ -171,215 +263,95 @@ class ReviewPoolUI(QMainWindow):
         self.smart_info_label.setFont(QFont('PingFang SC', 10))
         layout.addWidget(self.smart_info_label)
     
+    def _create_table(self, model):
+        """创建绑定模型的表格，点击表头在模型内排序"""
+        table = QTableView()
+        table.setModel(model)
+        table.setSortingEnabled(True)
+        table.sortByColumn(3, Qt.AscendingOrder)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.verticalHeader().setVisible(False)
+        return table
+    
     def loadData(self):
-        """加载所有复盘池数据"""
+        """在后台线程加载所有复盘池数据"""
+        if self.task_runner.is_running():
+            self._reload_pending = True
+            return
         self.statusBar().showMessage('正在加载数据...')
-        
-        # 加载基础复盘池
-        self.load_basic_pool()
-        
-        # 加载增强版复盘池
-        self.load_enhanced_pool()
-        
-        # 加载智能复盘池
-        self.load_smart_pool()
-        
+        self.task_runner.start(load_pools, interval=0,
+                               on_partial=self._on_pools_loaded,
+                               on_finished=self._on_load_finished,
+                               on_error=self._on_load_error)
+    
+    def _on_pools_loaded(self, batch):
+        """后台加载完一个复盘池后刷新对应的表格"""
+        loaders = {'basic': self.load_basic_pool, 'enhanced': self.load_enhanced_pool, 'smart': self.load_smart_pool}
+        for name, result, error in batch:
+            loaders[name](result, error)
+    
+    def _on_load_finished(self, _):
         self.statusBar().showMessage('数据加载完成')
+        self._reload_if_pending()
     
-    def load_basic_pool(self):
-        """加载基础复盘池数据"""
-        review_pool_file = 'review_pool.json'
-        
-        try:
-            if not os.path.exists(review_pool_file):
-                self.basic_info_label.setText('基础复盘池文件不存在')
-                return
-            
-            with open(review_pool_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            stocks = data.get('stocks', [])
-            last_updated = data.get('last_updated', '')
-            
-            # 清空表格
-            self.basic_table.setRowCount(0)
-            
-            # 填充表格
-            watching_count = 0
-            bought_count = 0
-            sold_count = 0
-            
-            for stock in stocks:
-                status = stock.get('status', '')
-                if status == 'watching':
-                    watching_count += 1
-                elif status == 'bought':
-                    bought_count += 1
-                elif status == 'sold':
-                    sold_count += 1
-                
-                row = self.basic_table.rowCount()
-                self.basic_table.insertRow(row)
-                
-                # 设置单元格内容
-                self.basic_table.setItem(row, 0, QTableWidgetItem(stock.get('symbol', '')))
-                self.basic_table.setItem(row, 1, QTableWidgetItem(stock.get('name', '')))
-                self.basic_table.setItem(row, 2, QTableWidgetItem(status))
-                self.basic_table.setItem(row, 3, QTableWidgetItem(stock.get('date_added', '')))
-                self.basic_table.setItem(row, 4, QTableWidgetItem(str(stock.get('analysis_score', ''))))
-                self.basic_table.setItem(row, 5, QTableWidgetItem(stock.get('market_status', '')))
-                self.basic_table.setItem(row, 6, QTableWidgetItem(stock.get('recommendation', '')))
-                
-                # 设置单元格颜色
-                if status == 'watching':
-                    self._set_row_color(self.basic_table, row, QColor(240, 240, 255))  # 浅蓝色
-                elif status == 'bought':
-                    self._set_row_color(self.basic_table, row, QColor(240, 255, 240))  # 浅绿色
-                elif status == 'sold':
-                    self._set_row_color(self.basic_table, row, QColor(255, 240, 240))  # 浅红色
-            
-            # 更新信息标签
-            info_text = f"总股票数: {len(stocks)}只 | 观察中: {watching_count}只 | 已买入: {bought_count}只 | 已卖出: {sold_count}只 | 最后更新: {last_updated}"
-            self.basic_info_label.setText(info_text)
-            
-        except Exception as e:
-            self.basic_info_label.setText(f'加载基础复盘池失败: {str(e)}')
+    def _on_load_error(self, message):
+        self.statusBar().showMessage(f'数据加载失败: {message}')
+        self._reload_if_pending()
     
-    def load_enhanced_pool(self):
-        """加载增强版复盘池数据"""
-        enhanced_review_file = 'enhanced_review_pool.json'
-        
-        try:
-            if not os.path.exists(enhanced_review_file):
-                self.enhanced_info_label.setText('增强版复盘池文件不存在')
-                return
-            
-            with open(enhanced_review_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            stocks = data.get('stocks', [])
-            settings = data.get('settings', {})
-            last_updated = settings.get('last_updated', '')
-            
-            # 清空表格
-            self.enhanced_table.setRowCount(0)
-            
-            # 填充表格
-            watching_count = 0
-            bought_count = 0
-            sold_count = 0
-            
-            for stock in stocks:
-                status = stock.get('status', '')
-                if status == 'watching':
-                    watching_count += 1
-                elif status == 'bought':
-                    bought_count += 1
-                elif status == 'sold':
-                    sold_count += 1
-                
-                row = self.enhanced_table.rowCount()
-                self.enhanced_table.insertRow(row)
-                
-                # 设置单元格内容
-                self.enhanced_table.setItem(row, 0, QTableWidgetItem(stock.get('symbol', '')))
-                self.enhanced_table.setItem(row, 1, QTableWidgetItem(stock.get('name', '')))
-                self.enhanced_table.setItem(row, 2, QTableWidgetItem(status))
-                self.enhanced_table.setItem(row, 3, QTableWidgetItem(stock.get('date_added', '')))
-                self.enhanced_table.setItem(row, 4, QTableWidgetItem(str(stock.get('analysis_score', ''))))
-                self.enhanced_table.setItem(row, 5, QTableWidgetItem(stock.get('market_status', '')))
-                self.enhanced_table.setItem(row, 6, QTableWidgetItem(stock.get('recommendation', '')))
-                
-                # 设置单元格颜色
-                if status == 'watching':
-                    self._set_row_color(self.enhanced_table, row, QColor(240, 240, 255))  # 浅蓝色
-                elif status == 'bought':
-                    self._set_row_color(self.enhanced_table, row, QColor(240, 255, 240))  # 浅绿色
-                elif status == 'sold':
-                    self._set_row_color(self.enhanced_table, row, QColor(255, 240, 240))  # 浅红色
-            
-            # 更新信息标签
-            data_source = settings.get('data_source', '未知')
-            auto_update = '开启' if settings.get('auto_update') else '关闭'
-            info_text = f"总股票数: {len(stocks)}只 | 观察中: {watching_count}只 | 已买入: {bought_count}只 | 已卖出: {sold_count}只 | 数据源: {data_source} | 自动更新: {auto_update} | 最后更新: {last_updated}"
-            self.enhanced_info_label.setText(info_text)
-            
-        except Exception as e:
-            self.enhanced_info_label.setText(f'加载增强版复盘池失败: {str(e)}')
+    def _reload_if_pending(self):
+        if self._reload_pending:
+            self._reload_pending = False
+            self.loadData()
     
-    def load_smart_pool(self):
-        """加载智能复盘池数据"""
-        smart_review_file = './smart_review_data/smart_review_pool.json'
-        
-        try:
-            if not os.path.exists(smart_review_file):
-                self.smart_info_label.setText('智能复盘池文件不存在')
-                return
-            
-            with open(smart_review_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            stocks = data.get('stocks', [])
-            last_updated = data.get('last_updated', '')
-            version = data.get('version', '')
-            
-            # 清空表格
-            self.smart_table.setRowCount(0)
-            
-            # 填充表格
-            watching_count = 0
-            bought_count = 0
-            sold_count = 0
-            
-            for stock in stocks:
-                status = stock.get('status', '')
-                if status == 'watching':
-                    watching_count += 1
-                elif status == 'bought':
-                    bought_count += 1
-                elif status == 'sold':
-                    sold_count += 1
-                
-                row = self.smart_table.rowCount()
-                self.smart_table.insertRow(row)
-                
-                # 设置单元格内容
-                self.smart_table.setItem(row, 0, QTableWidgetItem(stock.get('symbol', '')))
-                self.smart_table.setItem(row, 1, QTableWidgetItem(stock.get('name', '')))
-                self.smart_table.setItem(row, 2, QTableWidgetItem(status))
-                self.smart_table.setItem(row, 3, QTableWidgetItem(stock.get('date_added', '')))
-                self.smart_table.setItem(row, 4, QTableWidgetItem(str(stock.get('smart_score', ''))))
-                self.smart_table.setItem(row, 5, QTableWidgetItem(str(stock.get('importance', ''))))
-                
-                # 处理标签
-                tags = stock.get('tags', [])
-                if tags:
-                    tags_text = ', '.join(tags)
-                else:
-                    tags_text = ''
-                self.smart_table.setItem(row, 6, QTableWidgetItem(tags_text))
-                
-                # 设置单元格颜色
-                if status == 'watching':
-                    self._set_row_color(self.smart_table, row, QColor(240, 240, 255))  # 浅蓝色
-                elif status == 'bought':
-                    self._set_row_color(self.smart_table, row, QColor(240, 255, 240))  # 浅绿色
-                elif status == 'sold':
-                    self._set_row_color(self.smart_table, row, QColor(255, 240, 240))  # 浅红色
-            
-            # 更新信息标签
-            info_text = f"总股票数: {len(stocks)}只 | 观察中: {watching_count}只 | 已买入: {bought_count}只 | 已卖出: {sold_count}只 | 版本: {version} | 最后更新: {last_updated}"
-            self.smart_info_label.setText(info_text)
-            
-        except Exception as e:
-            self.smart_info_label.setText(f'加载智能复盘池失败: {str(e)}')
+    @staticmethod
+    def _count_text(data, counts):
+        return (f"总股票数: {len(data.get('stocks', []))}只 | 观察中: {counts['watching']}只 | "
+                f"已买入: {counts['bought']}只 | 已卖出: {counts['sold']}只")
+    
+    def load_basic_pool(self, result, error=None):
+        """显示基础复盘池数据"""
+        if error:
+            self.basic_info_label.setText(f'加载基础复盘池失败: {error}')
+            return
+        if result is None:
+            self.basic_info_label.setText('基础复盘池文件不存在')
+            return
+        data, table, counts = result
+        self.basic_model.set_table(table)
+        info_text = f"{self._count_text(data, counts)} | 最后更新: {data.get('last_updated', '')}"
+        self.basic_info_label.setText(info_text)
+    
+    def load_enhanced_pool(self, result, error=None):
+        """显示增强版复盘池数据"""
+        if error:
+            self.enhanced_info_label.setText(f'加载增强版复盘池失败: {error}')
+            return
+        if result is None:
+            self.enhanced_info_label.setText('增强版复盘池文件不存在')
+            return
+        data, table, counts = result
+        self.enhanced_model.set_table(table)
+        settings = data.get('settings', {})
+        data_source = settings.get('data_source', '未知')
+        auto_update = '开启' if settings.get('auto_update') else '关闭'
+        info_text = (f"{self._count_text(data, counts)} | 数据源: {data_source} | 自动更新: {auto_update} | "
+                     f"最后更新: {settings.get('last_updated', '')}")
+        self.enhanced_info_label.setText(info_text)
     
-    def _set_row_color(self, table, row, color):
-        """设置表格行的颜色"""
-        for col in range(table.columnCount()):
-            item = table.item(row, col)
-            if item:
-                item.setBackground(color)
+    def load_smart_pool(self, result, error=None):
+        """显示智能复盘池数据"""
+        if error:
+            self.smart_info_label.setText(f'加载智能复盘池失败: {error}')
+            return
+        if result is None:
+            self.smart_info_label.setText('智能复盘池文件不存在')
+            return
+        data, table, counts = result
+        self.smart_model.set_table(table)
+        info_text = (f"{self._count_text(data, counts)} | 版本: {data.get('version', '')} | "
+                     f"最后更新: {data.get('last_updated', '')}")
+        self.smart_info_label.setText(info_text)
     
     def fixReviewPools(self):
         """修复复盘池"""
@@ -1,7 +1,6 @@
 from datetime import datetime
 import pandas as pd
 import numpy as np
-import talib as ta
 from typing import Dict, List, Tuple
 from datetime import datetime, timedelta
 import logging
@@ -10,7 +9,14 @@ import threading
 import os
 import pickle
 import random
-import tushare as ts
+
+from lazy_imports import lazy_import
+from sector_cache import get_sector_cache
+from sector_membership import fetch_all_pages
+
+# 指标库和数据接口在首次使用时才加载
+ta = lazy_import('talib')
+ts = lazy_import('tushare')
 
 # 引入行业分析集成器
 try:
@@ -28,17 +34,15 @@ class SectorAnalyzer:
             token: Tushare API token
         """
         self.top_n = top_n
-        self._cache = {}
-        self._cache_expiry = 1800  # 缓存30分钟
+        self._cache = get_sector_cache()  # 统一行业缓存，按需加载、按键追加写入
+        self._cache_expiry = self._cache.expiry
         self.logger = logging.getLogger('SectorAnalyzer')
-        self.cache_lock = threading.Lock()
         self.north_flow = 0.0
         self._last_update = 0
         self.request_delay = 0.5  # API请求延迟，单位秒
-        self.cache_file = 'data_cache/sector_analyzer_cache.pkl'
         
-        # 创建缓存目录
-        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        # 创建备份数据目录
+        os.makedirs('data_cache', exist_ok=True)
         
         # 检查必要依赖
         self._check_dependencies()
@@ -54,6 +58,10 @@ class SectorAnalyzer:
         # 初始化tushare API
         self._init_tushare_api()
         
+        # 行业截面数据引擎和行业成分索引，首次使用时创建
+        self._sector_engine = None
+        self._membership_index = None
+        
         # 尝试初始化行业分析集成器
         self.sector_integrator = None
         if HAS_SECTOR_INTEGRATION:
@@ -63,9 +71,6 @@ class SectorAnalyzer:
             except Exception as e:
                 print(f"行业分析集成器初始化失败: {str(e)}")
         
-        # 尝试从磁盘加载缓存
-        self._load_cache_from_disk()
-        
     def _check_dependencies(self):
         """检查必要的依赖包是否已安装"""
         try:
@@ -146,14 +151,13 @@ class SectorAnalyzer:
         
     def get_sector_list(self) -> List[Dict]:
         """获取所有行业板块列表"""
-        cache_key = 'sector_list'
+        cache_key = 'analyzer:sector_list'
         
         # 首先检查缓存是否有效
-        current_time = time.time()
-        with self.cache_lock:
-            if cache_key in self._cache and current_time - self._cache[cache_key]['timestamp'] < self._cache_expiry:
-                print("从缓存获取行业列表数据")
-                return self._cache[cache_key]['data']
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            print("从缓存获取行业列表数据")
+            return cached
         
         # 尝试使用行业分析集成器获取数据
         if HAS_SECTOR_INTEGRATION and self.sector_integrator:
@@ -181,16 +185,11 @@ class SectorAnalyzer:
                         sectors.append(sector)
                     
                     # 将获取的数据保存到缓存
-                    with self.cache_lock:
-                        self._cache[cache_key] = {
-                            'data': sectors,
-                            'timestamp': current_time
-                        }
+                    self._cache.set(cache_key, sectors)
                     
                     # 保存行业列表备份
                     print(f"成功获取行业列表数据，共{len(sectors)}个行业")
                     print("成功保存行业列表备份，共{}个行业".format(len(sectors)))
-                    self._save_cache_to_disk()
                     
                     return sectors
             except Exception as e:
@@ -327,11 +326,7 @@ class SectorAnalyzer:
                         sectors.extend(mock_sectors)
                 
                 # 更新缓存
-                with self.cache_lock:
-                    self._cache[cache_key] = {
-                        'data': sectors,
-                        'timestamp': current_time
-                    }
+                self._cache.set(cache_key, sectors)
                 
                 print(f"成功获取行业列表数据，共{len(sectors)}个行业")
                 return sectors
@@ -349,14 +344,13 @@ class SectorAnalyzer:
 
     def analyze_hot_sectors(self) -> Dict:
         """分析热门行业，计算热度排名和涨跌幅"""
-        cache_key = 'hot_sectors_analysis'
+        cache_key = 'analyzer:hot_sectors_analysis'
         
         # 首先检查缓存是否有效
-        current_time = time.time()
-        with self.cache_lock:
-            if cache_key in self._cache and current_time - self._cache[cache_key]['timestamp'] < self._cache_expiry:
-                print("从缓存获取热门行业分析结果")
-                return self._cache[cache_key]['data']
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            print("从缓存获取热门行业分析结果")
+            return cached
         
         # 尝试使用行业分析集成器获取热门行业分析
         if HAS_SECTOR_INTEGRATION and self.sector_integrator:
@@ -366,15 +360,7 @@ class SectorAnalyzer:
                 
                 if hot_sectors_result and hot_sectors_result['status'] == 'success':
                     # 将获取的数据保存到缓存
-                    with self.cache_lock:
-                        self._cache[cache_key] = {
-                            'data': hot_sectors_result,
-                            'timestamp': current_time
-                        }
-                    
-                    # 保存缓存到磁盘
-                    print("成功保存缓存到磁盘")
-                    self._save_cache_to_disk()
+                    self._cache.set(cache_key, hot_sectors_result)
                     
                     return hot_sectors_result
             except Exception as e:
@@ -424,13 +410,19 @@ class SectorAnalyzer:
                 if time.time() - self._last_update > 3600:  # 每小时更新一次
                     try:
                         if self.tushare_available:
+                            # 优先从北向资金存储读取最近交易日
+                            north_money = self._get_store_north_money()
+                            if north_money is not None:
+                                north_flow = north_money / 100000000  # 转换为亿元
+                                print(f"从北向资金存储获取北向资金数据: {north_flow:.2f}亿元")
+                            
                             # 尝试从Tushare获取北向资金数据
                             today = datetime.now().strftime('%Y%m%d')
-                            north_data = self.tushare_pro.moneyflow_hsgt(trade_date=today)
+                            north_data = self.tushare_pro.moneyflow_hsgt(trade_date=today) if north_money is None else None
                             if north_data is not None and not north_data.empty:
                                 north_flow = north_data['north_money'].sum() / 100000000  # 转换为亿元
                                 print(f"成功从Tushare获取北向资金数据: {north_flow:.2f}亿元")
-                            else:
+                            elif north_money is None:
                                 # 尝试获取最近一个交易日的数据
                                 trade_cal = self.tushare_pro.trade_cal(exchange='SSE', is_open='1')
                                 if not trade_cal.empty:
@@ -643,15 +635,8 @@ class SectorAnalyzer:
                 }
             }
             
-            # 更新缓存
-            with self.cache_lock:
-                self._cache[cache_key] = {
-                    'data': result,
-                    'timestamp': current_time
-                }
-            
-            # 保存结果到磁盘缓存
-            self._save_cache_to_disk()
+            # 更新缓存（按键追加写入磁盘）
+            self._cache.set(cache_key, result)
             
             return result
             
@@ -694,36 +679,24 @@ class SectorAnalyzer:
                         # 获取行业指数历史数据
                         sector_name = sector['name']
                         sector_code = sector['code']
-                        cache_key = f'hist_data_{sector_name}'
+                        cache_key = f'sector_history:{sector_name}'
                         
                         # 检查缓存中是否有历史数据
-                        current_time = time.time()
-                        hist_data = None
-                        with self.cache_lock:
-                            if cache_key in self._cache and current_time - self._cache[cache_key]['timestamp'] < self._cache_expiry:
-                                print(f"从缓存获取行业{sector_name}历史数据")
-                                hist_data = self._cache[cache_key]['data']
+                        hist_data = self._cache.get(cache_key)
+                        if hist_data is not None:
+                            print(f"从缓存获取行业{sector_name}历史数据")
+                        
+                        # 申万/中信行业直接从截面面板读取，无需逐个请求
+                        if hist_data is None:
+                            hist_data = self._get_panel_history(sector_code)
                         
-                        # 如果缓存中没有，尝试从API获取
+                        # 如果缓存中没有，尝试从API获取（_get_sector_history会写入缓存）
                         if hist_data is None:
                             # 获取历史数据
                             hist_data = self._get_sector_history(sector_name, sector_code)
                             
-                            # 如果成功获取数据，更新缓存
-                            if hist_data is not None and not hist_data.empty:
-                                with self.cache_lock:
-                                    self._cache[cache_key] = {
-                                        'data': hist_data,
-                                        'timestamp': current_time
-                                    }
-                                print(f"成功获取并缓存行业{sector_name}历史数据")
-                            
                             # 添加请求延迟以避免被服务器阻断
                             time.sleep(self.request_delay)
-                            
-                            # 定期保存缓存到磁盘
-                            if random.random() < 0.1:  # 约10%的成功请求会触发保存
-                                self._save_cache_to_disk()
                         
                         if hist_data is None or hist_data.empty:
                             continue
@@ -817,6 +790,41 @@ class SectorAnalyzer:
         
         return "，".join(reasons)
 
+    def _get_store_north_money(self):
+        """从北向资金存储读取最近交易日的北向净流入，不可用时返回None"""
+        try:
+            from north_flow_store import get_north_flow_store
+            store = get_north_flow_store(pro=self.tushare_pro)
+            store.update_market(days=10)
+            return store.north_money()
+        except Exception as e:
+            self.logger.warning(f"北向资金存储不可用: {str(e)}")
+            return None
+
+    def _get_sector_engine(self):
+        """获取行业截面数据引擎，不可用时返回None"""
+        if self._sector_engine is None:
+            try:
+                from sector_data_engine import get_sector_data_engine
+                self._sector_engine = get_sector_data_engine(
+                    pro=self.tushare_pro if self.tushare_available else None)
+            except Exception as e:
+                self.logger.warning(f"行业截面数据引擎不可用: {str(e)}")
+                self._sector_engine = False
+        return self._sector_engine or None
+
+    def _get_panel_history(self, sector_code, days=60):
+        """从行业截面面板读取行业历史数据，面板中没有该行业时返回None"""
+        engine = self._get_sector_engine()
+        if engine is None or not sector_code:
+            return None
+        ts_code = sector_code[3:] if sector_code.startswith('SW_') else sector_code
+        try:
+            return engine.get_sector_history(ts_code, days=days)
+        except Exception as e:
+            self.logger.warning(f"从行业截面读取 {ts_code} 失败: {str(e)}")
+            return None
+
     def _pre_cache_historical_data(self, sector_names: list) -> None:
         """预缓存热门行业的历史数据
         
@@ -824,7 +832,6 @@ class SectorAnalyzer:
             sector_names: 需要预缓存历史数据的行业名称列表
         """
         print(f"预缓存{len(sector_names)}个热门行业历史数据...")
-        updated = False
         
         # 获取所有行业列表以获取代码信息
         all_sectors = None
@@ -839,42 +846,28 @@ class SectorAnalyzer:
             sector_code_map = {s['name']: s['code'] for s in all_sectors}
         
         for sector_name in sector_names:
-            cache_key = f'hist_data_{sector_name}'
+            cache_key = f'sector_history:{sector_name}'
             
             # 检查当前缓存状态
-            current_time = time.time()
-            cache_exists = False
-            with self.cache_lock:
-                if cache_key in self._cache and current_time - self._cache[cache_key]['timestamp'] < self._cache_expiry:
-                    print(f"行业{sector_name}历史数据已存在于缓存中")
-                    cache_exists = True
+            cache_exists = self._cache.get(cache_key) is not None
+            if cache_exists:
+                print(f"行业{sector_name}历史数据已存在于缓存中")
             
             # 如果缓存不存在或已过期，尝试获取
             if not cache_exists:
                 # 获取行业代码
                 sector_code = sector_code_map.get(sector_name, '')
                 
-                # 获取历史数据
+                # 获取历史数据（_get_sector_history会写入缓存）
                 hist_data = self._get_sector_history(sector_name, sector_code)
                 
-                # 如果成功获取数据，更新缓存
                 if hist_data is not None and not hist_data.empty:
-                    with self.cache_lock:
-                        self._cache[cache_key] = {
-                            'data': hist_data,
-                            'timestamp': current_time
-                        }
                     print(f"成功预缓存行业{sector_name}历史数据")
-                    updated = True
                 else:
                     print(f"行业{sector_name}无历史数据")
                 
                 # 添加请求延迟
                 time.sleep(self.request_delay)
-        
-        # 如果有更新缓存，保存到磁盘
-        if updated:
-            self._save_cache_to_disk()
 
     def generate_sector_report(self):
         """生成行业分析报告"""
@@ -918,27 +911,20 @@ class SectorAnalyzer:
             print(f"生成行业报告失败：{str(e)}")
             return {'status': 'error', 'message': str(e)}
 
-    def _load_cache_from_disk(self):
-        """从磁盘加载缓存"""
-        try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'rb') as f:
-                    self._cache = pickle.load(f)
-                print("成功从磁盘加载缓存")
-            else:
-                print("缓存文件不存在")
-        except Exception as e:
-            print(f"从磁盘加载缓存失败: {str(e)}")
-
-    def _save_cache_to_disk(self):
-        """保存缓存到磁盘"""
-        try:
-            with open(self.cache_file, 'wb') as f:
-                pickle.dump(self._cache, f)
-            print("成功保存缓存到磁盘")
-        except Exception as e:
-            print(f"保存缓存到磁盘失败: {str(e)}")
-
+    def _get_index_members(self, sector_code: str) -> List[str]:
+        """从行业成分索引读取成分股，索引中没有该行业时返回空列表"""
+        if self._membership_index is None:
+            try:
+                from sector_membership import get_membership_index
+                self._membership_index = get_membership_index(
+                    pro=self.tushare_pro if self.tushare_available else None, refresh=True)
+            except Exception as e:
+                self.logger.warning(f"行业成分索引不可用: {str(e)}")
+                self._membership_index = False
+        if not self._membership_index:
+            return []
+        return self._membership_index.stocks_of(sector_code)
+    
     def _get_sector_history(self, sector_name, sector_code, start_date=None):
         """获取行业历史数据
         
@@ -959,16 +945,13 @@ class SectorAnalyzer:
         end_date = datetime.now().strftime('%Y%m%d')
         
         # 缓存键
-        cache_key = f'history_{sector_name}'
+        cache_key = f'sector_history:{sector_name}'
         
         # 首先检查缓存是否有效
-        current_time = time.time()
-        with self.cache_lock:
-            if cache_key in self._cache and (
-                current_time - self._cache[cache_key]['timestamp'] < self._cache_expiry
-            ):
-                print(f"从缓存获取行业{sector_name}历史数据")
-                return self._cache[cache_key]['data']
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            print(f"从缓存获取行业{sector_name}历史数据")
+            return cached
         
         # 尝试从集成器获取行业历史数据
         if HAS_SECTOR_INTEGRATION and self.sector_integrator:
@@ -978,11 +961,7 @@ class SectorAnalyzer:
                 
                 if sector_data and sector_data['status'] == 'success':
                     # 将获取的数据保存到缓存
-                    with self.cache_lock:
-                        self._cache[cache_key] = {
-                            'data': sector_data['data'],
-                            'timestamp': current_time
-                        }
+                    self._cache.set(cache_key, sector_data['data'])
                     
                     print(f"成功预缓存行业{sector_name}历史数据")
                     return sector_data['data']
@@ -993,14 +972,6 @@ class SectorAnalyzer:
         hist_data = None
         tushare_error = None
         
-        # 首先检查缓存
-        cache_key = f'hist_data_{sector_name}'
-        current_time = time.time()
-        with self.cache_lock:
-            if cache_key in self._cache and current_time - self._cache[cache_key]['timestamp'] < self._cache_expiry:
-                print(f"从缓存获取行业{sector_name}历史数据")
-                return self._cache[cache_key]['data']
-        
         # 尝试从本地备用数据加载（如果存在，用于完全离线情况）
         backup_data_path = f'data_cache/sector_history_{sector_name.replace(" ", "_")}.pkl'
         backup_data = None
@@ -1014,8 +985,12 @@ class SectorAnalyzer:
                 print(f"读取本地备用数据失败: {str(e)}")
                 backup_data = None
         
+        # 0. 申万/中信行业优先从截面面板读取
+        hist_data = self._get_panel_history(
+            sector_code, days=(datetime.now() - datetime.strptime(start_date, '%Y%m%d')).days)
+        
         # 1. 使用Tushare获取行业历史数据
-        if self.tushare_available and sector_code:
+        if hist_data is None and self.tushare_available and sector_code:
             try:
                 # 处理代码格式，确保是tushare兼容的格式
                 ts_code = sector_code
@@ -1061,20 +1036,28 @@ class SectorAnalyzer:
                                 
                             latest_date = trade_cal['cal_date'].max()
                             
-                            # 获取行业成分股
+                            # 获取行业成分股，优先从行业成分索引读取
                             stocks = None
+                            index_members = self._get_index_members(ts_code)
+                            if index_members:
+                                print(f"从行业成分索引获取 {ts_code} 的 {len(index_members)} 只成分股")
+                                stocks = pd.DataFrame({'con_code': index_members})
                             try:
-                                if ts_code.startswith('8'):  # 申万行业
+                                if stocks is not None:
+                                    pass
+                                elif ts_code.startswith('8'):  # 申万行业
                                     print(f"获取申万行业 {ts_code} 的成分股")
-                                    stocks = self.tushare_pro.index_member(
-                                        index_code=ts_code
-                                    )
+                                    stocks = fetch_all_pages(lambda **page: self.tushare_pro.index_member(
+                                        index_code=ts_code, **page))
                                 elif ts_code.startswith('TS'):  # 概念板块
                                     print(f"获取概念板块 {ts_code} 的成分股")
                                     # 去掉TS前缀
-                                    stocks = self.tushare_pro.concept_detail(
-                                        id=ts_code[2:]
-                                    )
+                                    stocks = fetch_all_pages(lambda **page: self.tushare_pro.concept_detail(
+                                        id=ts_code[2:], **page))
+                                    # 按需请求的概念成分写入索引，之后直接查询
+                                    if stocks is not None and not stocks.empty and self._membership_index:
+                                        self._membership_index.add_members(
+                                            ts_code, stocks['ts_code'], sector_name, source='ts_concept')
                                 else:
                                     # 其他类型的板块尝试使用概念详情获取
                                     try:
@@ -1189,7 +1172,7 @@ class SectorAnalyzer:
             except Exception as e:
                 tushare_error = str(e)
                 print(f"使用Tushare获取行业 {sector_name} 历史数据失败: {str(e)}")
-        else:
+        elif hist_data is None:
             if not self.tushare_available:
                 print("Tushare API不可用，请检查token和网络连接")
             if not sector_code:
@@ -1236,11 +1219,7 @@ class SectorAnalyzer:
                 hist_data['是模拟数据'] = False
             
             # 更新内存缓存
-            with self.cache_lock:
-                self._cache[cache_key] = {
-                    'data': hist_data,
-                    'timestamp': current_time
-                }
+            self._cache.set(cache_key, hist_data)
             
             # 如果不是模拟数据，才保存为备份
             if not hist_data['是模拟数据'].any():
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+统一行业数据缓存模块
+SectorAnalyzer、TushareSectorProvider、AKShareSectorProvider和SectorIntegrator共用的缓存层：
+- 按需加载：启动时不反序列化任何文件，首次读取某个键时才读取对应文件
+- 按键追加写入：每次写入只向该键的文件追加一条记录，不再整体重写缓存字典
+- 统一过期策略：所有使用方共用同一个过期时间，读取时也可以按需指定
+"""
+
+import os
+import time
+import pickle
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+logger = logging.getLogger('SectorCache')
+
+
+class SectorCache:
+    """统一行业数据缓存
+
+    每个缓存键对应磁盘上一个记录文件，写入时追加(时间戳, 数据)记录，读取时以最后一条为准；
+    记录数超过compact_after时重写为只包含最新一条记录。
+    """
+
+    DEFAULT_EXPIRY = 1800  # 缓存30分钟
+
+    def __init__(self, cache_dir: str = 'data_cache/sector_cache', expiry: int = DEFAULT_EXPIRY,
+                 compact_after: int = 8):
+        """初始化行业数据缓存
+
+        Args:
+            cache_dir: 缓存目录
+            expiry: 默认过期时间(秒)
+            compact_after: 单个键的记录数超过该值时压缩文件
+        """
+        self.cache_dir = cache_dir
+        self.expiry = expiry
+        self.compact_after = compact_after
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Tuple[float, Any]] = {}  # 键 -> (时间戳, 数据)，只包含已加载的键
+        self._records: Dict[str, int] = {}  # 键 -> 磁盘文件中的记录数
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, quote(key, safe='') + '.log')
+
+    def _read_file(self, key: str) -> Optional[Tuple[float, Any]]:
+        """读取键对应文件中的最后一条完整记录"""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        entry, count = None, 0
+        try:
+            with open(path, 'rb') as f:
+                while True:
+                    try:
+                        entry = pickle.load(f)
+                        count += 1
+                    except EOFError:
+                        break
+        except Exception as e:
+            # 写入中断会留下不完整的末尾记录，保留之前已读到的记录
+            logger.warning(f"读取缓存 {key} 不完整: {str(e)}")
+        self._records[key] = count
+        return entry
+
+    def _load(self, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            if key not in self._entries:
+                entry = self._read_file(key)
+                if entry is None:
+                    return None
+                self._entries[key] = entry
+            return self._entries[key]
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Any:
+        """读取未过期的缓存数据
+
+        Args:
+            key: 缓存键
+            max_age: 最长缓存时间(秒)，默认使用统一的过期时间
+
+        Returns:
+            缓存数据，不存在或已过期时返回None
+        """
+        entry = self._load(key)
+        if entry is None:
+            return None
+        timestamp, data = entry
+        if time.time() - timestamp >= (self.expiry if max_age is None else max_age):
+            return None
+        return data
+
+    def get_any(self, key: str) -> Any:
+        """读取缓存数据，不检查是否过期（用于接口失败时的备用数据）"""
+        entry = self._load(key)
+        return entry[1] if entry is not None else None
+
+    def timestamp(self, key: str) -> Optional[float]:
+        """缓存写入时间，不存在时返回None"""
+        entry = self._load(key)
+        return entry[0] if entry is not None else None
+
+    def set(self, key: str, data: Any) -> None:
+        """写入缓存，并向该键的磁盘文件追加一条记录"""
+        entry = (time.time(), data)
+        with self._lock:
+            self._entries[key] = entry
+            try:
+                if key not in self._records:
+                    self._read_file(key)
+                if self._records.get(key, 0) >= self.compact_after:
+                    tmp_path = self._path(key) + '.tmp'
+                    with open(tmp_path, 'wb') as f:
+                        pickle.dump(entry, f)
+                    os.replace(tmp_path, self._path(key))
+                    self._records[key] = 1
+                else:
+                    with open(self._path(key), 'ab') as f:
+                        pickle.dump(entry, f)
+                    self._records[key] = self._records.get(key, 0) + 1
+            except Exception as e:
+                logger.error(f"保存缓存 {key} 到磁盘失败: {str(e)}")
+
+    def delete(self, key: str) -> None:
+        """删除缓存键"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._records.pop(key, None)
+            try:
+                if os.path.exists(self._path(key)):
+                    os.remove(self._path(key))
+            except Exception as e:
+                logger.error(f"删除缓存 {key} 失败: {str(e)}")
+
+    def keys(self, prefix: str = '') -> List[str]:
+        """列出磁盘和内存中的缓存键（不加载数据）"""
+        with self._lock:
+            keys = set(self._entries)
+            try:
+                keys.update(unquote(f[:-4]) for f in os.listdir(self.cache_dir) if f.endswith('.log'))
+            except Exception as e:
+                logger.error(f"读取缓存目录失败: {str(e)}")
+        return sorted(k for k in keys if k.startswith(prefix))
+
+    def clear(self, prefix: str = '', older_than: Optional[float] = None) -> int:
+        """清除缓存
+
+        Args:
+            prefix: 只清除以此开头的键
+            older_than: 只清除早于该秒数写入的键，None表示全部清除
+
+        Returns:
+            清除的键数量
+        """
+        removed = 0
+        cutoff = time.time() - older_than if older_than is not None else None
+        for key in self.keys(prefix):
+            if cutoff is not None:
+                # 按文件修改时间判断，避免为了清理而加载数据
+                with self._lock:
+                    entry = self._entries.get(key)
+                try:
+                    written = entry[0] if entry is not None else os.path.getmtime(self._path(key))
+                except OSError:
+                    written = 0
+                if written >= cutoff:
+                    continue
+            self.delete(key)
+            removed += 1
+        return removed
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_sector_cache(cache_dir: str = 'data_cache/sector_cache', expiry: int = SectorCache.DEFAULT_EXPIRY) -> SectorCache:
+    """获取进程内共享的行业数据缓存
+
+    Args:
+        cache_dir: 缓存目录，首次创建时使用
+        expiry: 统一过期时间(秒)，首次创建时使用
+    """
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = SectorCache(cache_dir, expiry)
+        return _instance
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+行业目录模块
+行业列表保留全部概念板块的轻量描述（代码、名称、类型），不再截断；
+需要逐个获取历史数据的概念板块先按一次截面快照（当日涨跌幅、成交额）预筛选，
+只为排名靠前的板块按需加载历史数据
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger('SectorCatalog')
+
+# 需要逐个获取历史数据的板块类型：TS - tushare概念，CN - 东方财富概念
+LAZY_TYPES = ('TS', 'CN')
+
+# 默认每次分析最多加载历史数据的概念板块数量（与原先截断的数量一致）
+DEFAULT_MAX_LAZY = 30
+
+
+def concept_descriptor(code: str, name: str, sector_type: str, **extra) -> Dict:
+    """概念板块的轻量描述，历史数据在需要时再获取"""
+    descriptor = {
+        'code': code,
+        'name': name,
+        'type': sector_type,
+        'description': f'概念板块-{name}',
+        'lazy': True
+    }
+    descriptor.update(extra)
+    return descriptor
+
+
+def is_lazy(sector: Dict) -> bool:
+    return sector.get('lazy', sector.get('type') in LAZY_TYPES)
+
+
+def prefilter_sectors(sectors: List[Dict], snapshot: Optional[pd.DataFrame] = None,
+                      max_lazy: int = DEFAULT_MAX_LAZY) -> List[Dict]:
+    """按截面快照预筛选需要加载历史数据的板块
+
+    非概念板块（如申万行业，可从截面面板读取）全部保留；概念板块按当日涨跌幅和成交额的
+    百分位排名平均值取前max_lazy个。目录中的全部概念板块都参与排名，快照中没有的板块
+    按中位数(0.5)计分，排在快照中偏弱的板块之前，避免快照只覆盖已加载过的板块时
+    每次都选中同一批板块。没有快照时保留前max_lazy个。
+
+    Args:
+        sectors: 行业描述列表
+        snapshot: 以行业代码为索引、包含change_pct和/或amount列的截面快照
+        max_lazy: 最多保留的概念板块数量
+
+    Returns:
+        保持原有顺序的行业描述列表
+    """
+    lazy = [s for s in sectors if is_lazy(s)]
+    if len(lazy) <= max_lazy:
+        return list(sectors)
+
+    codes = pd.Index([s['code'] for s in lazy])
+    score = pd.Series(0.0, index=range(len(lazy)))
+    if snapshot is not None and not snapshot.empty:
+        snapshot = snapshot[~snapshot.index.duplicated()]
+        columns = [c for c in ('change_pct', 'amount') if c in snapshot.columns]
+        ranks = [snapshot[c].reindex(codes).rank(pct=True).reset_index(drop=True) for c in columns]
+        if ranks:
+            score = pd.concat(ranks, axis=1).mean(axis=1).fillna(0.5)
+    # 得分相同（或都没有快照）时保持原有顺序
+    keep = set(score.sort_values(ascending=False, kind='stable').index[:max_lazy])
+    selected = {id(lazy[i]) for i in keep}
+    logger.info(f"概念板块 {len(lazy)} 个，按截面快照预筛选后加载 {len(keep)} 个")
+    return [s for s in sectors if not is_lazy(s) or id(s) in selected]
@@ -0,0 +1,398 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+行业截面数据引擎
+按交易日调用sw_daily/ci_daily一次取回全部行业指数行情，
+增量保存为(日期 × 行业)面板，供各行业分析器代替逐个指数的index_daily循环；
+个股日线与流通市值按同样方式保存为(日期 × 股票)面板，用于成分股合成行业指数
+"""
+
+import os
+import time
+import pickle
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger('SectorDataEngine')
+
+# 面板保存的字段（tushare原始列名）
+PANEL_FIELDS = ['open', 'high', 'low', 'close', 'vol', 'amount', 'pct_change']
+
+# 个股面板字段：pre_close为除权调整后的昨收，circ_mv为流通市值(万元)
+STOCK_FIELDS = ['open', 'high', 'low', 'close', 'pre_close', 'vol', 'amount', 'circ_mv']
+
+# 与各分析器get_sector_history返回格式一致的中文列名
+CN_COLUMNS = {
+    'open': '开盘',
+    'high': '最高',
+    'low': '最低',
+    'close': '收盘',
+    'vol': '成交量',
+    'amount': '成交额',
+    'pct_change': '涨跌幅'
+}
+
+
+def _default_fetchers() -> Dict[str, Callable[[str], pd.DataFrame]]:
+    """使用tushare_api中的申万/中信行业日线接口"""
+    from goon_stock_system.utils.tushare_api import get_sw_daily, get_ci_daily
+    return {
+        'sw': lambda trade_date: get_sw_daily(trade_date=trade_date),
+        'ci': lambda trade_date: get_ci_daily(trade_date=trade_date),
+    }
+
+
+def _default_stock_fetchers() -> Dict[str, Callable[[str], pd.DataFrame]]:
+    """使用tushare_api中的全市场日线和每日指标接口"""
+    from goon_stock_system.utils.tushare_api import get_daily_all, get_daily_basic
+    return {
+        'daily': lambda trade_date: get_daily_all(trade_date),
+        'basic': lambda trade_date: get_daily_basic(trade_date=trade_date),
+    }
+
+
+def _start_date(days: int) -> str:
+    """最近days个自然日的起始日期(YYYYMMDD)"""
+    return (datetime.now() - timedelta(days=days)).strftime('%Y%m%d')
+
+
+def _default_calendar(start_date: str, end_date: str) -> List[str]:
+    from goon_stock_system.utils.tushare_api import get_trade_calendar
+    return get_trade_calendar(start_date, end_date)
+
+
+class CrossSectionStore:
+    """按交易日增量保存的截面数据
+
+    每个交易日的全部代码数据保存为一个文件，已完成的交易日不再重复请求；
+    当日数据在收盘前按refresh_interval定期刷新。子类指定字段、默认数据源和合并方式。
+    """
+
+    FIELDS = PANEL_FIELDS
+    DEFAULT_CACHE_DIR = 'data_cache/sector_panel'
+
+    def __init__(self, cache_dir: Optional[str] = None,
+                 fetchers: Optional[Dict[str, Callable[[str], pd.DataFrame]]] = None,
+                 calendar_func: Optional[Callable[[str, str], List[str]]] = None,
+                 refresh_interval: int = 600):
+        """初始化截面数据
+
+        Args:
+            cache_dir: 按日保存截面数据的目录
+            fetchers: 数据源名称到取数函数的映射，取数函数参数为交易日(YYYYMMDD)，
+                      返回包含ts_code和FIELDS中字段的DataFrame
+            calendar_func: 交易日历函数(start_date, end_date) -> 交易日列表
+            refresh_interval: 未收盘交易日的刷新间隔(秒)
+        """
+        self.cache_dir = cache_dir or self.DEFAULT_CACHE_DIR
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._fetchers = fetchers
+        self._calendar_func = calendar_func
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.RLock()
+        self._days: Dict[str, pd.DataFrame] = {}  # 交易日 -> 已读入内存的截面数据
+        self._fetched_at: Dict[str, float] = {}   # 交易日 -> 取数时间，包含尚未读入的已保存交易日
+        self._panel: Optional[pd.DataFrame] = None  # 合并后的长表，更新时失效
+        self._panel_start = ''                     # 长表覆盖的起始交易日
+        self._checked_start: Optional[str] = None
+        self._checked_time = 0.0
+        self.api_calls = 0
+        self.version = 0  # 每取得新的截面数据加1，供调用方判断缓存的透视结果是否过期
+        self._load_from_disk()
+
+    @classmethod
+    def from_pro(cls, pro, **kwargs) -> 'CrossSectionStore':
+        """使用已初始化的tushare pro接口创建"""
+        def calendar(start_date, end_date):
+            cal = pro.trade_cal(exchange='SSE', start_date=start_date, end_date=end_date)
+            return cal[cal['is_open'] == 1]['cal_date'].tolist() if cal is not None else []
+
+        kwargs.setdefault('fetchers', cls._pro_fetchers(pro))
+        kwargs.setdefault('calendar_func', calendar)
+        return cls(**kwargs)
+
+    @staticmethod
+    def _pro_fetchers(pro) -> Dict[str, Callable[[str], pd.DataFrame]]:
+        return {
+            'sw': lambda trade_date: pro.sw_daily(trade_date=trade_date),
+            'ci': lambda trade_date: pro.ci_daily(trade_date=trade_date),
+        }
+
+    def _default_fetchers(self) -> Dict[str, Callable[[str], pd.DataFrame]]:
+        return _default_fetchers()
+
+    def _get_fetchers(self) -> Dict[str, Callable[[str], pd.DataFrame]]:
+        if self._fetchers is None:
+            try:
+                self._fetchers = self._default_fetchers()
+            except Exception as e:
+                logger.warning(f"{self.__class__.__name__} 日线接口不可用: {str(e)}")
+                self._fetchers = {}
+        return self._fetchers
+
+    def _day_path(self, trade_date: str) -> str:
+        return os.path.join(self.cache_dir, f"{trade_date}.pkl")
+
+    def _load_from_disk(self):
+        """登记已保存的交易日截面，数据在查询到对应日期时才读入"""
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.pkl') and entry.is_file():
+                    self._fetched_at[entry.name[:-4]] = entry.stat().st_mtime
+        if self._fetched_at:
+            logger.info(f"已保存截面数据 {len(self._fetched_at)} 个交易日")
+
+    def _load_days(self, trade_dates: Iterable[str]) -> None:
+        """读入尚未在内存中的已保存交易日（调用方持有锁），读取失败的交易日在下次更新时重新请求"""
+        for trade_date in trade_dates:
+            if trade_date in self._days:
+                continue
+            try:
+                with open(self._day_path(trade_date), 'rb') as f:
+                    self._days[trade_date] = pickle.load(f)
+            except Exception as e:
+                logger.error(f"加载截面数据 {trade_date} 失败: {str(e)}")
+                self._fetched_at.pop(trade_date, None)
+
+    def _is_final(self, trade_date: str) -> bool:
+        """交易日数据是否在收盘后取得（之后不再变化）"""
+        fetched_at = self._fetched_at.get(trade_date)
+        if fetched_at is None:
+            return False
+        close_time = datetime.strptime(trade_date, '%Y%m%d') + timedelta(hours=16)
+        return fetched_at >= close_time.timestamp()
+
+    def _trade_dates(self, start_date: str, end_date: str) -> List[str]:
+        calendar_func = self._calendar_func or _default_calendar
+        try:
+            dates = [str(d) for d in calendar_func(start_date, end_date)]
+            self.api_calls += 1
+            if dates:
+                return sorted(dates)
+        except Exception as e:
+            logger.warning(f"获取交易日历失败，按工作日处理: {str(e)}")
+        # 日历不可用时按工作日请求，节假日返回空数据
+        return [d.strftime('%Y%m%d') for d in pd.bdate_range(start_date, end_date)]
+
+    def _fetch_day(self, trade_date: str) -> Optional[pd.DataFrame]:
+        """请求一个交易日的全部截面数据"""
+        frames = []
+        for source, fetch in self._get_fetchers().items():
+            try:
+                df = fetch(trade_date)
+                self.api_calls += 1
+            except Exception as e:
+                logger.warning(f"获取 {trade_date} {source} 截面数据失败: {str(e)}")
+                continue
+            if df is None or df.empty:
+                continue
+            df = df.rename(columns={'pct_chg': 'pct_change'})
+            day = pd.DataFrame({'ts_code': df['ts_code'].astype(str)})
+            for field in self.FIELDS:
+                if field in df.columns:
+                    day[field] = pd.to_numeric(df[field], errors='coerce')
+            frames.append((source, day))
+        if not frames:
+            return None
+        return self._combine(frames)
+
+    def _combine(self, frames) -> pd.DataFrame:
+        """合并同一交易日各数据源的数据，默认按行拼接"""
+        day = pd.concat([df.assign(source=source) for source, df in frames], ignore_index=True)
+        # 同一代码在多个数据源出现时保留先配置的数据源
+        day = day.drop_duplicates('ts_code').reset_index(drop=True)
+        return day.reindex(columns=['ts_code'] + self.FIELDS + ['source'])
+
+    def update(self, days: int = 90, end_date: Optional[str] = None) -> int:
+        """补齐最近days个自然日内缺失的交易日截面
+
+        Args:
+            days: 覆盖的自然日数
+            end_date: 截止日期(YYYYMMDD)，默认今天
+
+        Returns:
+            本次新取得的交易日数量
+        """
+        now = datetime.now()
+        end_date = end_date or now.strftime('%Y%m%d')
+        start_date = (datetime.strptime(end_date, '%Y%m%d') - timedelta(days=days)).strftime('%Y%m%d')
+
+        with self._lock:
+            # 刚检查过同一或更短区间时不再请求交易日历
+            if self._checked_start is not None and self._checked_start <= start_date \
+                    and time.time() - self._checked_time < self.refresh_interval:
+                return 0
+
+            updated = 0
+            for trade_date in self._trade_dates(start_date, end_date):
+                if trade_date > now.strftime('%Y%m%d'):
+                    continue
+                if trade_date in self._fetched_at and (
+                        self._is_final(trade_date)
+                        or time.time() - self._fetched_at[trade_date] < self.refresh_interval):
+                    continue
+
+                day = self._fetch_day(trade_date)
+                if day is None:
+                    continue
+                self._days[trade_date] = day
+                self._fetched_at[trade_date] = time.time()
+                self._panel = None
+                self.version += 1
+                updated += 1
+                try:
+                    with open(self._day_path(trade_date), 'wb') as f:
+                        pickle.dump(day, f)
+                except Exception as e:
+                    logger.error(f"保存截面数据 {trade_date} 失败: {str(e)}")
+
+            self._checked_start = start_date
+            self._checked_time = time.time()
+            if updated:
+                logger.info(f"{self.__class__.__name__} 更新 {updated} 个交易日，累计接口调用 {self.api_calls} 次")
+            return updated
+
+    def _long_panel(self, start_date: Optional[str] = None) -> pd.DataFrame:
+        """start_date(YYYYMMDD)及之后的交易日合并后的长表（trade_date, ts_code, 字段...）
+
+        只读入区间内的交易日；已合并的长表覆盖该区间时直接截取
+        """
+        start_date = pd.Timestamp(start_date).strftime('%Y%m%d') if start_date else ''
+        with self._lock:
+            if self._panel is None or start_date < self._panel_start:
+                trade_dates = sorted(d for d in self._fetched_at if d >= start_date)
+                self._load_days(trade_dates)
+                frames = [self._days[d].assign(trade_date=pd.Timestamp(d)) for d in trade_dates if d in self._days]
+                if frames:
+                    self._panel = pd.concat(frames, ignore_index=True)
+                else:
+                    self._panel = pd.DataFrame(columns=['trade_date', 'ts_code'] + self.FIELDS)
+                self._panel_start = start_date
+            panel, panel_start = self._panel, self._panel_start
+        if start_date > panel_start:
+            panel = panel[panel['trade_date'] >= pd.Timestamp(start_date)]
+        return panel
+
+    def panel(self, field: str = 'close', days: Optional[int] = None) -> pd.DataFrame:
+        """获取单个字段的(日期 × 代码)面板
+
+        Args:
+            field: FIELDS中的字段
+            days: 只返回最近days个自然日，None表示全部
+        """
+        long_panel = self._long_panel(_start_date(days) if days is not None else None)
+        return long_panel.pivot(index='trade_date', columns='ts_code', values=field).sort_index()
+
+    def get_snapshot(self, trade_date: Optional[str] = None) -> pd.DataFrame:
+        """获取某个交易日（默认最近交易日）的全部截面数据，以ts_code为索引"""
+        with self._lock:
+            if not self._fetched_at:
+                return pd.DataFrame(columns=self.FIELDS)
+            trade_date = trade_date or max(self._fetched_at)
+            self._load_days([trade_date] if trade_date in self._fetched_at else [])
+            day = self._days.get(trade_date)
+        if day is None:
+            return pd.DataFrame(columns=self.FIELDS)
+        return day.set_index('ts_code')
+
+    @property
+    def codes(self) -> List[str]:
+        return sorted(self._long_panel()['ts_code'].unique())
+
+
+class SectorDataEngine(CrossSectionStore):
+    """行业截面数据引擎（申万/中信行业指数日线）"""
+
+    FIELDS = PANEL_FIELDS
+    DEFAULT_CACHE_DIR = 'data_cache/sector_panel'
+
+    @property
+    def sector_codes(self) -> List[str]:
+        return self.codes
+
+    def has_sector(self, sector_code: str) -> bool:
+        return sector_code in set(self._long_panel()['ts_code'])
+
+    def get_sector_history(self, sector_code: str, days: int = 90, update: bool = True) -> Optional[pd.DataFrame]:
+        """获取单个行业的历史行情，格式与行业数据提供器的get_sector_history一致
+
+        Args:
+            sector_code: 行业指数代码（如801080.SI）
+            days: 历史自然日数
+            update: 是否先补齐缺失的交易日
+
+        Returns:
+            以日期为索引、中文列名的DataFrame；面板中没有该行业时返回None
+        """
+        if update:
+            self.update(days)
+        long_panel = self._long_panel(_start_date(days))
+        rows = long_panel[long_panel['ts_code'] == sector_code]
+        if rows.empty:
+            return None
+
+        hist_data = rows.set_index('trade_date')[PANEL_FIELDS].rename(columns=CN_COLUMNS).sort_index()
+        hist_data.index.name = '日期'
+        hist_data['数据来源'] = 'sector_panel'
+        hist_data['是真实数据'] = True
+        return hist_data
+
+
+class StockDailyStore(CrossSectionStore):
+    """全市场个股日线与流通市值截面，每个交易日两次接口调用"""
+
+    FIELDS = STOCK_FIELDS
+    DEFAULT_CACHE_DIR = 'data_cache/stock_daily_panel'
+
+    @staticmethod
+    def _pro_fetchers(pro) -> Dict[str, Callable[[str], pd.DataFrame]]:
+        return {
+            'daily': lambda trade_date: pro.daily(trade_date=trade_date),
+            'basic': lambda trade_date: pro.daily_basic(trade_date=trade_date, fields='ts_code,circ_mv'),
+        }
+
+    def _default_fetchers(self) -> Dict[str, Callable[[str], pd.DataFrame]]:
+        return _default_stock_fetchers()
+
+    def _combine(self, frames) -> pd.DataFrame:
+        """日线和每日指标按股票代码横向合并"""
+        day = frames[0][1]
+        for _, df in frames[1:]:
+            columns = ['ts_code'] + [c for c in df.columns if c not in day.columns]
+            day = day.merge(df[columns], on='ts_code', how='outer')
+        return day.reindex(columns=['ts_code'] + self.FIELDS)
+
+
+_instances: Dict[type, CrossSectionStore] = {}
+_instance_lock = threading.Lock()
+
+
+def _get_shared(store_cls, cache_dir: Optional[str], pro, **kwargs):
+    with _instance_lock:
+        if store_cls not in _instances:
+            if pro is not None:
+                _instances[store_cls] = store_cls.from_pro(pro, cache_dir=cache_dir, **kwargs)
+            else:
+                _instances[store_cls] = store_cls(cache_dir=cache_dir, **kwargs)
+        return _instances[store_cls]
+
+
+def get_sector_data_engine(cache_dir: str = 'data_cache/sector_panel', pro=None, **kwargs) -> SectorDataEngine:
+    """获取进程内共享的行业数据引擎
+
+    Args:
+        cache_dir: 截面数据目录
+        pro: 调用方已初始化的tushare pro接口，首次创建引擎时使用
+    """
+    return _get_shared(SectorDataEngine, cache_dir, pro, **kwargs)
+
+
+def get_stock_daily_store(cache_dir: str = 'data_cache/stock_daily_panel', pro=None, **kwargs) -> StockDailyStore:
+    """获取进程内共享的个股日线截面"""
+    return _get_shared(StockDailyStore, cache_dir, pro, **kwargs)
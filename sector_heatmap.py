@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+盘中行业热力快照模块
+一次请求取回全市场实时行情，通过股票 -> 行业成分矩阵一步聚合出各行业的
+成交额加权涨跌幅、上涨家数占比和涨跌停家数，结果缓存数秒，
+供热门行业界面在盘中刷新，无需逐个请求行业指数
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger('SectorHeatmap')
+
+# 沪深京全部A股的实时行情代码通配符
+ALL_MARKET_PATTERN = '6*.SH,0*.SZ,3*.SZ,8*.BJ,4*.BJ'
+
+# 默认只在申万一级行业之间排名，不同分类体系和级别的行业混在一起时，
+# 成分很少的细分行业或概念板块容易因个别涨停股排到前面
+DEFAULT_SOURCES = ('sw',)
+DEFAULT_LEVELS = ('l1',)
+# 参与排名的行业至少要有的有效行情股票数
+DEFAULT_MIN_STOCK_COUNT = 5
+
+# 快照结果的列
+HEATMAP_COLUMNS = ['name', 'source', 'stock_count', 'change_pct', 'avg_change', 'amount', 'up_count',
+                   'down_count', 'breadth', 'limit_up', 'limit_down', 'hot_score']
+
+
+def _default_fetch_quotes() -> pd.DataFrame:
+    from goon_stock_system.utils.tushare_api import get_realtime_all
+    return get_realtime_all(ALL_MARKET_PATTERN)
+
+
+def limit_ratios(codes: pd.Series, names: Optional[pd.Series] = None) -> np.ndarray:
+    """按板块确定涨跌停幅度：主板10%、创业板/科创板20%、北交所30%、ST股5%"""
+    codes = codes.astype(str)
+    ratios = np.full(len(codes), 0.10)
+    ratios[codes.str.match(r'^(30|68)\d{4}').to_numpy()] = 0.20
+    ratios[codes.str.upper().str.endswith('.BJ').to_numpy()] = 0.30
+    if names is not None:
+        st = names.fillna('').astype(str).str.upper().str.contains('ST').to_numpy()
+        ratios[st & (ratios == 0.10)] = 0.05
+    return ratios
+
+
+def stock_signals(quotes: pd.DataFrame) -> pd.DataFrame:
+    """由实时行情计算逐股的聚合输入
+
+    Args:
+        quotes: 实时行情，至少包含ts_code、close、pre_close，可选amount、name
+
+    Returns:
+        以ts_code为索引的数值表，各列在行业内求和即得到快照指标
+    """
+    close = pd.to_numeric(quotes['close'], errors='coerce').to_numpy(dtype=float)
+    pre_close = pd.to_numeric(quotes['pre_close'], errors='coerce').to_numpy(dtype=float)
+    amount = (pd.to_numeric(quotes['amount'], errors='coerce').fillna(0).to_numpy(dtype=float)
+              if 'amount' in quotes.columns else np.zeros(len(quotes)))
+    # 未开盘或停牌的股票close为0，不参与统计
+    valid = (close > 0) & (pre_close > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = np.where(valid, (close / pre_close - 1) * 100, 0.0)
+
+    ratios = limit_ratios(quotes['ts_code'], quotes['name'] if 'name' in quotes.columns else None)
+    limit_up_price = np.round(pre_close * (1 + ratios), 2)
+    limit_down_price = np.round(pre_close * (1 - ratios), 2)
+    amount = np.where(valid, amount, 0.0)
+    return pd.DataFrame({
+        'stock_count': valid,
+        'change_sum': change,
+        'weighted_change': change * amount,
+        'amount': amount,
+        'up_count': valid & (close > pre_close),
+        'down_count': valid & (close < pre_close),
+        'limit_up': valid & (close >= limit_up_price - 1e-6),
+        'limit_down': valid & (close <= limit_down_price + 1e-6),
+    }, index=quotes['ts_code'].astype(str).to_numpy())
+
+
+class SectorHeatmap:
+    """盘中行业热力快照
+
+    snapshot()在缓存有效期内直接返回上次结果，过期后重新请求一次全市场实时行情并聚合。
+    共享的行业成分索引只读取已保存的文件，每日刷新通过warm_up()在后台线程进行。
+    """
+
+    def __init__(self, fetch_quotes: Optional[Callable[[], pd.DataFrame]] = None, membership=None,
+                 ttl: float = 5.0, sources: Optional[Iterable[str]] = DEFAULT_SOURCES,
+                 levels: Optional[Iterable[str]] = DEFAULT_LEVELS,
+                 min_stock_count: int = DEFAULT_MIN_STOCK_COUNT):
+        """初始化行业热力快照
+
+        Args:
+            fetch_quotes: 返回全市场实时行情的函数，默认使用tushare实时日线接口
+            membership: SectorMembershipIndex，为空时使用共享的行业成分索引
+            ttl: 快照缓存时间(秒)
+            sources: 只统计这些数据源的行业，默认申万；None表示全部
+            levels: 只统计这些级别的分级行业，默认一级行业；None表示不限级别
+            min_stock_count: 有效行情股票数少于该值的行业不参与排名
+        """
+        self.fetch_quotes = fetch_quotes or _default_fetch_quotes
+        self._membership = membership
+        self.ttl = ttl
+        self.sources = set(sources) if sources else None
+        self.levels = set(levels) if levels else None
+        self.min_stock_count = min_stock_count
+        self._warm_thread: Optional[threading.Thread] = None
+        self._warm_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._quotes: Optional[pd.DataFrame] = None
+        self._snapshot: Optional[pd.DataFrame] = None
+        self._updated_at = 0.0
+
+    @property
+    def membership(self):
+        if self._membership is None:
+            from sector_membership import get_membership_index
+            self._membership = get_membership_index()
+        return self._membership
+
+    def warm_up(self) -> threading.Thread:
+        """在后台线程刷新行业成分索引（每个数据源每天最多请求一次），避免阻塞界面线程
+
+        Returns:
+            执行刷新的线程，已在运行时返回原线程
+        """
+        with self._warm_lock:
+            if self._warm_thread is not None and self._warm_thread.is_alive():
+                return self._warm_thread
+
+            def refresh():
+                try:
+                    self.membership.refresh()
+                except Exception as e:
+                    logger.warning(f"后台刷新行业成分索引失败: {str(e)}")
+
+            self._warm_thread = threading.Thread(target=refresh, name='SectorHeatmapWarmUp', daemon=True)
+            self._warm_thread.start()
+            return self._warm_thread
+
+    @property
+    def updated_at(self) -> float:
+        """最近一次取数的时间戳"""
+        return self._updated_at
+
+    def _refresh(self, force: bool) -> None:
+        """缓存过期时重新取数并聚合（调用方持有锁）"""
+        if not force and self._snapshot is not None and time.time() - self._updated_at < self.ttl:
+            return
+        quotes = self.fetch_quotes()
+        if quotes is None or quotes.empty:
+            raise ValueError("未获取到实时行情数据")
+        self._snapshot = self.aggregate(quotes)
+        self._quotes = quotes
+        self._updated_at = time.time()
+
+    def quotes(self, force: bool = False) -> pd.DataFrame:
+        """最近一次的全市场实时行情，与快照来自同一次请求"""
+        with self._lock:
+            self._refresh(force)
+            return self._quotes
+
+    def snapshot(self, force: bool = False) -> pd.DataFrame:
+        """获取行业热力快照
+
+        Args:
+            force: 忽略缓存重新取数
+
+        Returns:
+            以行业代码为索引、按hot_score降序的DataFrame，列见HEATMAP_COLUMNS
+        """
+        with self._lock:
+            self._refresh(force)
+            return self._snapshot
+
+    def aggregate(self, quotes: pd.DataFrame) -> pd.DataFrame:
+        """将一次实时行情截面按行业聚合
+
+        Args:
+            quotes: 实时行情，至少包含ts_code、close、pre_close
+
+        Returns:
+            以行业代码为索引、按hot_score降序的DataFrame
+        """
+        membership = self.membership
+        sums = membership.sum_by_sector(stock_signals(quotes))
+        result = pd.DataFrame(index=sums.index)
+        sectors = membership.sector_table().reindex(sums.index)
+        result['name'] = sectors['name']
+        result['source'] = sectors['source']
+        result['level'] = sectors['level']
+        result['stock_count'] = sums['stock_count'].astype(int)
+
+        counts = sums['stock_count'].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_change = sums['change_sum'].to_numpy() / counts
+            # 成交额加权涨跌幅，整个行业都没有成交额时退化为简单平均
+            weighted = np.where(sums['amount'] > 0, sums['weighted_change'] / sums['amount'], avg_change)
+            breadth = sums['up_count'].to_numpy() / counts * 100
+        result['change_pct'] = weighted
+        result['avg_change'] = avg_change
+        result['amount'] = sums['amount']
+        for column in ('up_count', 'down_count', 'limit_up', 'limit_down'):
+            result[column] = sums[column].astype(int)
+        result['breadth'] = breadth
+
+        # 热度：涨幅(每1%计10分) 50%、上涨家数占比 30%、涨停家数占比(每1%计10分) 20%
+        change_score = np.clip(50 + result['change_pct'] * 10, 0, 100)
+        limit_score = np.clip(result['limit_up'] / result['stock_count'].clip(lower=1) * 1000, 0, 100)
+        result['hot_score'] = change_score * 0.5 + result['breadth'] * 0.3 + limit_score * 0.2
+
+        result = result[result['stock_count'] >= max(self.min_stock_count, 1)]
+        if self.sources is not None:
+            result = result[result['source'].isin(self.sources)]
+        if self.levels is not None:
+            # 只对分级行业按级别过滤，板块和概念没有级别
+            result = result[result['level'].isin(self.levels) | (result['level'].fillna('') == '')]
+        return result.sort_values('hot_score', ascending=False)[HEATMAP_COLUMNS]
+
+    def get_hot_sectors(self, top_n: int = 10, force: bool = False) -> Dict:
+        """按SectorIntegrator.get_hot_sectors的格式返回盘中热门行业
+
+        Args:
+            top_n: 返回的行业数量
+            force: 忽略缓存重新取数
+
+        Returns:
+            {'status': 'success', 'data': {'hot_sectors': [...], 'analysis_time', 'source'}}
+        """
+        try:
+            snapshot = self.snapshot(force)
+        except Exception as e:
+            logger.error(f"获取盘中行业快照失败: {str(e)}")
+            return {'status': 'error', 'message': str(e)}
+
+        hot_sectors = []
+        for code, row in snapshot.head(top_n).iterrows():
+            hot_sectors.append({
+                'code': code,
+                'name': row['name'] or code,
+                'hot_score': round(float(row['hot_score']), 2),
+                'change_pct': round(float(row['change_pct']), 2),
+                'volume': round(float(row['amount']) / 1e8, 2),  # 成交额(亿元)
+                'breadth': round(float(row['breadth']), 2),
+                'limit_up': int(row['limit_up']),
+                'analysis_reason': (f"上涨{int(row['up_count'])}家/下跌{int(row['down_count'])}家，"
+                                    f"涨停{int(row['limit_up'])}家"),
+                'is_real_data': True
+            })
+        return {
+            'status': 'success',
+            'data': {
+                'hot_sectors': hot_sectors,
+                'analysis_time': datetime.fromtimestamp(self._updated_at).strftime('%Y-%m-%d %H:%M:%S'),
+                'source': '盘中实时快照'
+            }
+        }
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_sector_heatmap(fetch_quotes: Optional[Callable[[], pd.DataFrame]] = None, **kwargs) -> SectorHeatmap:
+    """获取进程内共享的行业热力快照
+
+    Args:
+        fetch_quotes: 全市场实时行情取数函数，首次创建时使用
+    """
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = SectorHeatmap(fetch_quotes, **kwargs)
+        return _instance
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+行业指数合成模块
+使用全市场个股日线截面和流通市值，按(行业 × 股票)成分矩阵一次合成全部行业的
+流通市值加权指数，代替逐只成分股请求日线再等权平均的做法
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy import sparse
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+from sector_data_engine import CN_COLUMNS, get_stock_daily_store
+
+logger = logging.getLogger('SectorIndexSynthesizer')
+
+# 合成指数用到的个股字段
+STOCK_FIELDS = ('close', 'pre_close', 'circ_mv', 'open', 'high', 'low', 'vol', 'amount')
+
+
+class SectorIndexSynthesizer:
+    """流通市值加权的行业指数合成器
+
+    每日行业收益率 = Σ(w_i * r_i) / Σw_i，其中r_i = close/pre_close - 1，
+    权重w_i为成分股前一交易日的流通市值（首日使用当日市值），停牌股票权重为0。
+    指数点位从base_value起按日收益率累乘，开盘/最高/最低按同样权重的相对昨收比例折算。
+    """
+
+    def __init__(self, stock_store=None, base_value: float = 1000.0):
+        """初始化行业指数合成器
+
+        Args:
+            stock_store: 个股日线截面（StockDailyStore），为空时使用进程内共享实例
+            base_value: 指数基点
+        """
+        self.stock_store = stock_store if stock_store is not None else get_stock_daily_store()
+        self.base_value = base_value
+        self._panels = None  # (缓存键, 全市场字段面板)，逐个行业合成时共用一次透视
+
+    @staticmethod
+    def _normalize_members(members: Union[Dict[str, Iterable[str]], pd.DataFrame]) -> Dict[str, List[str]]:
+        """成分股统一为 行业代码 -> 股票代码列表"""
+        if isinstance(members, pd.DataFrame):
+            if members.empty:
+                return {}
+            return {code: group['con_code'].astype(str).tolist()
+                    for code, group in members.groupby('index_code', sort=False)}
+        return {code: list(stocks) for code, stocks in members.items()}
+
+    @staticmethod
+    def membership_matrix(members: Dict[str, List[str]], stocks: List[str]) -> Tuple[List[str], object]:
+        """构建(行业 × 股票)的0/1成分矩阵
+
+        Args:
+            members: 行业代码 -> 成分股代码列表
+            stocks: 矩阵列对应的股票代码（面板列顺序）
+
+        Returns:
+            (行业代码列表, 成分矩阵)，安装了scipy时为稀疏矩阵，否则为numpy数组
+        """
+        position = {code: j for j, code in enumerate(stocks)}
+        sectors, rows, cols = [], [], []
+        for sector, codes in members.items():
+            i = len(sectors)
+            sectors.append(sector)
+            for j in {position[c] for c in codes if c in position}:
+                rows.append(i)
+                cols.append(j)
+        shape = (len(sectors), len(stocks))
+        if HAS_SCIPY:
+            matrix = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=shape)
+        else:
+            matrix = np.zeros(shape)
+            matrix[rows, cols] = 1.0
+        return sectors, matrix
+
+    def _stock_panels(self, days: int) -> Tuple[pd.Index, List[str], Dict[str, np.ndarray]]:
+        """全市场个股各字段的(日期 × 股票)数组，列与收盘价面板对齐
+
+        按(天数, 日期, 截面数据版本)缓存，截面没有新数据时多次合成只透视一次
+
+        Returns:
+            (交易日索引, 股票代码列表, 字段 -> 数组)
+        """
+        version = getattr(self.stock_store, 'version', None)
+        key = (days, datetime.now().strftime('%Y%m%d'), version)
+        cached = self._panels
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        close = self.stock_store.panel('close', days=days)
+        stocks = list(close.columns)
+        fields = {'close': close.to_numpy(dtype=float)}
+        for name in STOCK_FIELDS[1:]:
+            fields[name] = self.stock_store.panel(name, days=days).reindex(
+                index=close.index, columns=stocks).to_numpy(dtype=float)
+        result = (close.index, stocks, fields)
+        if version is not None:
+            self._panels = (key, result)
+        return result
+
+    def synthesize(self, members: Union[Dict[str, Iterable[str]], pd.DataFrame],
+                   days: int = 90, update: bool = True) -> Dict[str, pd.DataFrame]:
+        """合成全部行业的指数行情
+
+        Args:
+            members: 行业代码 -> 成分股列表，或包含index_code/con_code的成分表
+            days: 使用最近days个自然日的个股数据
+            update: 是否先增量更新个股截面
+
+        Returns:
+            字段 -> (日期 × 行业)面板，字段为open/high/low/close/vol/amount/pct_change；
+            没有任何可用成分股时返回空字典
+        """
+        members = self._normalize_members(members)
+        if not members:
+            return {}
+        if update:
+            self.stock_store.update(days=days)
+
+        dates, stocks, fields = self._stock_panels(days)
+        if len(dates) == 0 or not stocks:
+            return {}
+        # 只取成分股所在的列参与计算
+        position = {code: j for j, code in enumerate(stocks)}
+        columns = sorted({position[c] for codes in members.values() for c in codes if c in position})
+        stocks = [stocks[j] for j in columns]
+        sectors, matrix = self.membership_matrix(members, stocks)
+
+        def field(name):
+            return fields[name][:, columns]
+
+        close_values = field('close')
+        pre_close = field('pre_close')
+        circ_mv = field('circ_mv')
+
+        # 前一交易日流通市值作为当日权重，停牌或缺少行情的股票不参与
+        weights = np.vstack([circ_mv[:1], circ_mv[:-1]])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = close_values / pre_close - 1
+        traded = np.isfinite(returns) & np.isfinite(weights) & (weights > 0)
+        weights = np.where(traded, weights, 0.0)
+
+        def aggregate(values):
+            # (行业 × 股票) @ (股票 × 日期) -> (日期 × 行业)
+            return np.asarray(matrix @ np.nan_to_num(values).T).T
+
+        total_weight = aggregate(weights)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            def weighted(values):
+                return aggregate(weights * np.where(traded, values, 0.0)) / total_weight
+
+            sector_returns = weighted(returns)
+            level = self.base_value * np.cumprod(1 + np.nan_to_num(sector_returns), axis=0)
+            prev_level = np.vstack([np.full((1, len(sectors)), self.base_value), level[:-1]])
+
+            panels = {
+                'open': weighted(field('open') / pre_close) * prev_level,
+                'high': weighted(field('high') / pre_close) * prev_level,
+                'low': weighted(field('low') / pre_close) * prev_level,
+                'close': np.where(total_weight > 0, level, np.nan),
+                'vol': aggregate(np.where(traded, field('vol'), 0.0)),
+                'amount': aggregate(np.where(traded, field('amount'), 0.0)),
+                'pct_change': sector_returns * 100,
+            }
+
+        logger.info(f"合成 {len(sectors)} 个行业指数，使用 {len(stocks)} 只股票 × {len(dates)} 个交易日")
+        return {name: pd.DataFrame(values, index=dates, columns=sectors) for name, values in panels.items()}
+
+    def to_history(self, panels: Dict[str, pd.DataFrame], sector_code: str) -> Optional[pd.DataFrame]:
+        """将合成结果转换为单个行业的历史数据（与数据提供器的中文列格式一致）"""
+        if not panels or sector_code not in panels['close'].columns:
+            return None
+        history = pd.DataFrame({name: panel[sector_code] for name, panel in panels.items()})
+        history = history[history['close'].notna()]
+        if history.empty:
+            return None
+        history = history.rename(columns=CN_COLUMNS)
+        history.index.name = '日期'
+        history = history.reset_index()
+        # 添加标记，标识为合成数据
+        history['是真实数据'] = False
+        history['是合成数据'] = True
+        return history
+
+    def sector_history(self, sector_code: str, components: Iterable[str], days: int = 90) -> Optional[pd.DataFrame]:
+        """合成单个行业的指数历史数据
+
+        Args:
+            sector_code: 行业代码
+            components: 成分股代码
+            days: 最近days个自然日
+
+        Returns:
+            行业指数历史数据，无法合成时返回None
+        """
+        return self.to_history(self.synthesize({sector_code: components}, days=days), sector_code)
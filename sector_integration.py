@@ -7,8 +7,11 @@
 """
 
 import os
+import time
 import logging
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
@@ -17,6 +20,7 @@ try:
     from sector_analyzer import SectorAnalyzer as OriginalSectorAnalyzer
     from optimized_sector_analyzer import OptimizedSectorAnalyzer
     from tushare_sector_provider import get_sector_provider
+    from sector_cache import get_sector_cache
 except ImportError as e:
     print(f"导入行业分析器失败: {str(e)}")
     raise
@@ -32,22 +36,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger("SectorIntegration")
 
+# 标记当前线程正在由集成器调用分析器，防止分析器回调集成器造成递归
+_analyzer_context = threading.local()
+
 class SectorIntegrator:
     """行业分析集成器"""
     
-    def __init__(self, use_optimized=True, top_n=10, data_days=90):
+    def __init__(self, use_optimized=True, top_n=10, data_days=90, parallel=False,
+                 timeout=60.0, preferred_grace=5.0):
         """初始化行业分析集成器
         
         Args:
             use_optimized: 是否优先使用优化版行业分析器
             top_n: 返回的热门行业数
             data_days: 历史数据天数
+            parallel: 是否并行运行全部分析器并采用最先成功的结果
+            timeout: 并行模式下等待分析结果的最长时间(秒)
+            preferred_grace: 并行模式下其他分析器先完成后，继续等待优先分析器的时间(秒)
         """
         self.use_optimized = use_optimized
         self.top_n = top_n
         self.data_days = data_days
+        self.parallel = parallel
+        self.timeout = timeout
+        self.preferred_grace = preferred_grace
         
-        # 初始化数据提供器与分析器
+        # 初始化数据提供器与分析器（与各分析器共用统一行业缓存）
+        self.cache = get_sector_cache()
         self.provider = get_sector_provider()
         
         # 初始化优化版分析器
@@ -76,39 +91,33 @@ class SectorIntegrator:
         Returns:
             Dict: 热门行业分析结果
         """
-        # 首先尝试使用优化版分析器
-        if self.use_optimized and self.optimized_analyzer:
-            try:
-                logger.info("使用优化版行业分析器获取热门行业")
-                result = self.optimized_analyzer.analyze_hot_sectors()
-                
-                if result['status'] == 'success' and result['data']['hot_sectors']:
-                    # 标记数据来源
-                    result['data']['source'] = 'optimized'
-                    logger.info(f"优化版分析成功，找到 {len(result['data']['hot_sectors'])} 个热门行业")
-                    return result
-                else:
-                    logger.warning("优化版分析器返回空结果，尝试原版分析器")
-            except Exception as e:
-                logger.error(f"优化版分析器出错: {str(e)}")
-                logger.debug(traceback.format_exc())
+        # 原版分析器在集成器调用期间会回调集成器，直接返回错误让其使用自身的分析方法
+        if getattr(_analyzer_context, 'active', False):
+            return {
+                'status': 'error',
+                'message': '行业分析集成器正在调用该分析器',
+                'data': {'hot_sectors': []}
+            }
         
-        # 如果优化版分析器失败或未配置使用，尝试原版分析器
-        if self.original_analyzer:
-            try:
-                logger.info("使用原版行业分析器获取热门行业")
-                result = self.original_analyzer.analyze_hot_sectors()
-                
-                if result['status'] == 'success':
-                    # 标记数据来源
-                    result['data']['source'] = 'original'
-                    logger.info(f"原版分析成功，找到 {len(result['data']['hot_sectors'])} 个热门行业")
-                    return result
-                else:
-                    logger.error(f"原版分析器失败: {result.get('message', '未知错误')}")
-            except Exception as e:
-                logger.error(f"原版分析器出错: {str(e)}")
-                logger.debug(traceback.format_exc())
+        cache_key = f'integrator:hot_sectors_{self.top_n}'
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info("从统一行业缓存获取热门行业")
+            return cached
+        
+        if self.parallel:
+            result = self._race_hot_sectors()
+        else:
+            # 首先尝试使用优化版分析器，失败或未配置使用时尝试原版分析器
+            result = None
+            for name in self._analyzer_order():
+                result = self._run_analyzer(name)
+                if result is not None:
+                    break
+        
+        if result is not None:
+            self.cache.set(cache_key, result)
+            return result
         
         # 两种分析器都失败，返回错误结果
         return {
@@ -120,6 +129,89 @@ class SectorIntegrator:
             }
         }
     
+    def _analyzer_order(self) -> List[str]:
+        """按优先级排列可用的分析器"""
+        order = []
+        if self.use_optimized and self.optimized_analyzer:
+            order.append('optimized')
+        if self.original_analyzer:
+            order.append('original')
+        return order
+    
+    def _run_analyzer(self, name: str) -> Optional[Dict]:
+        """运行一个分析器，返回成功的结果，失败时返回None"""
+        label = '优化版' if name == 'optimized' else '原版'
+        analyzer = self.optimized_analyzer if name == 'optimized' else self.original_analyzer
+        try:
+            logger.info(f"使用{label}行业分析器获取热门行业")
+            _analyzer_context.active = True
+            try:
+                result = analyzer.analyze_hot_sectors()
+            finally:
+                _analyzer_context.active = False
+            
+            if result['status'] == 'success' and (name == 'original' or result['data']['hot_sectors']):
+                # 标记数据来源
+                result['data']['source'] = name
+                logger.info(f"{label}分析成功，找到 {len(result['data']['hot_sectors'])} 个热门行业")
+                return result
+            logger.warning(f"{label}分析器失败: {result.get('message', '返回空结果')}")
+        except Exception as e:
+            logger.error(f"{label}分析器出错: {str(e)}")
+            logger.debug(traceback.format_exc())
+        return None
+    
+    def _race_hot_sectors(self) -> Optional[Dict]:
+        """并行运行全部分析器，返回最先成功的结果
+        
+        优先分析器（优化版）在timeout内成功时直接采用；其他分析器先成功时，
+        最多再等待preferred_grace秒看优先分析器能否完成。返回后取消尚未开始的任务，
+        仍在运行的分析器在后台结束（其结果只写入各自的缓存）。
+        
+        Returns:
+            成功的分析结果，全部失败或超时返回None
+        """
+        order = self._analyzer_order()
+        if not order:
+            return None
+        preferred = order[0]
+        
+        executor = ThreadPoolExecutor(max_workers=len(order), thread_name_prefix='SectorRace')
+        futures = {executor.submit(self._run_analyzer, name): name for name in order}
+        pending = set(futures)
+        deadline = time.time() + self.timeout
+        best = None
+        try:
+            while pending:
+                remaining = deadline - time.time()
+                if best is not None:
+                    remaining = min(remaining, grace_deadline - time.time())
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures[future]
+                    result = future.result()
+                    if name == preferred:
+                        if result is not None:
+                            return result
+                        if best is not None:
+                            return best
+                    elif result is not None and best is None:
+                        best = result
+                        grace_deadline = time.time() + self.preferred_grace
+                        if not any(futures[f] == preferred for f in pending):
+                            return best
+            if best is None:
+                logger.warning(f"行业分析器在 {self.timeout} 秒内均未返回成功结果")
+            else:
+                logger.info(f"优先分析器未在等待时间内完成，采用 {best['data']['source']} 结果")
+            return best
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     def predict_hot_sectors(self) -> Dict:
         """预测未来热门行业
         
@@ -271,21 +363,30 @@ class SectorIntegrator:
 
 # 单例模式提供全局访问点
 _integrator = None
+_initializing = False
 
-def get_sector_integrator(use_optimized=True, top_n=10, data_days=90):
+def get_sector_integrator(use_optimized=True, top_n=10, data_days=90, parallel=True):
     """获取行业分析集成器单例
     
     Args:
         use_optimized: 是否优先使用优化版分析器
         top_n: 热门行业数量
         data_days: 历史数据天数
+        parallel: 是否并行运行分析器（界面调用时延迟取决于较快的分析器）
         
     Returns:
         SectorIntegrator: 行业分析集成器实例
     """
-    global _integrator
+    global _integrator, _initializing
     if _integrator is None:
-        _integrator = SectorIntegrator(use_optimized, top_n, data_days)
+        # 集成器内部创建的原版分析器也会获取集成器，初始化期间不再嵌套创建
+        if _initializing:
+            raise RuntimeError("行业分析集成器正在初始化")
+        _initializing = True
+        try:
+            _integrator = SectorIntegrator(use_optimized, top_n, data_days, parallel=parallel)
+        finally:
+            _initializing = False
     return _integrator
 
 if __name__ == "__main__":
@@ -0,0 +1,540 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+行业成分双向索引模块
+将申万/中信行业和东方财富板块的成分关系保存为CSR数组（行业 -> 股票、股票 -> 行业），
+每天按数据源增量刷新一次，行业成分查询、个股所属行业查询和按行业聚合均在内存中完成
+"""
+
+import os
+import atexit
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger('SectorMembership')
+
+# 成分长表的列，level为分级行业的级别（l1/l2/l3），板块和概念为空
+MEMBERSHIP_COLUMNS = ['sector_code', 'sector_name', 'con_code', 'source', 'level']
+# 成分接口单次请求的行数，不超过各接口的单次上限
+PAGE_SIZE = 3000
+
+
+def normalize_stock_code(code) -> str:
+    """统一为tushare股票代码格式（000001.SZ），akshare的6位代码按交易所补全后缀"""
+    code = str(code).strip().upper()
+    if '.' in code or len(code) != 6 or not code.isdigit():
+        return code
+    if code[0] in '69':
+        return f'{code}.SH'
+    if code[0] in '48':
+        return f'{code}.BJ'
+    return f'{code}.SZ'
+
+
+def fetch_all_pages(fetch: Callable[..., pd.DataFrame], page_size: int = PAGE_SIZE) -> pd.DataFrame:
+    """按offset/limit分页请求，直到返回的行数不足一页
+
+    Args:
+        fetch: 接受offset和limit关键字参数的取数函数
+        page_size: 每页行数
+
+    Returns:
+        全部分页拼接后的数据，第一页为空时返回该空结果
+    """
+    pages = []
+    offset = 0
+    while True:
+        page = fetch(offset=offset, limit=page_size)
+        if page is None or page.empty:
+            break
+        pages.append(page)
+        if len(page) < page_size:
+            break
+        offset += len(page)
+    if not pages:
+        return page
+    return pd.concat(pages, ignore_index=True) if len(pages) > 1 else pages[0]
+
+
+def _level_members(df: pd.DataFrame, source: str) -> pd.DataFrame:
+    """将分级行业成分（l1/l2/l3）展开为每个级别一行"""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=MEMBERSHIP_COLUMNS)
+    frames = []
+    for level in ('l1', 'l2', 'l3'):
+        if f'{level}_code' in df.columns:
+            frames.append(pd.DataFrame({
+                'sector_code': df[f'{level}_code'],
+                'sector_name': df.get(f'{level}_name', ''),
+                'con_code': df['ts_code'],
+                'source': source,
+                'level': level
+            }))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=MEMBERSHIP_COLUMNS)
+
+
+def _board_members(df: pd.DataFrame, source: str, names: Optional[pd.Series] = None) -> pd.DataFrame:
+    """板块成分（ts_code为板块代码，con_code为股票代码）
+
+    Args:
+        df: 成分数据
+        source: 数据源
+        names: 板块代码 -> 板块名称，用于按名称查询
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=MEMBERSHIP_COLUMNS)
+    sector_name = df['ts_code'].map(names).fillna('') if names is not None else ''
+    return pd.DataFrame({'sector_code': df['ts_code'], 'sector_name': sector_name,
+                         'con_code': df['con_code'], 'source': source, 'level': ''})
+
+
+def _dc_members(pro) -> pd.DataFrame:
+    """东方财富板块成分，板块名称取自dc_index，与akshare东方财富板块名称一致"""
+    trade_date = datetime.now().strftime('%Y%m%d')
+    boards = fetch_all_pages(lambda **page: pro.dc_index(trade_date=trade_date, **page))
+    names = None
+    if boards is not None and not boards.empty:
+        names = boards.drop_duplicates('ts_code').set_index('ts_code')['name']
+    return _board_members(fetch_all_pages(
+        lambda **page: pro.dc_member(trade_date=trade_date, **page)), 'dc', names)
+
+
+def _pro_fetchers(pro) -> Dict[str, Callable[[], pd.DataFrame]]:
+    """申万、中信行业和东方财富板块成分的取数函数，每个数据源分页取回全部成分"""
+    return {
+        'sw': lambda: _level_members(fetch_all_pages(
+            lambda **page: pro.index_member_all(is_new='Y', **page)), 'sw'),
+        'ci': lambda: _level_members(fetch_all_pages(
+            lambda **page: pro.ci_index_member(is_new='Y', **page)), 'ci'),
+        'dc': lambda: _dc_members(pro),
+    }
+
+
+def _default_fetchers() -> Dict[str, Callable[[], pd.DataFrame]]:
+    """使用tushare_api中已初始化的pro接口"""
+    from goon_stock_system.utils import tushare_api
+    return _pro_fetchers(tushare_api.pro)
+
+
+@dataclass(frozen=True)
+class _MembershipArrays:
+    """一次构建完成的CSR数组和查找表
+
+    刷新时整体替换SectorMembershipIndex._arrays，查询方法开头取一次引用，
+    无锁读取时也不会看到新旧混合的数组
+    """
+    sector_codes: np.ndarray
+    sector_names: np.ndarray
+    sector_sources: np.ndarray
+    sector_levels: np.ndarray
+    stock_codes: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    stock_indices: np.ndarray
+    stock_indptr: np.ndarray
+    sector_pos: Dict[str, int]
+    stock_pos: Dict[str, int]
+    name_pos: Dict[Tuple[str, str], int]  # (数据源, 行业名称) -> 行业位置
+
+    @classmethod
+    def build(cls, sector_codes, sector_names, sector_sources, sector_levels, stock_codes,
+              indptr, indices) -> '_MembershipArrays':
+        """由正向CSR数组生成反向索引和查找表"""
+        rows = np.repeat(np.arange(len(sector_codes), dtype=np.int32), np.diff(indptr))
+        order = np.lexsort((rows, indices))
+        stock_indptr = np.concatenate([[0], np.cumsum(np.bincount(indices, minlength=len(stock_codes)))]).astype(np.int64)
+        name_pos: Dict[Tuple[str, str], int] = {}
+        for i, (name, source) in enumerate(zip(sector_names, sector_sources)):
+            if name:
+                name_pos.setdefault((source, name), i)
+        return cls(sector_codes=sector_codes, sector_names=sector_names, sector_sources=sector_sources,
+                   sector_levels=sector_levels, stock_codes=stock_codes, indptr=indptr, indices=indices,
+                   stock_indices=rows[order], stock_indptr=stock_indptr,
+                   sector_pos={code: i for i, code in enumerate(sector_codes)},
+                   stock_pos={code: j for j, code in enumerate(stock_codes)},
+                   name_pos=name_pos)
+
+
+class SectorMembershipIndex:
+    """行业成分双向索引
+
+    sector_codes[i]的成分股为stock_codes[indices[indptr[i]:indptr[i + 1]]]，
+    stock_codes[j]所属行业为sector_codes[stock_indices[stock_indptr[j]:stock_indptr[j + 1]]]。
+    """
+
+    def __init__(self, path: str = 'data_cache/sector_membership.npz',
+                 fetchers: Optional[Dict[str, Callable[[], pd.DataFrame]]] = None):
+        """初始化行业成分索引
+
+        Args:
+            path: 索引文件路径
+            fetchers: 数据源名称到取数函数的映射，取数函数返回包含MEMBERSHIP_COLUMNS的长表；
+                      默认使用申万、中信行业和东方财富板块成分
+        """
+        self.path = path
+        self._fetchers = fetchers
+        self._lock = threading.RLock()
+        self.refreshed_on: Dict[str, str] = {}  # 数据源 -> 最近刷新日期
+        self._attempted: Dict[str, str] = {}     # 数据源 -> 本进程最近请求日期（含失败）
+        self._pending: Dict[str, pd.DataFrame] = {}  # 行业代码 -> 尚未并入CSR数组的成分
+        self._dirty = False                          # 内存中的成分是否有未保存的修改
+        self._set_arrays(np.array([], dtype=str), np.array([], dtype=str), np.array([], dtype=str),
+                         np.array([], dtype=str), np.array([], dtype=str), np.zeros(1, dtype=np.int64),
+                         np.array([], dtype=np.int32))
+        self._load()
+
+    @classmethod
+    def from_pro(cls, pro, **kwargs) -> 'SectorMembershipIndex':
+        """使用已初始化的tushare pro接口创建"""
+        kwargs.setdefault('fetchers', _pro_fetchers(pro))
+        return cls(**kwargs)
+
+    # ---------- CSR数组 ----------
+
+    def _set_arrays(self, sector_codes, sector_names, sector_sources, sector_levels, stock_codes, indptr, indices):
+        """设置正向CSR数组并生成反向索引和查找表，一次赋值整体替换"""
+        self._arrays = _MembershipArrays.build(sector_codes, sector_names, sector_sources, sector_levels,
+                                               stock_codes, indptr, indices)
+
+    @property
+    def sector_codes(self) -> np.ndarray:
+        return self._arrays.sector_codes
+
+    @property
+    def sector_names(self) -> np.ndarray:
+        return self._arrays.sector_names
+
+    @property
+    def sector_sources(self) -> np.ndarray:
+        return self._arrays.sector_sources
+
+    @property
+    def sector_levels(self) -> np.ndarray:
+        return self._arrays.sector_levels
+
+    @property
+    def stock_codes(self) -> np.ndarray:
+        return self._arrays.stock_codes
+
+    @property
+    def indptr(self) -> np.ndarray:
+        return self._arrays.indptr
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self._arrays.indices
+
+    def _build(self, table: pd.DataFrame) -> None:
+        """由成分长表构建CSR数组"""
+        table = table.reindex(columns=MEMBERSHIP_COLUMNS).dropna(subset=['sector_code', 'con_code'])
+        table = table.assign(con_code=table['con_code'].map(normalize_stock_code),
+                             sector_code=table['sector_code'].astype(str))
+        table = table.drop_duplicates(['sector_code', 'con_code'])
+        sectors = table.drop_duplicates('sector_code').sort_values('sector_code')
+        sector_codes = sectors['sector_code'].to_numpy(dtype=str)
+        stock_codes = np.unique(table['con_code'].to_numpy(dtype=str))
+
+        rows = np.searchsorted(sector_codes, table['sector_code'].to_numpy(dtype=str))
+        cols = np.searchsorted(stock_codes, table['con_code'].to_numpy(dtype=str)).astype(np.int32)
+        order = np.lexsort((cols, rows))
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(sector_codes)))]).astype(np.int64)
+        self._set_arrays(sector_codes, sectors['sector_name'].fillna('').to_numpy(dtype=str),
+                         sectors['source'].to_numpy(dtype=str), sectors['level'].fillna('').to_numpy(dtype=str),
+                         stock_codes, indptr, cols[order])
+
+    def _table(self) -> pd.DataFrame:
+        """由CSR数组还原成分长表"""
+        a = self._arrays
+        counts = np.diff(a.indptr)
+        return pd.DataFrame({
+            'sector_code': np.repeat(a.sector_codes, counts),
+            'sector_name': np.repeat(a.sector_names, counts),
+            'con_code': a.stock_codes[a.indices],
+            'source': np.repeat(a.sector_sources, counts),
+            'level': np.repeat(a.sector_levels, counts)
+        }, columns=MEMBERSHIP_COLUMNS)
+
+    # ---------- 持久化 ----------
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                self.refreshed_on = dict(zip(data['refreshed_sources'].tolist(), data['refreshed_dates'].tolist()))
+                if 'sector_levels' in data.files:
+                    levels = data['sector_levels']
+                else:
+                    # 旧版索引没有行业级别，当天重新请求各数据源
+                    levels = np.full(len(data['sector_codes']), '')
+                    self.refreshed_on = {}
+                self._set_arrays(data['sector_codes'], data['sector_names'], data['sector_sources'], levels,
+                                 data['stock_codes'], data['indptr'], data['indices'])
+            logger.info(f"加载行业成分索引: {len(self.sector_codes)} 个行业, {len(self.stock_codes)} 只股票")
+        except Exception as e:
+            logger.error(f"加载行业成分索引失败: {str(e)}")
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            a = self._arrays
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(
+                    f, sector_codes=a.sector_codes, sector_names=a.sector_names,
+                    sector_sources=a.sector_sources, sector_levels=a.sector_levels, stock_codes=a.stock_codes,
+                    indptr=a.indptr, indices=a.indices,
+                    refreshed_sources=np.array(list(self.refreshed_on), dtype=str),
+                    refreshed_dates=np.array(list(self.refreshed_on.values()), dtype=str))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"保存行业成分索引失败: {str(e)}")
+
+    # ---------- 更新 ----------
+
+    def _get_fetchers(self) -> Dict[str, Callable[[], pd.DataFrame]]:
+        if self._fetchers is None:
+            try:
+                self._fetchers = _default_fetchers()
+            except Exception as e:
+                logger.warning(f"行业成分接口不可用: {str(e)}")
+                self._fetchers = {}
+        return self._fetchers
+
+    def refresh(self, force: bool = False) -> int:
+        """按数据源增量刷新，每个数据源每天最多请求一次
+
+        Args:
+            force: 是否忽略当天已刷新的记录
+
+        Returns:
+            刷新成功的数据源数量
+        """
+        today = datetime.now().strftime('%Y%m%d')
+        with self._lock:
+            self._apply_pending()
+            table, refreshed = None, 0
+            for source, fetch in self._get_fetchers().items():
+                if not force and today in (self.refreshed_on.get(source), self._attempted.get(source)):
+                    continue
+                self._attempted[source] = today
+                try:
+                    members = fetch()
+                except Exception as e:
+                    logger.warning(f"刷新 {source} 行业成分失败: {str(e)}")
+                    continue
+                if members is None or members.empty:
+                    # 数据源无数据时保留原有成分
+                    continue
+                if table is None:
+                    table = self._table()
+                members = members.reindex(columns=MEMBERSHIP_COLUMNS)
+                members['source'] = source
+                table = pd.concat([table[table['source'] != source], members], ignore_index=True)
+                self.refreshed_on[source] = today
+                refreshed += 1
+            if table is not None:
+                self._build(table)
+                self._dirty = True
+                logger.info(f"行业成分索引已刷新 {refreshed} 个数据源: {len(self.sector_codes)} 个行业, "
+                            f"{len(self.stock_codes)} 只股票")
+            # 数据源的成分和期间按需写入的成分一起保存一次
+            self.flush()
+            return refreshed
+
+    def add_members(self, sector_code: str, stocks: Iterable[str], sector_name: str = '',
+                    source: str = 'manual') -> None:
+        """写入单个行业（如按需请求的概念板块）的成分，替换该行业原有成分
+
+        成分先暂存，下一次查询时与其他暂存的行业一起并入CSR数组，
+        在下一次refresh、flush或进程退出时保存到文件
+        """
+        members = pd.DataFrame({'sector_code': sector_code, 'sector_name': sector_name,
+                                'con_code': list(stocks), 'source': source, 'level': ''},
+                               columns=MEMBERSHIP_COLUMNS)
+        if members.empty:
+            return
+        with self._lock:
+            if not sector_name:
+                pending = self._pending.get(sector_code)
+                if pending is not None:
+                    members['sector_name'] = pending['sector_name'].iloc[0]
+                elif sector_code in self._arrays.sector_pos:
+                    a = self._arrays
+                    members['sector_name'] = a.sector_names[a.sector_pos[sector_code]]
+            self._pending[sector_code] = members
+
+    def _apply_pending(self) -> None:
+        """将暂存的行业成分一次并入CSR数组"""
+        if not self._pending:
+            return
+        with self._lock:
+            if not self._pending:
+                return
+            table = self._table()
+            pending, self._pending = self._pending, {}
+            table = table[~table['sector_code'].isin(set(pending))]
+            self._build(pd.concat([table, *pending.values()], ignore_index=True))
+            self._dirty = True
+
+    def flush(self) -> None:
+        """并入暂存的成分，有未保存的修改时写入文件"""
+        with self._lock:
+            self._apply_pending()
+            if self._dirty:
+                self._save()
+
+    # ---------- 查询 ----------
+
+    def has_sector(self, sector_code: str) -> bool:
+        self._apply_pending()
+        return sector_code in self._arrays.sector_pos
+
+    def stocks_of(self, sector_code: str) -> List[str]:
+        """行业成分股代码，行业不存在时返回空列表"""
+        self._apply_pending()
+        a = self._arrays
+        i = a.sector_pos.get(sector_code)
+        if i is None:
+            return []
+        return a.stock_codes[a.indices[a.indptr[i]:a.indptr[i + 1]]].tolist()
+
+    def sector_code_of(self, sector_name: str, source: str) -> Optional[str]:
+        """按行业名称查找行业代码
+
+        不同数据源（申万、中信等）有同名行业，成分不同，需指明数据源
+
+        Args:
+            sector_name: 行业名称
+            source: 数据源，如'sw'、'ci'、'dc'、'ts_concept'
+        """
+        self._apply_pending()
+        a = self._arrays
+        i = a.name_pos.get((source, sector_name))
+        return str(a.sector_codes[i]) if i is not None else None
+
+    def stocks_of_name(self, sector_name: str, source: str) -> List[str]:
+        """按数据源和行业名称获取成分股代码"""
+        code = self.sector_code_of(sector_name, source)
+        return self.stocks_of(code) if code else []
+
+    def sectors_of(self, stock_code: str, among: Optional[Iterable[str]] = None) -> List[str]:
+        """个股所属的行业/板块代码
+
+        Args:
+            stock_code: 股票代码，支持6位代码
+            among: 只返回这些行业中的代码（如当前热门行业）
+        """
+        self._apply_pending()
+        a = self._arrays
+        j = a.stock_pos.get(normalize_stock_code(stock_code))
+        if j is None:
+            return []
+        codes = a.sector_codes[a.stock_indices[a.stock_indptr[j]:a.stock_indptr[j + 1]]].tolist()
+        if among is not None:
+            among = set(among)
+            codes = [code for code in codes if code in among]
+        return codes
+
+    def sector_table(self) -> pd.DataFrame:
+        """各行业的名称、数据源和级别，以行业代码为索引"""
+        self._apply_pending()
+        a = self._arrays
+        return pd.DataFrame({'name': a.sector_names, 'source': a.sector_sources, 'level': a.sector_levels},
+                            index=a.sector_codes)
+
+    def members_table(self, sector_codes: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """成分表(index_code, con_code)，可直接用于行业指数合成"""
+        self._apply_pending()
+        table = self._table()
+        if sector_codes is not None:
+            table = table[table['sector_code'].isin(set(sector_codes))]
+        return table.rename(columns={'sector_code': 'index_code'})[['index_code', 'con_code']].reset_index(drop=True)
+
+    def aggregate(self, values: pd.Series, how: str = 'mean') -> pd.Series:
+        """按行业聚合个股数值
+
+        Args:
+            values: 以股票代码为索引的数值
+            how: 'mean'、'sum'或'count'，缺失值不参与
+
+        Returns:
+            以行业代码为索引的聚合结果
+        """
+        self._apply_pending()
+        a = self._arrays
+        stock_values = pd.Series(values.to_numpy(dtype=float), index=[normalize_stock_code(c) for c in values.index])
+        stock_values = stock_values[~stock_values.index.duplicated()]
+        member_values = stock_values.reindex(a.stock_codes).to_numpy()[a.indices]
+        rows = np.repeat(np.arange(len(a.sector_codes)), np.diff(a.indptr))
+        valid = ~np.isnan(member_values)
+        sums = np.bincount(rows[valid], weights=member_values[valid], minlength=len(a.sector_codes))
+        counts = np.bincount(rows[valid], minlength=len(a.sector_codes))
+        if how == 'sum':
+            result = sums
+        elif how == 'count':
+            result = counts
+        else:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        return pd.Series(result, index=a.sector_codes)
+
+    def sum_by_sector(self, values: pd.DataFrame) -> pd.DataFrame:
+        """按行业对个股数值表的全部列一次求和
+
+        相当于(行业 × 股票)成分矩阵与(股票 × 列)数值矩阵相乘，缺失值按0计。
+
+        Args:
+            values: 以股票代码为索引的数值表
+
+        Returns:
+            以行业代码为索引、列与values相同的求和结果
+        """
+        self._apply_pending()
+        a = self._arrays
+        matrix = pd.DataFrame(values.to_numpy(dtype=float), index=[normalize_stock_code(c) for c in values.index])
+        matrix = matrix[~matrix.index.duplicated()]
+        member_values = np.nan_to_num(matrix.reindex(a.stock_codes).to_numpy()[a.indices])
+
+        sums = np.zeros((len(a.sector_codes), values.shape[1]))
+        non_empty = np.diff(a.indptr) > 0
+        if non_empty.any():
+            # 跳过空行业后各段首尾相接，reduceat按段求和
+            sums[non_empty] = np.add.reduceat(member_values, a.indptr[:-1][non_empty], axis=0)
+        return pd.DataFrame(sums, index=a.sector_codes, columns=values.columns)
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_membership_index(path: str = 'data_cache/sector_membership.npz', pro=None,
+                         refresh: bool = False, **kwargs) -> SectorMembershipIndex:
+    """获取进程内共享的行业成分索引
+
+    Args:
+        path: 索引文件路径
+        pro: 调用方已初始化的tushare pro接口，首次创建时使用
+        refresh: 是否执行每日增量刷新（当天已刷新的数据源不会重复请求）；
+                 默认只使用已保存的索引，不调用接口
+    """
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            if pro is not None:
+                _instance = SectorMembershipIndex.from_pro(pro, path=path, **kwargs)
+            else:
+                _instance = SectorMembershipIndex(path=path, **kwargs)
+            # 按需写入的成分在退出时保存
+            atexit.register(_instance.flush)
+    if refresh:
+        _instance.refresh()
+    return _instance
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+行业指标向量化计算模块
+在(日期 × 行业)收盘价面板上按列一次算出全部行业的涨幅、波动率、趋势、
+RSI/MACD和相对强度，结果与各分析器逐个行业计算的口径一致
+"""
+
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger('SectorMetrics')
+
+
+def align_panel(close: pd.DataFrame) -> pd.DataFrame:
+    """将每列的有效值下移对齐到最后一行
+
+    逐行业计算时各行业只使用自身的有效数据（长度可以不同），按位置取"最近N天"。
+    下移对齐后每列最后一行即该行业最新值、倒数第k行即其前第k个有效值，
+    停牌或新上市造成的缺失不会错位。
+    """
+    values = close.to_numpy(dtype=float)
+    order = np.argsort(~np.isnan(values), axis=0, kind='stable')
+    return pd.DataFrame(np.take_along_axis(values, order, axis=0), index=close.index, columns=close.columns)
+
+
+def stack_closes(histories: Dict[str, pd.DataFrame], column: str = '收盘') -> pd.DataFrame:
+    """将逐个行业的历史数据按位置下对齐合并为收盘价面板
+
+    各行业数据的日期可能不一致（或没有日期索引），逐行业指标只依赖数据的先后位置，
+    因此按最后一行对齐即可得到等价的面板。
+    """
+    histories = {name: df for name, df in histories.items() if df is not None and not df.empty}
+    if not histories:
+        return pd.DataFrame()
+    length = max(len(df) for df in histories.values())
+    panel = np.full((length, len(histories)), np.nan)
+    for j, df in enumerate(histories.values()):
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+        panel[length - len(values):, j] = values
+    return align_panel(pd.DataFrame(panel, columns=list(histories)))
+
+
+def hot_sector_metrics(close: pd.DataFrame) -> pd.DataFrame:
+    """计算全部行业的热度指标（OptimizedSectorAnalyzer._calculate_sector_metrics口径）
+
+    Args:
+        close: (日期 × 行业)收盘价面板，日期升序
+
+    Returns:
+        以行业代码为索引的DataFrame，包含last_close、last_date、各周期涨幅、
+        volatility、trend_strength和score（未取整）
+    """
+    mask = close.notna().to_numpy()
+    aligned = align_panel(close)
+    values = aligned.to_numpy()
+    rows, cols = values.shape
+    counts = mask.sum(axis=0)
+    col_index = np.arange(cols)
+
+    last = values[-1] if rows else np.full(cols, np.nan)
+    result = pd.DataFrame(index=close.columns)
+    result['last_close'] = last
+    # 每个行业最后一个有效值对应的日期
+    last_pos = rows - 1 - np.argmax(mask[::-1], axis=0) if rows else np.zeros(cols, dtype=int)
+    result['last_date'] = [close.index[p].strftime('%Y-%m-%d') if n else None for p, n in zip(last_pos, counts)]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for period in (1, 5, 20, 90):
+            back = np.minimum(period, counts - 1)
+            prev = values[np.clip(rows - 1 - back, 0, max(rows - 1, 0)), col_index] if rows else last
+            result[f'change_rate_{period}d'] = np.where(back > 0, (last / prev - 1) * 100, 0.0)
+
+        # 年化波动率（对数收益率样本标准差），超过5天才计算
+        log_returns = np.diff(np.log(values), axis=0)
+        return_counts = np.sum(~np.isnan(log_returns), axis=0)
+        volatility = np.full(cols, np.nan)
+        enough = return_counts > 1
+        if enough.any():
+            volatility[enough] = np.nanstd(log_returns[:, enough], axis=0, ddof=1)
+        result['volatility'] = np.where(counts > 5, volatility * np.sqrt(250) * 100, 0.0)
+
+        # 趋势强度：10日均线相对30日均线的偏离
+        trend = np.zeros(cols)
+        if rows >= 30:
+            ma10 = values[-10:].mean(axis=0)
+            ma30 = values[-30:].mean(axis=0)
+            trend = np.where((counts >= 30) & (ma30 != 0), (ma10 / ma30 - 1) * 100, 0.0)
+        result['trend_strength'] = np.nan_to_num(trend, nan=0.0)
+
+    score = (result['change_rate_5d'] * 0.2 + result['change_rate_20d'] * 0.3 +
+             result['change_rate_90d'] * 0.2 + result['trend_strength'] * 0.3)
+    fallback = (result['change_rate_5d'] * 0.3 + result['change_rate_20d'] * 0.7).fillna(0)
+    result['score'] = score.fillna(fallback)
+    result['data_days'] = counts
+    return result
+
+
+def momentum_indicators(close: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """计算全部行业的RSI(14)和MACD(12, 26, 9)序列
+
+    Args:
+        close: 下对齐的收盘价面板（见align_panel/stack_closes）
+
+    Returns:
+        {'rsi', 'macd_line', 'signal_line', 'macd_histogram'} -> 与close同形状的面板
+    """
+    change = close.diff()
+    present = close.notna()  # 下对齐留出的空行不参与滚动窗口
+    gain = change.where(change > 0, 0.0).where(present)
+    loss = (-change).where(change < 0, 0.0).where(present)
+    rs = gain.rolling(window=14).mean() / loss.rolling(window=14).mean()
+    rsi = 100 - (100 / (1 + rs))
+
+    macd_line = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    signal_line = macd_line.ewm(span=9, adjust=False).mean()
+    return {
+        'rsi': rsi,
+        'macd_line': macd_line,
+        'signal_line': signal_line,
+        'macd_histogram': macd_line - signal_line
+    }
+
+
+def _describe(scores: np.ndarray, labels) -> np.ndarray:
+    """按80/60/40/20分段生成描述"""
+    return np.select([scores >= 80, scores >= 60, scores >= 40, scores >= 20], labels[:4], labels[4])
+
+
+def trend_stability(close: pd.DataFrame) -> pd.DataFrame:
+    """计算全部行业的趋势稳定性得分（EnhancedSectorAnalyzer._calculate_trend_stability口径）
+
+    Args:
+        close: 下对齐的收盘价面板
+
+    Returns:
+        以行业为索引、包含score和desc的DataFrame
+    """
+    recent = close.tail(30)
+    ma5 = recent.rolling(window=5).mean()
+    ma15 = recent.rolling(window=15).mean()
+    ma5_slope = ma5.diff() / ma5.shift(1) * 100
+    ma15_slope = ma15.diff() / ma15.shift(1) * 100
+    valid = ma15_slope.notna()  # 对应逐行业计算中dropna后保留的行
+    valid_counts = valid.to_numpy().sum(axis=0)
+
+    last_close, last_ma5, last_ma15 = recent.iloc[-1], ma5.iloc[-1], ma15.iloc[-1]
+    position_score = ((last_close > last_ma5) * 20 + (last_close > last_ma15) * 10 +
+                      (last_ma5 > last_ma15) * 10).to_numpy(dtype=float)
+
+    avg_ma5_slope = ma5_slope.where(valid).tail(5).mean().to_numpy()
+    avg_ma15_slope = ma15_slope.where(valid).tail(5).mean().to_numpy()
+    with np.errstate(invalid='ignore'):
+        slope_score = (np.where(avg_ma5_slope > 0, 20 * np.minimum(avg_ma5_slope / 0.5, 1), 0.0) +
+                       np.where(avg_ma15_slope > 0, 20 * np.minimum(avg_ma15_slope / 0.3, 1), 0.0))
+
+    # 最近1~9天中收盘价 > MA5 > MA15的天数，且不超过有效行数-1
+    consistent = ((recent > ma5) & (ma5 > ma15)).to_numpy()[::-1][:9]
+    day_numbers = np.arange(1, len(consistent) + 1)[:, None]
+    consistency_days = (consistent & (day_numbers <= np.minimum(9, valid_counts - 1))).sum(axis=0)
+    consistency_score = 20 * (consistency_days / 10)
+
+    scores = position_score + slope_score + consistency_score
+    descs = _describe(scores, ["强劲上升趋势", "上升趋势", "弱上升趋势", "弱下降趋势", "下降趋势"])
+    no_data = valid_counts == 0
+    return pd.DataFrame({
+        'score': np.where(no_data, 0, scores),
+        'desc': np.where(no_data, "数据不足", descs)
+    }, index=close.columns)
+
+
+def relative_strength(close: pd.DataFrame, market_close: Optional[pd.Series] = None) -> pd.DataFrame:
+    """计算全部行业的相对强度得分（EnhancedSectorAnalyzer._calculate_relative_strength口径）
+
+    Args:
+        close: 下对齐的收盘价面板
+        market_close: 大盘收盘价序列，为空时只评估行业自身走势
+
+    Returns:
+        以行业为索引、包含score和desc的DataFrame
+    """
+    recent = close.tail(30).to_numpy()
+    counts = np.sum(~np.isnan(recent), axis=0)
+    rows = len(recent)
+
+    if market_close is not None and len(market_close):
+        market = pd.Series(market_close).tail(30).to_numpy(dtype=float)[1:]  # 去掉pct_change首行
+        # 行业同样去掉首个有效值，需至少21行才能计算20日表现
+        usable = np.minimum(counts, 30) - 1
+        if len(market) < 21:
+            usable = np.zeros_like(usable)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sector_5d = recent[-1] / recent[max(rows - 6, 0)] - 1
+            sector_20d = recent[-1] / recent[max(rows - 21, 0)] - 1
+            market_5d = market[-1] / market[-6] - 1 if len(market) >= 6 else np.nan
+            market_20d = market[-1] / market[-21] - 1 if len(market) >= 21 else np.nan
+        short_term = np.clip(50 + (sector_5d - market_5d) * 200, 0, 100)
+        long_term = np.clip(50 + (sector_20d - market_20d) * 100, 0, 100)
+        scores = short_term * 0.6 + long_term * 0.4
+        descs = _describe(scores, ["明显强于大盘", "强于大盘", "与大盘同步", "弱于大盘", "明显弱于大盘"])
+        failed = usable < 21
+        return pd.DataFrame({
+            'score': np.where(failed, 50, scores),
+            'desc': np.where(failed, "计算错误", descs)
+        }, index=close.columns)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first_pos = rows - counts  # 下对齐后每列首个有效值所在行
+        prev_pos = np.where(counts >= 6, rows - 6, first_pos)
+        prev = recent[np.clip(prev_pos, 0, max(rows - 1, 0)), np.arange(recent.shape[1])] if rows else recent
+        change_pct = (recent[-1] - prev) / prev * 100 if rows else np.array([])
+    scores = np.clip(50 + change_pct * 2, 0, 100)
+    descs = _describe(scores, ["强劲上涨", "温和上涨", "横盘整理", "温和下跌", "明显下跌"])
+    no_data = counts == 0
+    return pd.DataFrame({
+        'score': np.where(no_data, 0, scores),
+        'desc': np.where(no_data, "无数据", descs)
+    }, index=close.columns)
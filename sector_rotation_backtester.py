@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+行业轮动回测模块
+在(日期 × 行业)收盘价面板上逐期重放各分析器的热门行业预测逻辑，
+统计Top-N预测行业的命中率和未来收益，并按预测器 × 回看窗口并行回测，
+用于比较各预测器的历史表现
+"""
+
+import time
+import logging
+from dataclasses import dataclass, field
+from concurrent.futures import as_completed
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from sector_metrics import align_panel, hot_sector_metrics, momentum_indicators, trend_stability, relative_strength
+
+logger = logging.getLogger('SectorRotationBacktester')
+
+
+def score_sector_analyzer(close: pd.DataFrame, volume: Optional[pd.DataFrame] = None, pool: int = 10) -> pd.Series:
+    """SectorAnalyzer.predict_next_hot_sectors的技术评分
+
+    MACD柱翻红30分、RSI位于30~50区间20分、收盘价低于布林带中轨(5日均线)15分、
+    5日均量高于区间均量15分，只保留评分大于40的行业。RSI/MACD使用sector_metrics口径。
+
+    Args:
+        close: 截至评估日的(日期 × 行业)收盘价窗口
+        volume: 同形状的成交量窗口，为空时成交量条件不成立
+        pool: 未使用，保持各预测器签名一致
+
+    Returns:
+        以行业为索引的预测评分，未入选的行业为NaN
+    """
+    aligned = align_panel(close)
+    indicators = momentum_indicators(aligned)
+    histogram = indicators['macd_histogram']
+    score = pd.Series(0.0, index=close.columns)
+    if len(aligned) > 1:
+        score += ((histogram.iloc[-1] > 0) & (histogram.iloc[-2] <= 0)) * 30
+    score += indicators['rsi'].iloc[-1].between(30, 50) * 20
+    score += (aligned.iloc[-1] < aligned.rolling(window=5).mean().iloc[-1]) * 15
+    if volume is not None:
+        volume = align_panel(volume)
+        score += (volume.tail(5).mean() > volume.mean()) * 15
+    return score.where(score > 40)
+
+
+def _hot_candidates(close: pd.DataFrame, pool: int):
+    """当前热门行业（各分析器analyze_hot_sectors按热度取前pool个）"""
+    metrics = hot_sector_metrics(close)
+    return metrics, metrics['score'].nlargest(pool).index
+
+
+def score_optimized(close: pd.DataFrame, volume: Optional[pd.DataFrame] = None, pool: int = 10) -> pd.Series:
+    """OptimizedSectorAnalyzer.predict_hot_sectors的预测20日涨幅
+
+    当前热度前pool个行业按 20日涨幅*0.2 + 趋势强度*0.1 重新排序。
+
+    Args:
+        close: 截至评估日的收盘价窗口
+        volume: 未使用
+        pool: 参与预测的热门行业数量（分析器的top_n）
+
+    Returns:
+        以行业为索引的预测20日涨幅，不在热门行业中的为NaN
+    """
+    metrics, candidates = _hot_candidates(close, pool)
+    predicted = metrics['change_rate_20d'] * 0.2 + metrics['trend_strength'] * 0.1
+    return predicted.where(predicted.index.isin(candidates))
+
+
+def score_enhanced(close: pd.DataFrame, volume: Optional[pd.DataFrame] = None, pool: int = 10) -> pd.Series:
+    """EnhancedSectorAnalyzer.predict_hot_sectors_enhanced的综合预测评分
+
+    趋势稳定性*0.3 + min(增强热度, 100)*0.3 + 信号分*0.4，增强热度为
+    原始热度*0.5 + 趋势稳定性*0.3 + 相对强度*0.2。原实现的_calculate_trading_signals
+    在最近50天上计算min(60, 50)日均线，去掉空值后只剩一行，始终返回None，
+    因此信号分恒为中性50、没有风险调整，这里按实际行为重放。
+
+    Args:
+        close: 截至评估日的收盘价窗口
+        volume: 未使用
+        pool: 参与预测的热门行业数量
+
+    Returns:
+        以行业为索引的综合预测评分，不在热门行业中的为NaN
+    """
+    metrics, candidates = _hot_candidates(close, pool)
+    aligned = align_panel(close)
+    trend_score = trend_stability(aligned)['score']
+    enhanced_hot = (metrics['score'] * 0.5 + trend_score * 0.3 +
+                    relative_strength(aligned)['score'] * 0.2)
+    technical_score = trend_score * 0.3 + enhanced_hot.clip(upper=100) * 0.3 + 50 * 0.4
+    return technical_score.where(technical_score.index.isin(candidates))
+
+
+def score_simple_rotation(close: pd.DataFrame, volume: Optional[pd.DataFrame] = None, pool: int = 10) -> pd.Series:
+    """StockAnalyzerApp._create_simple_rotation_analysis给出的下一轮动行业
+
+    取预测前3名中不在当前热度前3名里的行业，没有时取预测第一名；
+    预测使用OptimizedSectorAnalyzer的口径。
+
+    Returns:
+        以行业为索引的预测20日涨幅，非轮动目标为NaN
+    """
+    metrics, _ = _hot_candidates(close, pool)
+    current_hot = set(metrics['score'].nlargest(3).index)
+    predicted = score_optimized(close, pool=pool).dropna().sort_values(ascending=False, kind='stable')
+    next_sectors = [code for code in predicted.index[:3] if code not in current_hot]
+    if not next_sectors and len(predicted):
+        next_sectors = [predicted.index[0]]
+    return predicted.reindex(next_sectors).reindex(close.columns)
+
+
+# 预测器名称 -> 评分函数(close, volume, pool) -> 行业评分Series
+PREDICTORS: Dict[str, Callable[..., pd.Series]] = {
+    'sector_analyzer': score_sector_analyzer,
+    'optimized': score_optimized,
+    'enhanced': score_enhanced,
+    'simple_rotation': score_simple_rotation,
+}
+
+
+@dataclass
+class RotationResult:
+    """单个(预测器, 回看窗口)的回测结果"""
+    predictor: str
+    lookback: int
+    top_n: int
+    horizon: int
+    periods: pd.DataFrame = field(default_factory=pd.DataFrame)  # 每个调仓日一行
+    execution_time: float = 0.0
+
+    def summary(self) -> Dict:
+        """汇总命中率与收益
+
+        Returns:
+            包含periods、hit_rate、mean_return、mean_benchmark、mean_excess、
+            win_rate和cumulative_return的字典
+        """
+        periods = self.periods
+        picked = periods[periods['n_picks'] > 0] if not periods.empty else periods
+        total_picks = picked['n_picks'].sum() if not picked.empty else 0
+        summary = {
+            'predictor': self.predictor,
+            'lookback': self.lookback,
+            'top_n': self.top_n,
+            'horizon': self.horizon,
+            'periods': len(picked),
+            'hit_rate': picked['hits'].sum() / total_picks if total_picks else np.nan,
+            'mean_return': picked['pick_return'].mean() if total_picks else np.nan,
+            'mean_benchmark': picked['benchmark_return'].mean() if total_picks else np.nan,
+            'mean_excess': picked['excess_return'].mean() if total_picks else np.nan,
+            'win_rate': (picked['excess_return'] > 0).mean() if total_picks else np.nan,
+            'cumulative_return': (1 + picked['pick_return']).prod() - 1 if total_picks else np.nan,
+            'execution_time': self.execution_time,
+        }
+        return summary
+
+
+class SectorRotationBacktester:
+    """行业轮动回测器
+
+    每个调仓日只把截至当日的回看窗口交给预测器，取评分最高的top_n个行业，
+    与未来horizon个交易日的收益对比：跑赢当期全部行业收益中位数记为命中。
+    """
+
+    def __init__(self, close: pd.DataFrame, volume: Optional[pd.DataFrame] = None):
+        """初始化回测器
+
+        Args:
+            close: (日期 × 行业)收盘价面板，日期升序
+            volume: 同形状的成交量面板，可选
+        """
+        self.close = close.sort_index()
+        self.volume = volume.reindex(index=self.close.index, columns=self.close.columns) if volume is not None else None
+        self.results: Dict[tuple, RotationResult] = {}
+        self._forward: Dict[int, pd.DataFrame] = {}
+
+    @classmethod
+    def from_engine(cls, engine=None, days: int = 365 * 3, update: bool = False) -> 'SectorRotationBacktester':
+        """从行业截面数据引擎的面板创建回测器
+
+        Args:
+            engine: SectorDataEngine，为空时使用共享实例
+            days: 读取最近多少个自然日的面板
+            update: 是否先增量更新面板
+        """
+        if engine is None:
+            from sector_data_engine import get_sector_data_engine
+            engine = get_sector_data_engine()
+        if update:
+            engine.update(days=days)
+        return cls(engine.panel('close', days=days), engine.panel('vol', days=days))
+
+    def forward_returns(self, horizon: int) -> pd.DataFrame:
+        """每个日期之后horizon个交易日的收益率面板（按horizon缓存）"""
+        if horizon not in self._forward:
+            self._forward[horizon] = self.close.shift(-horizon) / self.close - 1
+        return self._forward[horizon]
+
+    def run(self, predictor: str = 'optimized', lookback: int = 90, top_n: int = 5,
+            horizon: int = 5, step: Optional[int] = None, pool: int = 10) -> RotationResult:
+        """回测单个预测器
+
+        Args:
+            predictor: PREDICTORS中的预测器名称
+            lookback: 每期交给预测器的历史交易日数
+            top_n: 每期持有评分最高的行业数量
+            horizon: 持有期（交易日）
+            step: 调仓间隔（交易日），默认等于horizon，即持有期不重叠
+            pool: 预测器参与排序的热门行业数量
+
+        Returns:
+            RotationResult
+        """
+        if predictor not in PREDICTORS:
+            raise ValueError(f"未知的预测器: {predictor}")
+        score_fn = PREDICTORS[predictor]
+        step = step or horizon
+        start_time = time.time()
+
+        forward = self.forward_returns(horizon)
+        close_values = self.close.to_numpy()
+        rows = []
+        for t in range(lookback - 1, len(self.close) - horizon, step):
+            window = self.close.iloc[t - lookback + 1:t + 1]
+            volume = self.volume.iloc[t - lookback + 1:t + 1] if self.volume is not None else None
+            try:
+                scores = score_fn(window, volume=volume, pool=pool)
+            except Exception as e:
+                logger.warning(f"预测器 {predictor} 在 {self.close.index[t]} 评分失败: {str(e)}")
+                continue
+            # 评估日没有行情的行业不能入选
+            scores = scores[~np.isnan(close_values[t])].dropna()
+            picks = scores.sort_values(ascending=False, kind='stable').index[:top_n]
+
+            future = forward.iloc[t]
+            median = future.median()
+            pick_returns = future.reindex(picks).dropna()
+            pick_return = pick_returns.mean() if len(pick_returns) else np.nan
+            benchmark = future.mean()
+            rows.append({
+                'date': self.close.index[t],
+                'picks': list(picks),
+                'n_picks': len(pick_returns),
+                'hits': int((pick_returns > median).sum()),
+                'pick_return': pick_return,
+                'benchmark_return': benchmark,
+                'excess_return': pick_return - benchmark,
+            })
+
+        result = RotationResult(predictor, lookback, top_n, horizon,
+                                pd.DataFrame(rows, columns=['date', 'picks', 'n_picks', 'hits', 'pick_return',
+                                                            'benchmark_return', 'excess_return']),
+                                time.time() - start_time)
+        self.results[(predictor, lookback)] = result
+        return result
+
+    def run_grid(self, predictors: Optional[Iterable[str]] = None, lookbacks: Iterable[int] = (60, 90, 120),
+                 top_n: int = 5, horizon: int = 5, step: Optional[int] = None, pool: int = 10,
+                 backend=None) -> pd.DataFrame:
+        """并行回测预测器 × 回看窗口的全部组合
+
+        Args:
+            predictors: 预测器名称列表，默认全部
+            lookbacks: 回看窗口列表
+            top_n: 每期持有行业数量
+            horizon: 持有期（交易日）
+            step: 调仓间隔（交易日）
+            pool: 预测器参与排序的热门行业数量
+            backend: backtest_executor中的执行后端，默认使用共享线程池
+
+        Returns:
+            每个组合一行的汇总表，按命中率、平均超额收益降序
+        """
+        if backend is None:
+            from backtest_executor import get_shared_backend
+            backend = get_shared_backend('thread')
+        predictors = list(predictors or PREDICTORS)
+        executor = backend.get_executor()
+        futures = {
+            executor.submit(self.run, name, lookback, top_n, horizon, step, pool): (name, lookback)
+            for name in predictors for lookback in lookbacks
+        }
+
+        summaries = []
+        for future in as_completed(futures):
+            name, lookback = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"回测 {name}(lookback={lookback}) 失败: {str(e)}")
+                continue
+            # 进程池中运行时结果不会写回本实例
+            self.results[(name, lookback)] = result
+            summaries.append(result.summary())
+
+        if not summaries:
+            return pd.DataFrame()
+        return (pd.DataFrame(summaries)
+                .sort_values(['hit_rate', 'mean_excess'], ascending=False, na_position='last')
+                .reset_index(drop=True))
@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-import talib as ta
 import time
 from typing import Dict
 from minimal_visual_stock_system import VisualStockSystem
@@ -9,6 +8,11 @@ from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 import threading
 
+from lazy_imports import lazy_import
+from memory_cache import BoundedCache, current_trade_date
+
+ta = lazy_import('talib')  # 首次计算指标时才加载
+
 class SingleStockAnalyzer:
     def __init__(self, token=None):
         # 导入必要的模块
@@ -25,14 +29,14 @@ class SingleStockAnalyzer:
         self.token = token
         
         self.jf_system = JFTradingSystem()
-        import akshare as ak
-        self.ak = ak
+        self.ak = lazy_import('akshare')  # 首次请求数据时才加载
         self._last_api_call = 0
         self._min_api_interval = 0.12  # 进一步降低API调用间隔到120ms以提高性能
         
         # 优化缓存系统
-        self._cache = {}
         self._cache_expiry = 7200  # 缓存过期时间2小时
+        self._cache = BoundedCache(max_entries=2048, max_bytes=32 * 1024 * 1024, ttl=self._cache_expiry,
+                                   name='SingleStockAnalyzer.data')
         self._cache_lock = threading.Lock()
         
         # 增加线程池大小以提高并行处理能力
@@ -40,8 +44,9 @@ class SingleStockAnalyzer:
         self._thread_pool = ThreadPoolExecutor(max_workers=cpu_count * 2)
         
         # 分析结果缓存
-        self._analysis_cache = {}
-        self._analysis_cache_expiry = 3600  # 分析结果缓存1小时
+        self._analysis_cache_expiry = 3600  # 分析结果缓存1小时，跨交易日失效
+        self._analysis_cache = BoundedCache(max_entries=256, max_bytes=32 * 1024 * 1024,
+                                            ttl=self._analysis_cache_expiry, name='SingleStockAnalyzer.analysis')
         
         # 添加性能监控
         self._performance_metrics = {
@@ -71,6 +76,10 @@ class SingleStockAnalyzer:
         self._last_api_call = time.time()
         self._performance_metrics['api_calls'] += 1
         
+    def get_cache_stats(self) -> list:
+        """数据缓存和分析结果缓存的指标"""
+        return [self._cache.stats(), self._analysis_cache.stats()]
+        
     @lru_cache(maxsize=128)
     def _get_stock_name(self, stock_code: str) -> str:
         """获取股票名称，优先使用缓存"""
@@ -88,8 +97,7 @@ class SingleStockAnalyzer:
                 if not stock_info.empty:
                     name = stock_info.iloc[0]['名称']
                     # 更新缓存
-                    with self._cache_lock:
-                        self._cache[stock_code] = (time.time(), name)
+                    self._cache.set(stock_code, name)
                     return name
                 break
             except Exception as e:
@@ -106,9 +114,9 @@ class SingleStockAnalyzer:
         cache_key = f'financial_{stock_code}'
         
         # 检查缓存有效性
-        with self._cache_lock:
-            if cache_key in self._cache and time.time() - self._cache[cache_key]['timestamp'] < self._cache_expiry:
-                return self._cache[cache_key]['data']
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
             # 获取最新财务数据
@@ -131,11 +139,7 @@ class SingleStockAnalyzer:
             }
             
             # 更新缓存
-            with self._cache_lock:
-                self._cache[cache_key] = {
-                    'data': result,
-                    'timestamp': time.time()
-                }
+            self._cache.set(cache_key, result)
             return result
             
         except Exception as e:
@@ -195,10 +199,11 @@ class SingleStockAnalyzer:
         cache_key = hash(tuple(df['Close'].tail(50).values.tolist()) + 
                          tuple(df['Volume'].tail(50).values.tolist()))
         
+        cached = self._cache.get(cache_key)
         with self._cache_lock:
-            if cache_key in self._cache and time.time() - self._cache[cache_key]['timestamp'] < self._cache_expiry:
+            if cached is not None:
                 self._performance_metrics['cache_hits'] += 1
-                return self._cache[cache_key]['result']
+                return cached
             self._performance_metrics['cache_misses'] += 1
         
         futures = []
@@ -240,11 +245,7 @@ class SingleStockAnalyzer:
             result_tuple = tuple(results)
             
             # 缓存结果
-            with self._cache_lock:
-                self._cache[cache_key] = {
-                    'result': result_tuple,
-                    'timestamp': time.time()
-                }
+            self._cache.set(cache_key, result_tuple)
             
             # 记录性能指标
             analysis_time = time.time() - start_time
@@ -272,11 +273,13 @@ class SingleStockAnalyzer:
         
         # 检查缓存
         cache_key = f"analysis_{symbol}"
-        with self._cache_lock:
-            if cache_key in self._analysis_cache and time.time() - self._analysis_cache[cache_key]['timestamp'] < self._analysis_cache_expiry:
+        trade_date = current_trade_date()
+        cached = self._analysis_cache.get(cache_key, trade_date=trade_date)
+        if cached is not None:
+            with self._cache_lock:
                 self._performance_metrics['cache_hits'] += 1
-                self.logger.info(f"从缓存获取{symbol}分析结果")
-                return self._analysis_cache[cache_key]['result']
+            self.logger.info(f"从缓存获取{symbol}分析结果")
+            return cached
         try:
             # 验证股票代码格式
             if not symbol:
@@ -416,12 +419,7 @@ class SingleStockAnalyzer:
             analysis_result = self._update_stock_name(analysis_result, symbol)
             
             # 缓存分析结果
-            cache_key = f"analysis_{symbol}"
-            with self._cache_lock:
-                self._analysis_cache[cache_key] = {
-                    'result': analysis_result,
-                    'timestamp': time.time()
-                }
+            self._analysis_cache.set(cache_key, analysis_result, trade_date=trade_date)
                 
             # 记录分析完成时间
             analysis_time = time.time() - start_time
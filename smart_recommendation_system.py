@@ -11,9 +11,12 @@ import json
 import logging
 import pandas as pd
 import numpy as np
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple, Union
 
+from record_store import RecordIndex, RecordStore, DEFAULT_HISTORY_LIMIT
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -172,15 +175,20 @@ class StockRecommendation:
 class SmartRecommendationSystem:
     """智能股票推荐管理系统"""
     
-    def __init__(self, data_path: str = "smart_recommendation_data"):
+    def __init__(self, data_path: str = "smart_recommendation_data",
+                 history_limit: int = DEFAULT_HISTORY_LIMIT):
         """初始化推荐系统
         
         Args:
             data_path: 数据存储路径
+            history_limit: 最多保留的历史推荐记录条数
         """
         self.data_path = data_path
+        self.history_limit = history_limit
         self.recommendations = {}  # 股票代码 -> StockRecommendation
-        self.recommendation_history = []  # 历史推荐记录
+        self.recommendation_history = deque(maxlen=history_limit)  # 历史推荐记录（只保留最近的）
+        self.store = None
+        self.index = RecordIndex(key='stock_code', score='score')  # 按状态、标签、评分区间索引当前推荐
         
         # 确保数据目录存在
         os.makedirs(data_path, exist_ok=True)
@@ -191,43 +199,107 @@ class SmartRecommendationSystem:
         logger.info(f"智能推荐系统初始化完成，加载了 {len(self.recommendations)} 个推荐")
     
     def _load_recommendations(self) -> None:
-        """从文件加载推荐"""
+        """从数据库加载推荐，首次运行时从旧版recommendations.json导入
+        
+        数据库无法打开时改为读写recommendations.json，此时store为None
+        """
         recommendations_file = os.path.join(self.data_path, "recommendations.json")
         
-        if os.path.exists(recommendations_file):
-            try:
-                with open(recommendations_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # 加载当前推荐
-                for stock_code, rec_data in data.get('current', {}).items():
-                    self.recommendations[stock_code] = StockRecommendation.from_dict(rec_data)
-                
-                # 加载历史推荐
-                self.recommendation_history = data.get('history', [])
-                
-                logger.info(f"成功加载 {len(self.recommendations)} 个推荐和 {len(self.recommendation_history)} 条历史记录")
+        try:
+            self.store = RecordStore(os.path.join(self.data_path, "recommendations.db"),
+                                     key_field='stock_code', history_limit=self.history_limit)
+            self.store.import_json(recommendations_file, self._recommendations_from_json)
+            
+            # 加载当前推荐
+            for rec_data in self.store.load():
+                self.recommendations[rec_data['stock_code']] = StockRecommendation.from_dict(rec_data)
+            
+            self.index.rebuild(self.recommendations.values())
             
-            except Exception as e:
-                logger.error(f"加载推荐时出错: {str(e)}")
+            # 加载历史推荐
+            self.recommendation_history.extend(self.store.history())
+            
+            logger.info(f"成功加载 {len(self.recommendations)} 个推荐和 {len(self.recommendation_history)} 条历史记录")
+        
+        except Exception as e:
+            logger.error(f"打开推荐数据库失败，改用JSON文件 {recommendations_file}: {str(e)}")
+            if self.store is not None:
+                self.store.close()
+                self.store = None
+            self.recommendations.clear()
+            self.recommendation_history.clear()
+            self._load_recommendations_json(recommendations_file)
     
-    def _save_recommendations(self) -> None:
-        """保存推荐到文件"""
-        recommendations_file = os.path.join(self.data_path, "recommendations.json")
+    def _load_recommendations_json(self, recommendations_file: str) -> None:
+        """从JSON文件加载推荐，仅在数据库不可用时使用"""
+        if not os.path.exists(recommendations_file):
+            return
+        try:
+            with open(recommendations_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            current, history, _ = self._recommendations_from_json(data)
+            for rec_data in current:
+                self.recommendations[rec_data['stock_code']] = StockRecommendation.from_dict(rec_data)
+            self.index.rebuild(self.recommendations.values())
+            self.recommendation_history.extend(history)
+            logger.info(f"成功加载 {len(self.recommendations)} 个推荐和 {len(self.recommendation_history)} 条历史记录")
+        except Exception as e:
+            logger.error(f"加载推荐时出错: {str(e)}")
+    
+    @staticmethod
+    def _recommendations_from_json(data: Dict) -> Tuple[List[Dict], List[Dict], Dict]:
+        """把旧版JSON文件内容转换为(推荐, 历史, 元数据)"""
+        current = [dict(rec_data, stock_code=code) for code, rec_data in data.get('current', {}).items()]
+        return current, data.get('history', []), {'last_update': data.get('last_update')}
+    
+    def _save_recommendations(self, stock_codes: Optional[List[str]] = None,
+                              history: Optional[List[Dict]] = None) -> None:
+        """保存推荐到数据库
         
+        Args:
+            stock_codes: 有变化的股票代码，仍在推荐中的写入，已删除的移除；None表示全量保存
+            history: 本次新增的历史记录
+        """
         try:
-            # 准备保存的数据
-            data = {
-                'current': {code: rec.to_dict() for code, rec in self.recommendations.items()},
-                'history': self.recommendation_history,
-                'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
+            meta = {'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             
-            # 保存到文件
-            with open(recommendations_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
+            # 先更新内存索引
+            if stock_codes is None:
+                self.index.rebuild(self.recommendations.values())
+            else:
+                for code in stock_codes:
+                    if code in self.recommendations:
+                        self.index.update(self.recommendations[code])
+                    else:
+                        self.index.remove(code)
+            
+            if self.store is None:
+                # 数据库不可用，整体写入JSON文件（history已追加到recommendation_history）
+                recommendations_file = os.path.join(self.data_path, "recommendations.json")
+                data = {
+                    'current': {code: rec.to_dict() for code, rec in self.recommendations.items()},
+                    'history': list(self.recommendation_history),
+                    'last_update': meta['last_update']
+                }
+                temp_file = recommendations_file + '.tmp'
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=4, default=str)
+                os.replace(temp_file, recommendations_file)
+                logger.info(f"推荐已保存到 {recommendations_file}，当前 {len(self.recommendations)} 个推荐")
+                return
+            
+            if stock_codes is None:
+                self.store.sync([rec.to_dict() for rec in self.recommendations.values()],
+                                history=history, meta=meta)
+                count = len(self.recommendations)
+            else:
+                upserts = [self.recommendations[code].to_dict() for code in stock_codes
+                           if code in self.recommendations]
+                deletes = [code for code in stock_codes if code not in self.recommendations]
+                self.store.apply(upserts=upserts, deletes=deletes, history=history, meta=meta)
+                count = len(upserts) + len(deletes)
             
-            logger.info(f"成功保存 {len(self.recommendations)} 个推荐和 {len(self.recommendation_history)} 条历史记录")
+            logger.info(f"成功保存 {count} 个推荐变化，当前 {len(self.recommendations)} 个推荐")
         
         except Exception as e:
             logger.error(f"保存推荐时出错: {str(e)}")
@@ -251,7 +323,7 @@ class SmartRecommendationSystem:
             if recommendation.score > existing_rec.score:
                 logger.info(f"更新推荐: {stock_code} - {recommendation.stock_name}, 新评分: {recommendation.score}")
                 self.recommendations[stock_code] = recommendation
-                self._save_recommendations()
+                self._save_recommendations([stock_code])
                 return True
             else:
                 logger.info(f"保留现有推荐: {stock_code}, 现有评分 {existing_rec.score} > 新评分 {recommendation.score}")
@@ -260,7 +332,7 @@ class SmartRecommendationSystem:
         # 添加新推荐
         logger.info(f"添加新推荐: {stock_code} - {recommendation.stock_name}, 评分: {recommendation.score}")
         self.recommendations[stock_code] = recommendation
-        self._save_recommendations()
+        self._save_recommendations([stock_code])
         return True
     
     def update_recommendation(self, stock_code: str, updates: Dict) -> bool:
@@ -288,7 +360,7 @@ class SmartRecommendationSystem:
         recommendation.last_update = datetime.now()
         
         logger.info(f"更新推荐: {stock_code} - {recommendation.stock_name}")
-        self._save_recommendations()
+        self._save_recommendations([stock_code])
         return True
     
     def remove_recommendation(self, stock_code: str, reason: str = "手动删除") -> bool:
@@ -318,7 +390,7 @@ class SmartRecommendationSystem:
         del self.recommendations[stock_code]
         
         logger.info(f"删除推荐: {stock_code} - {recommendation.stock_name}, 原因: {reason}")
-        self._save_recommendations()
+        self._save_recommendations([stock_code], history=[history_entry])
         return True
     
     def get_recommendation(self, stock_code: str) -> Optional[StockRecommendation]:
@@ -349,14 +421,7 @@ class SmartRecommendationSystem:
         Returns:
             评分最高的推荐列表
         """
-        # 按评分降序排序
-        sorted_recommendations = sorted(
-            self.recommendations.values(),
-            key=lambda x: x.score,
-            reverse=True
-        )
-        
-        return sorted_recommendations[:limit]
+        return self.index.top(limit)
     
     def get_recommendations_by_tag(self, tag: str) -> List[StockRecommendation]:
         """获取包含指定标签的推荐
@@ -365,12 +430,9 @@ class SmartRecommendationSystem:
             tag: 标签
             
         Returns:
-            包含指定标签的推荐列表
+            包含指定标签的推荐列表，按评分降序
         """
-        return [
-            rec for rec in self.recommendations.values()
-            if tag in rec.tags
-        ]
+        return self.index.top(tags=[tag])
     
     def update_prices(self, price_data: Dict[str, float]) -> None:
         """批量更新当前价格
@@ -378,16 +440,17 @@ class SmartRecommendationSystem:
         Args:
             price_data: 股票代码 -> 价格 的字典
         """
-        updated_count = 0
+        updated_codes = []
         
         for stock_code, price in price_data.items():
             if stock_code in self.recommendations:
                 self.recommendations[stock_code].update_price(price)
-                updated_count += 1
+                updated_codes.append(stock_code)
         
-        if updated_count > 0:
-            logger.info(f"更新了 {updated_count} 个推荐的价格")
-            self._save_recommendations()
+        if updated_codes:
+            logger.info(f"更新了 {len(updated_codes)} 个推荐的价格")
+            # 只写入价格有更新的推荐
+            self._save_recommendations(updated_codes)
     
     def clean_recommendations(self, days_threshold: int = 30) -> int:
         """清理过期的推荐
@@ -13,7 +13,7 @@ from typing import Dict, List, Optional
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QPushButton, QTableWidget, QTableWidgetItem, QComboBox,
+    QLabel, QPushButton, QTableView, QAbstractItemView, QComboBox,
     QLineEdit, QSpinBox, QDoubleSpinBox, QTextEdit, QTabWidget,
     QGroupBox, QFormLayout, QDialog, QDialogButtonBox, QMessageBox,
     QHeaderView, QSplitter, QFrame, QFileDialog, QInputDialog
@@ -28,6 +28,8 @@ from smart_recommendation_system import (
     create_recommendation,
     StockRecommendation
 )
+from gui_tasks import TaskRunner
+from table_model import ColumnarTable, RecordTableModel, TableColumn, sign_color
 
 # 配置日志
 logging.basicConfig(
@@ -37,6 +39,49 @@ logging.basicConfig(
 )
 logger = logging.getLogger('SmartRecommendationUI')
 
+RECOMMENDATION_COLUMNS = [
+    TableColumn("股票代码", lambda rec: rec.stock_code),
+    TableColumn("股票名称", lambda rec: rec.stock_name),
+    TableColumn("推荐日期", lambda rec: rec.recommendation_date, lambda date: date.strftime('%Y-%m-%d')),
+    TableColumn("评分", lambda rec: rec.score, lambda value: f"{value:.2f}"),
+    TableColumn("建议买入价", lambda rec: rec.entry_price, lambda value: f"{value:.2f}"),
+    TableColumn("目标价格", lambda rec: rec.target_price, lambda value: f"{value:.2f}"),
+    TableColumn("止损价格", lambda rec: rec.stop_loss, lambda value: f"{value:.2f}"),
+    TableColumn("当前收益率", lambda rec: rec.performance_metrics.get('current_return', 0),
+                lambda value: f"{value:.2f}%", color=sign_color),
+]
+
+HISTORY_COLUMNS = [
+    TableColumn("股票代码", 'stock_code'),
+    TableColumn("股票名称", 'stock_name'),
+    TableColumn("推荐日期", lambda rec: (rec.get('recommendation_date') or '')[0:10]),
+    TableColumn("删除日期", lambda rec: (rec.get('removal_date') or '')[0:10]),
+    TableColumn("最终收益率", lambda rec: rec.get('performance_metrics', {}).get('current_return', 0),
+                lambda value: f"{value:.2f}%", color=sign_color),
+    TableColumn("原因", 'removal_reason'),
+    TableColumn("评分", 'score', lambda value: f"{value:.2f}"),
+    TableColumn("推荐来源", 'source'),
+]
+
+# 排序选项对应的推荐表格列，均按降序排列
+SORT_COLUMNS = {"评分": 3, "收益率": 7, "添加日期": 2}
+
+
+def build_recommendation_tables(context, recommendations, history):
+    """后台任务：构建推荐和历史记录的表格数据
+
+    Args:
+        context: 任务上下文
+        recommendations: 推荐对象列表
+        history: 历史记录字典列表
+
+    Returns:
+        (推荐表格数据, 历史表格数据)
+    """
+    table = ColumnarTable(RECOMMENDATION_COLUMNS, recommendations)
+    context.check()
+    return table, ColumnarTable(HISTORY_COLUMNS, history)
+
 class AddRecommendationDialog(QDialog):
     """添加推荐对话框"""
     
@@ -157,6 +202,8 @@ class SmartRecommendationWidget(QWidget):
         try:
             print("初始化SmartRecommendationWidget...")
             super().__init__(parent)
+            self.task_runner = TaskRunner(self)
+            self._reload_pending = False
             print("获取推荐系统实例...")
             self.recommendation_system = get_recommendation_system()
             print("设置UI...")
@@ -207,7 +254,15 @@ class SmartRecommendationWidget(QWidget):
         self.clean_btn = QPushButton("清理过期")
         self.clean_btn.clicked.connect(self.clean_recommendations)
         
+        self.view_btn = QPushButton("查看")
+        self.view_btn.clicked.connect(self.view_selected_recommendation)
+        
+        self.remove_btn = QPushButton("删除")
+        self.remove_btn.clicked.connect(self.remove_selected_recommendation)
+        
         buttons_layout.addWidget(self.add_btn)
+        buttons_layout.addWidget(self.view_btn)
+        buttons_layout.addWidget(self.remove_btn)
         buttons_layout.addWidget(self.refresh_btn)
         buttons_layout.addWidget(self.generate_report_btn)
         buttons_layout.addWidget(self.clean_btn)
@@ -220,35 +275,34 @@ class SmartRecommendationWidget(QWidget):
         filter_layout.addWidget(QLabel("排序:"))
         self.sort_combo = QComboBox()
         self.sort_combo.addItems(["评分", "收益率", "添加日期"])
-        self.sort_combo.currentIndexChanged.connect(self.load_recommendations)
+        self.sort_combo.currentIndexChanged.connect(self.apply_sort)
         filter_layout.addWidget(self.sort_combo)
         
         filter_layout.addWidget(QLabel("标签:"))
         self.tag_combo = QComboBox()
         self.tag_combo.addItem("全部")
-        self.tag_combo.currentIndexChanged.connect(self.load_recommendations)
+        self.tag_combo.currentIndexChanged.connect(self.apply_filters)
         filter_layout.addWidget(self.tag_combo)
         
         filter_layout.addWidget(QLabel("状态:"))
         self.status_combo = QComboBox()
         self.status_combo.addItems(["全部", "活跃", "已达目标", "已止损"])
-        self.status_combo.currentIndexChanged.connect(self.load_recommendations)
+        self.status_combo.currentIndexChanged.connect(self.apply_filters)
         filter_layout.addWidget(self.status_combo)
         
         filter_layout.addWidget(QLabel("搜索:"))
         self.search_input = QLineEdit()
-        self.search_input.textChanged.connect(self.load_recommendations)
+        self.search_input.textChanged.connect(self.apply_filters)
         filter_layout.addWidget(self.search_input)
         
         active_layout.addLayout(filter_layout)
         
-        # 推荐表格
-        self.recommendations_table = QTableWidget(0, 9)
-        self.recommendations_table.setHorizontalHeaderLabels([
-            "股票代码", "股票名称", "推荐日期", "评分", "建议买入价", 
-            "目标价格", "止损价格", "当前收益率", "操作"
-        ])
-        self.recommendations_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # 推荐表格，双击查看详情
+        self.recommendations_model = RecordTableModel(RECOMMENDATION_COLUMNS, self)
+        self.recommendations_table = self._create_table(self.recommendations_model)
+        self.recommendations_table.doubleClicked.connect(
+            lambda index: self.view_recommendation(self.recommendations_model.record(index.row()).stock_code))
+        self.apply_sort()
         
         active_layout.addWidget(self.recommendations_table)
         
@@ -259,12 +313,9 @@ class SmartRecommendationWidget(QWidget):
         history_layout = QVBoxLayout()
         
         # 历史表格
-        self.history_table = QTableWidget(0, 8)
-        self.history_table.setHorizontalHeaderLabels([
-            "股票代码", "股票名称", "推荐日期", "删除日期", "最终收益率", 
-            "原因", "评分", "推荐来源"
-        ])
-        self.history_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.history_model = RecordTableModel(HISTORY_COLUMNS, self)
+        self.history_table = self._create_table(self.history_model)
+        self.history_table.sortByColumn(3, Qt.DescendingOrder)
         
         history_layout.addWidget(self.history_table)
         history_tab.setLayout(history_layout)
@@ -307,155 +358,94 @@ class SmartRecommendationWidget(QWidget):
         
         self.setLayout(main_layout)
     
+    def _create_table(self, model):
+        """创建绑定模型的表格，点击表头在模型内排序"""
+        table = QTableView()
+        table.setModel(model)
+        table.setSortingEnabled(True)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SingleSelection)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        return table
+    
     def load_recommendations(self):
-        print("执行load_recommendations方法...")
-        """加载推荐到表格"""
-        # 获取所有推荐
-        recommendations = self.recommendation_system.get_all_recommendations()
-        
-        # 应用过滤和排序
-        filtered_recs = self.filter_recommendations(list(recommendations.values()))
-        
-        # 清空表格
-        self.recommendations_table.setRowCount(0)
-        print(f"表格已清空，准备填充 {len(filtered_recs)} 条记录")
-        # 设置表格可见性，确保表格显示
-        self.recommendations_table.setVisible(True)
-        # 更新UI
-        QApplication.processEvents()
-        print("已清空表格，准备添加推荐数据")
-        
-        # 填充表格
-        print(f"开始填充表格，共有 {len(filtered_recs)} 个推荐要显示")
-        for i, rec in enumerate(filtered_recs):
-            self.recommendations_table.insertRow(i)
-            if i == 0: print(f"插入第一行: {rec.stock_code} {rec.stock_name}")
-            
-            self.recommendations_table.setItem(i, 0, QTableWidgetItem(rec.stock_code))
-            self.recommendations_table.setItem(i, 1, QTableWidgetItem(rec.stock_name))
-            self.recommendations_table.setItem(i, 2, QTableWidgetItem(rec.recommendation_date.strftime('%Y-%m-%d')))
-            self.recommendations_table.setItem(i, 3, QTableWidgetItem(f"{rec.score:.2f}"))
-            self.recommendations_table.setItem(i, 4, QTableWidgetItem(f"{rec.entry_price:.2f}"))
-            self.recommendations_table.setItem(i, 5, QTableWidgetItem(f"{rec.target_price:.2f}"))
-            self.recommendations_table.setItem(i, 6, QTableWidgetItem(f"{rec.stop_loss:.2f}"))
-            
-            # 当前收益率
-            current_return = rec.performance_metrics.get('current_return', 0)
-            return_item = QTableWidgetItem(f"{current_return:.2f}%")
-            if current_return > 0:
-                return_item.setForeground(QColor('green'))
-            elif current_return < 0:
-                return_item.setForeground(QColor('red'))
-            self.recommendations_table.setItem(i, 7, return_item)
-            
-            # 操作按钮
-            action_widget = QWidget()
-            action_layout = QHBoxLayout()
-            action_layout.setContentsMargins(0, 0, 0, 0)
-            
-            view_btn = QPushButton("查看")
-            view_btn.setProperty("stock_code", rec.stock_code)
-            view_btn.clicked.connect(lambda checked, code=rec.stock_code: self.view_recommendation(code))
-            
-            remove_btn = QPushButton("删除")
-            remove_btn.setProperty("stock_code", rec.stock_code)
-            remove_btn.clicked.connect(lambda checked, code=rec.stock_code: self.remove_recommendation(code))
-            
-            action_layout.addWidget(view_btn)
-            action_layout.addWidget(remove_btn)
-            action_widget.setLayout(action_layout)
-            
-            self.recommendations_table.setCellWidget(i, 8, action_widget)
-        
-        # 加载历史记录
-        self.load_history()
+        """在后台线程构建推荐和历史记录表格"""
+        if self.task_runner.is_running():
+            self._reload_pending = True
+            return
+        recommendations = list(self.recommendation_system.get_all_recommendations().values())
+        history = list(self.recommendation_system.recommendation_history)
+        print(f"开始加载 {len(recommendations)} 个推荐和 {len(history)} 条历史记录")
+        self.task_runner.start(build_recommendation_tables, recommendations, history,
+                               on_finished=self._on_tables_built,
+                               on_error=self._on_load_error)
+    
+    def _on_tables_built(self, tables):
+        """表格数据构建完成后在界面线程替换模型数据"""
+        recommendation_table, history_table = tables
+        self.recommendations_model.set_table(recommendation_table)
+        self.history_model.set_table(history_table)
+        print(f"表格已加载，显示 {self.recommendations_model.rowCount()} 个推荐")
         
         # 更新统计信息
         self.update_statistics()
         
-        # 更新标签过滤器选项
+        # 更新标签过滤器选项，已选标签不存在时筛选条件随之更新
         self.update_tag_filter()
-        
-        # 确保表格内容可见
-        QApplication.processEvents()
+        self.apply_filters()
+        self._reload_if_pending()
     
-    def filter_recommendations(self, recommendations):
-        print(f"过滤和排序 {len(recommendations)} 个推荐...")
-        """过滤和排序推荐"""
-        filtered = recommendations.copy()
-        
-        # 应用搜索过滤
+    def _on_load_error(self, message):
+        logger.error(f"加载推荐数据失败: {message}")
+        self._reload_if_pending()
+    
+    def _reload_if_pending(self):
+        if self._reload_pending:
+            self._reload_pending = False
+            self.load_recommendations()
+    
+    def apply_filters(self):
+        """按搜索、标签和状态在模型内筛选推荐"""
         search_text = self.search_input.text().lower()
-        if search_text:
-            filtered = [
-                rec for rec in filtered
-                if search_text in rec.stock_code.lower() or search_text in rec.stock_name.lower()
-            ]
-        
-        # 应用标签过滤
         selected_tag = self.tag_combo.currentText()
-        if selected_tag != "全部":
-            filtered = [rec for rec in filtered if selected_tag in rec.tags]
-        
-        # 应用状态过滤
         selected_status = self.status_combo.currentText()
-        if selected_status == "活跃":
-            filtered = [rec for rec in filtered if rec.status == "active"]
-        elif selected_status == "已达目标":
-            filtered = [
-                rec for rec in filtered 
-                if rec.performance_metrics.get('target_reached', False)
-            ]
-        elif selected_status == "已止损":
-            filtered = [
-                rec for rec in filtered 
-                if rec.performance_metrics.get('stop_loss_triggered', False)
-            ]
-        
-        # 应用排序
-        sort_option = self.sort_combo.currentText()
-        print(f"应用排序: {sort_option}, 排序前有 {len(filtered)} 个推荐")
-        if sort_option == "评分":
-            filtered.sort(key=lambda x: x.score, reverse=True)
-        elif sort_option == "收益率":
-            filtered.sort(
-                key=lambda x: x.performance_metrics.get('current_return', 0), 
-                reverse=True
-            )
-        elif sort_option == "添加日期":
-            filtered.sort(key=lambda x: x.recommendation_date, reverse=True)
         
-        print(f"过滤后的推荐数: {len(filtered)}")
-        return filtered
+        def matches(rec):
+            if search_text and search_text not in rec.stock_code.lower() and search_text not in rec.stock_name.lower():
+                return False
+            if selected_tag and selected_tag != "全部" and selected_tag not in rec.tags:
+                return False
+            if selected_status == "活跃":
+                return rec.status == "active"
+            if selected_status == "已达目标":
+                return rec.performance_metrics.get('target_reached', False)
+            if selected_status == "已止损":
+                return rec.performance_metrics.get('stop_loss_triggered', False)
+            return True
+        
+        self.recommendations_model.set_filter(matches)
     
-    def load_history(self):
-        """加载历史记录"""
-        history = self.recommendation_system.recommendation_history
-        
-        # 清空表格
-        self.history_table.setRowCount(0)
-        
-        # 填充表格
-        for i, rec in enumerate(history):
-            self.history_table.insertRow(i)
-            
-            self.history_table.setItem(i, 0, QTableWidgetItem(rec['stock_code']))
-            self.history_table.setItem(i, 1, QTableWidgetItem(rec['stock_name']))
-            self.history_table.setItem(i, 2, QTableWidgetItem(rec['recommendation_date'][0:10]))
-            self.history_table.setItem(i, 3, QTableWidgetItem(rec.get('removal_date', '')[0:10]))
-            
-            # 最终收益率
-            final_return = rec.get('performance_metrics', {}).get('current_return', 0)
-            return_item = QTableWidgetItem(f"{final_return:.2f}%")
-            if final_return > 0:
-                return_item.setForeground(QColor('green'))
-            elif final_return < 0:
-                return_item.setForeground(QColor('red'))
-            self.history_table.setItem(i, 4, return_item)
-            
-            self.history_table.setItem(i, 5, QTableWidgetItem(rec.get('removal_reason', '')))
-            self.history_table.setItem(i, 6, QTableWidgetItem(f"{rec['score']:.2f}"))
-            self.history_table.setItem(i, 7, QTableWidgetItem(rec['source']))
+    def apply_sort(self):
+        """按排序选项在模型内降序排列"""
+        column = SORT_COLUMNS.get(self.sort_combo.currentText(), SORT_COLUMNS["评分"])
+        self.recommendations_table.sortByColumn(column, Qt.DescendingOrder)
+    
+    def _selected_stock_code(self):
+        rows = self.recommendations_table.selectionModel().selectedRows()
+        if not rows:
+            QMessageBox.information(self, "提示", "请先选择一个推荐")
+            return None
+        return self.recommendations_model.record(rows[0].row()).stock_code
+    
+    def view_selected_recommendation(self):
+        stock_code = self._selected_stock_code()
+        if stock_code:
+            self.view_recommendation(stock_code)
+    
+    def remove_selected_recommendation(self):
+        stock_code = self._selected_stock_code()
+        if stock_code:
+            self.remove_recommendation(stock_code)
     
     def update_statistics(self):
         """更新统计信息"""
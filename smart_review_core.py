@@ -7,12 +7,47 @@ from datetime import datetime, timedelta
 import os
 import json
 import logging
+import threading
 from typing import Dict, List, Tuple, Union, Optional
 from collections import defaultdict
+from concurrent.futures import as_completed
 
 from visual_stock_system import VisualStockSystem
 from china_stock_provider import ChinaStockProvider
 from lazy_analyzer import LazyStockAnalyzer
+from record_store import RecordIndex, RecordStore
+from backtest_executor import get_shared_backend
+
+
+def _last_market_close(now):
+    """最近一次收盘时间，交易时段进行中返回None
+    
+    按工作日9:30-15:00估算；节假日按交易日处理，只会多获取一次行情，不会漏掉新数据
+    """
+    open_time = now.replace(hour=9, minute=30, second=0, microsecond=0)
+    close_time = now.replace(hour=15, minute=0, second=0, microsecond=0)
+    if now.weekday() < 5 and open_time <= now < close_time:
+        return None
+    if now.weekday() >= 5 or now < open_time:
+        close_time -= timedelta(days=1)
+        while close_time.weekday() >= 5:
+            close_time -= timedelta(days=1)
+    return close_time
+
+
+def _analysis_is_current(stock, now):
+    """上次分析之后是否没有新收盘的行情"""
+    analyzed_at = stock.get('analyzed_at')
+    last_close = _last_market_close(now)
+    if not analyzed_at or last_close is None:
+        return False
+    return analyzed_at >= last_close.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _bars_signature(df):
+    """行情签名：K线数量、最后一根K线的日期、收盘价和成交量"""
+    last = df.iloc[-1]
+    return '|'.join(str(v) for v in (len(df), df.index[-1], last.get('close'), last.get('volume')))
 
 
 class SmartReviewCore:
@@ -31,6 +66,7 @@ class SmartReviewCore:
         self.token = token
         self.data_dir = data_dir
         self.review_pool_file = os.path.join(data_dir, 'smart_review_pool.json')
+        self.review_pool_db = os.path.join(data_dir, 'smart_review_pool.db')
         self.performance_file = os.path.join(data_dir, 'smart_performance.json')
         self.model_dir = os.path.join(data_dir, 'models')
         
@@ -44,6 +80,8 @@ class SmartReviewCore:
         # 初始化系统组件
         self.visual_system = VisualStockSystem(token, headless=True)
         self.data_provider = ChinaStockProvider(token)
+        # 数据提供器的行情缓存和接口限速状态不是线程安全的，线程池中每个线程使用自己的VisualStockSystem
+        self._thread_state = threading.local()
         self.lazy_mode = lazy_mode
         # 根据模式选择分析器初始化方式
         if self.lazy_mode:
@@ -55,9 +93,17 @@ class SmartReviewCore:
             # 全量计算模式
             self.analyzer = LazyStockAnalyzer(required_indicators='all')
             self.logger.info("LazyStockAnalyzer初始化为全量计算模式")
+        # analyzer初始化后只读，analyze()在数据副本上计算，可以在多个线程中共享
         
         # 加载复盘池和绩效数据
         self.review_pool = self._load_review_pool()
+        # 按状态、标签、评分区间索引复盘池，保存时随变化的股票更新
+        self.pool_index = RecordIndex(key='symbol', score='smart_score')
+        try:
+            self.pool_index.rebuild(self.review_pool['stocks'])
+        except Exception as e:
+            # 个别记录格式异常时不影响启动，索引为空时查询退化为无结果，保存时会重新登记
+            self.logger.error(f"建立复盘池索引失败: {str(e)}")
         self.performance_data = self._load_performance_data()
         
         self.logger.info("智能复盘核心初始化完成")
@@ -86,19 +132,51 @@ class SmartReviewCore:
         self.logger.addHandler(console_handler)
     
     def _load_review_pool(self):
-        """加载复盘股票池"""
+        """加载复盘股票池
+
+        复盘池保存在SQLite数据库中（每只股票一行），首次运行时从旧版JSON文件导入；
+        数据库无法打开时改为读写JSON文件，此时pool_store为None
+        """
+        self.pool_store = None
+        try:
+            self.pool_store = RecordStore(self.review_pool_db, key_field='symbol',
+                                          score_field='smart_score')
+            self.pool_store.import_json(self.review_pool_file, self._review_pool_from_json)
+            pool = self._create_default_review_pool()
+            for name in ('created_at', 'last_updated', 'version'):
+                pool[name] = self.pool_store.get_meta(name, pool[name])
+            pool['stocks'] = self.pool_store.load()
+            if pool['stocks']:
+                self.logger.info(f"成功加载复盘股票池，包含 {len(pool['stocks'])} 只股票")
+            else:
+                self.logger.info("复盘股票池为空，创建新的复盘池")
+            return pool
+        except Exception as e:
+            self.logger.error(f"打开复盘池数据库失败，改用JSON文件 {self.review_pool_file}: {str(e)}")
+            if self.pool_store is not None:
+                self.pool_store.close()
+                self.pool_store = None
+            return self._load_review_pool_json()
+
+    def _load_review_pool_json(self):
+        """从JSON文件加载复盘池，仅在数据库不可用时使用"""
         if os.path.exists(self.review_pool_file):
             try:
                 with open(self.review_pool_file, 'r', encoding='utf-8') as f:
                     pool = json.load(f)
-                self.logger.info(f"成功加载复盘股票池，包含 {len(pool.get('stocks', []))} 只股票")
+                pool['stocks'] = [s for s in pool.get('stocks', []) if s.get('symbol')]
+                self.logger.info(f"成功加载复盘股票池，包含 {len(pool['stocks'])} 只股票")
                 return pool
             except Exception as e:
                 self.logger.error(f"加载复盘股票池失败: {str(e)}")
-                return self._create_default_review_pool()
-        else:
-            self.logger.info("复盘股票池文件不存在，创建新的复盘池")
-            return self._create_default_review_pool()
+        return self._create_default_review_pool()
+
+    @staticmethod
+    def _review_pool_from_json(pool):
+        """把旧版JSON复盘池转换为(记录, 历史, 元数据)"""
+        stocks = [s for s in pool.get('stocks', []) if s.get('symbol')]
+        meta = {name: pool[name] for name in ('created_at', 'last_updated', 'version') if name in pool}
+        return stocks, [], meta
     
     def _create_default_review_pool(self):
         """创建默认复盘池结构"""
@@ -109,15 +187,39 @@ class SmartReviewCore:
             'version': '2.0'
         }
     
-    def _save_review_pool(self):
-        """保存复盘股票池"""
+    def _save_review_pool(self, symbols=None):
+        """保存复盘股票池
+        
+        Args:
+            symbols: 有变化的股票代码，只写入这些行；None表示全量保存
+        """
         try:
             # 更新最后更新时间
             self.review_pool['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            meta = {name: self.review_pool.get(name) for name in ('created_at', 'last_updated', 'version')}
+            
+            if self.pool_store is None:
+                # 数据库不可用，整体写入JSON文件
+                self.pool_index.rebuild(self.review_pool['stocks'])
+                temp_file = self.review_pool_file + '.tmp'
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.review_pool, f, ensure_ascii=False, indent=4, default=str)
+                os.replace(temp_file, self.review_pool_file)
+                self.logger.info(f"复盘股票池已保存到 {self.review_pool_file}")
+                return True
             
-            with open(self.review_pool_file, 'w', encoding='utf-8') as f:
-                json.dump(self.review_pool, f, ensure_ascii=False, indent=4)
-            self.logger.info(f"复盘股票池已保存到 {self.review_pool_file}")
+            if symbols is None:
+                self.pool_index.rebuild(self.review_pool['stocks'])
+                self.pool_store.sync(self.review_pool['stocks'], meta=meta)
+                count = len(self.review_pool['stocks'])
+            else:
+                symbols = set(symbols)
+                changed = [s for s in self.review_pool['stocks'] if s['symbol'] in symbols]
+                for stock in changed:
+                    self.pool_index.update(stock)
+                self.pool_store.apply(upserts=changed, meta=meta)
+                count = len(changed)
+            self.logger.info(f"复盘股票池已保存到 {self.review_pool_db}，写入 {count} 只股票")
             return True
         except Exception as e:
             self.logger.error(f"保存复盘股票池失败: {str(e)}")
@@ -235,7 +337,7 @@ class SmartReviewCore:
                 self.logger.info(f"添加新股票 {stock_entry['name']}({stock_entry['symbol']}) 到复盘池")
             
             # 保存复盘池
-            self._save_review_pool()
+            self._save_review_pool([stock_entry['symbol']])
             return True
             
         except Exception as e:
@@ -310,118 +412,195 @@ class SmartReviewCore:
             self.logger.error(f"计算智能评分时出错: {str(e)}")
             return 50  # 出错返回中等分数
     
-    def analyze_all_stocks_in_pool(self):
+    def analyze_all_stocks_in_pool(self, incremental=True, backend=None):
         """分析复盘池中的所有股票
         
+        行情获取和指标计算通过共享线程池并发执行，每只股票分析完成后立即单独保存，
+        中途中断后重新运行只需分析剩余的股票。复盘池的修改和保存只在调用线程中进行，
+        工作线程只获取行情(每个线程使用自己的VisualStockSystem)并计算指标。
+        
+        Args:
+            incremental: 是否跳过上次分析后行情没有变化的股票
+            backend: backtest_executor中的执行后端，默认使用共享线程池
+            
         Returns:
             分析结果摘要
         """
         results = {
             'success_count': 0,
             'fail_count': 0,
+            'skipped_count': 0,
             'improved_count': 0,
             'declined_count': 0,
             'stocks': []
         }
         
-        today = datetime.now().strftime('%Y-%m-%d')
+        now = datetime.now()
+        stocks = list(self.review_pool['stocks'])
+        pending = []
+        for stock in stocks:
+            # 上次分析之后没有新收盘的行情，不需要重新获取数据
+            if incremental and _analysis_is_current(stock, now):
+                results['skipped_count'] += 1
+                results['stocks'].append(self._analysis_summary(stock, 0))
+            else:
+                pending.append(stock)
         
-        for i, stock in enumerate(self.review_pool['stocks']):
-            try:
-                symbol = stock['symbol']
-                self.logger.info(f"分析股票 {stock['name']}({symbol})")
-                
-                # 获取股票数据
-                df = self.visual_system.get_stock_data(symbol)
-                if df is None or len(df) < 20:
-                    self.logger.warning(f"无法获取足够的股票数据: {symbol}")
+        if pending:
+            if backend is None:
+                backend = get_shared_backend('thread')
+            executor = backend.get_executor()
+            futures = {
+                executor.submit(self._fetch_and_analyze, stock['symbol'],
+                                stock.get('analysis', {}).get('bars_signature') if incremental else None): stock
+                for stock in pending
+            }
+            for future in as_completed(futures):
+                stock = futures[future]
+                try:
+                    outcome = future.result()
+                    if outcome is None:
+                        results['fail_count'] += 1
+                        continue
+                    if outcome.get('unchanged'):
+                        # 行情与上次分析时相同，只记录检查时间
+                        stock['last_analyzed'] = now.strftime('%Y-%m-%d')
+                        stock['analyzed_at'] = now.strftime('%Y-%m-%d %H:%M:%S')
+                        self._save_review_pool([stock['symbol']])
+                        results['skipped_count'] += 1
+                        results['stocks'].append(self._analysis_summary(stock, 0))
+                        continue
+                    
+                    previous_score = stock.get('smart_score', 50)
+                    new_score = self._apply_analysis(stock, outcome, now)
+                    self._save_review_pool([stock['symbol']])
+                    
+                    # 记录分数变化
+                    if new_score > previous_score:
+                        results['improved_count'] += 1
+                    elif new_score < previous_score:
+                        results['declined_count'] += 1
+                    results['stocks'].append(self._analysis_summary(stock, new_score - previous_score))
+                    results['success_count'] += 1
+                    
+                except Exception as e:
+                    self.logger.error(f"分析股票 {stock['symbol']} 时出错: {str(e)}")
                     results['fail_count'] += 1
-                    continue
-                
-                # 使用LazyStockAnalyzer进行分析
-                analysis = self.analyzer.analyze(df)
-                
-                # 保存前一次的智能评分
-                previous_score = stock.get('smart_score', 50)
-                
-                # 更新股票分析结果
-                stock_info = {
-                    'symbol': symbol,
-                    'name': stock['name'],
-                    'trend': 'uptrend' if analysis.get('trend_direction', 0) > 0 else 'downtrend' if analysis.get('trend_direction', 0) < 0 else 'sideways',
-                    'volume_ratio': analysis.get('volume_ratio', 1.0),
-                    'macd_hist': analysis.get('macd_hist', 0),
-                    'rsi': analysis.get('rsi', 50)
-                }
-                
-                # 根据分析结果生成推荐级别
-                if stock_info['trend'] == 'uptrend' and stock_info['volume_ratio'] > 1.5 and stock_info['macd_hist'] > 0:
-                    stock_info['recommendation'] = '强烈推荐买入'
-                elif stock_info['trend'] == 'uptrend' and stock_info['volume_ratio'] > 1.2:
-                    stock_info['recommendation'] = '建议买入'
-                elif stock_info['trend'] == 'downtrend' and stock_info['volume_ratio'] > 1.5 and stock_info['macd_hist'] < 0:
-                    stock_info['recommendation'] = '强烈建议卖出'
-                elif stock_info['trend'] == 'downtrend':
-                    stock_info['recommendation'] = '建议卖出'
-                else:
-                    stock_info['recommendation'] = '观望'
-                
-                # 计算新的智能评分
-                new_score = self._calculate_smart_score(stock_info)
-                stock_info['smart_score'] = new_score
-                
-                # 更新分析数据
-                self.review_pool['stocks'][i]['analysis'] = {
-                    'trend': stock_info['trend'],
-                    'volume_ratio': stock_info['volume_ratio'],
-                    'macd_hist': stock_info['macd_hist'],
-                    'rsi': stock_info['rsi'],
-                    'recommendation': stock_info['recommendation'],
-                    'last_price': float(df.iloc[-1]['close']) if 'close' in df.columns else None,
-                    'last_date': df.index[-1].strftime('%Y-%m-%d') if hasattr(df.index[-1], 'strftime') else str(df.index[-1]),
-                    'indicators': {k: v for k, v in analysis.items() if k not in ['date', 'open', 'high', 'low', 'close', 'volume']}
-                }
-                
-                # 更新智能评分和最后分析日期
-                self.review_pool['stocks'][i]['smart_score'] = new_score
-                self.review_pool['stocks'][i]['last_analyzed'] = today
-                
-                # 记录分数变化
-                if new_score > previous_score:
-                    results['improved_count'] += 1
-                    self.review_pool['stocks'][i]['score_trend'] = 'up'
-                elif new_score < previous_score:
-                    results['declined_count'] += 1
-                    self.review_pool['stocks'][i]['score_trend'] = 'down'
-                else:
-                    self.review_pool['stocks'][i]['score_trend'] = 'unchanged'
-                
-                # 添加到结果
-                results['stocks'].append({
-                    'symbol': symbol,
-                    'name': stock['name'],
-                    'recommendation': stock_info['recommendation'],
-                    'smart_score': new_score,
-                    'score_change': new_score - previous_score
-                })
-                
-                results['success_count'] += 1
-                
-            except Exception as e:
-                self.logger.error(f"分析股票 {stock['symbol']} 时出错: {str(e)}")
-                results['fail_count'] += 1
-        
-        # 保存更新后的复盘池
-        self._save_review_pool()
         
         # 对分析结果排序
         results['stocks'] = sorted(results['stocks'], key=lambda x: x['smart_score'], reverse=True)
         
         self.logger.info(f"分析完成，成功: {results['success_count']}，失败: {results['fail_count']}，" +
+                        f"跳过: {results['skipped_count']}，" +
                         f"上升: {results['improved_count']}，下降: {results['declined_count']}")
         
         return results
     
+    def _fetch_and_analyze(self, symbol, previous_signature=None):
+        """获取一只股票的行情并计算指标，在线程池中执行
+        
+        Args:
+            symbol: 股票代码
+            previous_signature: 上次分析时的行情签名，相同时不再计算指标
+            
+        Returns:
+            分析结果字典，行情未变化时为{'unchanged': True}，数据不足时为None
+        """
+        self.logger.info(f"分析股票 {symbol}")
+        df = self._worker_visual_system().get_stock_data(symbol)
+        if df is None or len(df) < 20:
+            self.logger.warning(f"无法获取足够的股票数据: {symbol}")
+            return None
+        
+        signature = _bars_signature(df)
+        if previous_signature is not None and signature == previous_signature:
+            return {'unchanged': True}
+        
+        return {
+            'analysis': self.analyzer.analyze(df),
+            'signature': signature,
+            'last_price': float(df.iloc[-1]['close']) if 'close' in df.columns else None,
+            'last_date': df.index[-1].strftime('%Y-%m-%d') if hasattr(df.index[-1], 'strftime') else str(df.index[-1])
+        }
+    
+    def _worker_visual_system(self):
+        """当前线程专用的VisualStockSystem，首次使用时创建"""
+        system = getattr(self._thread_state, 'visual_system', None)
+        if system is None:
+            if threading.current_thread() is threading.main_thread():
+                system = self.visual_system
+            else:
+                system = VisualStockSystem(self.token, headless=True)
+            self._thread_state.visual_system = system
+        return system
+    
+    def _apply_analysis(self, stock, outcome, now):
+        """把分析结果写入复盘池中的股票记录
+        
+        Returns:
+            新的智能评分
+        """
+        analysis = outcome['analysis']
+        stock_info = {
+            'symbol': stock['symbol'],
+            'name': stock['name'],
+            'trend': 'uptrend' if analysis.get('trend_direction', 0) > 0 else 'downtrend' if analysis.get('trend_direction', 0) < 0 else 'sideways',
+            'volume_ratio': analysis.get('volume_ratio', 1.0),
+            'macd_hist': analysis.get('macd_hist', 0),
+            'rsi': analysis.get('rsi', 50)
+        }
+        
+        # 根据分析结果生成推荐级别
+        if stock_info['trend'] == 'uptrend' and stock_info['volume_ratio'] > 1.5 and stock_info['macd_hist'] > 0:
+            stock_info['recommendation'] = '强烈推荐买入'
+        elif stock_info['trend'] == 'uptrend' and stock_info['volume_ratio'] > 1.2:
+            stock_info['recommendation'] = '建议买入'
+        elif stock_info['trend'] == 'downtrend' and stock_info['volume_ratio'] > 1.5 and stock_info['macd_hist'] < 0:
+            stock_info['recommendation'] = '强烈建议卖出'
+        elif stock_info['trend'] == 'downtrend':
+            stock_info['recommendation'] = '建议卖出'
+        else:
+            stock_info['recommendation'] = '观望'
+        
+        previous_score = stock.get('smart_score', 50)
+        new_score = self._calculate_smart_score(stock_info)
+        
+        # 更新分析数据
+        stock['analysis'] = {
+            'trend': stock_info['trend'],
+            'volume_ratio': stock_info['volume_ratio'],
+            'macd_hist': stock_info['macd_hist'],
+            'rsi': stock_info['rsi'],
+            'recommendation': stock_info['recommendation'],
+            'last_price': outcome['last_price'],
+            'last_date': outcome['last_date'],
+            'bars_signature': outcome['signature'],
+            'indicators': {k: v for k, v in analysis.items() if k not in ['date', 'open', 'high', 'low', 'close', 'volume']}
+        }
+        
+        # 更新智能评分和最后分析时间
+        stock['smart_score'] = new_score
+        stock['last_analyzed'] = now.strftime('%Y-%m-%d')
+        stock['analyzed_at'] = now.strftime('%Y-%m-%d %H:%M:%S')
+        if new_score > previous_score:
+            stock['score_trend'] = 'up'
+        elif new_score < previous_score:
+            stock['score_trend'] = 'down'
+        else:
+            stock['score_trend'] = 'unchanged'
+        return new_score
+    
+    @staticmethod
+    def _analysis_summary(stock, score_change):
+        """分析结果摘要中的一行"""
+        return {
+            'symbol': stock['symbol'],
+            'name': stock['name'],
+            'recommendation': stock.get('analysis', {}).get('recommendation', '观望'),
+            'smart_score': stock.get('smart_score', 0),
+            'score_change': score_change
+        }
+    
     def get_stock_from_pool(self, symbol=None, status=None, min_score=None, max_count=None):
         """从复盘池获取股票
         
@@ -435,26 +614,16 @@ class SmartReviewCore:
             符合条件的股票列表
         """
         try:
-            # 应用过滤条件
-            filtered_stocks = self.review_pool['stocks']
-            
             if symbol:
-                filtered_stocks = [s for s in filtered_stocks if s['symbol'] == symbol]
-            
-            if status:
-                filtered_stocks = [s for s in filtered_stocks if s['status'] == status]
-            
-            if min_score is not None:
-                filtered_stocks = [s for s in filtered_stocks if s.get('smart_score', 0) >= min_score]
+                stock = self.pool_index.get(symbol)
+                if stock is None or (status and stock['status'] != status):
+                    return []
+                if min_score is not None and stock.get('smart_score', 0) < min_score:
+                    return []
+                return [stock]
             
-            # 按分数排序
-            filtered_stocks = sorted(filtered_stocks, key=lambda x: x.get('smart_score', 0), reverse=True)
-            
-            # 限制返回数量
-            if max_count is not None:
-                filtered_stocks = filtered_stocks[:max_count]
-            
-            return filtered_stocks
+            # 通过索引过滤并按分数取前max_count只
+            return self.pool_index.top(max_count, status=status or None, min_score=min_score)
             
         except Exception as e:
             self.logger.error(f"从复盘池获取股票时出错: {str(e)}")
@@ -534,7 +703,7 @@ class SmartReviewCore:
                     break
             
             if updated:
-                self._save_review_pool()
+                self._save_review_pool([symbol])
                 return True
             else:
                 self.logger.warning(f"未找到股票 {symbol}")
@@ -659,31 +828,23 @@ class SmartReviewCore:
         
         return sorted(trades, key=lambda x: x['sell_date'], reverse=True)
     
-    def get_top_recommendations(self, count=10, min_score=70):
+    def get_top_recommendations(self, count=10, min_score=70, refresh=False):
         """获取顶级推荐股票
         
         Args:
             count: 返回数量
             min_score: 最低分数要求
+            refresh: 是否先重新分析复盘池中的所有股票，默认直接使用最近一次分析结果
             
         Returns:
             推荐股票列表
         """
         try:
-            # 分析所有股票
-            self.analyze_all_stocks_in_pool()
-            
-            # 获取观察中的股票
-            watching_stocks = [s for s in self.review_pool['stocks'] if s['status'] == 'watching']
+            if refresh:
+                self.analyze_all_stocks_in_pool()
             
-            # 按智能评分排序
-            sorted_stocks = sorted(watching_stocks, key=lambda x: x.get('smart_score', 0), reverse=True)
-            
-            # 过滤掉低于最低分数的股票
-            filtered_stocks = [s for s in sorted_stocks if s.get('smart_score', 0) >= min_score]
-            
-            # 限制返回数量
-            top_stocks = filtered_stocks[:count]
+            # 观察中且达到最低分数的股票，按智能评分取前count只
+            top_stocks = self.pool_index.top(count, status='watching', min_score=min_score)
             
             return [
                 {
@@ -715,18 +876,10 @@ class SmartReviewCore:
             criteria = {}
         
         try:
-            # 应用过滤条件
-            stocks = self.review_pool['stocks']
-            
-            # 状态过滤
-            if 'status' in criteria:
-                stocks = [s for s in stocks if s['status'] == criteria['status']]
-            
-            # 分数范围过滤
-            if 'min_score' in criteria:
-                stocks = [s for s in stocks if s.get('smart_score', 0) >= criteria['min_score']]
-            if 'max_score' in criteria:
-                stocks = [s for s in stocks if s.get('smart_score', 0) <= criteria['max_score']]
+            # 状态、标签和分数范围通过索引过滤，结果已按智能评分排序
+            stocks = self.pool_index.top(status=criteria.get('status'), tags=criteria.get('tags'),
+                                         min_score=criteria.get('min_score'),
+                                         max_score=criteria.get('max_score'))
             
             # 趋势过滤
             if 'trend' in criteria:
@@ -747,10 +900,6 @@ class SmartReviewCore:
             if 'min_volume_ratio' in criteria:
                 stocks = [s for s in stocks if s.get('analysis', {}).get('volume_ratio', 0) >= criteria['min_volume_ratio']]
             
-            # 标签过滤
-            if 'tags' in criteria:
-                stocks = [s for s in stocks if any(tag in s.get('tags', []) for tag in criteria['tags'])]
-            
             # 推荐级别过滤
             if 'recommendation' in criteria:
                 stocks = [s for s in stocks if s.get('analysis', {}).get('recommendation') == criteria['recommendation']]
@@ -762,8 +911,7 @@ class SmartReviewCore:
             if 'added_before' in criteria:
                 stocks = [s for s in stocks if s.get('date_added', '') <= criteria['added_before']]
             
-            # 按智能评分排序
-            return sorted(stocks, key=lambda x: x.get('smart_score', 0), reverse=True)
+            return stocks
             
         except Exception as e:
             self.logger.error(f"智能过滤股票时出错: {str(e)}")
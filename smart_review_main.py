@@ -309,7 +309,8 @@ def main():
             
             recommendations = review_core.get_top_recommendations(
                 count=args.count,
-                min_score=args.min_score
+                min_score=args.min_score,
+                refresh=True
             )
             
             if not recommendations:
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动性能基准
+离线测量各顶层模块的冷启动导入耗时、界面首个窗口出现的时间、hot_sector_cli得到首个结果的时间
+和峰值内存，结果输出为JSON便于跨版本比较。每项测量在独立的新进程中进行；行业数据来自录制的
+离线样本（--record从在线提供器录制），没有样本时使用固定种子生成的样本，不访问网络。
+
+用法:
+    python startup_benchmark.py --output benchmark_results.json
+    python startup_benchmark.py --record test_cache/benchmark_sectors.pkl
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import pickle
+import platform
+import argparse
+import importlib
+import subprocess
+import contextlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 导入耗时测量的默认模块
+DEFAULT_IMPORT_MODULES = ('stock_analyzer_app', 'desktop_app', 'hot_sector_cli', 'single_stock_analyzer',
+                          'sector_analyzer', 'optimized_sector_analyzer', 'visual_stock_system', 'jf_trading_system')
+
+# 启动路径上不应加载的重量级库
+HEAVY_MODULES = ('talib', 'tushare', 'akshare', 'matplotlib', 'plotly')
+
+# 测量首个窗口的模块及其主窗口类
+WINDOW_TARGETS = {'stock_analyzer_app': 'StockAnalyzerApp', 'desktop_app': 'MainWindow'}
+
+# 默认离线样本路径，不存在时使用生成的样本
+DEFAULT_FIXTURE = os.path.join('test_cache', 'benchmark_sectors.pkl')
+
+# 子进程输出结果的行前缀
+RESULT_MARKER = 'BENCHMARK_RESULT '
+
+# 大盘指数，优化版分析器计算市场概况时使用
+MARKET_INDICES = ('000001.SH', '399001.SZ')
+
+_IMPORT_LINE = re.compile(r'^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|\s*(.+)$')
+
+
+def peak_rss_mb() -> float:
+    """当前进程的峰值常驻内存(MB)"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS以字节为单位，Linux以KB为单位
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def import_profile(module: str, timeout: float = 120) -> Tuple[int, Dict[str, float], str]:
+    """在新进程中以-X importtime导入模块
+
+    Returns:
+        (返回码, {模块名: 累计导入耗时(秒)}, 标准错误输出)
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=ROOT, capture_output=True, text=True, timeout=timeout)
+    timings = {}
+    for line in proc.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            timings[match.group(3).strip()] = int(match.group(2)) / 1e6
+    return proc.returncode, timings, proc.stderr
+
+
+def _failure(stderr: str) -> Dict:
+    """将子进程失败归类为缺少依赖（skipped）或出错（error）"""
+    missing = re.search(r"No module named '([^']+)'", stderr)
+    if missing:
+        return {'status': 'skipped', 'reason': f"缺少依赖 {missing.group(1)}"}
+    lines = [line for line in stderr.strip().splitlines() if line.strip()]
+    return {'status': 'error', 'error': lines[-1] if lines else '未知错误'}
+
+
+# ---------- 离线样本 ----------
+
+class FixtureSectorProvider:
+    """回放离线样本的行业数据提供器，接口与行业数据提供器一致"""
+
+    def __init__(self, sectors: List[Dict], histories: Dict, snapshot=None):
+        self.sectors = sectors
+        self.histories = histories
+        self.snapshot = snapshot
+
+    @classmethod
+    def synthetic(cls, n_industries: int = 30, n_concepts: int = 60, days: int = 120,
+                  seed: int = 0) -> 'FixtureSectorProvider':
+        """按固定种子生成申万行业、概念板块和大盘指数的日线样本"""
+        import numpy as np
+        import pandas as pd
+
+        rng = np.random.default_rng(seed)
+        dates = pd.bdate_range(end='2024-06-28', periods=days)
+        sectors = [{'code': f'8010{i:02d}.SI', 'name': f'行业{i}', 'type': 'SW',
+                    'description': f'申万行业-行业{i}'} for i in range(n_industries)]
+        sectors += [{'code': f'BK{i:04d}', 'name': f'概念{i}', 'type': 'CN',
+                     'description': f'概念板块-概念{i}', 'lazy': True} for i in range(n_concepts)]
+
+        histories = {}
+        for code in [s['code'] for s in sectors] + list(MARKET_INDICES):
+            close = 1000 * np.exp(np.cumsum(rng.normal(0.0005, 0.015, days)))
+            open_ = close * (1 + rng.normal(0, 0.004, days))
+            histories[code] = pd.DataFrame({
+                '开盘': open_,
+                '收盘': close,
+                '最高': np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.005, days))),
+                '最低': np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.005, days))),
+                '成交量': rng.uniform(1e6, 1e7, days),
+            }, index=dates)
+
+        concepts = [s['code'] for s in sectors if s['type'] == 'CN']
+        snapshot = pd.DataFrame({'change_pct': [histories[c]['收盘'].pct_change().iloc[-1] * 100 for c in concepts],
+                                 'amount': rng.uniform(1e8, 1e10, len(concepts))}, index=concepts)
+        return cls(sectors, histories, snapshot)
+
+    @classmethod
+    def record(cls, provider, path: str, max_sectors: int = 90, days: int = 120) -> 'FixtureSectorProvider':
+        """从在线提供器录制行业列表、历史数据和截面快照并保存
+
+        Args:
+            provider: 行业数据提供器
+            path: 样本保存路径
+            max_sectors: 最多录制的行业数量
+            days: 录制的历史天数
+        """
+        sectors = provider.get_sector_list()[:max_sectors]
+        histories = {}
+        for code in [s['code'] for s in sectors] + list(MARKET_INDICES):
+            df = provider.get_sector_history(code, days=days)
+            if df is not None and not df.empty:
+                histories[code] = df
+        snapshot = provider.get_sector_snapshot() if hasattr(provider, 'get_sector_snapshot') else None
+        fixture = cls(sectors, histories, snapshot)
+        fixture.save(path)
+        return fixture
+
+    @classmethod
+    def load(cls, path: str) -> 'FixtureSectorProvider':
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        return cls(data['sectors'], data['histories'], data.get('snapshot'))
+
+    @classmethod
+    def from_path(cls, path: Optional[str]) -> 'FixtureSectorProvider':
+        """样本存在时回放录制数据，否则使用生成的样本"""
+        if path and os.path.exists(path):
+            return cls.load(path)
+        return cls.synthetic()
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump({'sectors': self.sectors, 'histories': self.histories, 'snapshot': self.snapshot}, f)
+
+    def get_sector_list(self) -> List[Dict]:
+        return [dict(s) for s in self.sectors]
+
+    def get_sector_history(self, sector_code: str, days: int = 90):
+        df = self.histories.get(sector_code)
+        return None if df is None else df.tail(days).copy()
+
+    def get_sector_snapshot(self):
+        import pandas as pd
+        return self.snapshot if self.snapshot is not None else pd.DataFrame(columns=['change_pct', 'amount'])
+
+
+class FixtureHotSectorAnalyzer:
+    """在离线样本上运行优化版行业分析器，结果转换为hot_sector_cli使用的格式"""
+
+    def __init__(self, provider, top_n: int = 10):
+        from optimized_sector_analyzer import OptimizedSectorAnalyzer
+        self._analyzer = OptimizedSectorAnalyzer(top_n=top_n, provider=provider, sector_engine=False)
+
+    def analyze_hot_sectors(self) -> Dict:
+        result = self._analyzer.analyze_hot_sectors()
+        if 'error' in result:
+            return {'status': 'error', 'message': result['error']}
+        hot_sectors = [{
+            'code': s['code'],
+            'name': s['name'],
+            'hot_score': s['score'],
+            'change_pct': s['change_rate_1d'],
+            'volume': 0.0,
+            'volatility': s['volatility'],
+            'analysis_reason': f"5日涨幅{s['change_rate_5d']:.2f}%，趋势强度{s['trend_strength']:.2f}",
+            'is_mock_data': False
+        } for s in result['data']['sectors']]
+        return {'status': 'success',
+                'data': {'hot_sectors': hot_sectors,
+                         'north_flow': result['data']['market_info'].get('north_flow', 0)}}
+
+
+# ---------- 子进程中的测量 ----------
+
+def _child_first_window(module_name: str) -> Dict:
+    """导入界面模块、创建并显示主窗口，直到首次事件循环处理完成"""
+    start = time.perf_counter()
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    module = importlib.import_module(module_name)
+    imported = time.perf_counter()
+    app = QApplication.instance() or QApplication([])
+    window = getattr(module, WINDOW_TARGETS[module_name])()
+    window.show()
+    app.processEvents()
+    shown = time.perf_counter()
+    return {'import_seconds': imported - start, 'seconds': shown - start, 'peak_rss_mb': peak_rss_mb()}
+
+
+def _child_hot_sector_cli(fixture: Optional[str], top_n: int) -> Dict:
+    """导入hot_sector_cli并在离线样本上得到首个热门行业结果"""
+    start = time.perf_counter()
+    import hot_sector_cli
+    imported = time.perf_counter()
+    analyzer = FixtureHotSectorAnalyzer(FixtureSectorProvider.from_path(fixture), top_n=top_n)
+    with contextlib.redirect_stdout(io.StringIO()):
+        hot_sectors = hot_sector_cli.analyze_hot_sectors(top_n=top_n, show_details=False, analyzer=analyzer)
+    finished = time.perf_counter()
+    if not hot_sectors:
+        raise RuntimeError('未得到热门行业结果')
+    return {'import_seconds': imported - start, 'seconds': finished - start, 'sector_count': len(hot_sectors),
+            'peak_rss_mb': peak_rss_mb()}
+
+
+def _run_child(args: List[str], timeout: float) -> Dict:
+    """在新进程中运行一项测量，返回测量结果及进程总耗时"""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'] + args, cwd=ROOT, env=env,
+                              capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'status': 'error', 'error': f'超过 {timeout} 秒未完成'}
+    wall = time.perf_counter() - start
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+            result.update(status='ok', wall_seconds=wall)
+            return result
+    return _failure(proc.stderr)
+
+
+# ---------- 基准 ----------
+
+def bench_imports(modules: Iterable[str] = DEFAULT_IMPORT_MODULES) -> Dict[str, Dict]:
+    """各模块的冷启动导入耗时及其加载的重量级库"""
+    results = {}
+    for module in modules:
+        returncode, timings, stderr = import_profile(module)
+        if returncode != 0:
+            results[module] = _failure(stderr)
+            continue
+        results[module] = {
+            'status': 'ok',
+            'seconds': timings.get(module, 0.0),
+            'heavy_modules': sorted(name for name in timings if name in HEAVY_MODULES),
+        }
+    return results
+
+
+def bench_first_window(module: str, timeout: float = 120) -> Dict:
+    """界面模块从进程启动到首个窗口显示的耗时"""
+    return _run_child(['first_window', module], timeout)
+
+
+def bench_hot_sector_cli(fixture: Optional[str] = DEFAULT_FIXTURE, top_n: int = 10, timeout: float = 120) -> Dict:
+    """hot_sector_cli从进程启动到得到首个结果的耗时"""
+    args = ['hot_sector_cli', '--top', str(top_n)]
+    if fixture:
+        args += ['--fixture', fixture]
+    return _run_child(args, timeout)
+
+
+def run_benchmarks(modules: Iterable[str] = DEFAULT_IMPORT_MODULES, fixture: Optional[str] = DEFAULT_FIXTURE,
+                   windows: Iterable[str] = tuple(WINDOW_TARGETS)) -> Dict:
+    """运行全部基准
+
+    Returns:
+        可直接写入JSON的结果：环境信息、导入耗时、首个窗口、首个结果和各项中的最大峰值内存
+    """
+    results = {
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'fixture': fixture if fixture and os.path.exists(os.path.join(ROOT, fixture)) else 'synthetic',
+        'imports': bench_imports(modules),
+        'first_window': {module: bench_first_window(module) for module in windows},
+        'first_result': {'hot_sector_cli': bench_hot_sector_cli(fixture)},
+    }
+    peaks = [r['peak_rss_mb'] for group in ('first_window', 'first_result')
+             for r in results[group].values() if 'peak_rss_mb' in r]
+    results['peak_rss_mb'] = max(peaks) if peaks else None
+    return results
+
+
+def _child_main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog='startup_benchmark --child')
+    parser.add_argument('target', choices=['first_window', 'hot_sector_cli'])
+    parser.add_argument('module', nargs='?')
+    parser.add_argument('--fixture')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args(argv)
+    if args.target == 'first_window':
+        result = _child_first_window(args.module)
+    else:
+        result = _child_hot_sector_cli(args.fixture, args.top)
+    print(RESULT_MARKER + json.dumps(result), flush=True)
+    # 不等待界面和后台线程清理
+    os._exit(0)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == '--child':
+        return _child_main(argv[1:])
+
+    parser = argparse.ArgumentParser(description='启动性能基准（离线）')
+    parser.add_argument('--output', help='结果JSON保存路径，默认输出到标准输出')
+    parser.add_argument('--modules', nargs='+', default=list(DEFAULT_IMPORT_MODULES), help='测量导入耗时的模块')
+    parser.add_argument('--fixture', default=DEFAULT_FIXTURE, help='离线行业样本路径')
+    parser.add_argument('--record', metavar='PATH', help='从在线行业数据提供器录制离线样本后退出')
+    args = parser.parse_args(argv)
+
+    if args.record:
+        from sector_provider_factory import get_provider
+        fixture = FixtureSectorProvider.record(get_provider(), args.record)
+        print(f"已录制 {len(fixture.sectors)} 个行业、{len(fixture.histories)} 条历史数据到 {args.record}")
+        return 0
+
+    results = run_benchmarks(args.modules, args.fixture)
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
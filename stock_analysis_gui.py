@@ -39,12 +39,28 @@ logger = logging.getLogger('StockGUI')
 class MainWindow(QMainWindow):
     """主窗口"""
     
-    def __init__(self, sector_integrator=None):
+    def __init__(self, sector_integrator=None, sector_heatmap=None):
+        """初始化主窗口
+        
+        Args:
+            sector_integrator: 行业分析器集成实例(可选)
+            sector_heatmap: 盘中行业热力快照，为None时使用共享实例，传入False不使用
+        """
         super().__init__()
         self.setWindowTitle('股票分析系统')
         self.setGeometry(100, 100, 1200, 800)
         # 保存行业分析器实例
         self.sector_integrator = sector_integrator
+        # 盘中热门行业直接由实时行情聚合；创建时不请求行情，行业成分索引在后台线程刷新
+        if sector_heatmap is None:
+            try:
+                from sector_heatmap import get_sector_heatmap
+                sector_heatmap = get_sector_heatmap()
+            except Exception as e:
+                logger.warning(f"盘中行业热力快照不可用: {str(e)}")
+        self.sector_heatmap = sector_heatmap or None
+        if self.sector_heatmap is not None:
+            self.sector_heatmap.warm_up()
         self.init_ui()
     
     def init_ui(self):
@@ -138,6 +154,22 @@ class MainWindow(QMainWindow):
         
         # 初始加载数据
         QTimer.singleShot(1000, self.refresh_hot_sectors)
+        
+        # 盘中定时刷新（实时快照只需一次全市场请求）
+        if self.sector_heatmap is not None:
+            self.hot_sectors_timer = QTimer(self)
+            self.hot_sectors_timer.timeout.connect(
+                lambda: self._is_trading_time() and self.refresh_hot_sectors())
+            self.hot_sectors_timer.start(30 * 1000)
+    
+    def _is_trading_time(self):
+        '''当前是否处于A股交易时段'''
+        from datetime import datetime
+        now = datetime.now()
+        if now.weekday() >= 5:
+            return False
+        minutes = now.hour * 60 + now.minute
+        return 9 * 60 + 30 <= minutes <= 11 * 60 + 30 or 13 * 60 <= minutes <= 15 * 60
     
     def refresh_hot_sectors(self):
         '''刷新热门行业数据'''
@@ -145,7 +177,7 @@ class MainWindow(QMainWindow):
         from PyQt5.QtCore import QTimer
         
         # 检查是否有集成器
-        if self.sector_integrator is None:
+        if self.sector_integrator is None and self.sector_heatmap is None:
             QMessageBox.warning(self, '警告', '未配置行业分析器，请检查配置')
             return
         
@@ -168,15 +200,19 @@ class MainWindow(QMainWindow):
             # 更新进度
             self.hot_sectors_progress.setValue(30)
             
-            # 获取热门行业数据
-            result = self.sector_integrator.get_hot_sectors()
+            # 获取热门行业数据：盘中优先使用实时快照，失败时回退到行业分析器
+            result = None
+            if self.sector_heatmap is not None and self._is_trading_time():
+                result = self.sector_heatmap.get_hot_sectors()
+            if (result is None or result['status'] != 'success') and self.sector_integrator is not None:
+                result = self.sector_integrator.get_hot_sectors()
             
             # 更新进度
             self.hot_sectors_progress.setValue(70)
             
             if result['status'] == 'success':
                 # 获取热门行业列表
-            hot_sectors = result['data'].get('hot_sectors', [])
+                hot_sectors = result['data'].get('hot_sectors', [])
                 
                 # 更新表格
                 self.hot_sectors_table.setRowCount(len(hot_sectors))
@@ -245,7 +281,7 @@ def launch_gui(sector_integrator=None):
     Args:
         sector_integrator: 行业分析器集成实例(可选)
     """
-        app = QApplication(sys.argv)
+    app = QApplication(sys.argv)
     
     # 设置应用字体
     font = QFont()
@@ -254,11 +290,11 @@ def launch_gui(sector_integrator=None):
     app.setFont(font)
     
     # 创建并显示主窗口
-    main_window = MainWindow(sector_integrator=None)
+    main_window = MainWindow(sector_integrator=sector_integrator)
     main_window.show()
     
     # 启动应用程序事件循环
-        sys.exit(app.exec_())
+    sys.exit(app.exec_())
 
 if __name__ == "__main__":
     # 如果直接运行此文件，尝试创建行业分析器集成器
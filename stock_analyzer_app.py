@@ -9,7 +9,6 @@
 import os
 import sys
 import logging
-from optimized_sector_analyzer import OptimizedSectorAnalyzer  # 导入优化版行业分析器
 import traceback
 from datetime import datetime, timedelta
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
@@ -21,13 +20,15 @@ from PyQt5.QtGui import QFont, QPalette, QColor
 from PyQt5.QtCore import Qt
 import pandas as pd
 import numpy as np
-from minimal_visual_stock_system import VisualStockSystem
-from single_stock_analyzer import SingleStockAnalyzer
+from visual_stock_system import VisualStockSystem
 import sys
 import logging
-from optimized_sector_analyzer import OptimizedSectorAnalyzer  # 导入优化版行业分析器
-# 导入行业分析器
-from sector_analyzer import SectorAnalyzer
+from gui_tasks import TaskRunner
+from lazy_imports import lazy_import
+
+# 分析器在首次使用时才导入，启动时不加载talib/tushare等库
+optimized_sector_analyzer = lazy_import('optimized_sector_analyzer')  # 优化版行业分析器
+single_stock_analyzer = lazy_import('single_stock_analyzer')
 
 # 设置日志
 logging.basicConfig(
@@ -57,6 +58,10 @@ def save_pid(pid_file='app.pid'):
         logger.error(f"保存PID文件失败: {e}")
 
 class StockAnalyzerApp(QMainWindow):
+    # 扫描时实时保留的前K名数量和扫描时限(秒)，超时后显示已完成部分中最好的结果
+    SCAN_TOP_K = 50
+    SCAN_TIME_LIMIT = 300
+    
     def __init__(self):
         super().__init__()
         print("正在初始化股票分析系统...")
@@ -65,8 +70,12 @@ class StockAnalyzerApp(QMainWindow):
         # 初始化日志
         self.logger = logging.getLogger('StockAnalyzerApp')
         
+        # 长时间运行的分析在后台线程执行，界面保持响应
+        self.task_runner = TaskRunner(self)
+        
         try:
-            self.visual_system = VisualStockSystem(self.token)
+            # 只使用数据和分析功能，界面由本窗口提供
+            self.visual_system = VisualStockSystem(self.token, headless=True)
             print("成功初始化数据系统")
             self.initUI()
             print("GUI界面已启动，程序准备就绪")
@@ -160,6 +169,18 @@ class StockAnalyzerApp(QMainWindow):
         control_layout.addStretch()
         layout.addLayout(control_layout)
         
+        # 后台任务进度和取消按钮，仅在任务运行时显示
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        progress_layout.addWidget(self.progress_bar)
+        self.cancel_btn = self.create_styled_button('取消')
+        self.cancel_btn.clicked.connect(self.cancel_task)
+        self.cancel_btn.setVisible(False)
+        progress_layout.addWidget(self.cancel_btn)
+        layout.addLayout(progress_layout)
+        self.task_runner.running_changed.connect(self._on_task_running)
+        
         # 添加结果显示区域
         self.result_text = QTextEdit()
         self.result_text.setReadOnly(True)
@@ -208,6 +229,55 @@ class StockAnalyzerApp(QMainWindow):
         """)
         return btn
     
+    def _start_task(self, fn, *args, error_title='错误', on_partial=None, on_finished=None):
+        """在后台线程执行长时间任务
+        
+        Args:
+            fn: 任务函数fn(context, *args)，在线程池中执行，不能直接操作界面
+            error_title: 任务出错时的对话框标题
+            on_partial: 部分结果回调，在主线程调用
+            on_finished: 完成回调，在主线程调用
+        """
+        if self.task_runner.is_running():
+            QMessageBox.information(self, '提示', '已有分析任务正在运行，请等待完成或先取消')
+            return None
+        return self.task_runner.start(
+            fn, *args,
+            on_progress=self._on_task_progress,
+            on_partial=on_partial,
+            on_finished=on_finished,
+            on_error=lambda message: self._on_task_error(error_title, message),
+            on_cancelled=self._on_task_cancelled
+        )
+    
+    def cancel_task(self):
+        """取消正在运行的后台任务"""
+        self.task_runner.cancel()
+        self.cancel_btn.setEnabled(False)
+        self.result_text.append('正在取消...')
+    
+    def _on_task_running(self, running):
+        self.progress_bar.setVisible(running)
+        self.cancel_btn.setVisible(running)
+        self.cancel_btn.setEnabled(running)
+        if running:
+            # 总数未知前显示忙碌状态
+            self.progress_bar.setRange(0, 0)
+    
+    def _on_task_progress(self, done, total, message):
+        if total > 0:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(done)
+        if message:
+            self.result_text.append(message)
+    
+    def _on_task_error(self, title, message):
+        self.show_error_message(title, f'执行过程中出错：{message}')
+        self.result_text.append(f'{title}：{message}')
+    
+    def _on_task_cancelled(self):
+        self.result_text.append('任务已取消')
+    
     def analyze_stocks(self):
         try:
             # 获取行业列表
@@ -231,87 +301,114 @@ class StockAnalyzerApp(QMainWindow):
 
             self.result_text.clear()
             self.result_text.append(f'正在分析{"全市场" if industry == "全部" else industry}股票...')
-            QApplication.processEvents()
-            
-            # 分析股票
-            recommendations = self.visual_system.scan_stocks(industry=None if industry == '全部' else industry)
+            self._start_task(self._scan_stocks_task, None if industry == '全部' else industry,
+                             on_partial=self._show_scan_partial, on_finished=self._show_scan_result)
+        
+        except Exception as e:
+            QMessageBox.warning(self, '错误', f'分析过程中出错：{str(e)}')
+    
+    def _scan_stocks_task(self, context, industry):
+        """后台扫描股票，逐只报告进度，排名靠前的股票变化时提交当前排名"""
+        progress = {'done': 0, 'total': 0}
+        
+        def on_update(done, total, ranking, changed):
+            progress.update(done=done, total=total)
+            context.progress(done, total)
+            if changed:
+                context.partial((ranking.seen, ranking.items()[:3]))
+        
+        ranking = self.visual_system.scan_top_stocks(self.SCAN_TOP_K, self._recommendation_sort_key,
+                                                     industry=industry, on_update=on_update,
+                                                     should_stop=context.is_cancelled,
+                                                     time_limit=self.SCAN_TIME_LIMIT)
+        return dict(progress, ranking=ranking)
+    
+    @staticmethod
+    def _recommendation_sort_key(x):
+        """扫描结果的排序键：上升趋势优先，其次MACD柱状图、量比和ATR"""
+        volume_ma20 = x.get('volume_ma20') or 0
+        return (
+            1 if x.get('trend') == 'uptrend' else 0,
+            abs(x.get('macd_hist') or 0),
+            x.get('volume', 0) / volume_ma20 if volume_ma20 else 0,
+            x.get('atr') or 0
+        )
+    
+    def _show_scan_partial(self, snapshots):
+        """扫描过程中显示当前排名靠前的股票"""
+        count, leaders = snapshots[-1]
+        self.result_text.append(f'已完成 {count} 只，当前靠前：' +
+                                '，'.join(f"{s['symbol']}({s.get('recommendation', '观望')})" for s in leaders))
+    
+    def _show_scan_result(self, result):
+        """扫描完成（或取消、超时后返回已完成部分）时显示结果"""
+        ranking = result['ranking']
+        if result['done'] < result['total']:
+            self.result_text.append(f"扫描未全部完成（{result['done']}/{result['total']}），以下为已完成部分中最好的结果")
+        
+        # 已按照条件排序的前SCAN_TOP_K只股票
+        sorted_recommendations = ranking.items()
+        if not sorted_recommendations:
+            self.result_text.append('未找到符合条件的股票')
+            return
             
-            if not recommendations:
-                self.result_text.append('未找到符合条件的股票')
-                return
+        self.result_text.append(f'共分析 {ranking.seen} 只股票')
+        
+        # 显示前10只股票
+        self.display_analysis(sorted_recommendations[:10])
+        
+        # 将强烈推荐的股票添加到智能推荐系统
+        if HAS_SMART_RECOMMENDATION:
+            try:
+                # 获取智能推荐系统实例
+                smart_system = get_recommendation_system()
                 
-            self.result_text.append(f'共分析 {len(recommendations)} 只股票')
-            QApplication.processEvents()
-            
-            # 按照条件排序
-            sorted_recommendations = sorted(recommendations, 
-                key=lambda x: (
-                    1 if x['trend'] == 'uptrend' else 0,
-                    abs(x['macd_hist']),
-                    x['volume'] / x['volume_ma20'],
-                    x['atr']
-                ), 
-                reverse=True
-            )
-            
-            # 显示前10只股票
-            self.display_analysis(sorted_recommendations[:10])
-            
-                        # 将强烈推荐的股票添加到智能推荐系统
-            if HAS_SMART_RECOMMENDATION:
-                try:
-                    # 获取智能推荐系统实例
-                    smart_system = get_recommendation_system()
+                # 过滤出强烈推荐买入的股票
+                strong_recommendations = [r for r in sorted_recommendations 
+                                        if r.get('recommendation', '') == '强烈推荐买入' or
+                                           r.get('recommendation', '') == '建议买入']
+                
+                # 添加到智能推荐系统
+                from smart_recommendation_system import create_recommendation, StockRecommendation
+                added_to_smart = 0
+                
+                for rec in strong_recommendations[:5]:  # 限制只添加前5个最强推荐
+                    # 创建推荐对象
+                    stock_code = rec['symbol']
+                    stock_name = rec.get('name', rec.get('symbol', '未知'))
+                    current_price = rec.get('last_price', rec.get('close', 0))
                     
-                    # 过滤出强烈推荐买入的股票
-                    strong_recommendations = [r for r in sorted_recommendations 
-                                            if r.get('recommendation', '') == '强烈推荐买入' or
-                                               r.get('recommendation', '') == '建议买入']
+                    # 计算目标价和止损价
+                    target_price = current_price * 1.15  # 15%盈利目标
+                    stop_loss = current_price * 0.92    # 8%止损线
                     
-                    # 添加到智能推荐系统
-                    from smart_recommendation_system import create_recommendation, StockRecommendation
-                    added_to_smart = 0
+                    # 构建推荐理由
+                    reason = f"技术分析推荐：{rec.get('recommendation', '建议买入')}。"
+                    if rec.get('trend') == 'uptrend':
+                        reason += " 处于上升趋势。"
+                    if rec.get('volume', 0) > rec.get('volume_ma20', 1):
+                        reason += f" 成交量放大{rec.get('volume', 0)/rec.get('volume_ma20', 1):.1f}倍。"
                     
-                    for rec in strong_recommendations[:5]:  # 限制只添加前5个最强推荐
-                        # 创建推荐对象
-                        stock_code = rec['symbol']
-                        stock_name = rec.get('name', rec.get('symbol', '未知'))
-                        current_price = rec.get('last_price', rec.get('close', 0))
-                        
-                        # 计算目标价和止损价
-                        target_price = current_price * 1.15  # 15%盈利目标
-                        stop_loss = current_price * 0.92    # 8%止损线
-                        
-                        # 构建推荐理由
-                        reason = f"技术分析推荐：{rec.get('recommendation', '建议买入')}。"
-                        if rec.get('trend') == 'uptrend':
-                            reason += " 处于上升趋势。"
-                        if rec.get('volume', 0) > rec.get('volume_ma20', 1):
-                            reason += f" 成交量放大{rec.get('volume', 0)/rec.get('volume_ma20', 1):.1f}倍。"
-                        
-                        # 添加推荐
-                        new_recommendation = create_recommendation(
-                            stock_code=stock_code,
-                            stock_name=stock_name,
-                            entry_price=current_price,
-                            target_price=target_price,
-                            stop_loss=stop_loss,
-                            reason=reason,
-                            source="股票分析系统",
-                            score=85.0,
-                            tags=["技术分析", rec.get('trend', 'unknown')]
-                        )
-                        
-                        if smart_system.add_recommendation(new_recommendation):
-                            added_to_smart += 1
+                    # 添加推荐
+                    new_recommendation = create_recommendation(
+                        stock_code=stock_code,
+                        stock_name=stock_name,
+                        entry_price=current_price,
+                        target_price=target_price,
+                        stop_loss=stop_loss,
+                        reason=reason,
+                        source="股票分析系统",
+                        score=85.0,
+                        tags=["技术分析", rec.get('trend', 'unknown')]
+                    )
                     
-                    if added_to_smart > 0:
-                        self.result_text.append(f'\n已将 {added_to_smart} 只强烈推荐股票添加到智能推荐系统')
-                except Exception as e:
-                    self.result_text.append(f'\n添加股票到智能推荐系统时出错: {str(e)}')
-        
-        except Exception as e:
-            QMessageBox.warning(self, '错误', f'分析过程中出错：{str(e)}')
+                    if smart_system.add_recommendation(new_recommendation):
+                        added_to_smart += 1
+                
+                if added_to_smart > 0:
+                    self.result_text.append(f'\n已将 {added_to_smart} 只强烈推荐股票添加到智能推荐系统')
+            except Exception as e:
+                self.result_text.append(f'\n添加股票到智能推荐系统时出错: {str(e)}')
     
     def visualize_stocks(self):
         self.result_text.clear()
@@ -328,7 +425,6 @@ class StockAnalyzerApp(QMainWindow):
             
             self.result_text.clear()
             self.result_text.append("正在准备策略回测...")
-            QApplication.processEvents()
             
             # 获取用户输入的股票代码
             stock_code, ok = QInputDialog.getText(
@@ -379,91 +475,101 @@ class StockAnalyzerApp(QMainWindow):
             self.result_text.append(f"正在对 {stock_code} 进行 {strategy} 回测...")
             self.result_text.append(f"回测区间: {start_date} 至 {end_date}")
             self.result_text.append(f"初始资金: {initial_capital:,.2f} 元")
-            QApplication.processEvents()
-            
-            # 初始化回测器
-            backtester = EnhancedBacktester(initial_capital=initial_capital)
-            
-            # 获取股票数据
-            stock_data = self.visual_system.get_stock_data(
-                stock_code, 
-                start_date=start_date,
-                end_date=end_date
-            )
             
-            if stock_data is None or stock_data.empty:
-                self.result_text.append(f"获取股票 {stock_code} 数据失败")
-                return
-                
-            # 执行回测
-            self.result_text.append("正在执行回测计算...")
-            QApplication.processEvents()
-            
-            # 根据选择的策略执行回测
-            if strategy == 'MACD金叉策略':
-                result = backtester.backtest_macd_strategy(stock_data, stock_code)
-            elif strategy == 'KDJ金叉策略':
-                result = backtester.backtest_kdj_strategy(stock_data, stock_code)
-            elif strategy == '双均线策略':
-                result = backtester.backtest_ma_strategy(stock_data, stock_code)
-            elif strategy == '布林带策略':
-                result = backtester.backtest_bollinger_strategy(stock_data, stock_code)
-            elif strategy == '量价策略':
-                result = backtester.backtest_volume_price_strategy(stock_data, stock_code)
-            else:
-                result = backtester.backtest_macd_strategy(stock_data, stock_code)  # 默认策略
-            
-            # 显示回测结果
-            self.result_text.clear()
-            self.result_text.append(f"===== {stock_code} {strategy} 回测结果 =====\n")
-            self.result_text.append(f"初始资金: {initial_capital:,.2f} 元")
-            self.result_text.append(f"最终资金: {backtester.current_capital:,.2f} 元")
-            self.result_text.append(f"总收益率: {((backtester.current_capital/initial_capital)-1)*100:.2f}%")
-            self.result_text.append(f"年化收益率: {backtester.annual_return*100:.2f}%")
-            self.result_text.append(f"最大回撤: {backtester.max_drawdown*100:.2f}%")
-            self.result_text.append(f"夏普比率: {backtester.sharpe_ratio:.2f}")
-            self.result_text.append(f"交易次数: {backtester.trade_count}")
-            self.result_text.append(f"胜率: {backtester.win_rate*100:.2f}%")
-            self.result_text.append(f"盈亏比: {backtester.profit_ratio:.2f}")
-            self.result_text.append(f"平均持仓周期: {backtester.avg_holding_period:.1f} 天")
-            
-            # 显示交易记录
-            if backtester.trades:
-                self.result_text.append("\n===== 交易记录 =====")
-                for i, trade in enumerate(backtester.trades[-10:], 1):  # 只显示最近10条
-                    self.result_text.append(f"\n{i}. {trade.timestamp.strftime('%Y-%m-%d')} - {trade.action.upper()}")
-                    self.result_text.append(f"   价格: {trade.price:.2f} 数量: {trade.volume:.0f} 股")
-                    if trade.action == 'sell':
-                        self.result_text.append(f"   收益: {trade.profit:.2f} 元")
-            
-            # 保存回测结果
-            try:
-                with open('backtest_results.json', 'w') as f:
-                    import json
-                    json.dump({
-                        'stock_code': stock_code,
-                        'strategy': strategy,
-                        'start_date': start_date,
-                        'end_date': end_date,
-                        'initial_capital': initial_capital,
-                        'final_capital': backtester.current_capital,
-                        'total_return': ((backtester.current_capital/initial_capital)-1)*100,
-                        'annual_return': backtester.annual_return*100,
-                        'max_drawdown': backtester.max_drawdown*100,
-                        'sharpe_ratio': backtester.sharpe_ratio,
-                        'trade_count': backtester.trade_count,
-                        'win_rate': backtester.win_rate*100,
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    }, f, indent=4)
-                self.result_text.append("\n回测结果已保存到 backtest_results.json")
-            except Exception as e:
-                self.result_text.append(f"\n保存回测结果失败: {str(e)}")
+            self._start_task(self._backtest_task, stock_code, strategy, start_date, end_date, initial_capital,
+                             error_title='回测错误',
+                             on_finished=lambda backtester: self._show_backtest_result(
+                                 backtester, stock_code, strategy, start_date, end_date, initial_capital))
                 
         except Exception as e:
             self.show_error_message('回测错误', f'执行回测时出错：{str(e)}')
             self.result_text.clear()
             self.result_text.append(f'回测失败：{str(e)}')
         
+    def _backtest_task(self, context, stock_code, strategy, start_date, end_date, initial_capital):
+        """后台获取数据并执行回测，数据获取失败时返回None"""
+        from enhanced_backtesting import EnhancedBacktester
+        
+        # 初始化回测器
+        backtester = EnhancedBacktester(initial_capital=initial_capital)
+        
+        # 获取股票数据
+        stock_data = self.visual_system.get_stock_data(
+            stock_code, 
+            start_date=start_date,
+            end_date=end_date
+        )
+        
+        if stock_data is None or stock_data.empty:
+            return None
+        
+        # 执行回测
+        context.check()
+        context.progress(0, 0, "正在执行回测计算...")
+        
+        # 根据选择的策略执行回测
+        strategies = {
+            'MACD金叉策略': backtester.backtest_macd_strategy,
+            'KDJ金叉策略': backtester.backtest_kdj_strategy,
+            '双均线策略': backtester.backtest_ma_strategy,
+            '布林带策略': backtester.backtest_bollinger_strategy,
+            '量价策略': backtester.backtest_volume_price_strategy
+        }
+        strategies.get(strategy, backtester.backtest_macd_strategy)(stock_data, stock_code)  # 默认MACD策略
+        return backtester
+    
+    def _show_backtest_result(self, backtester, stock_code, strategy, start_date, end_date, initial_capital):
+        """显示并保存回测结果"""
+        if backtester is None:
+            self.result_text.append(f"获取股票 {stock_code} 数据失败")
+            return
+            
+        # 显示回测结果
+        self.result_text.clear()
+        self.result_text.append(f"===== {stock_code} {strategy} 回测结果 =====\n")
+        self.result_text.append(f"初始资金: {initial_capital:,.2f} 元")
+        self.result_text.append(f"最终资金: {backtester.current_capital:,.2f} 元")
+        self.result_text.append(f"总收益率: {((backtester.current_capital/initial_capital)-1)*100:.2f}%")
+        self.result_text.append(f"年化收益率: {backtester.annual_return*100:.2f}%")
+        self.result_text.append(f"最大回撤: {backtester.max_drawdown*100:.2f}%")
+        self.result_text.append(f"夏普比率: {backtester.sharpe_ratio:.2f}")
+        self.result_text.append(f"交易次数: {backtester.trade_count}")
+        self.result_text.append(f"胜率: {backtester.win_rate*100:.2f}%")
+        self.result_text.append(f"盈亏比: {backtester.profit_ratio:.2f}")
+        self.result_text.append(f"平均持仓周期: {backtester.avg_holding_period:.1f} 天")
+        
+        # 显示交易记录
+        if backtester.trades:
+            self.result_text.append("\n===== 交易记录 =====")
+            for i, trade in enumerate(backtester.trades[-10:], 1):  # 只显示最近10条
+                self.result_text.append(f"\n{i}. {trade.timestamp.strftime('%Y-%m-%d')} - {trade.action.upper()}")
+                self.result_text.append(f"   价格: {trade.price:.2f} 数量: {trade.volume:.0f} 股")
+                if trade.action == 'sell':
+                    self.result_text.append(f"   收益: {trade.profit:.2f} 元")
+        
+        # 保存回测结果
+        try:
+            with open('backtest_results.json', 'w') as f:
+                import json
+                json.dump({
+                    'stock_code': stock_code,
+                    'strategy': strategy,
+                    'start_date': start_date,
+                    'end_date': end_date,
+                    'initial_capital': initial_capital,
+                    'final_capital': backtester.current_capital,
+                    'total_return': ((backtester.current_capital/initial_capital)-1)*100,
+                    'annual_return': backtester.annual_return*100,
+                    'max_drawdown': backtester.max_drawdown*100,
+                    'sharpe_ratio': backtester.sharpe_ratio,
+                    'trade_count': backtester.trade_count,
+                    'win_rate': backtester.win_rate*100,
+                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                }, f, indent=4)
+            self.result_text.append("\n回测结果已保存到 backtest_results.json")
+        except Exception as e:
+            self.result_text.append(f"\n保存回测结果失败: {str(e)}")
+        
     def analyze_single_stock(self):
         """分析单只股票"""
         try:
@@ -478,27 +584,36 @@ class StockAnalyzerApp(QMainWindow):
                 # 清空之前的结果
                 self.result_text.clear()
                 self.result_text.append(f'正在分析股票 {stock_code} ...')
-                QApplication.processEvents()
-                
-                # 获取分析结果
-                analyzer = SingleStockAnalyzer(self.token)
-                result = analyzer.get_detailed_analysis(stock_code)
-                
-                if result['status'] == 'success':
-                    data = result['data']
-                    
-                    # 确保所有必要的数据结构存在，避免KeyError
-                    if 'trend_analysis' not in data:
-                        data['trend_analysis'] = {'trend': '未知', 'strength': 0, 'rsi_value': 0}
-                    if 'volume_analysis' not in data:
-                        data['volume_analysis'] = {'status': '未知', 'ratio': 0}
-                    if 'technical_indicators' not in data:
-                        data['technical_indicators'] = {'macd': 0, 'macd_signal': 0, 'macd_hist': 0}
-                    if 'trading_advice' not in data:
-                        data['trading_advice'] = '数据不足，无法提供交易建议'
-                    
-                    # 格式化输出分析结果
-                    output = f"""分析结果：
+                self._start_task(self._single_stock_task, stock_code, error_title='系统错误',
+                                 on_finished=lambda result: self._show_single_stock_result(stock_code, result))
+        
+        except Exception as e:
+            self.show_error_message('系统错误', f'发生未知错误：{str(e)}')
+            self.result_text.clear()
+            self.result_text.append(f'系统错误：{str(e)}')
+    
+    def _single_stock_task(self, context, stock_code):
+        """后台获取单只股票的详细分析"""
+        analyzer = single_stock_analyzer.SingleStockAnalyzer(self.token)
+        return analyzer.get_detailed_analysis(stock_code)
+    
+    def _show_single_stock_result(self, stock_code, result):
+        """显示单只股票分析结果"""
+        if result['status'] == 'success':
+            data = result['data']
+            
+            # 确保所有必要的数据结构存在，避免KeyError
+            if 'trend_analysis' not in data:
+                data['trend_analysis'] = {'trend': '未知', 'strength': 0, 'rsi_value': 0}
+            if 'volume_analysis' not in data:
+                data['volume_analysis'] = {'status': '未知', 'ratio': 0}
+            if 'technical_indicators' not in data:
+                data['technical_indicators'] = {'macd': 0, 'macd_signal': 0, 'macd_hist': 0}
+            if 'trading_advice' not in data:
+                data['trading_advice'] = '数据不足，无法提供交易建议'
+            
+            # 格式化输出分析结果
+            output = f"""分析结果：
 股票代码：{data.get('symbol', stock_code)}
 股票名称：{data.get('name', '未知')}
 最新价格：{data.get('last_price', 0):.2f}
@@ -544,18 +659,13 @@ class StockAnalyzerApp(QMainWindow):
 
 交易建议：
 {data.get('trading_advice', '数据不足，无法提供交易建议')}"""
-                    
-                    self.result_text.clear()
-                    self.result_text.append(output)
-                else:
-                    self.show_error_message('分析失败', result.get('message', '未知错误'))
-                    self.result_text.clear()
-                    self.result_text.append(f'分析失败：{result.get("message", "未知错误")}')
-        
-        except Exception as e:
-            self.show_error_message('系统错误', f'发生未知错误：{str(e)}')
+            
             self.result_text.clear()
-            self.result_text.append(f'系统错误：{str(e)}')
+            self.result_text.append(output)
+        else:
+            self.show_error_message('分析失败', result.get('message', '未知错误'))
+            self.result_text.clear()
+            self.result_text.append(f'分析失败：{result.get("message", "未知错误")}')
     
     def show_error_message(self, title, message):
         """显示错误消息对话框"""
@@ -698,27 +808,41 @@ class StockAnalyzerApp(QMainWindow):
 
     def analyze_hot_industries(self):
         """热门行业分析和预测功能"""
+        self.result_text.clear()
+        self.result_text.append("正在分析热门行业数据，请稍候...")
+        self._start_task(self._hot_industries_task, error_title='分析错误',
+                         on_finished=self._show_hot_industries)
+    
+    def _hot_industries_task(self, context):
+        """后台分析热门行业并预测未来走势"""
+        # 初始化行业分析器 - 使用优化版行业分析器
+        try:
+            sector_analyzer = optimized_sector_analyzer.OptimizedSectorAnalyzer(top_n=15, provider_type='akshare')
+            self.logger.info("使用优化版行业分析器(AKShare)")
+        except Exception as e:
+            self.logger.error(f"行业分析器初始化失败: {str(e)}")
+            raise RuntimeError(f"行业分析器初始化失败: {str(e)}")
+        
+        # 获取热门行业分析结果
+        context.progress(0, 0, "正在获取行业列表及计算热度...")
+        result = sector_analyzer.analyze_hot_sectors()
+        if 'error' in result:
+            return result, None
+        
+        # 获取行业预测结果
+        context.check()
+        context.progress(0, 0, "正在预测未来行业走势...")
+        try:
+            prediction_result = sector_analyzer.predict_hot_sectors()
+        except Exception as e:
+            self.logger.error(f"预测热门行业时出错: {str(e)}")
+            prediction_result = {'error': str(e)}
+        return result, prediction_result
+    
+    def _show_hot_industries(self, results):
+        """显示热门行业分析报告"""
+        result, prediction_result = results
         try:
-            self.result_text.clear()
-            self.result_text.append("正在分析热门行业数据，请稍候...")
-            QApplication.processEvents()  # 更新UI
-            
-            # 初始化行业分析器 - 使用优化版行业分析器
-            try:
-                # 优先使用优化版行业分析器
-                sector_analyzer = OptimizedSectorAnalyzer(top_n=15, provider_type='akshare')
-                self.logger.info("使用优化版行业分析器(AKShare)")
-            except Exception as e:
-                # 如果优化版分析器初始化失败，直接显示错误
-                self.logger.error(f"行业分析器初始化失败: {str(e)}")
-                self.show_error_message('初始化失败', f"行业分析器初始化失败: {str(e)}")
-                return
-            
-            # 获取热门行业分析结果
-            self.result_text.append("正在获取行业列表及计算热度...")
-            QApplication.processEvents()  # 更新UI
-            result = sector_analyzer.analyze_hot_sectors()
-            
             # 处理结果
             if 'error' in result:
                 self.show_error_message('分析失败', f"热门行业分析失败: {result['error']}")
@@ -761,7 +885,6 @@ class StockAnalyzerApp(QMainWindow):
             
             # 对比行业与大盘趋势
             self.result_text.append("\n【行业与大盘对比】")
-            QApplication.processEvents()  # 更新UI
             
             try:
                 # 获取大盘涨跌
@@ -786,13 +909,8 @@ class StockAnalyzerApp(QMainWindow):
             except Exception as e:
                 self.logger.warning(f"获取行业趋势对比数据失败: {str(e)}")
             
-            # 获取行业预测结果
-            self.result_text.append("\n正在预测未来行业走势...")
-            QApplication.processEvents()  # 更新UI
-            
+            predicted_sectors = []
             try:
-                prediction_result = sector_analyzer.predict_hot_sectors()
-                
                 if 'error' in prediction_result:
                     self.result_text.append(f"\n预测分析失败: {prediction_result['error']}")
                 else:
@@ -835,7 +953,7 @@ class StockAnalyzerApp(QMainWindow):
                         self.result_text.append(f"{i+1}. {item['name']} - 景气度: {item['prosperity_score']:.1f}")
                         self.result_text.append(f"   当前热度: {item['current_heat']:.1f} | 预期变化: {item['change_trend']}")
             except Exception as e:
-                self.logger.error(f"预测热门行业时出错: {str(e)}")
+                self.logger.error(f"显示行业预测结果时出错: {str(e)}")
                 self.result_text.append(f"\n预测分析失败: {str(e)}")
             
             # 生成投资建议
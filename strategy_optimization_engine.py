@@ -15,6 +15,12 @@ from china_stock_provider import ChinaStockProvider
 from enhanced_backtesting import EnhancedBacktester
 from lazy_analyzer import LazyStockAnalyzer
 from volume_price_strategy import VolumePriceStrategy
+from walk_forward_optimizer import WalkForwardOptimizer
+from backtest_result_cache import BacktestResultCache, fingerprint_data
+
+# 回测器已实现的策略及其策略类，均线交叉和RSI策略只有参数配置，暂不支持回测
+BACKTEST_STRATEGIES = {'volume_price': VolumePriceStrategy}
+
 
 class StrategyOptimizationEngine:
     """
@@ -37,10 +43,14 @@ class StrategyOptimizationEngine:
         # 确保数据目录存在
         os.makedirs(self.data_dir, exist_ok=True)
         
+        # 设置日志（加载策略配置时会写日志）
+        self._setup_logging()
+        
         # 初始化系统组件
         self.visual_system = VisualStockSystem(token, headless=True)
         self.data_provider = ChinaStockProvider(token)
         self.backtester = EnhancedBacktester(initial_capital=100000.0)
+        self.result_cache = BacktestResultCache(os.path.join(data_dir, 'backtest_cache'))
         
         # 初始化LazyStockAnalyzer
         self.lazy_analyzer = LazyStockAnalyzer(required_indicators=[
@@ -50,9 +60,6 @@ class StrategyOptimizationEngine:
         # 加载策略配置
         self.strategies = self._load_strategies()
         
-        # 设置日志
-        self._setup_logging()
-        
         self.logger.info("策略优化引擎初始化完成")
     
     def _setup_logging(self):
@@ -244,7 +251,52 @@ class StrategyOptimizationEngine:
         else:
             return 'all'  # 默认全量计算
     
-    def backtest_strategy(self, strategy_id, symbol, start_date=None, end_date=None, parameters=None):
+    def _untunable_parameters(self, strategy_id, param_grid):
+        """找出参数网格中回测不会使用的参数
+        
+        这些参数取任何值回测结果都相同，在其上寻优得到的"最优参数"没有意义
+        
+        Args:
+            strategy_id: 策略ID
+            param_grid: 参数网格
+            
+        Returns:
+            回测不使用的参数名列表
+        """
+        tunable = BACKTEST_STRATEGIES[strategy_id].PARAMETERS
+        return sorted({name for params in param_grid for name in params if name not in tunable})
+    
+    def _run_strategy_backtest(self, strategy_id, symbol, df, strategy_params, backtester=None, start_index=0):
+        """在给定数据上执行策略回测
+        
+        Args:
+            strategy_id: 策略ID
+            symbol: 股票代码
+            df: 已预处理的行情数据
+            strategy_params: 完整的策略参数
+            backtester: 回测器实例，默认使用引擎共享的回测器
+            start_index: 开始交易的行号，之前的行只用于指标预热
+            
+        Returns:
+            回测结果字典，策略未实现时返回None
+        """
+        backtester = backtester or self.backtester
+        
+        if strategy_id == 'volume_price':
+            result = backtester.backtest_volume_price_strategy(data=df, symbol=symbol, start_index=start_index,
+                                                               strategy_params=strategy_params)
+        else:
+            return None
+        
+        # 回测器返回BacktestResult对象时转换为字典
+        if not isinstance(result, dict):
+            result = {key: value for key, value in vars(result).items() if key != 'trades'}
+            if 'total_return' not in result and 'profit_pct' in result:
+                result['total_return'] = result['profit_pct']
+        return result
+    
+    def backtest_strategy(self, strategy_id, symbol, start_date=None, end_date=None, parameters=None,
+                          data=None, use_cache=True):
         """回测策略
         
         Args:
@@ -253,6 +305,8 @@ class StrategyOptimizationEngine:
             start_date: 回测开始日期 (默认为一年前)
             end_date: 回测结束日期 (默认为今天)
             parameters: 可选的参数覆盖
+            data: 已获取的行情数据，为空时按日期范围获取
+            use_cache: 是否优先读取回测结果缓存
             
         Returns:
             回测结果字典
@@ -262,6 +316,9 @@ class StrategyOptimizationEngine:
             if strategy_id not in self.strategies:
                 self.logger.error(f"策略 {strategy_id} 不存在")
                 return {'status': 'error', 'message': f"策略 {strategy_id} 不存在"}
+            if strategy_id not in BACKTEST_STRATEGIES:
+                self.logger.error(f"策略 {strategy_id} 暂不支持回测")
+                return {'status': 'error', 'message': f"策略 {strategy_id} 暂不支持回测"}
             
             # 获取策略配置
             strategy_config = self.strategies[strategy_id]
@@ -273,17 +330,11 @@ class StrategyOptimizationEngine:
                 end_date = datetime.now().strftime('%Y-%m-%d')
             
             # 获取股票数据
-            self.logger.info(f"获取 {symbol} 的历史数据，时间范围: {start_date} - {end_date}")
-            df = self.data_provider.get_stock_daily_data(symbol, start_date=start_date, end_date=end_date)
-            
-            # 使用LazyStockAnalyzer预处理数据
-            required_indicators = self._get_strategy_required_indicators(strategy_id)
-            analysis_result = self.lazy_analyzer.analyze(df)
-            
-            # 合并分析结果到原始数据
-            for key, value in analysis_result.items():
-                if key not in ['date', 'open', 'high', 'low', 'close', 'volume']:
-                    df[key] = value
+            if data is not None:
+                df = data.copy()
+            else:
+                self.logger.info(f"获取 {symbol} 的历史数据，时间范围: {start_date} - {end_date}")
+                df = self.data_provider.get_stock_daily_data(symbol, start_date=start_date, end_date=end_date)
             
             if df is None or len(df) < 30:  # 至少需要30个交易日的数据
                 self.logger.error(f"获取 {symbol} 的历史数据失败或数据不足")
@@ -294,32 +345,19 @@ class StrategyOptimizationEngine:
             if parameters:
                 strategy_params.update(parameters)
             
-            # 选择策略类
-            strategy_class_name = strategy_config.get('class_name')
+            # 相同策略版本、参数和行情数据的结果直接从缓存读取
+            cache_key = self.result_cache.make_key(
+                strategy_id, self._get_strategy_version(strategy_id), strategy_params, fingerprint_data(df))
+            if use_cache:
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    self.logger.info(f"命中回测缓存: {strategy_id} {symbol} {cache_key[:12]}")
+                    return {'status': 'success', 'data': cached, 'cached': True}
             
             # 执行回测
             self.logger.info(f"开始回测 {symbol} 的 {strategy_config['name']} 策略")
-            
-            # 调用对应的策略回测方法
-            if strategy_id == 'volume_price':
-                result = self.backtester.backtest_volume_price_strategy(data=df, symbol=symbol)
-            elif strategy_id == 'moving_average_crossover':
-                result = self.backtester.backtest_ma_crossover_strategy(
-                    data=df, 
-                    symbol=symbol,
-                    fast_period=strategy_params['fast_period'],
-                    slow_period=strategy_params['slow_period'],
-                    signal_period=strategy_params['signal_period']
-                )
-            elif strategy_id == 'rsi_strategy':
-                result = self.backtester.backtest_rsi_strategy(
-                    data=df,
-                    symbol=symbol,
-                    rsi_period=strategy_params['rsi_period'],
-                    oversold=strategy_params['oversold_threshold'],
-                    overbought=strategy_params['overbought_threshold']
-                )
-            else:
+            result = self._run_strategy_backtest(strategy_id, symbol, df, strategy_params)
+            if result is None:
                 self.logger.error(f"未实现的策略类型: {strategy_id}")
                 return {'status': 'error', 'message': f"未实现的策略类型: {strategy_id}"}
             
@@ -331,6 +369,8 @@ class StrategyOptimizationEngine:
                 'start_date': start_date,
                 'end_date': end_date,
                 'parameters': strategy_params,
+                'strategy_version': self._get_strategy_version(strategy_id),
+                'cache_key': cache_key,
                 'backtest_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             })
             
@@ -339,38 +379,61 @@ class StrategyOptimizationEngine:
             # 保存回测结果
             self._save_backtest_result(result)
             
-            return {'status': 'success', 'data': result}
+            return {'status': 'success', 'data': result, 'cached': False}
             
         except Exception as e:
             self.logger.error(f"回测策略时出错: {str(e)}")
             return {'status': 'error', 'message': str(e)}
     
     def _save_backtest_result(self, result):
-        """保存回测结果
+        """保存回测结果到结果缓存
         
         Args:
-            result: 回测结果字典
+            result: 回测结果字典（包含cache_key）
         """
         try:
-            # 创建回测结果目录
-            backtest_dir = os.path.join(self.data_dir, 'backtest_results')
-            os.makedirs(backtest_dir, exist_ok=True)
-            
-            # 生成文件名
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{result['strategy_id']}_{result['symbol']}_{timestamp}.json"
-            filepath = os.path.join(backtest_dir, filename)
-            
-            # 保存结果
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=4)
-            
-            self.logger.info(f"回测结果已保存到 {filepath}")
+            meta = {
+                'strategy_id': result['strategy_id'],
+                'symbol': result['symbol'],
+                'start_date': result.get('start_date'),
+                'end_date': result.get('end_date'),
+                'parameters': result.get('parameters'),
+                'total_return': result.get('total_return', 0),
+                'backtest_time': result.get('backtest_time')
+            }
+            self.result_cache.put(result['cache_key'], result, meta)
+            self.logger.info(f"回测结果已缓存: {result['cache_key'][:12]}")
             
         except Exception as e:
             self.logger.error(f"保存回测结果时出错: {str(e)}")
     
-    def optimize_strategy(self, strategy_id, symbol, start_date=None, end_date=None, param_grid=None):
+    def _get_strategy_version(self, strategy_id):
+        """获取策略版本，策略逻辑变更时提升策略配置或策略类中的version使旧缓存失效"""
+        strategy_config = self.strategies.get(strategy_id, {})
+        version = f"{strategy_config.get('class_name', strategy_id)}:{strategy_config.get('version', 1)}"
+        strategy_class = BACKTEST_STRATEGIES.get(strategy_id)
+        if strategy_class is not None:
+            version += f".{getattr(strategy_class, 'VERSION', 1)}"
+        return version
+    
+    def list_backtest_results(self, strategy_id=None, symbol=None):
+        """列出已缓存的历史回测结果摘要
+        
+        Args:
+            strategy_id: 按策略过滤
+            symbol: 按股票代码过滤
+            
+        Returns:
+            结果摘要列表，按时间倒序
+        """
+        return self.result_cache.list_results(strategy_id=strategy_id, symbol=symbol)
+    
+    def get_cached_backtest_result(self, cache_key):
+        """按缓存键读取完整回测结果"""
+        return self.result_cache.get(cache_key)
+    
+    def optimize_strategy(self, strategy_id, symbol, start_date=None, end_date=None, param_grid=None,
+                          use_cache=True):
         """优化策略参数
         
         Args:
@@ -379,6 +442,7 @@ class StrategyOptimizationEngine:
             start_date: 回测开始日期
             end_date: 回测结束日期
             param_grid: 参数网格，若为None则使用策略配置中的优化范围
+            use_cache: 是否优先读取回测结果缓存
             
         Returns:
             优化结果字典
@@ -388,6 +452,9 @@ class StrategyOptimizationEngine:
             if strategy_id not in self.strategies:
                 self.logger.error(f"策略 {strategy_id} 不存在")
                 return {'status': 'error', 'message': f"策略 {strategy_id} 不存在"}
+            if strategy_id not in BACKTEST_STRATEGIES:
+                self.logger.error(f"策略 {strategy_id} 暂不支持回测")
+                return {'status': 'error', 'message': f"策略 {strategy_id} 暂不支持回测"}
             
             # 获取策略配置
             strategy_config = self.strategies[strategy_id]
@@ -414,6 +481,11 @@ class StrategyOptimizationEngine:
                 self.logger.error(f"策略 {strategy_id} 没有定义优化范围")
                 return {'status': 'error', 'message': f"策略 {strategy_id} 没有定义优化范围"}
             
+            untunable = self._untunable_parameters(strategy_id, param_grid)
+            if untunable:
+                self.logger.error(f"策略 {strategy_id} 的回测不使用参数: {', '.join(untunable)}")
+                return {'status': 'error', 'message': f"策略 {strategy_id} 的回测不使用参数: {', '.join(untunable)}"}
+            
             # 进行参数优化
             self.logger.info(f"开始优化 {symbol} 的 {strategy_config['name']} 策略参数")
             self.logger.info(f"参数网格包含 {len(param_grid)} 组参数组合")
@@ -423,7 +495,8 @@ class StrategyOptimizationEngine:
             
             # 遍历参数组合进行回测
             for params in param_grid:
-                result = self.backtest_strategy(strategy_id, symbol, start_date, end_date, params)
+                result = self.backtest_strategy(strategy_id, symbol, start_date, end_date, params,
+                                                data=df, use_cache=use_cache)
                 
                 if result['status'] == 'success':
                     # 提取回测性能指标
@@ -474,6 +547,115 @@ class StrategyOptimizationEngine:
             self.logger.error(f"优化策略参数时出错: {str(e)}")
             return {'status': 'error', 'message': str(e)}
     
+    def walk_forward_optimize(self, strategy_id, symbol, start_date=None, end_date=None, param_grid=None,
+                              train_days=120, test_days=20, step_days=None, anchored=False,
+                              metric='total_return', apply_best=False, max_workers=None, warmup_days=60):
+        """滚动前推优化策略参数
+        
+        每个训练窗口独立寻优，并在随后的测试窗口上评估样本外表现。
+        与optimize_strategy不同，默认不会改写strategies.json。
+        
+        Args:
+            strategy_id: 策略ID
+            symbol: 股票代码
+            start_date: 数据开始日期 (默认为三年前)
+            end_date: 数据结束日期 (默认为今天)
+            param_grid: 参数网格，若为None则使用策略配置中的优化范围
+            train_days: 训练窗口交易日数（锚定模式下为首个训练窗口长度）
+            test_days: 测试窗口交易日数
+            step_days: 窗口前移交易日数，默认等于test_days
+            anchored: 是否使用锚定窗口
+            metric: 寻优目标指标
+            apply_best: 是否将各窗口最常出现的最优参数写入策略配置
+            max_workers: 并行窗口数
+            warmup_days: 每个训练和测试窗口之前用于指标预热的交易日数，预热期内不交易
+            
+        Returns:
+            滚动前推优化结果字典
+        """
+        try:
+            if strategy_id not in self.strategies:
+                self.logger.error(f"策略 {strategy_id} 不存在")
+                return {'status': 'error', 'message': f"策略 {strategy_id} 不存在"}
+            if strategy_id not in BACKTEST_STRATEGIES:
+                self.logger.error(f"策略 {strategy_id} 暂不支持回测")
+                return {'status': 'error', 'message': f"策略 {strategy_id} 暂不支持回测"}
+            
+            strategy_config = self.strategies[strategy_id]
+            
+            if not start_date:
+                start_date = (datetime.now() - timedelta(days=365 * 3)).strftime('%Y-%m-%d')
+            if not end_date:
+                end_date = datetime.now().strftime('%Y-%m-%d')
+            
+            # 只获取一次数据，各窗口按行切片
+            self.logger.info(f"获取 {symbol} 的历史数据，时间范围: {start_date} - {end_date}")
+            df = self.data_provider.get_stock_daily_data(symbol, start_date=start_date, end_date=end_date)
+            
+            if df is None or len(df) < train_days + test_days:
+                self.logger.error(f"获取 {symbol} 的历史数据失败或数据不足")
+                return {'status': 'error', 'message': f"获取 {symbol} 的历史数据失败或数据不足"}
+            
+            if param_grid is None and 'optimization_ranges' in strategy_config:
+                param_grid = self._generate_param_grid(strategy_config['optimization_ranges'])
+            
+            if not param_grid:
+                self.logger.error(f"策略 {strategy_id} 没有定义优化范围")
+                return {'status': 'error', 'message': f"策略 {strategy_id} 没有定义优化范围"}
+            
+            untunable = self._untunable_parameters(strategy_id, param_grid)
+            if untunable:
+                self.logger.error(f"策略 {strategy_id} 的回测不使用参数: {', '.join(untunable)}")
+                return {'status': 'error', 'message': f"策略 {strategy_id} 的回测不使用参数: {', '.join(untunable)}"}
+            
+            base_params = strategy_config['parameters']
+            initial_capital = self.backtester.initial_capital
+            
+            def evaluate(data, params, start):
+                # 每次评估使用独立的回测器，避免并行窗口共享状态；前start行只用于预热
+                strategy_params = dict(base_params, **params)
+                backtester = EnhancedBacktester(initial_capital=initial_capital)
+                result = self._run_strategy_backtest(strategy_id, symbol, data.copy(), strategy_params,
+                                                     backtester, start_index=start)
+                return result or {}
+            
+            optimizer = WalkForwardOptimizer(
+                evaluate_func=evaluate,
+                metric=metric,
+                max_workers=max_workers,
+                warmup=warmup_days
+            )
+            
+            self.logger.info(f"开始滚动前推优化 {symbol} 的 {strategy_config['name']} 策略参数")
+            wf_result = optimizer.run(
+                df, param_grid, train_days, test_days, step=step_days,
+                anchored=anchored, data_key=(symbol, start_date, end_date)
+            )
+            
+            wf_result.update({
+                'strategy_id': strategy_id,
+                'strategy_name': strategy_config['name'],
+                'symbol': symbol,
+                'start_date': start_date,
+                'end_date': end_date,
+                'optimization_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            })
+            
+            self._save_optimization_result(wf_result)
+            
+            summary = wf_result['summary']
+            self.logger.info(f"滚动前推优化完成，有效窗口 {summary['valid_folds']}/{summary['fold_count']}")
+            
+            if apply_best and summary.get('most_common_parameters'):
+                strategy_config['parameters'].update(summary['most_common_parameters'])
+                self._save_strategies()
+            
+            return {'status': 'success', 'data': wf_result}
+            
+        except Exception as e:
+            self.logger.error(f"滚动前推优化时出错: {str(e)}")
+            return {'status': 'error', 'message': str(e)}
+    
     def _generate_param_grid(self, optimization_ranges):
         """根据参数优化范围生成参数网格
         
@@ -549,7 +731,7 @@ class StrategyOptimizationEngine:
         except Exception as e:
             self.logger.error(f"保存优化结果时出错: {str(e)}")
     
-    def batch_backtest(self, strategy_id, symbols, start_date=None, end_date=None):
+    def batch_backtest(self, strategy_id, symbols, start_date=None, end_date=None, use_cache=True):
         """批量回测策略
         
         Args:
@@ -557,6 +739,7 @@ class StrategyOptimizationEngine:
             symbols: 股票代码列表
             start_date: 回测开始日期
             end_date: 回测结束日期
+            use_cache: 是否优先读取回测结果缓存
             
         Returns:
             批量回测结果字典
@@ -571,7 +754,7 @@ class StrategyOptimizationEngine:
             results = []
             for symbol in symbols:
                 self.logger.info(f"回测 {symbol}...")
-                result = self.backtest_strategy(strategy_id, symbol, start_date, end_date)
+                result = self.backtest_strategy(strategy_id, symbol, start_date, end_date, use_cache=use_cache)
                 
                 if result['status'] == 'success':
                     # 提取回测性能指标
@@ -631,7 +814,8 @@ class StrategyOptimizationEngine:
             # 保存批量回测结果
             self._save_batch_result(batch_result)
             
-            self.logger.info(f"批量回测完成，成功率: {summary['successful_tests']}/{summary['total_stocks']}")
+            self.logger.info(f"批量回测完成，成功率: {summary['successful_tests']}/{summary['total_stocks']}，"
+                             f"缓存命中率: {self.result_cache.get_stats()['hit_rate']:.0%}")
             
             return {'status': 'success', 'data': batch_result}
             
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+表格模型模块
+大表格的数据按列存储：每列保存显示文本和排序键，在后台线程一次构建完成；
+界面用QTableView加RecordTableModel显示，只有可见的单元格才会调用data()，
+排序和筛选只重新排列行号视图，不再为每个单元格创建QTableWidgetItem或逐行设置颜色
+"""
+
+import logging
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+    from PyQt5.QtGui import QColor
+    HAS_QT = True
+except ImportError:
+    HAS_QT = False
+
+logger = logging.getLogger('TableModel')
+
+# 复盘池状态对应的行背景色
+STATUS_COLORS = {
+    'watching': '#f0f0ff',  # 浅蓝色
+    'bought': '#f0fff0',    # 浅绿色
+    'sold': '#fff0f0',      # 浅红色
+}
+
+
+def status_background(record: Dict[str, Any]) -> Optional[str]:
+    """按复盘池状态取行背景色"""
+    return STATUS_COLORS.get(record.get('status', ''))
+
+
+def sign_color(value: Any) -> Optional[str]:
+    """正数为绿色，负数为红色"""
+    if isinstance(value, (int, float)):
+        if value > 0:
+            return 'green'
+        if value < 0:
+            return 'red'
+    return None
+
+
+def sort_key(value: Any) -> tuple:
+    """统一的排序键：数值按大小，其余按文本，空值单独标记，混合类型的列也能排序"""
+    if value is None or value == '' or (isinstance(value, float) and math.isnan(value)):
+        return (2, '')
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value)
+    return (1, str(value))
+
+
+class TableColumn:
+    """表格列定义"""
+
+    def __init__(self, header: str, value: Any, fmt: Optional[Callable[[Any], str]] = None,
+                 color: Optional[Callable[[Any], Optional[str]]] = None):
+        """初始化列定义
+
+        Args:
+            header: 列标题
+            value: 记录中的字段名，或从记录取值的函数
+            fmt: 显示格式函数，默认str，空值显示为空字符串
+            color: 按取值返回文字颜色的函数
+        """
+        self.header = header
+        self.value = value if callable(value) else (lambda record, field=value: record.get(field))
+        self.fmt = fmt or str
+        self.color = color
+
+    def display(self, value: Any) -> str:
+        if value is None:
+            return ''
+        try:
+            return self.fmt(value)
+        except (TypeError, ValueError):
+            return str(value)
+
+
+class ColumnarTable:
+    """列式存储的表格数据，构建后只读，可以在后台线程构建后交给界面线程"""
+
+    def __init__(self, columns: Sequence[TableColumn], records: Sequence[Any] = (),
+                 background: Optional[Callable[[Any], Optional[str]]] = None):
+        """按列构建表格数据
+
+        Args:
+            columns: 列定义
+            records: 记录列表，保留原始对象供筛选和查看详情
+            background: 按记录返回行背景色的函数
+        """
+        self.columns = list(columns)
+        self.records = list(records)
+        self.text: List[List[str]] = []
+        self.keys: List[List[tuple]] = []
+        self.foreground: List[Optional[List[Optional[str]]]] = []
+        for column in self.columns:
+            values = [column.value(record) for record in self.records]
+            self.text.append([column.display(value) for value in values])
+            self.keys.append([sort_key(value) for value in values])
+            self.foreground.append([column.color(value) for value in values] if column.color else None)
+        self.background = [background(record) for record in self.records] if background else None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def headers(self) -> List[str]:
+        return [column.header for column in self.columns]
+
+    def filter_rows(self, predicate: Optional[Callable[[Any], bool]] = None) -> List[int]:
+        """满足条件的行号，predicate为None时返回全部行"""
+        if predicate is None:
+            return list(range(len(self.records)))
+        return [i for i, record in enumerate(self.records) if predicate(record)]
+
+    def sort_rows(self, rows: List[int], column: int, descending: bool = False) -> List[int]:
+        """按列排序行号，排序稳定，空值总排在最后"""
+        keys = self.keys[column]
+        filled = [row for row in rows if keys[row][0] < 2]
+        empty = [row for row in rows if keys[row][0] == 2]
+        return sorted(filled, key=keys.__getitem__, reverse=descending) + empty
+
+
+if HAS_QT:
+    class RecordTableModel(QAbstractTableModel):
+        """基于ColumnarTable的只读表格模型，支持视图内排序和筛选"""
+
+        def __init__(self, columns: Sequence[TableColumn], parent=None):
+            super().__init__(parent)
+            self._table = ColumnarTable(columns)
+            self._rows: List[int] = []
+            self._predicate: Optional[Callable[[Any], bool]] = None
+            self._sort_column: Optional[int] = None
+            self._descending = False
+            self._colors: Dict[str, QColor] = {}
+
+        def _color(self, name: Optional[str]):
+            if name is None:
+                return None
+            color = self._colors.get(name)
+            if color is None:
+                color = self._colors[name] = QColor(name)
+            return color
+
+        def _refresh(self) -> None:
+            self.beginResetModel()
+            rows = self._table.filter_rows(self._predicate)
+            if self._sort_column is not None:
+                rows = self._table.sort_rows(rows, self._sort_column, self._descending)
+            self._rows = rows
+            self.endResetModel()
+
+        def set_table(self, table: ColumnarTable) -> None:
+            """替换表格数据，保留当前的排序和筛选条件"""
+            self._table = table
+            self._refresh()
+
+        def set_filter(self, predicate: Optional[Callable[[Any], bool]]) -> None:
+            """设置筛选条件，参数为原始记录，None表示不筛选"""
+            self._predicate = predicate
+            self._refresh()
+
+        def record(self, row: int) -> Any:
+            """视图中第row行对应的原始记录"""
+            return self._table.records[self._rows[row]]
+
+        def total_count(self) -> int:
+            """筛选前的记录数"""
+            return len(self._table)
+
+        def rowCount(self, parent=QModelIndex()) -> int:
+            return 0 if parent.isValid() else len(self._rows)
+
+        def columnCount(self, parent=QModelIndex()) -> int:
+            return 0 if parent.isValid() else len(self._table.columns)
+
+        def data(self, index, role=Qt.DisplayRole):
+            if not index.isValid():
+                return None
+            row = self._rows[index.row()]
+            column = index.column()
+            if role == Qt.DisplayRole:
+                return self._table.text[column][row]
+            if role == Qt.BackgroundRole and self._table.background is not None:
+                return self._color(self._table.background[row])
+            if role == Qt.ForegroundRole and self._table.foreground[column] is not None:
+                return self._color(self._table.foreground[column][row])
+            if role == Qt.UserRole:
+                return self._table.records[row]
+            return None
+
+        def headerData(self, section, orientation, role=Qt.DisplayRole):
+            if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+                return self._table.columns[section].header
+            return super().headerData(section, orientation, role)
+
+        def sort(self, column: int, order=Qt.AscendingOrder) -> None:
+            """按列排序，QTableView点击表头时调用"""
+            self._sort_column = column
+            self._descending = order == Qt.DescendingOrder
+            self._refresh()
@@ -5,9 +5,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 import mplfinance as mpf
 from datetime import datetime, timedelta
+import io
 import os
 import sys
 from simple_stock_provider import SimpleStockProvider
+from chart_render import DEFAULT_MAX_POINTS, cached_render, decimate_frame
 
 # Set up logging
 logging.basicConfig(
@@ -323,14 +325,18 @@ class TechnicalAnalyzer:
             "reasons": reasons
         }
     
-    def plot_data(self, data, symbol, output_file=None):
+    def plot_data(self, data, symbol, output_file=None, max_points=DEFAULT_MAX_POINTS):
         """
         Create a comprehensive plot of price and indicators
         
+        Saved charts are cached by (symbol, last bar, format), so saving the
+        same data again only writes the already rendered image.
+        
         Args:
             data: DataFrame with stock data
             symbol: Stock symbol
             output_file: Path to save the plot (if None, display only)
+            max_points: Maximum number of bars to draw, longer histories are decimated
             
         Returns:
             True if successful, False otherwise
@@ -339,6 +345,31 @@ class TechnicalAnalyzer:
             logger.error("No data to plot")
             return False
             
+        if output_file:
+            fmt = os.path.splitext(output_file)[1].lstrip('.').lower() or 'png'
+            image = cached_render(symbol, data, f'technical:{max_points}.{fmt}',
+                                  lambda: self._render_plot(data, symbol, max_points, fmt))
+            with open(output_file, 'wb') as f:
+                f.write(image)
+            logger.info(f"Plot saved to {output_file}")
+        else:
+            self._create_figure(data, symbol, max_points)
+            plt.show()
+            plt.close()
+        return True
+    
+    def _render_plot(self, data, symbol, max_points, fmt):
+        """Render the plot to image bytes in the given format"""
+        fig = self._create_figure(data, symbol, max_points)
+        buffer = io.BytesIO()
+        try:
+            fig.savefig(buffer, format=fmt)
+        finally:
+            plt.close(fig)
+        return buffer.getvalue()
+    
+    def _create_figure(self, data, symbol, max_points):
+        """Build the price and indicator figure"""
         # Get stock info for title
         stock_info = self.get_stock_info(symbol)
         if not stock_info.empty:
@@ -347,6 +378,14 @@ class TechnicalAnalyzer:
         else:
             title = symbol
             
+        # Moving averages use the full history, then everything is decimated for drawing
+        data = data.assign(
+            ma5=data['close'].rolling(window=5).mean(),
+            ma20=data['close'].rolling(window=20).mean(),
+            ma60=data['close'].rolling(window=60).mean(),
+        )
+        data = decimate_frame(data, max_points)
+            
         # Create OHLC dataframe for mplfinance
         ohlc = data[['open', 'high', 'low', 'close']].copy()
         if 'vol' in data.columns:
@@ -363,13 +402,9 @@ class TechnicalAnalyzer:
         axes[0].grid(True)
         
         # Add moving averages to price chart
-        ma5 = data['close'].rolling(window=5).mean()
-        ma20 = data['close'].rolling(window=20).mean()
-        ma60 = data['close'].rolling(window=60).mean()
-        
-        axes[0].plot(data.index, ma5, label='MA5', color='blue', linewidth=1)
-        axes[0].plot(data.index, ma20, label='MA20', color='orange', linewidth=1)
-        axes[0].plot(data.index, ma60, label='MA60', color='purple', linewidth=1)
+        axes[0].plot(data.index, data['ma5'], label='MA5', color='blue', linewidth=1)
+        axes[0].plot(data.index, data['ma20'], label='MA20', color='orange', linewidth=1)
+        axes[0].plot(data.index, data['ma60'], label='MA60', color='purple', linewidth=1)
         axes[0].legend()
         
         # Add Bollinger Bands if available
@@ -415,16 +450,7 @@ class TechnicalAnalyzer:
         
         # Adjust layout
         plt.tight_layout()
-        
-        # Save or display
-        if output_file:
-            plt.savefig(output_file)
-            logger.info(f"Plot saved to {output_file}")
-        else:
-            plt.show()
-            
-        plt.close()
-        return True
+        return fig
     
     def generate_report(self, symbol, days=90):
         """
@@ -0,0 +1,74 @@
+import unittest
+import pandas as pd
+import numpy as np
+
+import backtest_executor
+from backtest_executor import (BacktestJob, LocalProcessBackend, LocalThreadBackend,
+                               get_shared_backend, shutdown_shared_backends)
+from enhanced_backtesting import EnhancedBacktester
+
+
+def buy_then_sell(data, hold_days=5):
+    """第一天买入，持有hold_days后卖出"""
+    signals = pd.DataFrame(index=data.index)
+    signals['action'] = 'hold'
+    signals['price'] = data['close']
+    signals['stop_loss'] = data['close'] * 0.9
+    signals.iloc[0, signals.columns.get_loc('action')] = 'buy'
+    signals.iloc[hold_days, signals.columns.get_loc('action')] = 'sell'
+    return signals
+
+
+def _make_data(seed, days=30):
+    rng = np.random.default_rng(seed)
+    close = 10 + rng.normal(0, 0.1, days).cumsum()
+    return pd.DataFrame({'close': close}, index=pd.date_range('2024-01-01', periods=days))
+
+
+class TestBacktestExecutor(unittest.TestCase):
+    """测试并行回测执行后端"""
+
+    def setUp(self):
+        self.data = {f'S{i}': _make_data(i) for i in range(4)}
+        self.params = {'use_dynamic_position_sizing': False, 'use_time_stop': False,
+                       'use_trailing_stop': False}
+
+    def _jobs(self):
+        return [(symbol, buy_then_sell, dict(self.params, hold_days=3 + i))
+                for i, symbol in enumerate(self.data)]
+
+    def test_backtesters_do_not_create_pools(self):
+        shutdown_shared_backends()
+        backtesters = [EnhancedBacktester() for _ in range(100)]
+        self.assertEqual(len(backtesters), 100)
+        self.assertEqual(backtest_executor._default_backends, {})
+
+    def test_thread_backend_streams_progress(self):
+        progress = []
+        backend = LocalThreadBackend(max_workers=2)
+        self.assertFalse(backend.started)
+        results = EnhancedBacktester().parallel_backtest(
+            self._jobs(), backend=backend, data=self.data,
+            progress_callback=lambda done, total, r: progress.append((done, total)))
+        backend.shutdown()
+
+        self.assertEqual([r.symbol for r in results], list(self.data))
+        self.assertTrue(all(r.success for r in results))
+        self.assertEqual(results[0].result.trade_count, 1)
+        self.assertEqual(progress[-1], (4, 4))
+
+    def test_process_backend(self):
+        backend = LocalProcessBackend(max_workers=2)
+        results = EnhancedBacktester().parallel_backtest(self._jobs(), backend=backend, data=self.data)
+        backend.shutdown()
+        self.assertTrue(all(r.success for r in results))
+
+    def test_unknown_strategy_reported(self):
+        job = BacktestJob(symbol='S0', strategy='missing', data=self.data['S0'])
+        results = EnhancedBacktester().parallel_backtest([job], backend=get_shared_backend('thread'))
+        self.assertFalse(results[0].success)
+        self.assertIn('missing', results[0].error)
+
+
+if __name__ == '__main__':
+    unittest.main()
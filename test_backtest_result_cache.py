@@ -0,0 +1,51 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from backtest_result_cache import BacktestResultCache, fingerprint_data
+
+
+class TestBacktestResultCache(unittest.TestCase):
+    """测试内容寻址的回测结果缓存"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = BacktestResultCache(self.tmp.name)
+        self.df = pd.DataFrame({'close': np.arange(30, dtype=float)},
+                               index=pd.date_range('2024-01-01', periods=30))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fingerprint_tracks_bar_changes(self):
+        changed = self.df.copy()
+        changed.iloc[-1, 0] += 0.01
+        self.assertEqual(fingerprint_data(self.df), fingerprint_data(self.df.copy()))
+        self.assertNotEqual(fingerprint_data(self.df), fingerprint_data(changed))
+
+    def test_key_ignores_parameter_order(self):
+        fp = fingerprint_data(self.df)
+        key1 = self.cache.make_key('rsi', 'RSIStrategy:1', {'a': 1, 'b': 2}, fp)
+        key2 = self.cache.make_key('rsi', 'RSIStrategy:1', {'b': 2, 'a': 1}, fp)
+        key3 = self.cache.make_key('rsi', 'RSIStrategy:2', {'a': 1, 'b': 2}, fp)
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, key3)
+
+    def test_put_get_and_index(self):
+        key = self.cache.make_key('rsi', 1, {'a': np.int64(3)}, fingerprint_data(self.df))
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, {'total_return': np.float64(1.5), 'trade_count': np.int64(3)},
+                       {'strategy_id': 'rsi', 'symbol': '000001.SZ'})
+        self.cache.put(key, {'total_return': 1.5, 'trade_count': 3},
+                       {'strategy_id': 'rsi', 'symbol': '000001.SZ'})
+
+        self.assertEqual(self.cache.get(key), {'total_return': 1.5, 'trade_count': 3})
+        self.assertEqual(len(self.cache.list_results(strategy_id='rsi')), 1)
+        self.assertEqual(self.cache.list_results(symbol='600519.SH'), [])
+        self.assertEqual(self.cache.get_stats()['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
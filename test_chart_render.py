@@ -0,0 +1,102 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import chart_render
+from chart_render import cached_render, decimate_frame, last_bar, lttb_indices
+
+
+def _bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=n))
+    return pd.DataFrame({
+        'Open': close + rng.normal(size=n) * 0.1,
+        'High': close + 1 + rng.random(n),
+        'Low': close - 1 - rng.random(n),
+        'Close': close,
+        'Volume': rng.integers(1000, 2000, size=n).astype(float),
+        'MACD': np.sin(np.arange(n) / 10),
+    }, index=pd.date_range('2015-01-01', periods=n, freq='B'))
+
+
+class TestLttb(unittest.TestCase):
+
+    def test_keeps_endpoints_and_extremes(self):
+        x = np.arange(1000)
+        y = np.zeros(1000)
+        y[337] = 50.0
+        y[712] = -30.0
+        idx = lttb_indices(x, y, 50)
+        self.assertEqual(len(idx), 50)
+        self.assertEqual(idx[0], 0)
+        self.assertEqual(idx[-1], 999)
+        self.assertTrue(np.all(np.diff(idx) > 0))
+        self.assertIn(337, idx)
+        self.assertIn(712, idx)
+
+    def test_short_series_unchanged(self):
+        self.assertEqual(list(lttb_indices(range(10), range(10), 20)), list(range(10)))
+
+
+class TestDecimateFrame(unittest.TestCase):
+
+    def test_ohlc_buckets_preserve_range_and_volume(self):
+        df = _bars(2500)
+        result = decimate_frame(df, 600)
+        self.assertEqual(len(result), 600)
+        self.assertEqual(result.index[-1], df.index[-1])
+        self.assertTrue(result.index.is_monotonic_increasing)
+        self.assertEqual(result['High'].max(), df['High'].max())
+        self.assertEqual(result['Low'].min(), df['Low'].min())
+        self.assertAlmostEqual(result['Volume'].sum(), df['Volume'].sum())
+        self.assertEqual(result['Close'].iloc[-1], df['Close'].iloc[-1])
+        self.assertEqual(result['Open'].iloc[0], df['Open'].iloc[0])
+
+    def test_line_frame_uses_lttb_and_short_frame_untouched(self):
+        df = _bars(2000)[['MACD']]
+        result = decimate_frame(df, 300)
+        self.assertEqual(len(result), 300)
+        self.assertTrue(set(result.index) <= set(df.index))
+        short = _bars(100)
+        self.assertIs(decimate_frame(short, 600), short)
+
+
+class TestCachedRender(unittest.TestCase):
+
+    def setUp(self):
+        chart_render.get_figure_cache().clear()
+
+    def test_reuses_until_new_bar(self):
+        df = _bars(300)
+        builds = []
+
+        def build():
+            builds.append(1)
+            return object()
+
+        first = cached_render('000001', df, 'analysis', build)
+        self.assertIs(cached_render('000001', df, 'analysis', build), first)
+        cached_render('000001', df, 'volume', build)
+        self.assertEqual(len(builds), 2)
+
+        # 盘中最后一根K线价格变化或出现新K线都会重新绘制
+        updated = df.copy()
+        updated.iloc[-1, updated.columns.get_loc('Close')] += 1
+        self.assertNotEqual(last_bar(updated), last_bar(df))
+        self.assertIsNot(cached_render('000001', updated, 'analysis', build), first)
+        self.assertEqual(len(builds), 3)
+
+        # 截止同一天但回看长度不同的数据分别缓存
+        recent = cached_render('000001', df.tail(90), 'analysis', build)
+        self.assertIsNot(recent, first)
+        self.assertIs(cached_render('000001', df, 'analysis', build), first)
+        self.assertEqual(len(builds), 4)
+
+        # 生成失败不缓存
+        self.assertIsNone(cached_render('000002', df, 'analysis', lambda: None))
+        self.assertIsNotNone(cached_render('000002', df, 'analysis', build))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from gui_tasks import TaskCancelled, TaskContext, run_task
+
+
+class TestGuiTasks(unittest.TestCase):
+    """测试后台任务上下文的进度合并、部分结果批量发送和取消"""
+
+    def setUp(self):
+        self.progress = []
+        self.batches = []
+
+    def _context(self, interval):
+        return TaskContext(lambda done, total, message: self.progress.append((done, total, message)),
+                           self.batches.append, interval=interval)
+
+    def test_progress_and_partial_are_batched(self):
+        context = self._context(interval=60)
+
+        def scan(ctx, symbols):
+            for done, symbol in enumerate(symbols, 1):
+                ctx.progress(done, len(symbols))
+                ctx.partial(symbol)
+            return len(symbols)
+
+        symbols = [f'{i:06d}' for i in range(5000)]
+        status, value = run_task(scan, context, symbols)
+        self.assertEqual((status, value), ('finished', 5000))
+        # 间隔内只发送首次和完成时的进度，部分结果合并成少量批次且不丢失
+        self.assertEqual(self.progress, [(1, 5000, ''), (5000, 5000, '')])
+        self.assertLessEqual(len(self.batches), 2)
+        self.assertEqual([s for batch in self.batches for s in batch], symbols)
+
+        # 带说明的进度总是立即发送
+        context.progress(0, 0, '正在执行回测计算...')
+        self.assertEqual(self.progress[-1], (0, 0, '正在执行回测计算...'))
+
+    def test_cancel_and_error(self):
+        context = self._context(interval=0)
+
+        def task(ctx):
+            ctx.partial('000001')
+            ctx.cancel()
+            ctx.partial('000002')
+            ctx.check()
+            return 'unreachable'
+
+        self.assertEqual(run_task(task, context), ('cancelled', None))
+        self.assertTrue(context.is_cancelled())
+        self.assertEqual([s for batch in self.batches for s in batch], ['000001', '000002'])
+
+        def failing(ctx):
+            raise ValueError('获取数据失败')
+
+        self.assertEqual(run_task(failing, self._context(0)), ('error', '获取数据失败'))
+        with self.assertRaises(TaskCancelled):
+            context.check()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import time
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from intraday_backtesting import IntradayBacktester, MinuteBarStore
+
+
+def _minute_frame(days, bars_per_day=240, seed=0, prices=None):
+    """生成stk_mins格式的分钟线"""
+    rng = np.random.default_rng(seed)
+    session = pd.date_range('09:31', periods=120, freq='min').time.tolist() + \
+        pd.date_range('13:01', periods=120, freq='min').time.tolist()
+    dates = pd.bdate_range('2023-01-02', periods=days)
+    times = [pd.Timestamp.combine(d, t) for d in dates for t in session[:bars_per_day]]
+    if prices is None:
+        prices = 10 * np.exp(rng.normal(0, 0.0005, len(times)).cumsum())
+    return pd.DataFrame({
+        'trade_time': [t.strftime('%Y-%m-%d %H:%M:%S') for t in times],
+        'open': prices, 'high': prices * 1.0005, 'low': prices * 0.9995, 'close': prices,
+        'vol': rng.integers(1000, 5000, len(times)), 'amount': prices * 1000,
+    })
+
+
+def first_bar_buy(day, backtester):
+    signals = np.zeros(len(day), dtype=np.int8)
+    signals[0] = 1
+    return signals
+
+
+class TestIntradayBacktester(unittest.TestCase):
+    """测试分钟线事件驱动回测"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'bars.npy')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_store_chunks_by_day(self):
+        store = MinuteBarStore.save(_minute_frame(3), self.path)
+        days = list(store.iter_days())
+        self.assertEqual(store.day_count, 3)
+        self.assertEqual([len(d) for d in days], [240, 240, 240])
+        self.assertIsInstance(store.bars, np.memmap)
+        self.assertEqual(days[1].date, pd.Timestamp('2023-01-03'))
+
+    def test_t_plus_one_defers_stop(self):
+        # 第一天开盘后一路下跌，止损只能在第二天执行
+        prices = np.concatenate([np.linspace(10, 8, 240), np.full(240, 8.0)])
+        store = MinuteBarStore.save(_minute_frame(2, prices=prices), self.path)
+        backtester = IntradayBacktester(initial_capital=1000000.0)
+        backtester.use_time_stop = False
+        result = backtester.backtest_minute_bars(store, first_bar_buy, 'TEST')
+
+        trades = list(result.trades)
+        self.assertEqual(trades[0].action, 'buy')
+        self.assertEqual(trades[1].action, 'sell')
+        self.assertEqual(trades[1].timestamp.date(), pd.Timestamp('2023-01-03').date())
+        self.assertEqual(trades[0].volume % 100, 0)
+
+    def test_year_of_minute_bars_is_fast(self):
+        store = MinuteBarStore.save(_minute_frame(242), self.path)
+        backtester = IntradayBacktester()
+        start = time.time()
+        result = backtester.backtest_minute_bars(store, first_bar_buy, 'TEST')
+        elapsed = time.time() - start
+        self.assertGreater(result.trade_count, 0)
+        self.assertLess(elapsed, 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
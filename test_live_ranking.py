@@ -0,0 +1,81 @@
+import importlib.util
+import random
+import threading
+import unittest
+from unittest import mock
+
+from gui_tasks import TaskContext, run_task
+from live_ranking import LiveTopK
+
+
+class TestLiveTopK(unittest.TestCase):
+
+    def test_matches_full_sort(self):
+        rng = random.Random(3)
+        items = [{'symbol': str(i), 'score': rng.randint(0, 20)} for i in range(500)]
+        ranking = LiveTopK(10, key=lambda x: x['score'])
+        for item in items:
+            ranking.push(item)
+            # 任一时刻的前K名都与已到达结果的稳定排序一致
+            if int(item['symbol']) % 97 == 0:
+                arrived = items[:int(item['symbol']) + 1]
+                expected = sorted(arrived, key=lambda x: x['score'], reverse=True)[:10]
+                self.assertEqual(ranking.items(), expected)
+        self.assertEqual(ranking.seen, 500)
+        self.assertEqual(ranking.items(), sorted(items, key=lambda x: x['score'], reverse=True)[:10])
+
+    def test_push_reports_changes(self):
+        ranking = LiveTopK(2)
+        self.assertEqual([ranking.push(v) for v in (5, 3, 1, 4, 4, 9)], [True, True, False, True, False, True])
+        self.assertEqual(ranking.items(), [9, 5])
+        self.assertFalse(LiveTopK(0).push(1))
+
+    def test_concurrent_pushes(self):
+        ranking = LiveTopK(5)
+        threads = [threading.Thread(target=lambda start=start: [ranking.push(v) for v in range(start, 1000, 4)])
+                   for start in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(ranking.seen, 1000)
+        self.assertEqual(ranking.items(), [999, 998, 997, 996, 995])
+
+
+@unittest.skipUnless(importlib.util.find_spec('PyQt5'), '需要PyQt5')
+class TestAppScanTask(unittest.TestCase):
+    """主界面的扫描任务使用应用实际导入的VisualStockSystem"""
+
+    def test_scan_task_ranks_results(self):
+        import stock_analyzer_app
+        from stock_analyzer_app import StockAnalyzerApp
+        from visual_stock_system import VisualStockSystem
+
+        self.assertIs(stock_analyzer_app.VisualStockSystem, VisualStockSystem)
+        system = VisualStockSystem(headless=True)
+        results = {
+            '600000.SH': {'symbol': '600000.SH', 'trend': 'downtrend', 'macd_hist': 0.5},
+            '000001.SZ': {'symbol': '000001.SZ', 'trend': 'uptrend', 'macd_hist': 0.1},
+            '000977.SZ': None,
+            '600519.SH': {'symbol': '600519.SH', 'trend': 'uptrend', 'macd_hist': 0.3},
+        }
+        system.get_industry_stocks = mock.Mock(return_value=list(results))
+        system._scan_one = results.get
+        app = mock.Mock(visual_system=system, SCAN_TOP_K=2, SCAN_TIME_LIMIT=None,
+                        _recommendation_sort_key=StockAnalyzerApp._recommendation_sort_key)
+        progress = []
+        context = TaskContext(on_progress=lambda done, total, message: progress.append((done, total)),
+                              interval=0)
+
+        status, result = run_task(StockAnalyzerApp._scan_stocks_task.__get__(app), context, '银行')
+
+        self.assertEqual(status, 'finished')
+        system.get_industry_stocks.assert_called_once_with('银行')
+        self.assertEqual((result['done'], result['total']), (4, 4))
+        self.assertEqual(progress[-1], (4, 4))
+        self.assertEqual(result['ranking'].seen, 3)
+        self.assertEqual([r['symbol'] for r in result['ranking'].items()], ['600519.SH', '000001.SZ'])
+
+
+if __name__ == '__main__':
+    unittest.main()
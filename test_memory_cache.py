@@ -0,0 +1,92 @@
+import time
+import threading
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from memory_cache import BoundedCache, all_cache_stats, current_trade_date, estimate_size
+
+
+class TestBoundedCache(unittest.TestCase):
+
+    def test_lru_and_memory_budget(self):
+        cache = BoundedCache(max_entries=3, name='lru')
+        for key in 'abcd':
+            cache.set(key, key)
+        self.assertNotIn('a', cache)
+        cache.get('b')
+        cache.set('e', 'e')
+        self.assertEqual(sorted(cache._data), ['b', 'd', 'e'])
+
+        block = np.zeros(1000)  # 8000字节
+        budget = BoundedCache(max_entries=100, max_bytes=20000, name='bytes')
+        for i in range(5):
+            budget.set(i, block.copy())
+        stats = budget.stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertLessEqual(stats['bytes'], 20000)
+        self.assertEqual(stats['evicted'], 3)
+        budget.set('huge', np.zeros(10000))
+        self.assertNotIn('huge', budget)
+        self.assertIn('bytes', [s['name'] for s in all_cache_stats()])
+
+    def test_ttl_and_trade_date(self):
+        cache = BoundedCache(ttl=0.05, name='ttl')
+        cache.set('x', 1, trade_date='20240102')
+        self.assertEqual(cache.get('x', trade_date='20240102'), 1)
+        self.assertIsNone(cache.get('x', trade_date='20240103'))
+        self.assertNotIn('x', cache)
+
+        cache.set('y', 0.0)
+        self.assertEqual(cache.get('y'), 0.0)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('y'))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['expired']), (2, 3, 2))
+
+        self.assertEqual(current_trade_date(datetime(2026, 10, 19, 9, 0)), '20261016')
+        self.assertEqual(current_trade_date(datetime(2026, 10, 19, 10, 0)), '20261019')
+        self.assertEqual(current_trade_date(datetime(2026, 10, 18, 12, 0)), '20261016')
+
+    def test_concurrent_access_and_size_estimate(self):
+        cache = BoundedCache(max_entries=50, name='threads')
+
+        def worker(offset):
+            for i in range(2000):
+                cache.set((offset, i % 100), i)
+                cache.get((offset, (i + 1) % 100))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(cache), 50)
+
+        df = pd.DataFrame({'close': np.arange(1000.0)})
+        self.assertGreaterEqual(estimate_size(df), 8000)
+        self.assertGreater(estimate_size({'df': df}), estimate_size(df))
+
+
+class TestJFTradingSystemCaches(unittest.TestCase):
+
+    def test_indicator_caches_are_bounded(self):
+        from jf_trading_system import JFTradingSystem
+        system = JFTradingSystem()
+        self.assertIsInstance(system._volatility_cache, BoundedCache)
+        self.assertIsInstance(system._resonance_cache, BoundedCache)
+        system._volatility_cache.max_entries = 2
+        rng = np.random.default_rng(0)
+        for _ in range(4):
+            close = 10 + rng.normal(0, 0.2, 60).cumsum()
+            df = pd.DataFrame({'High': close + 0.1, 'Low': close - 0.1, 'Close': close})
+            first = system.analyze_volatility_expansion(df)
+            self.assertEqual(system.analyze_volatility_expansion(df), first)
+        self.assertEqual(len(system._volatility_cache), 2)
+        self.assertEqual(system._volatility_cache.stats()['hits'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import advanced_sector_analyzer
+from north_flow_store import NorthFlowStore, NorthHoldingStore, NorthTop10Store, _northbound_only
+from sector_membership import SectorMembershipIndex
+
+DATES = ['20240102', '20240103', '20240104']
+
+
+class FakeTushare:
+    """按日期返回固定数据并记录调用次数"""
+
+    def __init__(self):
+        self.calls = {'market': 0, 'hold': 0, 'top10': 0}
+
+    def market(self, start_date, end_date):
+        self.calls['market'] += 1
+        dates = [d for d in DATES if start_date <= d <= end_date]
+        return pd.DataFrame({'trade_date': dates, 'hgt': [100.0] * len(dates), 'sgt': [50.0] * len(dates),
+                             'north_money': [150.0 + i for i in range(len(dates))]})
+
+    def hold(self, trade_date):
+        self.calls['hold'] += 1
+        i = DATES.index(trade_date)
+        return pd.DataFrame({'ts_code': ['600000.SH', '000001.SZ', '00700.HK'],
+                             'vol': [1000.0 + 100 * i, 2000.0 - 50 * i, 5.0],
+                             'ratio': [1.0, 2.0, 3.0], 'exchange': ['SH', 'SZ', 'HK']})
+
+    def top10(self, trade_date):
+        self.calls['top10'] += 1
+        i = DATES.index(trade_date)
+        return pd.DataFrame({'ts_code': ['600000.SH', '000977.SZ'], 'name': ['浦发银行', '浪潮信息'],
+                             'net_amount': [1e7 * (1 if i != 1 else -1), 2e7], 'amount': [1e8, 2e8],
+                             'market_type': ['1', '3']})
+
+
+class TestNorthFlowStore(unittest.TestCase):
+    """测试北向资金增量存储与行业归因"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.api = FakeTushare()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _store(self):
+        calendar = lambda start, end: [d for d in DATES if start <= d <= end]
+        holdings = NorthHoldingStore(os.path.join(self.tmp.name, 'holdings'),
+                                     fetchers={'hold': lambda d: _northbound_only(self.api.hold(d))},
+                                     calendar_func=calendar)
+        top10 = NorthTop10Store(os.path.join(self.tmp.name, 'top10'), fetchers={'top10': self.api.top10},
+                                calendar_func=calendar)
+        return NorthFlowStore(self.tmp.name, market_fetcher=self.api.market, holdings=holdings, top10=top10)
+
+    def test_incremental_update_and_range_queries(self):
+        store = self._store()
+        store.update(days=10, end_date='20240104')
+        self.assertEqual(self.api.calls, {'market': 1, 'hold': 3, 'top10': 3})
+
+        market = store.market('20240103', '20240104')
+        self.assertEqual(list(market['north_money']), [151.0, 152.0])
+        self.assertEqual(store.north_money(), 152.0)
+        self.assertEqual(store.north_money('20240102'), 150.0)
+
+        # 重新打开后区间查询不再请求接口，港股通持股已剔除
+        reopened = self._store()
+        self.assertEqual(list(reopened.market()['north_money']), [150.0, 151.0, 152.0])
+        vol = reopened.holdings_panel('vol')
+        self.assertEqual(list(vol.columns), ['000001.SZ', '600000.SH'])
+        self.assertEqual(self.api.calls, {'market': 1, 'hold': 3, 'top10': 3})
+
+        flows = reopened.stock_flows('20240102', '20240104').set_index('ts_code')
+        self.assertAlmostEqual(flows.loc['600000.SH', 'net_inflow'], 1000.0)  # 1e7 * (1 - 1 + 1) / 1e4
+        self.assertEqual(flows.loc['600000.SH', 'positive_days'], 2)
+        self.assertEqual(flows.loc['000977.SZ', 'appear_days'], 3)
+        self.assertEqual(flows.index[0], '000977.SZ')
+
+    def test_top10_only_update_skips_holdings(self):
+        store = self._store()
+        store.update(days=10, end_date='20240104', holdings=False)
+        self.assertEqual(self.api.calls, {'market': 1, 'hold': 0, 'top10': 3})
+        self.assertEqual(store.stock_flows().loc[0, 'ts_code'], '000977.SZ')
+        self.assertTrue(store.holdings_panel('vol').empty)
+
+        # 之后需要持股明细时只补请求持股接口
+        store.holdings.update(days=10, end_date='20240104')
+        self.assertEqual(self.api.calls, {'market': 1, 'hold': 3, 'top10': 3})
+
+    def test_sector_attribution(self):
+        store = self._store()
+        store.update(days=10, end_date='20240104')
+        membership = SectorMembershipIndex(os.path.join(self.tmp.name, 'membership.npz'), fetchers={
+            'sw': lambda: pd.DataFrame({'sector_code': ['801780.SI', '801780.SI', '801750.SI', '801010.SI'],
+                                        'sector_name': ['银行', '银行', '计算机', '农林牧渔'],
+                                        'con_code': ['600000.SH', '000001.SZ', '000977.SZ', '830799.BJ']})})
+        membership.refresh()
+
+        net = store.sector_flows('net_amount', membership=membership)
+        self.assertEqual(sorted(net.columns), ['801750.SI', '801780.SI'])
+        self.assertEqual(list(net['801780.SI']), [1e7, -1e7, 1e7])
+
+        change = store.sector_flows('vol', membership=membership, diff=True)
+        self.assertEqual(list(change['801780.SI'].iloc[1:]), [50.0, 50.0])
+        self.assertTrue(change['801780.SI'].isna().iloc[0])
+
+
+class TestAdvancedSectorNorthFlow(unittest.TestCase):
+    """测试行业分析器读取北向资金存储的单位换算"""
+
+    def test_store_values_converted_from_million_yuan(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with mock.patch.object(advanced_sector_analyzer.AdvancedSectorAnalyzer, '_init_tushare_api'):
+                analyzer = advanced_sector_analyzer.AdvancedSectorAnalyzer(cache_dir=tmp)
+            store = mock.Mock()
+            store.north_money.return_value = 15000.0  # 百万元
+            analyzer._north_flow_store = store
+            self.assertAlmostEqual(analyzer.get_north_flow(), 150.0)
+            store.update_market.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import smart_recommendation_system
+from record_store import RecordIndex, RecordStore
+from smart_recommendation_system import SmartRecommendationSystem, create_recommendation
+
+
+class TestRecordStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'pool.db')
+        self.store = RecordStore(self.db_path, score_field='smart_score', history_limit=3)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_row_updates_indexes_and_rollback(self):
+        self.store.apply(upserts=[
+            {'symbol': '600000.SH', 'status': 'watching', 'smart_score': 80, 'tags': ['银行']},
+            {'symbol': '000001.SZ', 'status': 'bought', 'smart_score': 60, 'tags': ['银行', '金融']},
+            {'symbol': '000977.SZ', 'status': 'watching', 'smart_score': 90, 'tags': ['算力']},
+        ])
+        # 更新一行保持原有顺序，标签随之替换
+        self.store.apply(upserts=[{'symbol': '000001.SZ', 'status': 'watching', 'smart_score': 70, 'tags': ['金融']}])
+        self.assertEqual([r['symbol'] for r in self.store.load()], ['600000.SH', '000001.SZ', '000977.SZ'])
+        self.assertEqual([r['symbol'] for r in self.store.query(status='watching', min_score=75)],
+                         ['000977.SZ', '600000.SH'])
+        self.assertEqual([r['symbol'] for r in self.store.query(tag='银行')], ['600000.SH'])
+
+        # 事务中途出错（记录缺少主键）时整体回滚
+        with self.assertRaises(KeyError):
+            self.store.apply(upserts=[{'symbol': '600519.SH', 'smart_score': 99}, {'smart_score': 1}],
+                             deletes=['600000.SH'])
+        self.assertEqual(len(self.store), 3)
+        self.assertIsNone(self.store.get('600519.SH'))
+
+        # 全量保存删除不再存在的记录
+        self.store.sync(self.store.load()[1:])
+        self.assertIsNone(self.store.get('600000.SH'))
+        self.assertEqual(self.store.query(tag='银行'), [])
+
+        plan = sqlite3.connect(self.db_path).execute(
+            'EXPLAIN QUERY PLAN SELECT key FROM records WHERE status = ?', ('watching',)).fetchall()
+        self.assertIn('idx_records_status', str(plan))
+
+    def test_history_is_bounded(self):
+        for i in range(5):
+            self.store.apply(history=[{'symbol': f'{i:06d}.SZ', 'n': i}])
+        self.assertEqual([h['n'] for h in self.store.history()], [2, 3, 4])
+
+
+class TestRecordIndex(unittest.TestCase):
+
+    def _reference(self, records, k=None, status=None, tags=None, min_score=None, max_score=None):
+        selected = [r for r in records
+                    if (status is None or r['status'] == status)
+                    and (tags is None or any(t in r['tags'] for t in tags))
+                    and (min_score is None or r['smart_score'] >= min_score)
+                    and (max_score is None or r['smart_score'] <= max_score)]
+        selected = sorted(selected, key=lambda r: r['smart_score'], reverse=True)
+        return selected if k is None else selected[:k]
+
+    def test_matches_linear_scan_after_updates(self):
+        rng = random.Random(7)
+        records = [{'symbol': f'{i:06d}', 'status': rng.choice(['watching', 'bought', 'sold']),
+                    'smart_score': rng.choice([rng.randint(0, 100), 55]),
+                    'tags': rng.sample(['银行', '算力', '医药', '军工'], rng.randint(0, 2))}
+                   for i in range(500)]
+        index = RecordIndex(key='symbol', score='smart_score')
+        index.rebuild(records)
+        for record in rng.sample(records, 100):
+            record['smart_score'] = rng.randint(0, 100)
+            record['status'] = 'watching'
+            record['tags'] = ['医药']
+            index.update(record)
+        removed = records.pop(3)
+        index.remove(removed['symbol'])
+
+        cases = [dict(k=10), dict(k=10, status='watching', min_score=70), dict(tags=['银行', '军工']),
+                 dict(k=5, status='bought', tags=['医药'], max_score=60), dict(min_score=55, max_score=55),
+                 dict(k=0)]
+        for case in cases:
+            with self.subTest(**case):
+                self.assertEqual([r['symbol'] for r in index.top(**case)],
+                                 [r['symbol'] for r in self._reference(records, **case)])
+        self.assertNotIn(removed['symbol'], index)
+
+    def test_non_finite_scores_are_indexed_as_zero(self):
+        records = [{'symbol': 'nan', 'status': 'watching', 'smart_score': float('nan'), 'tags': []},
+                   {'symbol': 'inf', 'status': 'watching', 'smart_score': float('inf'), 'tags': []},
+                   {'symbol': 'ninf', 'status': 'watching', 'smart_score': float('-inf'), 'tags': []},
+                   {'symbol': 'text', 'status': 'watching', 'smart_score': 'N/A', 'tags': []},
+                   {'symbol': 'high', 'status': 'watching', 'smart_score': 80, 'tags': []}]
+        index = RecordIndex(key='symbol', score='smart_score')
+        index.rebuild(records)
+        self.assertEqual([r['symbol'] for r in index.top()], ['high', 'nan', 'inf', 'ninf', 'text'])
+        self.assertEqual([r['symbol'] for r in index.top(min_score=50)], ['high'])
+        self.assertEqual([r['symbol'] for r in index.top(min_score=float('-inf'), max_score=float('inf'))],
+                         ['high', 'nan', 'inf', 'ninf', 'text'])
+
+        records[0]['smart_score'] = 90
+        index.update(records[0])
+        records[4]['smart_score'] = float('nan')
+        index.update(records[4])
+        self.assertEqual([r['symbol'] for r in index.top(2)], ['nan', 'inf'])
+        index.remove('high')
+        self.assertNotIn('high', index)
+
+    def test_top_k_is_fast_on_large_pool(self):
+        rng = random.Random(1)
+        index = RecordIndex(key='symbol', score='smart_score')
+        index.rebuild({'symbol': str(i), 'status': 'watching', 'smart_score': rng.uniform(0, 100), 'tags': []}
+                      for i in range(20000))
+        start = time.perf_counter()
+        for _ in range(100):
+            top = index.top(10, status='watching', min_score=70)
+        elapsed = (time.perf_counter() - start) / 100
+        self.assertEqual(len(top), 10)
+        self.assertLess(elapsed, 0.01)
+
+
+class TestSmartRecommendationStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _recommendation(self, code, score=80.0):
+        return create_recommendation(code, f'股票{code}', 10.0, 12.0, 9.0, '测试', '技术分析',
+                                     score=score, tags=['测试'])
+
+    def test_migrates_json_and_writes_changed_rows(self):
+        legacy = {
+            'current': {'000001': self._recommendation('000001').to_dict()},
+            'history': [{'stock_code': f'{i:06d}'} for i in range(10)],
+        }
+        with open(os.path.join(self.tmp.name, 'recommendations.json'), 'w', encoding='utf-8') as f:
+            json.dump(legacy, f, ensure_ascii=False)
+
+        system = SmartRecommendationSystem(self.tmp.name, history_limit=5)
+        self.assertEqual(list(system.recommendations), ['000001'])
+        self.assertEqual(len(system.recommendation_history), 5)
+
+        for code in ('000002', '000003'):
+            system.add_recommendation(self._recommendation(code))
+        before = {row[0]: row[1] for row in system.store._conn.execute('SELECT key, updated_at FROM records')}
+        system.store._conn.execute("UPDATE records SET updated_at = 'old'")
+        system.store._conn.commit()
+        system.update_prices({'000002': 11.0, '999999': 1.0})
+        after = {row[0]: row[1] for row in system.store._conn.execute('SELECT key, updated_at FROM records')}
+        self.assertEqual(set(before), {'000001', '000002', '000003'})
+        self.assertEqual([code for code, updated in after.items() if updated != 'old'], ['000002'])
+
+        system.update_recommendation('000001', {'score': 95.0, 'tags': ['龙头']})
+        self.assertEqual([r.stock_code for r in system.get_top_recommendations(2)], ['000001', '000002'])
+        self.assertEqual([r.stock_code for r in system.get_recommendations_by_tag('测试')], ['000002', '000003'])
+
+        system.remove_recommendation('000003')
+        self.assertEqual([r.stock_code for r in system.get_recommendations_by_tag('测试')], ['000002'])
+        system.store.close()
+
+        reloaded = SmartRecommendationSystem(self.tmp.name, history_limit=5)
+        self.assertEqual(sorted(reloaded.recommendations), ['000001', '000002'])
+        self.assertEqual(reloaded.recommendations['000002'].performance_metrics['current_price'], 11.0)
+        self.assertEqual(reloaded.recommendation_history[-1]['stock_code'], '000003')
+        self.assertEqual(len(reloaded.recommendation_history), 5)
+        reloaded.store.close()
+
+    def test_falls_back_to_json_when_database_unavailable(self):
+        legacy = {'current': {'000001': self._recommendation('000001').to_dict()}, 'history': []}
+        json_file = os.path.join(self.tmp.name, 'recommendations.json')
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(legacy, f, ensure_ascii=False)
+
+        with mock.patch.object(smart_recommendation_system, 'RecordStore', side_effect=OSError('disk I/O error')):
+            system = SmartRecommendationSystem(self.tmp.name, history_limit=5)
+            self.assertIsNone(system.store)
+            self.assertEqual(list(system.recommendations), ['000001'])
+
+            system.add_recommendation(self._recommendation('000002', score=90.0))
+            system.update_prices({'000001': 11.0})
+            system.remove_recommendation('000001')
+            reloaded = SmartRecommendationSystem(self.tmp.name, history_limit=5)
+
+        self.assertEqual(list(reloaded.recommendations), ['000002'])
+        self.assertEqual(reloaded.recommendation_history[-1]['stock_code'], '000001')
+        self.assertEqual([r.stock_code for r in reloaded.get_top_recommendations(1)], ['000002'])
+
+
+if __name__ == '__main__':
+    unittest.main()
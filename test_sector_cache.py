@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from sector_cache import SectorCache
+
+
+class TestSectorCache(unittest.TestCase):
+    """测试统一行业缓存的按需加载、追加写入和过期策略"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _history(self, value):
+        return pd.DataFrame({'收盘': [value, value + 1]}, index=pd.to_datetime(['2024-01-02', '2024-01-03']))
+
+    def test_lazy_load_only_requested_key(self):
+        cache = SectorCache(self.tmp.name)
+        cache.set('history:801010.SI', self._history(1))
+        cache.set('history:801080.SI', self._history(2))
+        cache.set('tushare:sector_list', [{'code': '801010.SI'}])
+
+        reopened = SectorCache(self.tmp.name)
+        self.assertEqual(reopened._entries, {})
+        self.assertEqual(reopened.keys('history:'), ['history:801010.SI', 'history:801080.SI'])
+        pd.testing.assert_frame_equal(reopened.get('history:801080.SI'), self._history(2))
+        self.assertEqual(list(reopened._entries), ['history:801080.SI'])
+
+    def test_append_per_key_and_compact(self):
+        cache = SectorCache(self.tmp.name, compact_after=3)
+        cache.set('history:801010.SI', self._history(1))
+        cache.set('history:801080.SI', self._history(2))
+        other_path = cache._path('history:801080.SI')
+        other_size = os.path.getsize(other_path)
+
+        path = cache._path('history:801010.SI')
+        sizes = [os.path.getsize(path)]
+        for value in (3, 4):
+            cache.set('history:801010.SI', self._history(value))
+            sizes.append(os.path.getsize(path))
+        # 追加写入只影响被更新的键
+        self.assertTrue(sizes[0] < sizes[1] < sizes[2])
+        self.assertEqual(os.path.getsize(other_path), other_size)
+        pd.testing.assert_frame_equal(SectorCache(self.tmp.name).get('history:801010.SI'), self._history(4))
+
+        # 记录数达到上限后压缩为一条
+        cache.set('history:801010.SI', self._history(5))
+        self.assertEqual(os.path.getsize(path), sizes[0])
+        pd.testing.assert_frame_equal(SectorCache(self.tmp.name).get('history:801010.SI'), self._history(5))
+
+    def test_truncated_record_keeps_previous(self):
+        cache = SectorCache(self.tmp.name)
+        cache.set('analyzer:sector_list', ['银行'])
+        cache.set('analyzer:sector_list', ['银行', '计算机'])
+        path = cache._path('analyzer:sector_list')
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - 5)
+        self.assertEqual(SectorCache(self.tmp.name).get('analyzer:sector_list'), ['银行'])
+
+    def test_shared_expiry(self):
+        cache = SectorCache(self.tmp.name, expiry=60)
+        cache.set('history:801010.SI', self._history(1))
+        self.assertIsNotNone(cache.get('history:801010.SI'))
+        self.assertIsNone(cache.get('history:801010.SI', max_age=0))
+        self.assertIsNotNone(cache.get_any('history:801010.SI'))
+
+        cache.expiry = 0
+        self.assertIsNone(SectorCache(self.tmp.name, expiry=0).get('history:801010.SI'))
+        self.assertEqual(cache.clear(prefix='history:', older_than=3600), 0)
+        self.assertEqual(cache.clear(prefix='history:'), 1)
+        self.assertEqual(cache.keys(), [])
+
+    def test_provider_clear_cache_keeps_other_namespaces(self):
+        from tushare_sector_provider import TushareSectorProvider
+
+        cache = SectorCache(self.tmp.name)
+        provider = TushareSectorProvider.__new__(TushareSectorProvider)
+        provider._cache = cache
+        provider.cache_expiry = None
+        provider._save_to_cache('history:801010.SI', self._history(1))
+        provider._save_to_cache('sector_list', [{'code': '801010.SI'}])
+        cache.set('analyzer:sector_list', ['银行'])
+        cache.set('akshare:sector_list', [{'code': 'BK0475'}])
+
+        self.assertEqual(cache.keys('tushare:'), ['tushare:history:801010.SI', 'tushare:sector_list'])
+        self.assertEqual(provider._get_from_cache('sector_list'), (True, [{'code': '801010.SI'}]))
+        provider.clear_cache()
+        self.assertEqual(cache.keys(), ['akshare:sector_list', 'analyzer:sector_list'])
+        self.assertEqual(provider._get_from_cache('sector_list'), (False, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from optimized_sector_analyzer import OptimizedSectorAnalyzer
+from sector_cache import SectorCache
+from sector_catalog import concept_descriptor, prefilter_sectors
+
+
+def _sectors(concepts=100, concept_type='CN'):
+    sectors = [{'code': '801780.SI', 'name': '银行', 'type': 'SW'}]
+    sectors += [concept_descriptor(f'BK{i:04d}', f'概念{i}', concept_type) for i in range(concepts)]
+    return sectors
+
+
+class FakeProvider:
+    """全部概念板块都在列表中，记录逐个请求历史数据的板块"""
+
+    def __init__(self, concepts=100, concept_type='CN'):
+        self.concepts = concepts
+        self.concept_type = concept_type
+        self.history_calls = []
+        self.snapshot_calls = 0
+
+    def get_sector_list(self):
+        return _sectors(self.concepts, self.concept_type)
+
+    def get_sector_snapshot(self):
+        self.snapshot_calls += 1
+        # 编号越大当日越活跃
+        codes = [f'BK{i:04d}' for i in range(self.concepts)]
+        return pd.DataFrame({'change_pct': np.arange(self.concepts, dtype=float),
+                             'amount': np.arange(self.concepts, dtype=float) * 1e8}, index=codes)
+
+    def get_sector_history(self, code, days=90):
+        self.history_calls.append(code)
+        dates = pd.bdate_range(end='2024-06-28', periods=60)
+        close = np.linspace(100, 110, 60)
+        return pd.DataFrame({'开盘': close, '收盘': close, '最高': close * 1.01, '最低': close * 0.99,
+                             '成交量': 1e6}, index=dates)
+
+
+class TestSectorCatalog(unittest.TestCase):
+    """测试概念板块按截面快照预筛选"""
+
+    def test_prefilter_keeps_eager_and_top_lazy(self):
+        sectors = _sectors(100)
+        snapshot = pd.DataFrame({'change_pct': np.arange(100.0), 'amount': np.arange(100.0)},
+                                index=[f'BK{i:04d}' for i in range(100)])
+        selected = prefilter_sectors(sectors, snapshot, max_lazy=10)
+        self.assertEqual(selected[0]['code'], '801780.SI')
+        self.assertEqual([s['code'] for s in selected[1:]], [f'BK{i:04d}' for i in range(90, 100)])
+
+        # 没有快照时与原先截断行为一致；快照中缺失的板块按中位数计分
+        self.assertEqual([s['code'] for s in prefilter_sectors(sectors, None, max_lazy=3)],
+                         ['801780.SI', 'BK0000', 'BK0001', 'BK0002'])
+        partial = snapshot.iloc[:2]
+        self.assertEqual([s['code'] for s in prefilter_sectors(sectors, partial, max_lazy=3)][1:],
+                         ['BK0000', 'BK0001', 'BK0002'])
+        self.assertEqual(len(prefilter_sectors(sectors[:5], snapshot, max_lazy=10)), 5)
+
+    def test_prefilter_rotates_concepts_missing_from_snapshot(self):
+        # 快照只覆盖已加载过的前30个板块时，目录中其余板块按中位数参与排名
+        sectors = _sectors(100)
+        snapshot = pd.DataFrame({'change_pct': np.arange(30.0), 'amount': np.arange(30.0)},
+                                index=[f'BK{i:04d}' for i in range(30)])
+        selected = [s['code'] for s in prefilter_sectors(sectors, snapshot, max_lazy=30)][1:]
+        self.assertEqual(len(selected), 30)
+        self.assertEqual(selected[:16], [f'BK{i:04d}' for i in range(14, 30)])
+        self.assertEqual(selected[16:], [f'BK{i:04d}' for i in range(30, 44)])
+
+    def test_analyzer_fetches_history_only_for_prefiltered(self):
+        provider = FakeProvider(100)
+        analyzer = OptimizedSectorAnalyzer(provider=provider, sector_engine=False)
+        result = analyzer.analyze_hot_sectors(days=90, min_days=30)
+        self.assertIn('data', result)
+        self.assertEqual(provider.snapshot_calls, 1)
+        # 大盘指数之外，只为申万行业和预筛选出的概念板块获取历史数据
+        sector_calls = [code for code in provider.history_calls if code not in ('000001.SH', '399001.SZ')]
+        self.assertEqual(len(sector_calls), 1 + analyzer.max_lazy_sectors)
+        self.assertIn('801780.SI', sector_calls)
+        self.assertIn('BK0099', sector_calls)
+        self.assertNotIn('BK0000', sector_calls)
+
+    def test_analyzer_includes_tushare_concepts(self):
+        provider = FakeProvider(100, concept_type='TS')
+        analyzer = OptimizedSectorAnalyzer(provider=provider, sector_engine=False)
+        analyzer.analyze_hot_sectors(days=90, min_days=30)
+        sector_calls = [code for code in provider.history_calls if code not in ('000001.SH', '399001.SZ')]
+        self.assertEqual(len(sector_calls), 1 + analyzer.max_lazy_sectors)
+        self.assertIn('BK0099', sector_calls)
+
+
+class TestTushareSnapshot(unittest.TestCase):
+    """Tushare截面快照默认只读取缓存数据"""
+
+    def setUp(self):
+        from tushare_sector_provider import TushareSectorProvider
+        self.tmp = tempfile.TemporaryDirectory()
+        # 不连接接口，只设置快照需要的属性
+        self.provider = TushareSectorProvider.__new__(TushareSectorProvider)
+        self.provider._cache = SectorCache(self.tmp.name)
+        self.provider.cache_expiry = None
+        self.provider.pro = mock.Mock()
+        self.provider.is_pro_available = True
+        self.store = mock.Mock()
+        self.store.get_snapshot.return_value = pd.DataFrame(
+            {'close': [11.0, 9.0], 'pre_close': [10.0, 10.0], 'amount': [1.0, 2.0]},
+            index=['000001.SZ', '600000.SH'])
+        self.membership = mock.Mock()
+        self.membership.aggregate.side_effect = lambda values, how='mean': pd.Series(
+            {'BK0001': values.sum() if how == 'sum' else values.mean()})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_snapshot_uses_cached_data_only(self):
+        with mock.patch('sector_data_engine.get_stock_daily_store', return_value=self.store), \
+                mock.patch('sector_membership.get_membership_index', return_value=self.membership) as index:
+            snapshot = self.provider.get_sector_snapshot()
+        self.store.update.assert_not_called()
+        self.assertFalse(index.call_args.kwargs['refresh'])
+        self.assertEqual(snapshot.loc['BK0001', 'amount'], 3.0)
+        self.provider.pro.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import tempfile
+import unittest
+
+import pandas as pd
+
+from sector_data_engine import SectorDataEngine
+
+SW_CODES = ['801010.SI', '801080.SI', '801750.SI']
+
+
+def _calendar(start_date, end_date):
+    return [d.strftime('%Y%m%d') for d in pd.bdate_range(start_date, end_date)]
+
+
+class FakeSource:
+    """按交易日返回全部行业行情的模拟接口"""
+
+    def __init__(self, codes, base):
+        self.codes = codes
+        self.base = base
+        self.calls = []
+
+    def __call__(self, trade_date):
+        self.calls.append(trade_date)
+        day = int(trade_date[-2:])
+        close = [self.base + i * 100 + day for i in range(len(self.codes))]
+        return pd.DataFrame({
+            'ts_code': self.codes,
+            'trade_date': trade_date,
+            'open': close, 'high': close, 'low': close, 'close': close,
+            'vol': 1000.0, 'amount': 5000.0, 'pct_change': 1.0
+        })
+
+
+class TestSectorDataEngine(unittest.TestCase):
+    """测试按交易日增量构建的行业截面面板"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sw = FakeSource(SW_CODES, 1000)
+        self.ci = FakeSource(['CI005001.CI'], 2000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _engine(self):
+        return SectorDataEngine(cache_dir=self.tmp.name, fetchers={'sw': self.sw, 'ci': self.ci},
+                                calendar_func=_calendar, refresh_interval=0)
+
+    def test_one_call_per_date_serves_all_sectors(self):
+        engine = self._engine()
+        engine.update(days=30)
+        trade_days = len(_calendar(*self._range(30)))
+        self.assertEqual(len(self.sw.calls), trade_days)
+        self.assertEqual(len(self.ci.calls), trade_days)
+
+        calls = len(self.sw.calls)
+        for code in SW_CODES + ['CI005001.CI']:
+            hist = engine.get_sector_history(code, days=30, update=False)
+            self.assertEqual(len(hist), trade_days)
+            self.assertEqual(list(hist.columns[:4]), ['开盘', '最高', '最低', '收盘'])
+            self.assertTrue(hist.index.is_monotonic_increasing)
+        self.assertEqual(len(self.sw.calls), calls)
+        self.assertIsNone(engine.get_sector_history('TS123', days=30, update=False))
+
+        close = engine.panel('close')
+        self.assertEqual(close.shape, (trade_days, 4))
+
+    def test_incremental_reload_from_disk(self):
+        self._engine().update(days=30)
+        fetched = set(self.sw.calls)
+
+        self.sw.calls.clear()
+        engine = self._engine()
+        engine.update(days=40)
+        # 只请求面板中缺失的更早交易日（以及收盘前取得的当日数据）
+        self.assertTrue(self.sw.calls)
+        self.assertFalse(set(self.sw.calls[:-1]) & fetched)
+        self.assertEqual(len(engine.panel('close')), len(_calendar(*self._range(40))))
+
+    def test_snapshot_latest_cross_section(self):
+        engine = self._engine()
+        engine.update(days=10)
+        snapshot = engine.get_snapshot()
+        self.assertEqual(sorted(snapshot.index), sorted(SW_CODES + ['CI005001.CI']))
+        self.assertEqual(snapshot.loc['801010.SI', 'source'], 'sw')
+
+    def test_reopen_loads_only_requested_dates(self):
+        self._engine().update(days=60)
+        trade_dates = _calendar(*self._range(60))
+
+        engine = self._engine()
+        self.assertEqual(engine._days, {})
+        # 最近交易日截面只读入一个文件
+        self.assertEqual(len(engine.get_snapshot()), 4)
+        self.assertEqual(list(engine._days), [trade_dates[-1]])
+
+        recent = _calendar(*self._range(10))
+        self.assertEqual(len(engine.get_sector_history('801010.SI', days=10, update=False)), len(recent))
+        self.assertEqual(sorted(engine._days), recent)
+        # 更长的区间补读更早的交易日，已读入的不再重复读取
+        self.assertEqual(len(engine.panel('close', days=30)), len(_calendar(*self._range(30))))
+        self.assertEqual(len(engine.panel('close', days=10)), len(recent))
+        self.assertEqual(len(engine._days), len(_calendar(*self._range(30))))
+        self.assertEqual(len(engine.panel('close')), len(trade_dates))
+
+    @staticmethod
+    def _range(days):
+        end = pd.Timestamp.now().normalize()
+        return (end - pd.Timedelta(days=days)).strftime('%Y%m%d'), end.strftime('%Y%m%d')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from sector_heatmap import SectorHeatmap, limit_ratios
+from sector_membership import SectorMembershipIndex
+
+
+def _members():
+    return pd.DataFrame({
+        'sector_code': ['801780.SI', '801780.SI', '801750.SI', '801750.SI', '801750.SI', '801010.SI'],
+        'sector_name': ['银行', '银行', '计算机', '计算机', '计算机', '农林牧渔'],
+        'con_code': ['600000.SH', '000001.SZ', '000977.SZ', '688111.SH', '300750.SZ', '830799.BJ'],
+        'level': 'l1',
+    })
+
+
+def _small_sectors():
+    """一个只有一只涨停股的申万三级行业和一个东方财富概念板块"""
+    return pd.DataFrame({
+        'sector_code': ['850831.SI', 'BK1184.DC'],
+        'sector_name': ['股份制银行Ⅲ', '北交所概念'],
+        'con_code': ['600000.SH', '830799.BJ'],
+        'level': ['l3', ''],
+    })
+
+
+def _quotes():
+    return pd.DataFrame({
+        'ts_code': ['600000.SH', '000001.SZ', '000977.SZ', '688111.SH', '300750.SZ', '830799.BJ', '600001.SH'],
+        'name': ['浦发银行', '平安银行', '浪潮信息', '金山办公', '宁德时代', '*ST某某', '其他'],
+        'pre_close': [10.0, 12.0, 40.0, 300.0, 200.0, 10.0, 5.0],
+        'close': [11.0, 11.88, 43.0, 360.0, 0.0, 13.0, 5.5],
+        'amount': [1e8, 3e8, 2e8, 2e8, 0.0, 1e7, 1e7],
+    })
+
+
+class CountingQuotes:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return _quotes()
+
+
+class TestSectorHeatmap(unittest.TestCase):
+    """测试盘中行业热力快照"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.membership = SectorMembershipIndex(os.path.join(self.tmp.name, 'membership.npz'),
+                                                fetchers={'sw': _members})
+        self.membership.refresh()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_aggregate_matches_per_sector(self):
+        snapshot = SectorHeatmap(CountingQuotes(), self.membership, min_stock_count=1).snapshot()
+        bank = snapshot.loc['801780.SI']
+        self.assertEqual(bank['name'], '银行')
+        self.assertEqual(bank['stock_count'], 2)
+        # 成交额加权：(10% * 1亿 + (-1%) * 3亿) / 4亿
+        self.assertAlmostEqual(bank['change_pct'], (10 * 1e8 - 1 * 3e8) / 4e8)
+        self.assertAlmostEqual(bank['avg_change'], 4.5)
+        self.assertEqual((bank['up_count'], bank['down_count'], bank['limit_up']), (1, 1, 1))
+        self.assertAlmostEqual(bank['breadth'], 50.0)
+
+        # 停牌股票(close为0)不计入；科创板涨20%才算涨停
+        tech = snapshot.loc['801750.SI']
+        self.assertEqual(tech['stock_count'], 2)
+        self.assertEqual(tech['limit_up'], 1)
+        self.assertAlmostEqual(tech['amount'], 4e8)
+
+        # 北交所30%涨停
+        self.assertEqual(snapshot.loc['801010.SI', 'limit_up'], 1)
+        self.assertTrue(snapshot['hot_score'].is_monotonic_decreasing)
+
+    def test_snapshot_cached_within_ttl(self):
+        fetch = CountingQuotes()
+        heatmap = SectorHeatmap(fetch, self.membership, ttl=60, min_stock_count=1)
+        first = heatmap.snapshot()
+        self.assertIs(heatmap.snapshot(), first)
+        self.assertEqual(len(heatmap.quotes()), 7)
+        self.assertEqual(fetch.calls, 1)
+        heatmap.snapshot(force=True)
+        self.assertEqual(fetch.calls, 2)
+
+        result = heatmap.get_hot_sectors(top_n=2)
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(len(result['data']['hot_sectors']), 2)
+        self.assertEqual(fetch.calls, 2)
+
+    def test_default_ranks_sw_level1_with_enough_stocks(self):
+        membership = SectorMembershipIndex(os.path.join(self.tmp.name, 'mixed.npz'),
+                                           fetchers={'sw': lambda: pd.concat([_members(), _small_sectors().iloc[:1]]),
+                                                     'dc': lambda: _small_sectors().iloc[1:]})
+        membership.refresh()
+
+        # 默认只统计申万一级行业，且有效股票数不少于min_stock_count
+        default = SectorHeatmap(CountingQuotes(), membership, min_stock_count=2).snapshot()
+        self.assertEqual(sorted(default.index), ['801750.SI', '801780.SI'])
+
+        # 放开分类、级别和股票数后，全部涨停的单股行业和概念得满分并参与排名
+        everything = SectorHeatmap(CountingQuotes(), membership, sources=None, levels=None,
+                                   min_stock_count=1).snapshot()
+        self.assertEqual(len(everything), 5)
+        self.assertEqual(everything.loc['850831.SI', 'hot_score'], 100)
+        self.assertEqual(everything.loc['BK1184.DC', 'hot_score'], 100)
+
+    def test_warm_up_refreshes_membership_in_background(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_refresh():
+            started.set()
+            release.wait(5)
+            return 1
+
+        with mock.patch.object(self.membership, 'refresh', side_effect=slow_refresh) as refresh:
+            heatmap = SectorHeatmap(CountingQuotes(), self.membership, min_stock_count=1)
+            thread = heatmap.warm_up()
+            self.assertTrue(started.wait(5))
+            # 刷新进行中仍可直接用已有成分聚合，重复调用不会再启动线程
+            self.assertIn('801780.SI', heatmap.snapshot().index)
+            self.assertIs(heatmap.warm_up(), thread)
+            release.set()
+            thread.join(5)
+        self.assertEqual(refresh.call_count, 1)
+
+    def test_failed_fetch_returns_error(self):
+        heatmap = SectorHeatmap(lambda: pd.DataFrame(), self.membership)
+        self.assertEqual(heatmap.get_hot_sectors()['status'], 'error')
+
+    def test_limit_ratios(self):
+        codes = pd.Series(['600000.SH', '300750.SZ', '688111.SH', '830799.BJ', '000004.SZ'])
+        names = pd.Series(['浦发银行', '宁德时代', '金山办公', '某某', 'ST国华'])
+        np.testing.assert_allclose(limit_ratios(codes, names), [0.1, 0.2, 0.2, 0.3, 0.05])
+
+
+if __name__ == '__main__':
+    unittest.main()
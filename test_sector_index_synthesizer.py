@@ -0,0 +1,131 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import sector_index_synthesizer
+from sector_data_engine import StockDailyStore
+from sector_index_synthesizer import SectorIndexSynthesizer
+
+STOCKS = ['600000.SH', '600001.SH', '000001.SZ', '000002.SZ']
+MEMBERS = {
+    '801010.SI': ['600000.SH', '600001.SH'],
+    '801080.SI': ['600001.SH', '000001.SZ', '000002.SZ', '688999.SH'],  # 最后一只不在截面中
+}
+
+
+def _calendar(start_date, end_date):
+    return [d.strftime('%Y%m%d') for d in pd.bdate_range(start_date, end_date)]
+
+
+class FakeMarket:
+    """按交易日返回全市场日线和流通市值的模拟接口"""
+
+    def __init__(self, dates):
+        rng = np.random.default_rng(3)
+        self.dates = dates
+        self.close = pd.DataFrame(10 * np.exp(rng.normal(0, 0.02, (len(dates), len(STOCKS))).cumsum(axis=0)),
+                                  index=dates, columns=STOCKS)
+        self.circ_mv = pd.DataFrame(rng.uniform(1e5, 1e6, (len(dates), len(STOCKS))), index=dates, columns=STOCKS)
+        self.close.iloc[5, 2] = np.nan  # 000001.SZ停牌一天
+        self.calls = 0
+
+    def pre_close(self):
+        return self.close.ffill().shift(1).fillna(self.close.iloc[0] / 1.01)
+
+    def daily(self, trade_date):
+        self.calls += 1
+        if trade_date not in self.close.index:
+            return pd.DataFrame()
+        close = self.close.loc[trade_date].dropna()
+        pre = self.pre_close().loc[trade_date, close.index]
+        return pd.DataFrame({'ts_code': close.index, 'open': pre * 1.001, 'high': close * 1.02,
+                             'low': close * 0.98, 'close': close.values, 'pre_close': pre.values,
+                             'vol': 100.0, 'amount': 1000.0})
+
+    def basic(self, trade_date):
+        self.calls += 1
+        if trade_date not in self.circ_mv.index:
+            return pd.DataFrame()
+        mv = self.circ_mv.loc[trade_date]
+        return pd.DataFrame({'ts_code': mv.index, 'circ_mv': mv.values})
+
+
+class TestSectorIndexSynthesizer(unittest.TestCase):
+    """测试流通市值加权的行业指数合成"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        end = pd.Timestamp.now().normalize()
+        self.market = FakeMarket(_calendar((end - pd.Timedelta(days=20)).strftime('%Y%m%d'), end.strftime('%Y%m%d')))
+        self.store = StockDailyStore(cache_dir=self.tmp.name, calendar_func=_calendar, refresh_interval=0,
+                                     fetchers={'daily': self.market.daily, 'basic': self.market.basic})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _expected_returns(self, codes):
+        codes = [c for c in codes if c in STOCKS]
+        returns = self.market.close[codes] / self.market.pre_close()[codes] - 1
+        weights = self.market.circ_mv[codes].shift(1).fillna(self.market.circ_mv[codes].iloc[0])
+        weights = weights.where(returns.notna(), 0.0)
+        return (weights * returns.fillna(0)).sum(axis=1) / weights.sum(axis=1)
+
+    def test_cap_weighted_returns(self):
+        synthesizer = SectorIndexSynthesizer(self.store)
+        panels = synthesizer.synthesize(MEMBERS, days=30)
+        # 每个交易日只请求一次日线和一次每日指标，与行业数量无关
+        calls = self.market.calls
+        synthesizer.synthesize({'801750.SI': STOCKS}, days=30, update=False)
+        self.assertEqual(self.market.calls, calls)
+
+        for sector, codes in MEMBERS.items():
+            expected = self._expected_returns(codes).to_numpy()
+            np.testing.assert_allclose(panels['pct_change'][sector].to_numpy(), expected * 100, rtol=1e-10)
+            np.testing.assert_allclose(panels['close'][sector].to_numpy(), 1000 * np.cumprod(1 + expected), rtol=1e-10)
+            self.assertTrue((panels['high'][sector] >= panels['close'][sector]).all())
+
+        history = synthesizer.to_history(panels, '801080.SI')
+        self.assertEqual(list(history.columns[:5]), ['日期', '开盘', '最高', '最低', '收盘'])
+        self.assertFalse(history['是真实数据'].any())
+        self.assertTrue(history['是合成数据'].all())
+        self.assertIsNone(synthesizer.to_history(panels, '801750.SI'))
+
+    def test_per_sector_history_pivots_once(self):
+        synthesizer = SectorIndexSynthesizer(self.store)
+        panels = synthesizer.synthesize(MEMBERS, days=30)
+        # 刷新间隔内不再取当日数据，截面版本不变
+        self.store.refresh_interval = 600
+        with mock.patch.object(self.store, 'panel', wraps=self.store.panel) as panel:
+            histories = {sector: synthesizer.sector_history(sector, codes, days=30)
+                         for sector, codes in MEMBERS.items()}
+            self.assertEqual(panel.call_count, 0)
+            # 截面有新数据后重新透视一次
+            self.store.version += 1
+            synthesizer.sector_history('801010.SI', MEMBERS['801010.SI'], days=30)
+            synthesizer.sector_history('801080.SI', MEMBERS['801080.SI'], days=30)
+            self.assertEqual(panel.call_count, len(sector_index_synthesizer.STOCK_FIELDS))
+
+        # 只取本行业成分股列的结果与全部行业一起合成一致
+        for sector, history in histories.items():
+            pd.testing.assert_frame_equal(history, synthesizer.to_history(panels, sector))
+
+    def test_dense_fallback_matches_sparse(self):
+        synthesizer = SectorIndexSynthesizer(self.store)
+        members = pd.DataFrame([(sector, code) for sector, codes in MEMBERS.items() for code in codes],
+                               columns=['index_code', 'con_code'])
+        expected = synthesizer.synthesize(members, days=30)
+        has_scipy = sector_index_synthesizer.HAS_SCIPY
+        sector_index_synthesizer.HAS_SCIPY = False
+        try:
+            actual = synthesizer.synthesize(MEMBERS, days=30, update=False)
+        finally:
+            sector_index_synthesizer.HAS_SCIPY = has_scipy
+        for name, panel in expected.items():
+            pd.testing.assert_frame_equal(actual[name], panel)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import sector_integration
+from sector_cache import SectorCache
+from sector_integration import SectorIntegrator
+
+
+class FakeAnalyzer:
+    """按指定耗时返回结果的模拟分析器"""
+
+    def __init__(self, delay, success=True, integrator=None):
+        self.delay = delay
+        self.success = success
+        self.integrator = integrator
+        self.calls = 0
+
+    def analyze_hot_sectors(self):
+        self.calls += 1
+        if self.integrator is not None:
+            # 原版分析器会回调集成器
+            nested = self.integrator.get_hot_sectors()
+            if nested['status'] == 'success':
+                return nested
+        time.sleep(self.delay)
+        if not self.success:
+            return {'status': 'error', 'message': '模拟失败', 'data': {}}
+        return {'status': 'success', 'data': {'hot_sectors': [{'name': '银行', 'hot_score': 80}]}}
+
+
+class TestSectorIntegratorRace(unittest.TestCase):
+    """测试并行运行行业分析器"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _integrator(self, optimized, original, parallel=True, preferred_grace=0.2):
+        integrator = SectorIntegrator.__new__(SectorIntegrator)
+        integrator.use_optimized = True
+        integrator.top_n = 10
+        integrator.data_days = 90
+        integrator.parallel = parallel
+        integrator.timeout = 5.0
+        integrator.preferred_grace = preferred_grace
+        integrator.cache = SectorCache(self.tmp.name)
+        integrator.optimized_analyzer = optimized
+        integrator.original_analyzer = original
+        return integrator
+
+    def test_faster_analyzer_caps_latency(self):
+        integrator = self._integrator(FakeAnalyzer(2.0), FakeAnalyzer(0.05))
+        start = time.perf_counter()
+        result = integrator.get_hot_sectors()
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(result['data']['source'], 'original')
+
+    def test_preferred_wins_within_grace(self):
+        integrator = self._integrator(FakeAnalyzer(0.15), FakeAnalyzer(0.05), preferred_grace=1.0)
+        self.assertEqual(integrator.get_hot_sectors()['data']['source'], 'optimized')
+
+    def test_preferred_failure_falls_back_immediately(self):
+        integrator = self._integrator(FakeAnalyzer(0.01, success=False), FakeAnalyzer(0.1), preferred_grace=5.0)
+        start = time.perf_counter()
+        self.assertEqual(integrator.get_hot_sectors()['data']['source'], 'original')
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_original_callback_does_not_recurse(self):
+        for parallel in (False, True):
+            original = FakeAnalyzer(0.01)
+            integrator = self._integrator(FakeAnalyzer(0.01, success=False), original, parallel=parallel)
+            integrator.cache = SectorCache(f'{self.tmp.name}/{parallel}')
+            original.integrator = integrator
+            result = integrator.get_hot_sectors()
+            self.assertEqual(result['data']['source'], 'original')
+            self.assertEqual(original.calls, 1)
+
+    def test_result_cached(self):
+        optimized = FakeAnalyzer(0.01)
+        integrator = self._integrator(optimized, FakeAnalyzer(0.5))
+        integrator.get_hot_sectors()
+        integrator.get_hot_sectors()
+        self.assertEqual(optimized.calls, 1)
+
+
+class TestSectorIntegratorInit(unittest.TestCase):
+    """测试通过真实构造函数创建集成器"""
+
+    def test_optimized_analyzer_created(self):
+        provider = object()
+        with mock.patch.object(sector_integration, 'get_sector_provider', return_value=provider), \
+                mock.patch.object(sector_integration, 'OriginalSectorAnalyzer', lambda top_n: FakeAnalyzer(0)):
+            integrator = SectorIntegrator(top_n=5, data_days=60)
+        self.assertIsNotNone(integrator.optimized_analyzer)
+        self.assertIs(integrator.optimized_analyzer.provider, provider)
+        self.assertEqual(integrator.optimized_analyzer.top_n, 5)
+        self.assertEqual(integrator.optimized_analyzer.data_days, 60)
+        self.assertIsNotNone(integrator.original_analyzer)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from sector_membership import SectorMembershipIndex, _pro_fetchers, fetch_all_pages, normalize_stock_code
+
+
+def _sw_members():
+    return pd.DataFrame({
+        'sector_code': ['801780.SI', '801780.SI', '801750.SI', '801750.SI', '801750.SI'],
+        'sector_name': ['银行', '银行', '计算机', '计算机', '计算机'],
+        'con_code': ['600000.SH', '000001.SZ', '000977.SZ', '600588.SH', '000001.SZ'],
+    })
+
+
+class CountingFetcher:
+    def __init__(self, table):
+        self.table = table
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.table
+
+
+class TestSectorMembershipIndex(unittest.TestCase):
+    """测试行业成分双向索引"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'membership.npz')
+        self.sw = CountingFetcher(_sw_members())
+        self.dc = CountingFetcher(pd.DataFrame({'sector_code': ['BK0800.DC'], 'sector_name': [''],
+                                                'con_code': ['600588']}))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _index(self):
+        return SectorMembershipIndex(self.path, fetchers={'sw': self.sw, 'dc': self.dc})
+
+    def test_bidirectional_lookup(self):
+        index = self._index()
+        self.assertEqual(index.refresh(), 2)
+        self.assertEqual(index.stocks_of('801750.SI'), ['000001.SZ', '000977.SZ', '600588.SH'])
+        self.assertEqual(index.stocks_of_name('银行', 'sw'), ['000001.SZ', '600000.SH'])
+        self.assertEqual(index.sectors_of('000001.SZ'), ['801750.SI', '801780.SI'])
+        self.assertEqual(index.sectors_of('600588'), ['801750.SI', 'BK0800.DC'])
+        self.assertEqual(index.sectors_of('600588.SH', among=['BK0800.DC']), ['BK0800.DC'])
+        self.assertEqual(index.stocks_of('TS999'), [])
+
+        members = index.members_table(['801780.SI'])
+        self.assertEqual(list(members.columns), ['index_code', 'con_code'])
+        self.assertEqual(len(members), 2)
+
+        change = pd.Series({'000001.SZ': 1.0, '600000.SH': 3.0, '000977.SZ': float('nan'), '600588': 5.0})
+        mean = index.aggregate(change)
+        self.assertAlmostEqual(mean['801780.SI'], 2.0)
+        self.assertAlmostEqual(mean['801750.SI'], 3.0)
+        self.assertEqual(index.aggregate(change, how='count')['801750.SI'], 2)
+
+    def test_daily_incremental_refresh_and_persistence(self):
+        index = self._index()
+        index.refresh()
+        self.assertEqual(index.refresh(), 0)
+        self.assertEqual((self.sw.calls, self.dc.calls), (1, 1))
+
+        # 重新加载后当天不再请求，查询结果一致
+        reloaded = self._index()
+        self.assertEqual(reloaded.refresh(), 0)
+        self.assertEqual(reloaded.sectors_of('000001.SZ'), ['801750.SI', '801780.SI'])
+
+        # 强制刷新单个数据源只替换该数据源的成分，空结果保留原有成分
+        self.dc.table = pd.DataFrame(columns=['sector_code', 'sector_name', 'con_code'])
+        self.sw.table = _sw_members().iloc[:2]
+        reloaded.refresh(force=True)
+        self.assertEqual(reloaded.stocks_of('801750.SI'), [])
+        self.assertEqual(reloaded.stocks_of('BK0800.DC'), ['600588.SH'])
+
+        reloaded.add_members('TS001', ['000977', '600000.SH'], '人工智能', source='ts_concept')
+        reloaded.flush()
+        self.assertEqual(self._index().sectors_of('000977.SZ'), ['TS001'])
+        self.assertEqual(self._index().sector_code_of('人工智能', 'ts_concept'), 'TS001')
+
+    def test_add_members_rebuilds_and_saves_once_per_batch(self):
+        index = self._index()
+        index.refresh()
+        with mock.patch.object(index, '_build', wraps=index._build) as build, \
+                mock.patch.object(index, '_save', wraps=index._save) as save:
+            for i in range(5):
+                index.add_members(f'TS00{i}', ['000977', '600000.SH'], f'概念{i}', source='ts_concept')
+            self.assertEqual(build.call_count, 0)
+            # 第一次查询时一次并入全部暂存的成分，不写文件
+            self.assertEqual(index.sectors_of('000977.SZ'), ['801750.SI', 'TS000', 'TS001', 'TS002', 'TS003', 'TS004'])
+            self.assertEqual(index.stocks_of('TS004'), ['000977.SZ', '600000.SH'])
+            self.assertEqual((build.call_count, save.call_count), (1, 0))
+            self.assertFalse(self._index().has_sector('TS000'))
+
+            # 刷新时连同按需写入的成分只保存一次
+            index.add_members('TS005', ['600588'], source='ts_concept')
+            index.refresh(force=True)
+            self.assertEqual(save.call_count, 1)
+            index.flush()
+            self.assertEqual(save.call_count, 1)
+        self.assertEqual(self._index().stocks_of('TS005'), ['600588.SH'])
+        self.assertEqual(self._index().sector_code_of('概念3', 'ts_concept'), 'TS003')
+
+    def test_name_lookup_uses_given_source(self):
+        ci = CountingFetcher(pd.DataFrame({'sector_code': ['CI005021.CI'], 'sector_name': ['银行'],
+                                           'con_code': ['601398.SH']}))
+        index = SectorMembershipIndex(self.path, fetchers={'sw': self.sw, 'ci': ci})
+        index.refresh()
+        self.assertEqual(index.stocks_of_name('银行', 'sw'), ['000001.SZ', '600000.SH'])
+        self.assertEqual(index.stocks_of_name('银行', 'ci'), ['601398.SH'])
+        self.assertEqual(index.sector_code_of('银行', 'ci'), 'CI005021.CI')
+        self.assertEqual(index.stocks_of_name('银行', 'dc'), [])
+
+    def test_levels_persisted_and_legacy_index_refetched(self):
+        sw = CountingFetcher(_sw_members().assign(level=['l1', 'l1', 'l2', 'l2', 'l2']))
+        index = SectorMembershipIndex(self.path, fetchers={'sw': sw})
+        index.refresh()
+        reloaded = SectorMembershipIndex(self.path, fetchers={'sw': sw})
+        self.assertEqual(reloaded.sector_table()['level'].to_dict(), {'801750.SI': 'l2', '801780.SI': 'l1'})
+        self.assertEqual(reloaded.refresh(), 0)
+
+        # 旧版索引文件没有行业级别，当天重新请求
+        with np.load(self.path) as data:
+            legacy = {name: data[name] for name in data.files if name != 'sector_levels'}
+        with open(self.path, 'wb') as f:
+            np.savez_compressed(f, **legacy)
+        legacy_index = SectorMembershipIndex(self.path, fetchers={'sw': sw})
+        self.assertEqual(legacy_index.stocks_of_name('银行', 'sw'), ['000001.SZ', '600000.SH'])
+        self.assertEqual(legacy_index.refresh(), 1)
+        self.assertEqual(sw.calls, 2)
+
+    def test_dc_boards_named_from_dc_index(self):
+        pro = mock.Mock()
+        pro.dc_index.return_value = pd.DataFrame({'ts_code': ['BK0475.DC', 'BK1036.DC'], 'name': ['银行', '半导体']})
+        pro.dc_member.return_value = pd.DataFrame({'ts_code': ['BK0475.DC', 'BK1036.DC'],
+                                                   'con_code': ['601398.SH', '688981.SH']})
+        fetchers = _pro_fetchers(pro)
+        index = SectorMembershipIndex(self.path, fetchers={'sw': self.sw, 'dc': fetchers['dc']})
+        index.refresh()
+        # 东方财富板块名称只在dc数据源中查找，不会返回同名申万行业的成分
+        self.assertEqual(index.stocks_of_name('银行', 'dc'), ['601398.SH'])
+        self.assertEqual(index.stocks_of_name('银行', 'sw'), ['000001.SZ', '600000.SH'])
+        self.assertEqual(index.sector_code_of('半导体', 'dc'), 'BK1036.DC')
+
+    def test_readers_never_see_half_swapped_arrays(self):
+        small = _sw_members().iloc[:2]
+        large = _sw_members()
+        index = SectorMembershipIndex(self.path, fetchers={'sw': CountingFetcher(large)})
+        index.refresh()
+        expected = ({'801780.SI': 2}, {'801780.SI': 2, '801750.SI': 3})
+        stop = threading.Event()
+        errors = []
+
+        def read():
+            while not stop.is_set():
+                try:
+                    counts = index.aggregate(pd.Series(1.0, index=large['con_code'].unique()), how='count')
+                    if counts.to_dict() not in expected:
+                        errors.append(counts.to_dict())
+                except Exception as e:
+                    errors.append(e)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            for i in range(200):
+                index._build((small if i % 2 else large).assign(source='sw'))
+        finally:
+            stop.set()
+            reader.join()
+        self.assertEqual(errors, [])
+
+    def test_fetch_all_pages(self):
+        rows = pd.DataFrame({'con_code': [f'{i:06d}' for i in range(7)]})
+        calls = []
+
+        def fetch(offset, limit):
+            calls.append((offset, limit))
+            return rows.iloc[offset:offset + limit]
+
+        self.assertEqual(fetch_all_pages(fetch, page_size=3)['con_code'].tolist(), rows['con_code'].tolist())
+        self.assertEqual(calls, [(0, 3), (3, 3), (6, 3)])
+        # 恰好整页时再请求一次，空页结束
+        calls.clear()
+        self.assertEqual(len(fetch_all_pages(fetch, page_size=7)), 7)
+        self.assertEqual(calls, [(0, 7), (7, 7)])
+        self.assertTrue(fetch_all_pages(lambda offset, limit: pd.DataFrame(), page_size=3).empty)
+
+    def test_normalize_stock_code(self):
+        self.assertEqual(normalize_stock_code('600000'), '600000.SH')
+        self.assertEqual(normalize_stock_code('300750'), '300750.SZ')
+        self.assertEqual(normalize_stock_code('830799'), '830799.BJ')
+        self.assertEqual(normalize_stock_code('000001.sz'), '000001.SZ')
+
+
+if __name__ == '__main__':
+    unittest.main()
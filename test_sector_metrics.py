@@ -0,0 +1,94 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import sector_metrics
+from momentum_analyzer import SectorAnalyzer as MomentumSectorAnalyzer
+from optimized_sector_analyzer import OptimizedSectorAnalyzer
+from enhance_sector_analyzer import EnhancedSectorAnalyzer
+
+
+def _make_panel(sectors=6, days=120, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2024-01-01', periods=days)
+    returns = rng.normal(0.001, 0.015, (days, sectors)) + np.linspace(-0.004, 0.004, sectors)
+    close = pd.DataFrame(1000 * np.exp(returns.cumsum(axis=0)), index=dates,
+                         columns=[f'8010{i:02d}.SI' for i in range(sectors)])
+    close.iloc[:70, 1] = np.nan   # 新上市行业，只有50天数据
+    close.iloc[:100, 2] = np.nan  # 数据不足30天
+    close.iloc[60:63, 3] = np.nan  # 中间缺失几天
+    return close
+
+
+def _history(series):
+    """单个行业的历史数据（与数据提供器格式一致）"""
+    data = series.dropna()
+    return pd.DataFrame({'开盘': data, '最高': data * 1.01, '最低': data * 0.99,
+                         '收盘': data, '成交量': 1e6}, index=data.index)
+
+
+class TestSectorMetrics(unittest.TestCase):
+    """向量化行业指标与逐行业计算结果一致"""
+
+    def setUp(self):
+        self.close = _make_panel()
+
+    def test_hot_sector_metrics_match_per_sector(self):
+        analyzer = OptimizedSectorAnalyzer(provider=object(), sector_engine=False)
+        table = sector_metrics.hot_sector_metrics(self.close)
+        for code in self.close.columns:
+            sector = {'code': code, 'name': code, 'type': 'SW'}
+            expected = analyzer._calculate_sector_metrics(_history(self.close[code]), sector)
+            actual = analyzer._format_sector_metrics(table.loc[code], sector)
+            for key in ('last_close', 'change_rate_1d', 'change_rate_5d', 'change_rate_20d',
+                        'change_rate_90d', 'volatility', 'trend_strength', 'score'):
+                self.assertAlmostEqual(actual[key], expected[key], places=6, msg=f"{code} {key}")
+            self.assertEqual(actual['last_date'], expected['last_date'])
+
+    def test_enhanced_indicators_match_per_sector(self):
+        analyzer = EnhancedSectorAnalyzer.__new__(EnhancedSectorAnalyzer)
+        frames = {code: _history(self.close[code]) for code in self.close.columns}
+        market = _history(self.close.mean(axis=1))
+
+        for market_data in (None, market):
+            panel = analyzer._calculate_panel_indicators(frames, market_data)
+            for code, data in frames.items():
+                expected = analyzer._calculate_momentum_indicators(data)
+                actual = analyzer._attach_panel_indicators(data, panel, code)
+                for column in ('rsi', 'macd_line', 'signal_line', 'macd_histogram'):
+                    pd.testing.assert_series_equal(actual[column], expected[column], check_names=False)
+
+                score, desc = analyzer._calculate_trend_stability(data)
+                self.assertAlmostEqual(panel['trend'].loc[code, 'score'], score, places=9)
+                self.assertEqual(panel['trend'].loc[code, 'desc'], desc)
+
+                score, desc = analyzer._calculate_relative_strength(data, market_data)
+                self.assertAlmostEqual(panel['rs'].loc[code, 'score'], score, places=9)
+                self.assertEqual(panel['rs'].loc[code, 'desc'], desc)
+
+    def test_rank_sectors_match_per_column(self):
+        analyzer = MomentumSectorAnalyzer()
+        data = self.close.ffill().bfill()
+        expected = {}
+        for sector in data.columns:
+            expected[sector] = (analyzer._calculate_momentum(data[sector]) * 0.4 +
+                                analyzer._calculate_trend_strength(data[sector]) * 0.3 +
+                                analyzer._calculate_relative_strength(data[sector], data) * 0.3)
+        ranked = analyzer.rank_sectors(data)
+        self.assertEqual([name for name, _ in ranked],
+                         sorted(expected, key=expected.get, reverse=True))
+        for name, score in ranked:
+            self.assertAlmostEqual(score, expected[name], places=12)
+
+    def test_full_market_ranking_is_fast(self):
+        import time
+        close = _make_panel(sectors=500, days=250, seed=1)
+        start = time.perf_counter()
+        table = sector_metrics.hot_sector_metrics(close)
+        self.assertEqual(len(table), 500)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from backtest_executor import LocalThreadBackend
+from sector_rotation_backtester import PREDICTORS, SectorRotationBacktester
+
+
+def _make_panel(sectors=12, days=400, seed=1):
+    """收益带有持续动量的行业面板：各行业的漂移率在每个季度内保持不变"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2022-01-03', periods=days)
+    drift = np.repeat(rng.normal(0, 0.004, (days // 60 + 1, sectors)), 60, axis=0)[:days]
+    returns = drift + rng.normal(0, 0.01, (days, sectors))
+    columns = [f'8010{i:02d}.SI' for i in range(sectors)]
+    close = pd.DataFrame(1000 * np.exp(returns.cumsum(axis=0)), index=dates, columns=columns)
+    volume = pd.DataFrame(rng.uniform(1e6, 2e6, (days, sectors)), index=dates, columns=columns)
+    close.iloc[:150, 0] = np.nan  # 中途上市的行业
+    return close, volume
+
+
+class TestSectorRotationBacktester(unittest.TestCase):
+    """测试行业轮动回测"""
+
+    def setUp(self):
+        self.close, self.volume = _make_panel()
+        self.backtester = SectorRotationBacktester(self.close, self.volume)
+
+    def test_run_records_picks_and_forward_returns(self):
+        result = self.backtester.run('optimized', lookback=60, top_n=3, horizon=5)
+        periods = result.periods
+        self.assertEqual(len(periods), len(range(59, len(self.close) - 5, 5)))
+        self.assertTrue((periods['n_picks'] <= 3).all())
+
+        row = periods.iloc[10]
+        t = self.close.index.get_loc(row['date'])
+        forward = self.close.iloc[t + 5] / self.close.iloc[t] - 1
+        self.assertAlmostEqual(row['pick_return'], forward[row['picks']].mean())
+        self.assertEqual(row['hits'], int((forward[row['picks']] > forward.median()).sum()))
+        # 上市前的行业不会入选
+        early = periods[periods['date'] < self.close.index[150]]
+        self.assertFalse(any('801000.SI' in picks for picks in early['picks']))
+
+        summary = result.summary()
+        self.assertGreater(summary['hit_rate'], 0.5)  # 动量面板上动量预测器应跑赢中位数
+        self.assertAlmostEqual(summary['cumulative_return'], (1 + periods['pick_return']).prod() - 1)
+
+    def test_no_lookahead(self):
+        baseline = self.backtester.run('enhanced', lookback=90, top_n=3, horizon=10)
+        cutoff = baseline.periods['date'].iloc[5]
+        shocked = self.close.copy()
+        shocked.loc[shocked.index > cutoff] *= np.linspace(0.5, 2, shocked.shape[1])
+        result = SectorRotationBacktester(shocked, self.volume).run('enhanced', lookback=90, top_n=3, horizon=10)
+        self.assertEqual(list(result.periods['picks'].iloc[:6]), list(baseline.periods['picks'].iloc[:6]))
+
+    def test_grid_matches_serial_runs(self):
+        backend = LocalThreadBackend(max_workers=4)
+        try:
+            table = self.backtester.run_grid(lookbacks=(60, 120), top_n=3, horizon=5, backend=backend)
+        finally:
+            backend.shutdown()
+        self.assertEqual(len(table), len(PREDICTORS) * 2)
+        self.assertTrue(table['hit_rate'].is_monotonic_decreasing)
+
+        serial = SectorRotationBacktester(self.close, self.volume)
+        for _, row in table.iterrows():
+            expected = serial.run(row['predictor'], row['lookback'], top_n=3, horizon=5).summary()
+            self.assertEqual(row['periods'], expected['periods'])
+            np.testing.assert_allclose(row['mean_return'], expected['mean_return'])
+        self.assertTrue((table.loc[table['predictor'] == 'simple_rotation', 'periods'] > 0).all())
+
+    def test_unknown_predictor(self):
+        with self.assertRaises(ValueError):
+            self.backtester.run('unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
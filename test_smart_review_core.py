@@ -0,0 +1,225 @@
+import importlib.util
+import json
+import logging
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import smart_review_core
+from record_store import RecordStore
+from smart_review_core import SmartReviewCore, _last_market_close
+from backtest_executor import LocalThreadBackend
+
+
+def _bars(n=60, last_close=None):
+    index = pd.date_range('2024-01-02', periods=n, freq='B')
+    close = 10 + np.cumsum(np.random.default_rng(n).normal(0, 0.1, n))
+    if last_close is not None:
+        close[-1] = last_close
+    return pd.DataFrame({'open': close, 'high': close + 0.2, 'low': close - 0.2,
+                         'close': close, 'volume': np.full(n, 1e6)}, index=index)
+
+
+class FakeVisualSystem:
+    """按股票代码返回固定行情，记录每次获取所在的线程"""
+    bars = {}
+    calls = []
+    instances = []
+    lock = threading.Lock()
+
+    def __init__(self, token=None, headless=True):
+        with self.lock:
+            self.instances.append(self)
+
+    def get_stock_data(self, symbol):
+        with self.lock:
+            self.calls.append((symbol, id(self), threading.get_ident()))
+        bars = self.bars[symbol]
+        if isinstance(bars, Exception):
+            raise bars
+        return bars
+
+
+class TestAnalyzeAllStocksInPool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        FakeVisualSystem.bars = {'600000.SH': _bars(), '000001.SZ': _bars(70), '000977.SZ': _bars(80)}
+        FakeVisualSystem.calls = []
+        FakeVisualSystem.instances = []
+        patches = [mock.patch.object(smart_review_core, 'VisualStockSystem', FakeVisualSystem),
+                   mock.patch.object(smart_review_core, 'ChinaStockProvider', mock.MagicMock())]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.core = SmartReviewCore(data_dir=self.tmp.name)
+        self.core.review_pool['stocks'] = [
+            {'symbol': symbol, 'name': symbol, 'status': 'watching', 'smart_score': 50}
+            for symbol in FakeVisualSystem.bars
+        ]
+        self.core._save_review_pool()
+        self.backend = LocalThreadBackend(max_workers=3)
+
+    def tearDown(self):
+        self.backend.shutdown()
+        self.core.pool_store.close()
+        for handler in list(self.core.logger.handlers):
+            self.core.logger.removeHandler(handler)
+            handler.close()
+        self.tmp.cleanup()
+
+    def _stored(self):
+        store = RecordStore(self.core.review_pool_db, key_field='symbol', score_field='smart_score')
+        try:
+            return {s['symbol']: s for s in store.load()}
+        finally:
+            store.close()
+
+    def test_each_stock_saved_as_it_completes(self):
+        FakeVisualSystem.bars['000977.SZ'] = RuntimeError('接口超时')
+        saved = []
+        save = self.core._save_review_pool
+        self.core._save_review_pool = lambda symbols=None: saved.append(symbols) or save(symbols)
+
+        # 交易时段内不按收盘时间跳过
+        with mock.patch.object(smart_review_core, '_last_market_close', return_value=None):
+            results = self.core.analyze_all_stocks_in_pool(backend=self.backend)
+
+        self.assertEqual((results['success_count'], results['fail_count']), (2, 1))
+        self.assertCountEqual(saved, [['600000.SH'], ['000001.SZ']])
+        stored = self._stored()
+        for symbol in ('600000.SH', '000001.SZ'):
+            self.assertIn('bars_signature', stored[symbol]['analysis'])
+            self.assertIn('analyzed_at', stored[symbol])
+        self.assertNotIn('analysis', stored['000977.SZ'])
+        # 工作线程各自使用独立的VisualStockSystem，不共享主实例的数据提供器
+        main_system = self.core.visual_system
+        self.assertTrue(all(system_id != id(main_system) for _, system_id, _ in FakeVisualSystem.calls))
+        per_thread = {}
+        for _, system_id, thread_id in FakeVisualSystem.calls:
+            self.assertEqual(per_thread.setdefault(thread_id, system_id), system_id)
+
+    def test_skips_when_analysis_is_current(self):
+        with mock.patch.object(smart_review_core, '_last_market_close', return_value=None):
+            self.core.analyze_all_stocks_in_pool(backend=self.backend)
+        FakeVisualSystem.calls = []
+
+        # 上次分析晚于最近收盘时间，不再获取行情
+        with mock.patch.object(smart_review_core, '_last_market_close',
+                               return_value=datetime(2000, 1, 3, 15)):
+            results = self.core.analyze_all_stocks_in_pool(backend=self.backend)
+        self.assertEqual(results['skipped_count'], 3)
+        self.assertEqual(FakeVisualSystem.calls, [])
+
+        # 关闭增量模式时全部重新分析
+        with mock.patch.object(smart_review_core, '_last_market_close',
+                               return_value=datetime(2000, 1, 3, 15)):
+            results = self.core.analyze_all_stocks_in_pool(incremental=False, backend=self.backend)
+        self.assertEqual((results['success_count'], results['skipped_count']), (3, 0))
+
+    def test_skips_when_bars_signature_unchanged(self):
+        with mock.patch.object(smart_review_core, '_last_market_close', return_value=None):
+            self.core.analyze_all_stocks_in_pool(backend=self.backend)
+            signature = self._stored()['600000.SH']['analysis']['bars_signature']
+
+            # 只有000001.SZ有新行情，其余股票不重新计算指标
+            FakeVisualSystem.bars['000001.SZ'] = _bars(71)
+            with mock.patch.object(self.core.analyzer, 'analyze',
+                                   wraps=self.core.analyzer.analyze) as analyze:
+                results = self.core.analyze_all_stocks_in_pool(backend=self.backend)
+
+        self.assertEqual(analyze.call_count, 1)
+        self.assertEqual((results['success_count'], results['skipped_count']), (1, 2))
+        stored = self._stored()
+        self.assertEqual(stored['600000.SH']['analysis']['bars_signature'], signature)
+        self.assertTrue(stored['000001.SZ']['analysis']['bars_signature'].startswith('71|'))
+
+
+class TestReviewPoolStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patches = [mock.patch.object(smart_review_core, 'VisualStockSystem', FakeVisualSystem),
+                   mock.patch.object(smart_review_core, 'ChinaStockProvider', mock.MagicMock())]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.cores = []
+
+    def tearDown(self):
+        for core in self.cores:
+            if core.pool_store is not None:
+                core.pool_store.close()
+            for handler in list(core.logger.handlers):
+                core.logger.removeHandler(handler)
+                handler.close()
+        self.tmp.cleanup()
+
+    def _core(self):
+        core = SmartReviewCore(data_dir=self.tmp.name)
+        self.cores.append(core)
+        return core
+
+    def test_falls_back_to_json_when_database_unavailable(self):
+        with open(os.path.join(self.tmp.name, 'smart_review_pool.json'), 'w', encoding='utf-8') as f:
+            json.dump({'stocks': [{'symbol': '600000.SH', 'name': '浦发银行', 'smart_score': 60}]}, f)
+        with mock.patch.object(smart_review_core, 'RecordStore', side_effect=OSError('disk I/O error')):
+            core = self._core()
+        self.assertIsNone(core.pool_store)
+        self.assertEqual([s['symbol'] for s in core.review_pool['stocks']], ['600000.SH'])
+
+        core.review_pool['stocks'][0]['smart_score'] = 75
+        self.assertTrue(core._save_review_pool(['600000.SH']))
+        with open(core.review_pool_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['stocks'][0]['smart_score'], 75)
+
+    def test_malformed_pool_records_do_not_break_startup(self):
+        stocks = [{'symbol': '600000.SH', 'name': '浦发银行', 'smart_score': float('nan')},
+                  {'symbol': '000001.SZ', 'name': '平安银行', 'smart_score': 70}]
+        with open(os.path.join(self.tmp.name, 'smart_review_pool.json'), 'w', encoding='utf-8') as f:
+            json.dump({'stocks': stocks}, f)
+        with mock.patch.object(smart_review_core, 'RecordStore', side_effect=OSError('disk I/O error')):
+            core = self._core()
+        self.assertEqual([s['symbol'] for s in core.pool_index.top()], ['000001.SZ', '600000.SH'])
+
+        # 标签字段格式错误时索引建立失败，但初始化仍然完成
+        stocks[0]['tags'] = 5
+        with open(os.path.join(self.tmp.name, 'smart_review_pool.json'), 'w', encoding='utf-8') as f:
+            json.dump({'stocks': stocks}, f)
+        with mock.patch.object(smart_review_core, 'RecordStore', side_effect=OSError('disk I/O error')):
+            core = self._core()
+        self.assertEqual(len(core.review_pool['stocks']), 2)
+
+    @unittest.skipUnless(importlib.util.find_spec('PyQt5'), '需要PyQt5')
+    def test_review_pool_ui_reads_database(self):
+        from review_pool_ui import read_pool
+
+        core = self._core()
+        core.review_pool['stocks'] = [{'symbol': '600000.SH', 'name': '浦发银行', 'smart_score': 60}]
+        core._save_review_pool()
+        pool = read_pool(core.review_pool_db)
+        self.assertEqual([s['symbol'] for s in pool['stocks']], ['600000.SH'])
+        self.assertEqual(pool['version'], core.review_pool['version'])
+
+
+class TestLastMarketClose(unittest.TestCase):
+
+    def test_trading_hours_and_weekends(self):
+        # 周三盘中、盘后、开盘前
+        self.assertIsNone(_last_market_close(datetime(2024, 6, 5, 10, 0)))
+        self.assertEqual(_last_market_close(datetime(2024, 6, 5, 16, 0)), datetime(2024, 6, 5, 15))
+        self.assertEqual(_last_market_close(datetime(2024, 6, 5, 9, 0)), datetime(2024, 6, 4, 15))
+        # 周一开盘前和周日都回到上周五收盘
+        self.assertEqual(_last_market_close(datetime(2024, 6, 3, 9, 0)), datetime(2024, 5, 31, 15))
+        self.assertEqual(_last_market_close(datetime(2024, 6, 2, 12, 0)), datetime(2024, 5, 31, 15))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    unittest.main()
@@ -0,0 +1,47 @@
+import json
+import os
+import tempfile
+import unittest
+
+from startup_benchmark import (FixtureHotSectorAnalyzer, FixtureSectorProvider, bench_hot_sector_cli,
+                               bench_imports)
+
+
+class TestStartupBenchmark(unittest.TestCase):
+    """测试离线样本和启动基准的输出"""
+
+    def test_fixture_roundtrip_and_analyzer(self):
+        fixture = FixtureSectorProvider.synthetic(n_industries=5, n_concepts=40, days=60)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sectors.pkl')
+            fixture.save(path)
+            loaded = FixtureSectorProvider.from_path(path)
+        self.assertEqual(loaded.get_sector_list(), fixture.get_sector_list())
+        self.assertEqual(len(loaded.get_sector_history('BK0001', days=30)), 30)
+        self.assertIsNone(loaded.get_sector_history('UNKNOWN'))
+        # 同一种子生成的样本相同
+        again = FixtureSectorProvider.synthetic(n_industries=5, n_concepts=40, days=60)
+        self.assertTrue(again.histories['000001.SH'].equals(fixture.histories['000001.SH']))
+
+        result = FixtureHotSectorAnalyzer(loaded, top_n=5).analyze_hot_sectors()
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(len(result['data']['hot_sectors']), 5)
+        self.assertIn('hot_score', result['data']['hot_sectors'][0])
+
+    def test_benchmarks_emit_json(self):
+        first_result = bench_hot_sector_cli(fixture=None, top_n=5)
+        self.assertEqual(first_result['status'], 'ok', first_result)
+        self.assertEqual(first_result['sector_count'], 5)
+        self.assertGreater(first_result['seconds'], 0)
+        self.assertGreaterEqual(first_result['wall_seconds'], first_result['seconds'])
+        self.assertGreater(first_result['peak_rss_mb'], 0)
+
+        imports = bench_imports(['sector_metrics', 'module_that_does_not_exist'])
+        self.assertEqual(imports['sector_metrics']['status'], 'ok')
+        self.assertEqual(imports['sector_metrics']['heavy_modules'], [])
+        self.assertEqual(imports['module_that_does_not_exist']['status'], 'skipped')
+        json.dumps({'imports': imports, 'first_result': first_result})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import re
+import unittest
+
+from lazy_imports import LazyModule
+from startup_benchmark import HEAVY_MODULES, import_profile
+
+# 冷启动导入预算(秒)，可通过环境变量调整
+STARTUP_BUDGET = float(os.environ.get('STARTUP_IMPORT_BUDGET', '2.0'))
+
+# 启动路径上的模块
+STARTUP_MODULES = ('stock_analyzer_app', 'single_stock_analyzer', 'sector_analyzer', 'jf_trading_system')
+
+
+class TestStartupTime(unittest.TestCase):
+    """冷启动导入回归测试：重量级库延迟加载，导入耗时不超过预算"""
+
+    def test_startup_modules_import_lazily(self):
+        for module in STARTUP_MODULES:
+            with self.subTest(module=module):
+                returncode, timings, stderr = import_profile(module)
+                if returncode != 0:
+                    missing = re.search(r"No module named '([^']+)'", stderr)
+                    if missing and missing.group(1).split('.')[0] not in HEAVY_MODULES:
+                        self.skipTest(f"缺少界面依赖 {missing.group(1)}")
+                    self.fail(f"导入 {module} 失败:\n{stderr[-2000:]}")
+                loaded = sorted(name for name in timings if name.split('.')[0] in HEAVY_MODULES)
+                self.assertEqual(loaded, [], f"{module} 启动时加载了 {loaded}")
+                self.assertLess(timings[module], STARTUP_BUDGET,
+                                f"{module} 导入耗时 {timings[module]:.2f}s 超过预算 {STARTUP_BUDGET}s")
+
+    def test_lazy_module_loads_on_first_access(self):
+        loaded = []
+        json_module = LazyModule('json', on_load=loaded.append)
+        self.assertIn('not loaded', repr(json_module))
+        self.assertEqual(loaded, [])
+        self.assertEqual(json_module.dumps([1]), '[1]')
+        self.assertEqual(len(loaded), 1)
+        json_module.loads('[]')
+        self.assertEqual(len(loaded), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import time
+import random
+import unittest
+
+from table_model import ColumnarTable, TableColumn, sign_color, sort_key, status_background
+
+COLUMNS = [
+    TableColumn('代码', 'symbol'),
+    TableColumn('状态', 'status'),
+    TableColumn('分析得分', 'analysis_score', lambda value: f"{value:.1f}"),
+    TableColumn('收益率', 'return', lambda value: f"{value:.2f}%", color=sign_color),
+    TableColumn('标签', lambda stock: ', '.join(stock.get('tags') or [])),
+]
+
+
+class TestColumnarTable(unittest.TestCase):
+
+    def setUp(self):
+        self.stocks = [
+            {'symbol': '600000', 'status': 'watching', 'analysis_score': 72.5, 'return': 1.5, 'tags': ['银行']},
+            {'symbol': '000001', 'status': 'bought', 'analysis_score': '', 'return': -2.0},
+            {'symbol': '000977', 'status': 'sold', 'analysis_score': 88, 'return': 0, 'tags': ['算力', 'AI']},
+            {'symbol': '300750', 'status': 'unknown', 'analysis_score': None, 'return': 3.0},
+        ]
+        self.table = ColumnarTable(COLUMNS, self.stocks, background=status_background)
+
+    def test_columns_hold_display_text_and_colors(self):
+        self.assertEqual(len(self.table), 4)
+        self.assertEqual(self.table.headers, ['代码', '状态', '分析得分', '收益率', '标签'])
+        self.assertEqual(self.table.text[2], ['72.5', '', '88.0', ''])
+        self.assertEqual(self.table.text[4], ['银行', '', '算力, AI', ''])
+        self.assertEqual(self.table.foreground[3], ['green', 'red', None, 'green'])
+        self.assertIsNone(self.table.foreground[0])
+        self.assertEqual(self.table.background, ['#f0f0ff', '#f0fff0', '#fff0f0', None])
+
+    def test_sort_and_filter_rows(self):
+        rows = self.table.filter_rows()
+        # 空值总在最后，数值按大小排序
+        self.assertEqual(self.table.sort_rows(rows, 2), [0, 2, 1, 3])
+        self.assertEqual(self.table.sort_rows(rows, 2, descending=True), [2, 0, 1, 3])
+        self.assertEqual(self.table.sort_rows(rows, 0), [1, 2, 3, 0])
+        watching = self.table.filter_rows(lambda stock: stock['status'] in ('watching', 'sold'))
+        self.assertEqual(self.table.sort_rows(watching, 3, descending=True), [0, 2])
+
+    def test_mixed_types_are_sortable(self):
+        values = [3, 'abc', None, 1.5, '', float('nan'), '10']
+        ordered = sorted(values, key=sort_key)
+        self.assertEqual(ordered[:4], [1.5, 3, '10', 'abc'])
+
+    def test_large_table_builds_and_sorts_quickly(self):
+        rng = random.Random(3)
+        stocks = [{'symbol': f'{i:06d}', 'status': rng.choice(['watching', 'bought', 'sold']),
+                   'analysis_score': rng.uniform(0, 100), 'return': rng.uniform(-10, 10), 'tags': ['测试']}
+                  for i in range(20000)]
+        start = time.perf_counter()
+        table = ColumnarTable(COLUMNS, stocks, background=status_background)
+        rows = table.sort_rows(table.filter_rows(lambda stock: stock['status'] == 'watching'), 2, descending=True)
+        elapsed = time.perf_counter() - start
+        scores = [stocks[row]['analysis_score'] for row in rows]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertLess(elapsed, 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
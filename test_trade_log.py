@@ -0,0 +1,148 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backtesting import Backtester, RESULTS_DIR, TradeRecord as BasicTradeRecord
+from enhanced_backtesting import EnhancedBacktester, TradeRecord
+from trade_log import TradeLog, IncrementalTradeMetrics
+
+
+class TestTradeLog(unittest.TestCase):
+    """测试列式交易记录和增量统计"""
+
+    def _record(self, i, action='sell', profit=0.0):
+        return TradeRecord(timestamp=datetime(2024, 1, 1) + timedelta(days=i), symbol=f'S{i % 3}',
+                           action=action, price=10.0 + i, volume=100, position=0, profit=profit,
+                           drawdown=0.0, holding_days=i % 5, market_condition='normal')
+
+    def test_append_grows_and_round_trips(self):
+        log = TradeLog(TradeRecord, capacity=2)
+        for i in range(10):
+            log.append(self._record(i, profit=float(i)))
+        self.assertEqual(len(log), 10)
+        self.assertEqual(log[3], self._record(3, profit=3.0))
+        self.assertEqual([t.profit for t in log[-2:]], [8.0, 9.0])
+        self.assertEqual(list(log.column('symbol')[:3]), ['S0', 'S1', 'S2'])
+
+    def test_binary_export(self):
+        log = TradeLog(TradeRecord)
+        for i in range(5):
+            log.append(self._record(i, action='buy' if i % 2 else 'sell', profit=i * 1.5))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'trades.npz')
+            log.save(path, metadata={'total_profit': 15.0})
+            loaded = TradeLog.load(path, TradeRecord)
+            self.assertEqual(list(loaded), list(log))
+            self.assertEqual(TradeLog.load_metadata(path)['total_profit'], 15.0)
+
+    def test_incremental_matches_full_scan(self):
+        rng = np.random.default_rng(0)
+        profits = list(rng.normal(0, 100, 500).round(2)) + [0.0, 0.0]
+        metrics = IncrementalTradeMetrics()
+        for p in profits:
+            metrics.update(p, 2, datetime(2024, 1, 1))
+
+        wins = [p for p in profits if p > 0]
+        losses = [p for p in profits if p < 0]
+        self.assertEqual(metrics.win_count, len(wins))
+        self.assertEqual(metrics.loss_count, len(profits) - len(wins))
+        self.assertAlmostEqual(metrics.avg_win, np.mean(wins))
+        self.assertAlmostEqual(metrics.avg_loss, abs(np.mean(losses)))
+        self.assertEqual(metrics.max_loss, min(losses))
+
+        streak, max_win_streak, max_loss_streak = 0, 0, 0
+        for p in profits:
+            streak = (streak + 1 if streak > 0 else 1) if p > 0 else (streak - 1 if streak < 0 else -1)
+            max_win_streak = max(max_win_streak, streak)
+            max_loss_streak = max(max_loss_streak, -streak)
+        self.assertEqual(metrics.max_consecutive_wins, max_win_streak)
+        self.assertEqual(metrics.max_consecutive_losses, max_loss_streak)
+
+    def test_backtester_metrics_from_fills(self):
+        backtester = EnhancedBacktester(initial_capital=1000000.0)
+        start = datetime(2024, 1, 1)
+        backtester.execute_trade(start, 'TEST', 'buy', 100.0, 1000)
+        backtester.execute_trade(start + timedelta(days=5), 'TEST', 'sell', 110.0, 1000)
+        backtester.execute_trade(start + timedelta(days=10), 'TEST', 'buy', 105.0, 1000)
+        backtester.execute_trade(start + timedelta(days=15), 'TEST', 'sell', 95.0, 1000)
+
+        result = backtester.calculate_metrics()
+        self.assertEqual(len(result.trades), 4)
+        self.assertEqual((result.win_count, result.loss_count), (1, 1))
+        self.assertEqual(result.avg_holding_period, 5)
+        self.assertEqual(list(result.monthly_returns), ['2024-01'])
+
+
+class TestBacktesterLogMetrics(unittest.TestCase):
+    """测试基础回测器直接在交易记录列数组上计算的指标"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        self.addCleanup(self.tmp.cleanup)
+
+    def _trades(self):
+        rng = np.random.default_rng(5)
+        trades = TradeLog(BasicTradeRecord)
+        for i in range(300):
+            action = 'sell' if rng.random() < 0.5 else 'buy'
+            profit = float(rng.choice([0.0, rng.normal(0, 50)])) if action == 'sell' else 0.0
+            trades.append(BasicTradeRecord(timestamp=datetime(2024, 1, 1) + timedelta(hours=13 * i),
+                                           symbol=f'S{i % 4}', action=action, price=10.0, volume=100,
+                                           position=0, profit=profit, drawdown=float(rng.uniform(0, 500))))
+        return trades
+
+    def test_matches_per_trade_scan(self):
+        backtester = Backtester()
+        trades = self._trades()
+        records = list(trades)
+        profit, risk, streaks, holding = backtester._calculate_log_metrics(trades)
+
+        profits = [t.profit for t in records]
+        wins = [p for p in profits if p > 0]
+        losses = [p for p in profits if p < 0]
+        self.assertAlmostEqual(profit['total_profit'], sum(profits))
+        self.assertEqual((profit['win_count'], profit['loss_count']), (len(wins), len(losses)))
+        self.assertAlmostEqual(profit['win_rate'], len(wins) / len(records))
+        self.assertAlmostEqual(profit['profit_ratio'], np.mean(wins) / abs(np.mean(losses)))
+        self.assertEqual(risk['max_drawdown'], max(t.drawdown for t in records))
+
+        streak, max_wins, max_losses = 0, 0, 0
+        for p in profits:
+            if p > 0:
+                streak = streak + 1 if streak > 0 else 1
+            elif p < 0:
+                streak = streak - 1 if streak < 0 else -1
+            max_wins, max_losses = max(max_wins, streak), max(max_losses, -streak)
+        self.assertEqual((streaks['max_consecutive_wins'], streaks['max_consecutive_losses']),
+                         (max_wins, max_losses))
+
+        # 每笔卖出与同一股票最早的未配对买入配对
+        open_buys, periods = {}, []
+        for t in records:
+            if t.action == 'buy':
+                open_buys.setdefault(t.symbol, []).append(t)
+            elif open_buys.get(t.symbol):
+                periods.append((t.timestamp - open_buys[t.symbol].pop(0).timestamp).days)
+        self.assertAlmostEqual(holding['avg_holding_period'], np.mean(periods))
+
+    def test_trades_saved_under_results_dir(self):
+        backtester = Backtester()
+        start = datetime(2024, 1, 1)
+        backtester.execute_trade(start, 'TEST', 'buy', 100.0, 1000)
+        backtester.execute_trade(start + timedelta(days=3), 'TEST', 'sell', 110.0, 1000)
+
+        result = backtester.calculate_metrics()
+        self.assertEqual(result.avg_holding_period, 3)
+        path = os.path.join(RESULTS_DIR, 'backtest_trades.npz')
+        self.assertEqual(list(TradeLog.load(path, BasicTradeRecord)), list(result.trades))
+        self.assertFalse(os.path.exists('backtest_trades.npz'))
+
+
+if __name__ == '__main__':
+    unittest.main()
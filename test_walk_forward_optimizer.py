@@ -0,0 +1,195 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+import numpy as np
+
+import strategy_optimization_engine
+from volume_price_strategy import VolumePriceStrategy
+from walk_forward_optimizer import WalkForwardOptimizer, generate_walk_forward_splits
+
+
+class TestWalkForwardOptimizer(unittest.TestCase):
+    """测试滚动前推优化器"""
+
+    def setUp(self):
+        dates = pd.date_range('2023-01-01', periods=200, freq='B')
+        self.data = pd.DataFrame({'close': np.linspace(10, 30, 200)}, index=dates)
+        self.prepare_calls = 0
+
+    def _prepare(self, df):
+        self.prepare_calls += 1
+        df['ma'] = df['close'].rolling(5, min_periods=1).mean()
+        return df
+
+    @staticmethod
+    def _evaluate(df, params, start):
+        # 收益与参数距离3越近越好，便于验证寻优；预热行不计入
+        df = df.iloc[start:]
+        return {'total_return': float(df['close'].iloc[-1] - df['close'].iloc[0]) - abs(params['x'] - 3),
+                'trade_count': len(df)}
+
+    def test_rolling_splits(self):
+        folds = generate_walk_forward_splits(100, train_size=40, test_size=20)
+        self.assertEqual(len(folds), 3)
+        self.assertEqual((folds[1].train_start, folds[1].train_end), (20, 60))
+        self.assertEqual((folds[1].test_start, folds[1].test_end), (60, 80))
+
+    def test_anchored_splits(self):
+        folds = generate_walk_forward_splits(100, train_size=40, test_size=20, anchored=True)
+        self.assertTrue(all(f.train_start == 0 for f in folds))
+        self.assertEqual(folds[-1].train_end, 80)
+
+    def test_run_reports_out_of_sample(self):
+        optimizer = WalkForwardOptimizer(self._evaluate, prepare_func=self._prepare, max_workers=2)
+        grid = [{'x': x} for x in range(6)]
+        result = optimizer.run(self.data, grid, train_size=60, test_size=20)
+
+        self.assertEqual(len(result['folds']), 7)
+        for fold in result['folds']:
+            self.assertEqual(fold['best_parameters'], {'x': 3})
+            self.assertEqual(fold['out_of_sample']['trade_count'], 20)
+        self.assertEqual(result['summary']['valid_folds'], 7)
+        self.assertEqual(result['summary']['most_common_parameters'], {'x': 3})
+
+    def test_windows_include_warmup_rows(self):
+        calls = []
+
+        def evaluate(df, params, start):
+            calls.append((df.index[start], len(df) - start, start))
+            return self._evaluate(df, params, start)
+
+        optimizer = WalkForwardOptimizer(evaluate, warmup=10, max_workers=1)
+        optimizer.run(self.data.iloc[:100], [{'x': 3}], train_size=40, test_size=20)
+        dates = self.data.index
+        # 第一个训练区间前没有历史数据，之后的训练区间和所有测试区间都带10行预热
+        self.assertEqual(calls, [
+            (dates[0], 40, 0), (dates[40], 20, 10),
+            (dates[20], 40, 10), (dates[60], 20, 10),
+            (dates[40], 40, 10), (dates[80], 20, 10),
+        ])
+
+    def test_prepared_windows_are_cached(self):
+        optimizer = WalkForwardOptimizer(self._evaluate, prepare_func=self._prepare, max_workers=1)
+        grid = [{'x': x} for x in range(3)]
+        optimizer.run(self.data, grid, train_size=60, test_size=20, data_key='A')
+        first_calls = self.prepare_calls
+        optimizer.run(self.data, grid, train_size=60, test_size=20, data_key='A')
+        self.assertEqual(first_calls, 7)
+        self.assertEqual(self.prepare_calls, first_calls)
+
+    def test_insufficient_data(self):
+        optimizer = WalkForwardOptimizer(self._evaluate)
+        with self.assertRaises(ValueError):
+            optimizer.run(self.data.iloc[:50], [{'x': 1}], train_size=60, test_size=20)
+
+
+class TestEngineWalkForward(unittest.TestCase):
+    """测试策略优化引擎的滚动前推优化"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patches = [mock.patch.object(strategy_optimization_engine, 'VisualStockSystem'),
+                   mock.patch.object(strategy_optimization_engine, 'ChinaStockProvider'),
+                   # 每5根K线给出一次买入信号，下一根K线卖出
+                   mock.patch.object(VolumePriceStrategy, 'analyze',
+                                     lambda self, df: {'strategy_score': 90 if len(df) % 5 == 0 else 30})]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.engine = strategy_optimization_engine.StrategyOptimizationEngine(data_dir=self.tmp.name)
+        dates = pd.date_range('2023-01-02', periods=200, freq='B')
+        close = np.linspace(10, 20, 200)
+        self.engine.data_provider.get_stock_daily_data.return_value = pd.DataFrame(
+            {'open': close, 'high': close, 'low': close, 'close': close, 'volume': np.full(200, 1e6),
+             '收盘': close}, index=dates)
+
+    def tearDown(self):
+        for handler in list(self.engine.logger.handlers):
+            self.engine.logger.removeHandler(handler)
+            handler.close()
+        self.tmp.cleanup()
+
+    def test_out_of_sample_windows_trade(self):
+        result = self.engine.walk_forward_optimize('volume_price', '600000.SH', param_grid=[{'ma_period': 20}],
+                                                   train_days=60, test_days=20)
+        self.assertEqual(result['status'], 'success')
+        folds = result['data']['folds']
+        self.assertEqual(len(folds), 7)
+        # 测试区间20根K线内只统计窗口内的交易：4次买入信号，各自在下一根K线卖出
+        for fold in folds:
+            self.assertIsNone(fold['error'])
+            self.assertEqual(fold['out_of_sample']['trade_count'], 4)
+
+    def test_grid_parameters_reach_strategy(self):
+        seen = set()
+        original_init = VolumePriceStrategy.__init__
+
+        def init(strategy, **params):
+            original_init(strategy, **params)
+            seen.add(strategy.params['volume_threshold'])
+
+        with mock.patch.object(VolumePriceStrategy, '__init__', init):
+            result = self.engine.walk_forward_optimize(
+                'volume_price', '600000.SH', param_grid=[{'volume_threshold': 1.2}, {'volume_threshold': 1.8}],
+                train_days=60, test_days=20)
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(seen, {1.2, 1.8})
+
+    def test_untunable_parameters_rejected(self):
+        result = self.engine.walk_forward_optimize('volume_price', '600000.SH', param_grid=[{'macd_fast': 8}],
+                                                   train_days=60, test_days=20, apply_best=True)
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('macd_fast', result['message'])
+        self.assertEqual(self.engine.strategies['volume_price']['parameters']['macd_fast'], 12)
+
+    def test_unsupported_strategies_rejected(self):
+        for strategy_id in ('moving_average_crossover', 'rsi_strategy'):
+            result = self.engine.walk_forward_optimize(strategy_id, '600000.SH')
+            self.assertEqual(result['status'], 'error')
+            self.assertIn('暂不支持回测', result['message'])
+            self.assertEqual(self.engine.backtest_strategy(strategy_id, '600000.SH')['status'], 'error')
+        self.engine.data_provider.get_stock_daily_data.assert_not_called()
+
+
+class TestVolumePriceStrategyParameters(unittest.TestCase):
+    """测试量价策略参数对信号的影响"""
+
+    def setUp(self):
+        close = np.full(40, 10.0)
+        close[-1] = 9.7
+        volume = np.full(40, 1e6)
+        volume[-1] = 1.6e6
+        self.data = pd.DataFrame({'收盘': close, '最高': close + 0.1, '最低': close - 0.1, '成交量': volume})
+
+    @staticmethod
+    def _signals(strategy, data):
+        # 直接调用各项计算，test_integration会把analyze替换为LazyStockAnalyzer版本
+        results = {
+            'volume_price_ratio': strategy._calculate_volume_price_ratio(data),
+            'volume_trend': strategy._analyze_volume_trend(data),
+            'price_volume_divergence': strategy._check_price_volume_divergence(data),
+            'volume_breakout': strategy._check_volume_breakout(data),
+            'accumulation_distribution': strategy._calculate_accumulation_distribution(data)
+        }
+        results['strategy_score'] = strategy._calculate_strategy_score(results)
+        return results
+
+    def test_score_depends_on_parameters(self):
+        loose = self._signals(VolumePriceStrategy(volume_threshold=1.5, price_change_threshold=0.02), self.data)
+        strict = self._signals(VolumePriceStrategy(volume_threshold=2.0, price_change_threshold=0.05), self.data)
+        self.assertEqual(loose['volume_breakout']['type'], 'up')
+        self.assertEqual(loose['price_volume_divergence']['type'], 'positive')
+        self.assertIsNone(strict['volume_breakout']['type'])
+        self.assertFalse(strict['price_volume_divergence']['exists'])
+        self.assertGreater(loose['strategy_score'], strict['strategy_score'])
+
+    def test_unknown_parameters_ignored(self):
+        strategy = VolumePriceStrategy(ma_period=10, macd_fast=12)
+        self.assertEqual(strategy.ma_period, 10)
+        self.assertNotIn('macd_fast', strategy.params)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+列式交易记录模块
+交易明细保存在预分配的NumPy结构化数组中，字符串字段按字典编码；
+卖出成交时增量更新胜负、盈亏、连胜连亏等统计，回测结束时无需重新扫描
+"""
+
+import json
+import dataclasses
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+import numpy as np
+import pandas as pd
+
+_ACTION_CODES = {'buy': 0, 'sell': 1}
+_ACTION_NAMES = {code: name for name, code in _ACTION_CODES.items()}
+
+
+def _field_dtype(field_type: Any) -> str:
+    """根据dataclass字段类型选择列类型"""
+    if field_type in (float, 'float'):
+        return 'f8'
+    if field_type in (int, 'int'):
+        return 'i8'
+    if field_type in (datetime, 'datetime'):
+        return 'datetime64[ns]'
+    # 字符串字段保存为字典编码
+    return 'i4'
+
+
+class TradeLog:
+    """基于结构化数组的交易记录
+
+    与List[TradeRecord]接口兼容：支持append、len、迭代、下标和切片，
+    读取时按需还原为record_cls对象。
+    """
+
+    def __init__(self, record_cls: Type, capacity: int = 1024):
+        self.record_cls = record_cls
+        self._fields = [f.name for f in dataclasses.fields(record_cls)]
+        self._dtype = np.dtype([(f.name, _field_dtype(f.type)) for f in dataclasses.fields(record_cls)])
+        self._string_fields = {name for name in self._fields
+                               if self._dtype[name] == np.dtype('i4') and name != 'action'}
+        self._data = np.zeros(max(int(capacity), 1), dtype=self._dtype)
+        self._size = 0
+        # 字符串字典：值 -> 编码，以及编码 -> 值
+        self._codes: Dict[str, int] = {}
+        self._strings: List[str] = []
+
+    def _encode(self, value: Any) -> int:
+        value = '' if value is None else str(value)
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._strings)
+            self._codes[value] = code
+            self._strings.append(value)
+        return code
+
+    def _grow(self):
+        new_data = np.zeros(len(self._data) * 2, dtype=self._dtype)
+        new_data[:self._size] = self._data[:self._size]
+        self._data = new_data
+
+    def append(self, trade: Any):
+        """追加一条交易记录"""
+        if self._size == len(self._data):
+            self._grow()
+        row = []
+        for name in self._fields:
+            value = getattr(trade, name)
+            if name == 'action':
+                row.append(_ACTION_CODES.get(value, -1))
+            elif name in self._string_fields:
+                row.append(self._encode(value))
+            elif self._dtype[name].kind == 'M':
+                row.append(np.datetime64('NaT') if value is None else np.datetime64(value, 'ns'))
+            else:
+                row.append(value)
+        # 整行一次写入，避免逐字段的标量赋值开销
+        self._data[self._size] = tuple(row)
+        self._size += 1
+
+    def _to_record(self, row: np.void) -> Any:
+        values = {}
+        for name in self._fields:
+            value = row[name]
+            if name == 'action':
+                values[name] = _ACTION_NAMES.get(int(value), '')
+            elif name in self._string_fields:
+                values[name] = self._strings[int(value)]
+            elif self._dtype[name].kind == 'M':
+                values[name] = None if np.isnat(value) else pd.Timestamp(value)
+            elif self._dtype[name].kind == 'i':
+                values[name] = int(value)
+            else:
+                values[name] = float(value)
+        return self.record_cls(**values)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(self._size):
+            yield self._to_record(self._data[i])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._to_record(self._data[i]) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("交易记录下标越界")
+        return self._to_record(self._data[index])
+
+    @property
+    def array(self) -> np.ndarray:
+        """已记录部分的结构化数组视图"""
+        return self._data[:self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        """获取单列数据（字符串列返回解码后的对象数组）"""
+        values = self.array[name]
+        if name == 'action':
+            return np.array([_ACTION_NAMES.get(int(v), '') for v in values], dtype=object)
+        if name in self._string_fields:
+            return np.asarray(self._strings, dtype=object)[values] if len(values) else np.array([], dtype=object)
+        return values
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """转换为DataFrame"""
+        return pd.DataFrame({name: self.column(name) for name in self._fields})
+
+    def save(self, path: str, metadata: Optional[Dict[str, Any]] = None):
+        """以压缩二进制格式保存交易记录
+
+        Args:
+            path: 输出文件路径（.npz）
+            metadata: 附带保存的汇总指标等信息，需可JSON序列化
+        """
+        np.savez_compressed(
+            path,
+            trades=self.array,
+            strings=np.asarray(self._strings, dtype=str),
+            metadata=np.asarray(json.dumps(metadata or {}, ensure_ascii=False, default=str))
+        )
+
+    @classmethod
+    def load(cls, path: str, record_cls: Type) -> 'TradeLog':
+        """从save生成的文件加载交易记录"""
+        with np.load(path, allow_pickle=False) as data:
+            trades = data['trades']
+            log = cls(record_cls, capacity=len(trades))
+            log._data[:len(trades)] = trades
+            log._size = len(trades)
+            log._strings = [str(s) for s in data['strings']]
+            log._codes = {s: i for i, s in enumerate(log._strings)}
+        return log
+
+    @staticmethod
+    def load_metadata(path: str) -> Dict[str, Any]:
+        """读取save时附带的元数据"""
+        with np.load(path, allow_pickle=False) as data:
+            return json.loads(str(data['metadata']))
+
+
+class IncrementalTradeMetrics:
+    """随卖出成交增量更新的交易统计"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.trade_count = 0
+        self.win_count = 0
+        self.loss_count = 0  # 亏损或持平的交易数
+        self.losing_count = 0  # 亏损额小于0的交易数
+        self.total_win = 0.0
+        self.total_loss = 0.0  # 亏损合计（负数）
+        self.max_win = 0.0
+        self.max_loss = 0.0
+        self.total_holding_days = 0
+        self.current_streak = 0
+        self.max_consecutive_wins = 0
+        self.max_consecutive_losses = 0
+        self.monthly_returns: Dict[str, float] = {}
+
+    def update(self, profit: float, holding_days: int = 0, timestamp: Optional[datetime] = None):
+        """记录一笔平仓交易"""
+        self.trade_count += 1
+        self.total_holding_days += holding_days
+
+        if profit > 0:
+            self.win_count += 1
+            self.total_win += profit
+            self.max_win = max(self.max_win, profit)
+            self.current_streak = self.current_streak + 1 if self.current_streak > 0 else 1
+            self.max_consecutive_wins = max(self.max_consecutive_wins, self.current_streak)
+        else:
+            self.loss_count += 1
+            if profit < 0:
+                self.losing_count += 1
+                self.total_loss += profit
+                self.max_loss = min(self.max_loss, profit)
+            self.current_streak = self.current_streak - 1 if self.current_streak < 0 else -1
+            self.max_consecutive_losses = max(self.max_consecutive_losses, -self.current_streak)
+
+        if timestamp is not None:
+            month_key = timestamp.strftime('%Y-%m')
+            self.monthly_returns[month_key] = self.monthly_returns.get(month_key, 0.0) + profit
+
+    @property
+    def win_rate(self) -> float:
+        return self.win_count / self.trade_count if self.trade_count > 0 else 0.0
+
+    @property
+    def avg_win(self) -> float:
+        return self.total_win / self.win_count if self.win_count > 0 else 0.0
+
+    @property
+    def avg_loss(self) -> float:
+        """平均亏损（绝对值），只统计亏损额小于0的交易"""
+        return abs(self.total_loss) / self.losing_count if self.losing_count > 0 else 0.0
+
+    @property
+    def avg_holding_period(self) -> float:
+        return self.total_holding_days / self.trade_count if self.trade_count > 0 else 0.0
@@ -10,7 +10,6 @@ import os
 import sys
 import time
 import json
-import pickle
 import logging
 import pandas as pd
 import numpy as np
@@ -18,6 +17,10 @@ import tushare as ts
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Union
 
+from sector_cache import SectorCache, get_sector_cache
+from sector_catalog import concept_descriptor
+from sector_membership import fetch_all_pages
+
 # 设置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -32,6 +35,9 @@ logger = logging.getLogger("TushareSectorProvider")
 class TushareSectorProvider:
     """Tushare行业数据提供器，专注于申万行业和概念板块"""
     
+    # 在统一行业缓存中的键前缀
+    CACHE_NAMESPACE = 'tushare:'
+    
     # 申万一级行业映射 (名称: 代码)
     SW_INDUSTRY_MAP = {
         '农林牧渔': '801010.SI', '采掘': '801020.SI', '化工': '801030.SI', 
@@ -46,32 +52,29 @@ class TushareSectorProvider:
         '机械设备': '801890.SI'
     }
     
-    def __init__(self, token=None, cache_dir='data_cache/sectors', cache_expiry=1800):
+    def __init__(self, token=None, cache_dir=None, cache_expiry=None):
         """初始化Tushare行业数据提供器
         
         Args:
             token: Tushare API Token，默认从环境变量或配置文件读取
-            cache_dir: 缓存目录
-            cache_expiry: 缓存过期时间(秒)，默认30分钟
+            cache_dir: 独立缓存目录，默认使用统一行业缓存
+            cache_expiry: 缓存过期时间(秒)，默认使用统一行业缓存的过期时间
         """
-        self.cache_dir = cache_dir
+        if cache_dir is None:
+            self._cache = get_sector_cache()
+        else:
+            self._cache = SectorCache(cache_dir, cache_expiry or SectorCache.DEFAULT_EXPIRY)
+        self.cache_dir = self._cache.cache_dir
         self.cache_expiry = cache_expiry
-        self._cache = {}
         self._last_api_call = 0
         self.api_call_interval = 0.5  # API调用间隔(秒)
         
-        # 确保缓存目录存在
-        os.makedirs(self.cache_dir, exist_ok=True)
-        
         # 初始化Tushare API
         self.token = token or self._get_token()
         self.pro = None
         self.is_pro_available = False
         self._init_tushare_api()
         
-        # 加载本地缓存
-        self._load_cache_from_disk()
-        
     def _get_token(self) -> str:
         """从环境变量或配置文件获取Tushare API Token"""
         # 使用固定的Token
@@ -154,90 +157,22 @@ class TushareSectorProvider:
             time.sleep(self.api_call_interval - elapsed)
         self._last_api_call = time.time()
     
+    def _cache_key(self, key: str) -> str:
+        """统一行业缓存由多个模块共用，本提供器的键统一加上命名空间前缀"""
+        return self.CACHE_NAMESPACE + key
+    
     def _save_to_cache(self, key: str, data: any) -> None:
-        """保存数据到内存缓存和磁盘"""
-        self._cache[key] = {
-            'data': data,
-            'timestamp': time.time()
-        }
-        
-        # 保存到磁盘
-        try:
-            file_path = os.path.join(self.cache_dir, f"{key}.pkl")
-            with open(file_path, 'wb') as f:
-                pickle.dump(data, f)
-            logger.debug(f"数据已保存到磁盘: {key}")
-        except Exception as e:
-            logger.error(f"保存缓存到磁盘失败: {str(e)}")
+        """保存数据到统一行业缓存"""
+        self._cache.set(self._cache_key(key), data)
     
-    def _get_from_cache(self, key: str) -> Tuple[bool, any]:
-        """从缓存获取数据
+    def _get_from_cache(self, key: str, max_age: Optional[float] = None) -> Tuple[bool, any]:
+        """从统一行业缓存获取数据
         
         Returns:
             (是否命中缓存, 数据)
         """
-        current_time = time.time()
-        
-        # 检查内存缓存
-        if key in self._cache:
-            cache_item = self._cache[key]
-            if current_time - cache_item['timestamp'] < self.cache_expiry:
-                logger.debug(f"从内存缓存获取: {key}")
-                return True, cache_item['data']
-        
-        # 检查磁盘缓存
-        file_path = os.path.join(self.cache_dir, f"{key}.pkl")
-        if os.path.exists(file_path):
-            try:
-                # 检查文件修改时间
-                mod_time = os.path.getmtime(file_path)
-                if current_time - mod_time < self.cache_expiry:
-                    with open(file_path, 'rb') as f:
-                        data = pickle.load(f)
-                    
-                    # 更新内存缓存
-                    self._cache[key] = {
-                        'data': data,
-                        'timestamp': mod_time
-                    }
-                    
-                    logger.debug(f"从磁盘缓存获取: {key}")
-                    return True, data
-            except Exception as e:
-                logger.error(f"读取磁盘缓存失败: {str(e)}")
-        
-        return False, None
-    
-    def _load_cache_from_disk(self) -> None:
-        """启动时加载磁盘缓存到内存"""
-        if not os.path.exists(self.cache_dir):
-            return
-            
-        try:
-            files = [f for f in os.listdir(self.cache_dir) if f.endswith('.pkl')]
-            if not files:
-                return
-                
-            logger.info(f"加载磁盘缓存，共 {len(files)} 个文件")
-            for file in files:
-                key = file.replace('.pkl', '')
-                file_path = os.path.join(self.cache_dir, file)
-                mod_time = os.path.getmtime(file_path)
-                
-                try:
-                    with open(file_path, 'rb') as f:
-                        data = pickle.load(f)
-                    
-                    self._cache[key] = {
-                        'data': data,
-                        'timestamp': mod_time
-                    }
-                except Exception as e:
-                    logger.error(f"加载缓存文件 {file} 失败: {str(e)}")
-            
-            logger.info(f"成功加载 {len(self._cache)} 个缓存项")
-        except Exception as e:
-            logger.error(f"加载缓存目录失败: {str(e)}")
+        data = self._cache.get(self._cache_key(key), max_age=max_age if max_age is not None else self.cache_expiry)
+        return data is not None, data
     
     def get_sector_list(self) -> List[Dict]:
         """获取行业列表，包括申万行业和热门概念板块
@@ -269,14 +204,9 @@ class TushareSectorProvider:
                 
                 if concepts is not None and not concepts.empty:
                     logger.info(f"获取到 {len(concepts)} 个概念板块")
-                    # 只取前30个概念板块，避免太多
-                    for _, row in concepts.head(30).iterrows():
-                        sectors.append({
-                            'code': row['code'],
-                            'name': row['name'],
-                            'type': 'TS',
-                            'description': f'概念板块-{row["name"]}'
-                        })
+                    # 保留全部概念板块的轻量描述，历史数据在预筛选后按需获取
+                    sectors.extend(concept_descriptor(code, name, 'TS')
+                                   for code, name in zip(concepts['code'], concepts['name']))
             except Exception as e:
                 logger.error(f"获取概念板块失败: {str(e)}")
         
@@ -284,6 +214,53 @@ class TushareSectorProvider:
         self._save_to_cache(cache_key, sectors)
         return sectors
     
+    def _record_members(self, concept_code: str, stocks: pd.DataFrame) -> None:
+        """将概念板块成分写入行业成分索引，供截面快照聚合"""
+        try:
+            from sector_membership import get_membership_index
+            get_membership_index(pro=self.pro, refresh=False).add_members(
+                concept_code, stocks['ts_code'].astype(str).tolist(), source='ts_concept')
+        except Exception as e:
+            logger.warning(f"记录概念板块 {concept_code} 成分失败: {str(e)}")
+    
+    def get_sector_snapshot(self, refresh: bool = False) -> pd.DataFrame:
+        """行业/概念板块截面快照，用于按需加载历史数据前的预筛选
+        
+        已缓存的最近交易日全市场个股日线（共享的个股截面）按行业成分索引聚合，
+        成分尚未记录的概念板块不在快照中。
+        
+        Args:
+            refresh: 是否先补齐个股截面并刷新成分索引；默认只使用已缓存的数据，不调用接口
+        
+        Returns:
+            以板块代码为索引、包含change_pct(成分股平均涨跌幅)和amount(成交额合计)的DataFrame
+        """
+        cache_key = 'sector_snapshot'
+        hit, data = self._get_from_cache(cache_key, max_age=300)
+        if hit:
+            return data
+        try:
+            from sector_data_engine import get_stock_daily_store
+            from sector_membership import get_membership_index
+            pro = self.pro if self.is_pro_available else None
+            store = get_stock_daily_store(pro=pro)
+            if refresh:
+                store.update(days=7)
+            day = store.get_snapshot()
+            if day.empty:
+                return pd.DataFrame(columns=['change_pct', 'amount'])
+            membership = get_membership_index(pro=pro, refresh=refresh)
+            change = (day['close'] / day['pre_close'] - 1) * 100
+            snapshot = pd.DataFrame({
+                'change_pct': membership.aggregate(change),
+                'amount': membership.aggregate(day['amount'], how='sum')
+            }).dropna(subset=['change_pct'])
+            self._save_to_cache(cache_key, snapshot)
+            return snapshot
+        except Exception as e:
+            logger.error(f"获取行业截面快照失败: {str(e)}")
+            return pd.DataFrame(columns=['change_pct', 'amount'])
+    
     def get_sector_history(self, sector_code: str, days: int = 90) -> Optional[pd.DataFrame]:
         """获取行业历史数据
         
@@ -294,7 +271,7 @@ class TushareSectorProvider:
         Returns:
             DataFrame包含行业历史数据 (日期索引, OHLCV数据)
         """
-        cache_key = f'history_{sector_code}'
+        cache_key = f'history:{sector_code}'
         hit, data = self._get_from_cache(cache_key)
         if hit:
             # 确保缓存的数据是真实数据
@@ -357,9 +334,10 @@ class TushareSectorProvider:
                     logger.info(f"尝试获取概念板块 {sector_code} 的成分股")
                     
                     # 获取成分股
-                    concept_stocks = self.pro.concept_detail(id=sector_code)
+                    concept_stocks = fetch_all_pages(lambda **page: self.pro.concept_detail(id=sector_code, **page))
                     
                     if concept_stocks is not None and not concept_stocks.empty:
+                        self._record_members(sector_code, concept_stocks)
                         # 取前10个成分股代表整个板块
                         stock_codes = concept_stocks['ts_code'].tolist()[:10]
                         logger.info(f"使用 {len(stock_codes)} 只股票合成板块指数")
@@ -453,7 +431,7 @@ class TushareSectorProvider:
             logger.error(f"无效的概念板块代码: {concept_code}，应以TS开头")
             return None
             
-        cache_key = f'concept_detail_{concept_code}'
+        cache_key = f'concept_detail:{concept_code}'
         hit, data = self._get_from_cache(cache_key)
         if hit:
             return data
@@ -464,10 +442,11 @@ class TushareSectorProvider:
             
         try:
             self._rate_limit()
-            stocks = self.pro.concept_detail(id=concept_code)
+            stocks = fetch_all_pages(lambda **page: self.pro.concept_detail(id=concept_code, **page))
             
             if stocks is not None and not stocks.empty:
                 logger.info(f"获取到概念板块 {concept_code} 的 {len(stocks)} 只成分股")
+                self._record_members(concept_code, stocks)
                 # 保存到缓存
                 self._save_to_cache(cache_key, stocks)
                 return stocks
@@ -548,11 +527,10 @@ class TushareSectorProvider:
             交易日期字符串 (YYYYMMDD)
         """
         cache_key = 'latest_trading_day'
-        hit, data = self._get_from_cache(cache_key)
+        # 缓存时间不超过1天，直接返回
+        hit, data = self._get_from_cache(cache_key, max_age=86400)
         if hit:
-            # 如果缓存时间不超过1天，直接返回
-            if time.time() - self._cache[cache_key]['timestamp'] < 86400:
-                return data
+            return data
         
         # 默认返回当前日期
         latest_day = datetime.now().strftime('%Y%m%d')
@@ -583,60 +561,27 @@ class TushareSectorProvider:
         return latest_day
 
     def clear_cache(self, older_than_days=None):
-        """清除缓存
+        """清除本提供器的缓存，统一行业缓存中其他模块的数据不受影响
         
         Args:
             older_than_days: 只清除几天前的缓存，None表示清除所有
         """
         if older_than_days is None:
-            # 清除所有内存缓存
-            self._cache.clear()
-            
-            # 清除所有磁盘缓存
-            if os.path.exists(self.cache_dir):
-                for file in os.listdir(self.cache_dir):
-                    if file.endswith('.pkl'):
-                        try:
-                            os.remove(os.path.join(self.cache_dir, file))
-                        except Exception as e:
-                            logger.error(f"删除缓存文件 {file} 失败: {str(e)}")
-            
-            logger.info("已清除所有缓存")
+            removed = self._cache.clear(prefix=self.CACHE_NAMESPACE)
+            logger.info(f"已清除所有Tushare缓存，共 {removed} 项")
         else:
-            # 计算截止时间
-            cutoff_time = time.time() - older_than_days * 86400
-            
-            # 清除旧的内存缓存
-            keys_to_remove = []
-            for key, value in self._cache.items():
-                if value['timestamp'] < cutoff_time:
-                    keys_to_remove.append(key)
-            
-            for key in keys_to_remove:
-                del self._cache[key]
-            
-            # 清除旧的磁盘缓存
-            if os.path.exists(self.cache_dir):
-                for file in os.listdir(self.cache_dir):
-                    if file.endswith('.pkl'):
-                        file_path = os.path.join(self.cache_dir, file)
-                        try:
-                            if os.path.getmtime(file_path) < cutoff_time:
-                                os.remove(file_path)
-                        except Exception as e:
-                            logger.error(f"删除缓存文件 {file} 失败: {str(e)}")
-            
-            logger.info(f"已清除 {len(keys_to_remove)} 个超过 {older_than_days} 天的缓存项")
+            removed = self._cache.clear(prefix=self.CACHE_NAMESPACE, older_than=older_than_days * 86400)
+            logger.info(f"已清除 {removed} 个超过 {older_than_days} 天的缓存项")
 
 # 单例模式提供全局访问点
 _instance = None
 
-def get_sector_provider(token=None, cache_dir='data_cache/sectors', cache_expiry=1800):
+def get_sector_provider(token=None, cache_dir=None, cache_expiry=None):
     """获取TushareSectorProvider单例
     
     Args:
         token: Tushare API Token
-        cache_dir: 缓存目录
+        cache_dir: 独立缓存目录，默认使用统一行业缓存
         cache_expiry: 缓存过期时间(秒)
         
     Returns:
@@ -1,29 +1,45 @@
 import pandas as pd
 import numpy as np
-import talib as ta
-import akshare as ak
 import pytz
 from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
-from tqdm import tqdm
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from jf_trading_system import JFTradingSystem, MarketSignal
 import time
 import os
 import logging
-import tushare as ts
 from china_stock_provider import ChinaStockProvider
 import re
 import traceback
 
+from concurrent.futures import TimeoutError as FuturesTimeoutError, as_completed
+from lazy_imports import lazy_import
+from chart_render import DEFAULT_MAX_POINTS, cached_render, decimate_frame
+from live_ranking import LiveTopK
+from memory_cache import BoundedCache, current_trade_date
 
-# Fix Chinese font display
-import matplotlib.pyplot as plt
-plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial', 'Helvetica', 'sans-serif']
-plt.rcParams['axes.unicode_minus'] = False
+# 导入耗时较长的库在首次使用时才加载
+ta = lazy_import('talib')
+ak = lazy_import('akshare')
+ts = lazy_import('tushare')
+go = lazy_import('plotly.graph_objects')
+plotly_subplots = lazy_import('plotly.subplots')
+jf_trading_system = lazy_import('jf_trading_system')
 
-from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QTextEdit
+
+def _configure_matplotlib(plt):
+    # Fix Chinese font display
+    plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial', 'Helvetica', 'sans-serif']
+    plt.rcParams['axes.unicode_minus'] = False
+
+
+plt = lazy_import('matplotlib.pyplot', on_load=_configure_matplotlib)
+
+try:
+    from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QTextEdit
+    HAS_QT = True
+except ImportError:
+    # 没有PyQt5时只能以无头模式使用
+    HAS_QT = False
+    QMainWindow = object
 
 class VisualStockSystem(QMainWindow):
     def __init__(self, token=None, headless=False, cache_dir: str = './data_cache', log_level: str = 'INFO', data_source: str = 'tushare'):
@@ -32,6 +48,8 @@ class VisualStockSystem(QMainWindow):
         
         # 只有在非无头模式下才初始化GUI
         if not headless:
+            if not HAS_QT:
+                raise ImportError("界面模式需要PyQt5，请安装PyQt5或使用headless=True")
             super().__init__()
             self.initUI()
         else:
@@ -44,8 +62,13 @@ class VisualStockSystem(QMainWindow):
         # 缓存设置
         self.cache_dir = cache_dir
         self.ensure_cache_dir()
-        self.cache = {}
         self.cache_timeout = 3600  # 缓存过期时间(秒)
+        # 扫描结果缓存：按交易日失效，条数和内存有上限
+        self.cache = BoundedCache(max_entries=6000, max_bytes=64 * 1024 * 1024, ttl=self.cache_timeout,
+                                  name='VisualStockSystem.scan')
+        # 分析结果连同指标数据缓存，绘图时直接复用，不再重新获取和计算
+        self.analysis_cache = BoundedCache(max_entries=32, max_bytes=128 * 1024 * 1024, ttl=self.cache_timeout,
+                                           name='VisualStockSystem.analysis')
         
         # API设置
         self.api_cooldown = 0.5  # API调用间隔(秒)
@@ -78,7 +101,7 @@ class VisualStockSystem(QMainWindow):
         """初始化非GUI模式的必要组件"""
         # 初始化无头模式下需要的组件
         self.china_tz = pytz.timezone('Asia/Shanghai')
-        self.jf_system = JFTradingSystem()
+        self.jf_system = jf_trading_system.JFTradingSystem()
         self._stock_names_cache = {}
         self._stock_data_cache = {}
         self._market_data_cache = {}
@@ -498,12 +521,12 @@ class VisualStockSystem(QMainWindow):
                 mean_price = df['Close'].mean()
                 df['Volume'] = np.random.normal(1000000, 200000, len(df)) * (df['Close'] / mean_price)
 
-                try:
-            # 确保日期索引
+        # 确保日期索引
         if 'Date' in df.columns:
             df.set_index('Date', inplace=True)
         df.index = pd.to_datetime(df.index)
 
+        try:
             # 初始化指标数据，防止NaN警告
             indicator_columns = [
                 'Volume_MA20', 'Volume_MA5', 'Volume_Ratio', 'Price_Change', 'Volume_Change',
@@ -522,11 +545,11 @@ class VisualStockSystem(QMainWindow):
             df['Volume_MA5'] = df['Volume'].rolling(window=5, min_periods=1).mean().fillna(df['Volume'])
             df['Volume_Ratio'] = (df['Volume'] / df['Volume_MA20']).fillna(1.0)
         
-        # 计算价格和成交量变化
+            # 计算价格和成交量变化
             df['Price_Change'] = df['Close'].pct_change().fillna(0)
             df['Volume_Change'] = df['Volume'].pct_change().fillna(0)
         
-        # 计算ATR和波动率
+            # 计算ATR和波动率
             atr_values = ta.ATR(df['High'].values, df['Low'].values, df['Close'].values, timeperiod=14)
             df['ATR'] = np.nan_to_num(atr_values, nan=df['Close'].std() * 0.1)
             
@@ -536,22 +559,22 @@ class VisualStockSystem(QMainWindow):
             # 安全计算波动率 - 使用向量化操作
             df['Volatility'] = (df['ATR'] / df['Close'] * 100).fillna(5.0)  # 默认5%波动率
 
-        # 计算政策量能指标
-        df['PEV'] = df['Volume'] * df['Price_Change'].abs()
+            # 计算政策量能指标
+            df['PEV'] = df['Volume'] * df['Price_Change'].abs()
             df['PEV_MA20'] = df['PEV'].rolling(window=20, min_periods=1).mean().fillna(df['PEV'])
         
-        # 计算布林带
+            # 计算布林带
             sma_values = ta.SMA(df['Close'].values, timeperiod=20)
-            df['BB_Middle'] = np.nan_to_num(sma_values, nan=df['Close'])
+            df['BB_Middle'] = np.where(np.isnan(sma_values), df['Close'].values, sma_values)
             std_20 = df['Close'].rolling(window=20, min_periods=1).std().fillna(df['Close'] * 0.02)
             df['BB_Upper'] = df['BB_Middle'] + 2 * std_20
             df['BB_Lower'] = df['BB_Middle'] - 2 * std_20
         
-        # 计算CCI指标
+            # 计算CCI指标
             cci_values = ta.CCI(df['High'].values, df['Low'].values, df['Close'].values, timeperiod=14)
             df['CCI'] = np.nan_to_num(cci_values, nan=0.0)
         
-        # 计算DMI指标
+            # 计算DMI指标
             di_plus = ta.PLUS_DI(df['High'].values, df['Low'].values, df['Close'].values, timeperiod=14)
             di_minus = ta.MINUS_DI(df['High'].values, df['Low'].values, df['Close'].values, timeperiod=14)
             adx = ta.ADX(df['High'].values, df['Low'].values, df['Close'].values, timeperiod=14)
@@ -560,48 +583,34 @@ class VisualStockSystem(QMainWindow):
             df['DI_Minus'] = np.nan_to_num(di_minus, nan=20.0)
             df['ADX'] = np.nan_to_num(adx, nan=15.0)
         
-        # 计算资金流向指标
-        typical_price = (df['High'] + df['Low'] + df['Close']) / 3
-        money_flow = typical_price * df['Volume']
-            mfi_values = ta.MFI(df['High'].values, df['Low'].values, df['Close'].values, df['Volume'].values, timeperiod=14)
+            # 计算资金流向指标
+            mfi_values = ta.MFI(df['High'].values, df['Low'].values, df['Close'].values,
+                                df['Volume'].values.astype(float), timeperiod=14)
             df['MFI'] = np.nan_to_num(mfi_values, nan=50.0)
         
-        # 计算趋势强度
-            trend_values = ta.LINEARREG_SLOPE(df['Close'].values, timeperiod=14)
-            df['Trend_Strength'] = np.nan_to_num(trend_values, nan=0.0)
+            # 计算未来价格区间
+            df['Future_High'] = df['Close'] + df['ATR'] * 2
+            df['Future_Low'] = df['Close'] - df['ATR'] * 2
         
-        # 计算未来价格区间
-        df['Future_High'] = df['Close'] + df['ATR'] * 2
-        df['Future_Low'] = df['Close'] - df['ATR'] * 2
-        
-            # 安全计算趋势可信度，避免NaN
-            vol_adjusted = df['Volatility'].clip(upper=100)  # 限制最大波动率为100%
-        df['Trend_Confidence'] = (df['Volume_Ratio'] * (1 + abs(df['Price_Change'])) * 
-                                    (1 - vol_adjusted/100)).clip(0, 1)
-        
-        # 3L理论分析
-        # 1. Liquidity（流动性）
-        df['Liquidity_Score'] = df['Volume_Ratio'] * (1 + abs(df['Price_Change']))
+            # 3L理论分析
+            # 1. Liquidity（流动性）
+            df['Liquidity_Score'] = df['Volume_Ratio'] * (1 + abs(df['Price_Change']))
             df['Liquidity_MA10'] = df['Liquidity_Score'].rolling(window=20, min_periods=1).mean().fillna(df['Liquidity_Score'])
         
-        # 2. Level（价格水平）
+            # 2. Level（价格水平）
             df['Price_MA20'] = df['Close'].rolling(window=20, min_periods=1).mean().fillna(df['Close'])
             df['Price_MA60'] = df['Close'].rolling(window=60, min_periods=1).mean().fillna(df['Close'])
             
             # 安全计算价格水平位置
-        df['Level_Position'] = (df['Close'] - df['Price_MA60']) / (df['ATR'] * 2)
+            df['Level_Position'] = (df['Close'] - df['Price_MA60']) / (df['ATR'] * 2)
         
-            # 3. Line（趋势线）- 再次计算趋势强度，确保有值
+            # 3. Line（趋势线）
             trend_values = ta.LINEARREG_SLOPE(df['Close'].values, timeperiod=20)
             df['Trend_Strength'] = np.nan_to_num(trend_values, nan=0.0)
             
             # 计算支撑位和阻力位
-            upper_line = df['High'].rolling(window=20, min_periods=1).max().fillna(df['High'])
-            lower_line = df['Low'].rolling(window=20, min_periods=1).min().fillna(df['Low'])
-            
-            # 赋值并确保无NaN
-            df['Upper_Line'] = upper_line
-            df['Lower_Line'] = lower_line
+            df['Upper_Line'] = df['High'].rolling(window=20, min_periods=1).max().fillna(df['High'])
+            df['Lower_Line'] = df['Low'].rolling(window=20, min_periods=1).min().fillna(df['Low'])
             
             # 确保支撑位小于阻力位 - 使用元素级别的比较和赋值
             df_max = df[['Upper_Line', 'Lower_Line']].max(axis=1)
@@ -610,7 +619,6 @@ class VisualStockSystem(QMainWindow):
             df['Lower_Line'] = df_min
             
             # 安全计算通道宽度 - 避免除以零
-            # 创建一个安全的除数，确保不为零
             close_for_division = df['Close'].copy()
             close_for_division.loc[close_for_division == 0] = 1.0  # 替换零值
             df['Channel_Width'] = (df['Upper_Line'] - df['Lower_Line']) / close_for_division * 100
@@ -622,42 +630,34 @@ class VisualStockSystem(QMainWindow):
                 (1 + df['Trend_Strength'].abs().clip(0, 2))
             ).clip(0, 100)  # 限制最大值
             
-            # 预测未来趋势 - 使用向量化操作而不是条件逻辑
-            if len(df) > 0:
-                # 获取最新值，避免使用索引[-1]可能引起歧义
-                last_idx = len(df) - 1
-                last_close = df['Close'].iloc[last_idx]
-                last_atr = df['ATR'].iloc[last_idx]
-                last_trend_strength = df['Trend_Strength'].iloc[last_idx]
-                last_volume_ratio = df['Volume_Ratio'].iloc[last_idx]
-                
-                # 安全计算趋势因子，避免负数和无穷大
-                safe_volume_ratio = max(0.1, last_volume_ratio)  # 避免log(0)或log(负数)
-                trend_factor = last_trend_strength * (1 + np.log(safe_volume_ratio))
-                
-                # 更新最新记录的未来价格区间
-                future_high = last_close + (last_atr * 2 * abs(trend_factor))
-                future_low = last_close - (last_atr * abs(trend_factor))
-                df.loc[df.index[last_idx], 'Future_High'] = future_high
-                df.loc[df.index[last_idx], 'Future_Low'] = future_low
+            # 预测未来趋势 - 更新最新记录的未来价格区间
+            last_idx = len(df) - 1
+            last_close = df['Close'].iloc[last_idx]
+            last_atr = df['ATR'].iloc[last_idx]
+            last_trend_strength = df['Trend_Strength'].iloc[last_idx]
+            last_volume_ratio = df['Volume_Ratio'].iloc[last_idx]
+            
+            # 安全计算趋势因子，避免负数和无穷大
+            safe_volume_ratio = max(0.1, last_volume_ratio)  # 避免log(0)或log(负数)
+            trend_factor = last_trend_strength * (1 + np.log(safe_volume_ratio))
+            df.loc[df.index[last_idx], 'Future_High'] = last_close + (last_atr * 2 * abs(trend_factor))
+            df.loc[df.index[last_idx], 'Future_Low'] = last_close - (last_atr * abs(trend_factor))
         
-        # 计算趋势可信度
-                liquidity_ma5 = df['Liquidity_Score'].rolling(window=5, min_periods=1).mean().fillna(df['Liquidity_Score'])
-                channel_width_safe = df['Channel_Width'].clip(0, 200)  # 限制最大通道宽度
-                
-                trend_confidence = (
-                    liquidity_ma5 *
-                    (1 + abs(df['Trend_Strength']).clip(0, 2)) *
-                    (1 - channel_width_safe / 200)  # 通道越窄，可信度越高
-        ).clip(0, 1)
-                df['Trend_Confidence'] = trend_confidence
+            # 计算趋势可信度
+            liquidity_ma5 = df['Liquidity_Score'].rolling(window=5, min_periods=1).mean().fillna(df['Liquidity_Score'])
+            channel_width_safe = df['Channel_Width'].clip(0, 200)  # 限制最大通道宽度
+            df['Trend_Confidence'] = (
+                liquidity_ma5 *
+                (1 + abs(df['Trend_Strength']).clip(0, 2)) *
+                (1 - channel_width_safe / 200)  # 通道越窄，可信度越高
+            ).clip(0, 1)
             
             # 最终检查和清理 - 处理任何剩余的NaN值
             for col in df.columns:
                 if df[col].isnull().any():
                     df[col] = df[col].ffill().bfill().fillna(0)
         
-        return df
+            return df
             
         except Exception as e:
             print(f"量价分析计算出错: {str(e)}")
@@ -994,29 +994,29 @@ class VisualStockSystem(QMainWindow):
         volume_ma20 = self.safe_get_value(df, 'Volume_MA20')
         macd_hist = self.safe_get_value(df, 'MACD_Hist')
         
-            if trend == 'uptrend':
+        if trend == 'uptrend':
             if volume > volume_ma20 * 1.5 and macd_hist > 0:
                 return {
-                        'action': '建议买入',
-                        'explanation': '上升趋势明显，成交量放大，MACD金叉，多重指标共振看多'
-                    }
-                else:
+                    'action': '建议买入',
+                    'explanation': '上升趋势明显，成交量放大，MACD金叉，多重指标共振看多'
+                }
+            else:
                 return {
-                        'action': '谨慎买入',
-                        'explanation': '上升趋势形成，但需要观察量能配合，建议分批建仓'
-                    }
-            elif trend == 'downtrend':
+                    'action': '谨慎买入',
+                    'explanation': '上升趋势形成，但需要观察量能配合，建议分批建仓'
+                }
+        elif trend == 'downtrend':
             if volume > volume_ma20 * 1.5 and macd_hist < 0:
                 return {
-                        'action': '建议卖出',
-                        'explanation': '下跌趋势明显，成交量放大，MACD死叉，注意及时止损'
-                    }
-                else:
-                return {
-                        'action': '谨慎卖出',
-                        'explanation': '下跌趋势形成，但可能存在超跌反弹，建议分批减仓'
-                    }
+                    'action': '建议卖出',
+                    'explanation': '下跌趋势明显，成交量放大，MACD死叉，注意及时止损'
+                }
             else:
+                return {
+                    'action': '谨慎卖出',
+                    'explanation': '下跌趋势形成，但可能存在超跌反弹，建议分批减仓'
+                }
+        else:
             return {
                 'action': '建议观望',
                 'explanation': '横盘整理，等待明确信号出现再行动，可少量高抛低吸'
@@ -1037,15 +1037,53 @@ class VisualStockSystem(QMainWindow):
         else:
             return '观望'
 
-    def plot_stock_analysis(self, symbol):
-        """绘制股票分析图表"""
+    def get_analysis(self, symbol):
+        """获取股票的分析结果和指标数据，同一交易日内优先使用内存中的结果
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            (分析结果字典, 处理后的数据DataFrame)
+        """
+        trade_date = current_trade_date()
+        cached = self.analysis_cache.get(symbol, trade_date=trade_date)
+        if cached is not None:
+            return cached
+        analysis, df = self.analyze_stock(symbol)
+        if analysis is not None and df is not None:
+            self.analysis_cache.set(symbol, (analysis, df), trade_date=trade_date)
+        return analysis, df
+
+    def plot_stock_analysis(self, symbol, df=None, max_points=DEFAULT_MAX_POINTS):
+        """绘制股票分析图表
+
+        图表按(股票代码, 数据范围, 抽稀点数)缓存，超过max_points的历史数据抽稀后再绘制
+
+        Args:
+            symbol: 股票代码
+            df: 已经计算好指标的数据，None时复用get_analysis的结果
+            max_points: 最多绘制的K线数量，None表示不抽稀
+
+        Returns:
+            plotly图表，失败时返回None
+        """
         try:
             # 获取并验证数据
-            analysis, df = self.analyze_stock(symbol)
-            if analysis is None or df is None:
-                print(f"无法获取股票 {symbol} 的数据或分析结果")
-                return None
-                
+            if df is None:
+                analysis, df = self.get_analysis(symbol)
+                if analysis is None or df is None:
+                    print(f"无法获取股票 {symbol} 的数据或分析结果")
+                    return None
+            return cached_render(symbol, df, f'analysis:{max_points}',
+                                 lambda: self._build_analysis_figure(df, max_points))
+        except Exception as e:
+            print(f"绘制股票分析图表时发生错误：{str(e)}")
+            return None
+
+    def _build_analysis_figure(self, df, max_points):
+        """根据指标数据生成分析图表"""
+        try:
             # 验证数据完整性
             required_columns = ['Open', 'High', 'Low', 'Close', 'Volume', 'EMA21', 
                               'MACD', 'MACD_Signal', 'MACD_Hist', 'PEV', 'PEV_MA20']
@@ -1065,8 +1103,12 @@ class VisualStockSystem(QMainWindow):
                 print(f"数据量不足，至少需要20个交易日的数据")
                 return None
 
+            # 资金影响按日计算后再抽稀，桶内累加
+            df = df.assign(Flow_Impact=df['Close'].pct_change() * df['Volume'] / df['Volume_MA20'])
+            df = decimate_frame(df, max_points, how={'Flow_Impact': 'sum', 'Price_Change': 'sum'})
+
             # 创建子图
-            fig = make_subplots(rows=6, cols=1,
+            fig = plotly_subplots.make_subplots(rows=6, cols=1,
                                shared_xaxes=True,
                                vertical_spacing=0.02,
                                subplot_titles=(
@@ -1189,10 +1231,9 @@ class VisualStockSystem(QMainWindow):
                          row=6, col=1)
 
             # 添加北向资金影响
-            flow_impacts = df['Close'].pct_change() * df['Volume'] / df['Volume_MA20']
             fig.add_trace(go.Scatter(
                 x=df.index,
-                y=flow_impacts,
+                y=df['Flow_Impact'],
                 name='北向资金影响',
                 line=dict(color='rgba(147,112,219,0.8)', width=1.5),
                 fill='tozeroy',
@@ -1212,48 +1253,112 @@ class VisualStockSystem(QMainWindow):
             print(f"绘制股票分析图表时发生错误：{str(e)}")
             return None
 
-    def scan_stocks(self, stock_list=None, industry=None):
-        """扫描股票列表或指定行业的股票，使用多线程并行处理和缓存机制提高性能"""
+    def _scan_one(self, symbol):
+        """扫描单只股票，结果按股票缓存"""
         try:
-            if industry:
-                stock_list = self.get_industry_stocks(industry)
+            # 检查缓存，前一交易日或超过cache_timeout的结果视为过期
+            cache_key = f"scan_{symbol}"
+            trade_date = current_trade_date()
+            analysis = self.cache.get(cache_key, trade_date=trade_date)
+            if analysis is not None:
+                return analysis
 
-            if not stock_list:
-                return []
+            # 分析股票
+            analysis, _ = self.analyze_stock(symbol)
+            if analysis:
+                # 更新缓存
+                self.cache.set(cache_key, analysis, trade_date=trade_date)
+                return analysis
+            return None
+        except Exception as e:
+            self.logger.error(f"分析股票 {symbol} 时出错：{str(e)}")
+            return None
 
-            def analyze_stock_with_cache(symbol):
-                try:
-                    # 检查缓存
-                    with self._cache_lock:
-                        cache_key = f"scan_{symbol}"
-                        if cache_key in self.cache:
-                            return self.cache[cache_key]
-
-                    # 分析股票
-                    analysis, _ = self.analyze_stock(symbol)
-                    if analysis:
-                        # 更新缓存
-                        with self._cache_lock:
-                            self.cache[cache_key] = analysis
-                        return analysis
-                    return None
-                except Exception as e:
-                    self.logger.error(f"分析股票 {symbol} 时出错：{str(e)}")
-                    return None
+    def iter_scan_stocks(self, stock_list=None, industry=None, should_stop=None, time_limit=None):
+        """并行扫描股票，按完成顺序逐只产出结果
 
-            # 使用线程池并行处理
-            recommendations = []
-            futures = [self._thread_pool.submit(analyze_stock_with_cache, symbol) for symbol in stock_list]
+        Args:
+            stock_list: 股票代码列表
+            industry: 行业名称，指定时扫描该行业的全部股票
+            should_stop: 返回True时停止扫描，取消尚未开始的股票
+            time_limit: 扫描时限(秒)，超时后取消尚未完成的股票，None表示不限
+
+        Yields:
+            (已完成数, 总数, 分析结果或None)
+        """
+        if industry:
+            stock_list = self.get_industry_stocks(industry)
+        if not stock_list:
+            return
+
+        futures = [self._thread_pool.submit(self._scan_one, symbol) for symbol in stock_list]
+        done = 0
+        try:
+            for future in as_completed(futures, timeout=time_limit):
+                if should_stop is not None and should_stop():
+                    self.logger.info(f"扫描已停止，完成 {done}/{len(futures)} 只股票")
+                    break
+                done += 1
+                yield done, len(futures), future.result()
+        except FuturesTimeoutError:
+            self.logger.info(f"扫描超过 {time_limit} 秒，返回已完成的 {done}/{len(futures)} 只股票")
+        finally:
+            # 停止、超时或调用方提前结束迭代时，取消尚未开始的股票
             for future in futures:
-                result = future.result()
+                future.cancel()
+
+    def scan_stocks(self, stock_list=None, industry=None, progress_callback=None, should_stop=None,
+                    time_limit=None):
+        """扫描股票列表或指定行业的股票，使用多线程并行处理和缓存机制提高性能
+
+        Args:
+            stock_list: 股票代码列表
+            industry: 行业名称，指定时扫描该行业的全部股票
+            progress_callback: 每只股票完成后调用(已完成数, 总数, 分析结果或None)
+            should_stop: 返回True时停止扫描，取消尚未开始的股票并返回已完成的结果
+            time_limit: 扫描时限(秒)，超时后返回已完成的结果
+
+        Returns:
+            分析结果列表，按完成顺序
+        """
+        try:
+            recommendations = []
+            for done, total, result in self.iter_scan_stocks(stock_list, industry, should_stop, time_limit):
                 if result:
                     recommendations.append(result)
-
+                if progress_callback is not None:
+                    progress_callback(done, total, result)
             return recommendations
         except Exception as e:
             self.logger.error(f"扫描股票时发生错误：{str(e)}")
             return []
-            
+
+    def scan_top_stocks(self, k, key, stock_list=None, industry=None, on_update=None, should_stop=None,
+                        time_limit=None):
+        """扫描股票并实时维护排名前k的结果
+
+        Args:
+            k: 保留的数量
+            key: 排序键函数，值越大越靠前
+            stock_list: 股票代码列表
+            industry: 行业名称
+            on_update: 每只股票完成后调用(已完成数, 总数, LiveTopK, 前k名是否变化)
+            should_stop: 返回True时停止扫描
+            time_limit: 扫描时限(秒)，超时后返回当前最好的结果
+
+        Returns:
+            LiveTopK，items()为按key降序的前k名，seen为有结果的股票数量
+        """
+        ranking = LiveTopK(k, key)
+        try:
+            for done, total, result in self.iter_scan_stocks(stock_list, industry, should_stop, time_limit):
+                changed = ranking.push(result) if result else False
+                if on_update is not None:
+                    on_update(done, total, ranking, changed)
+        except Exception as e:
+            self.logger.error(f"扫描股票时发生错误：{str(e)}")
+        return ranking
+
     def print_recommendations(self, recommendations):
         """打印股票推荐结果"""
         if not recommendations:
@@ -1407,8 +1512,12 @@ class VisualStockSystem(QMainWindow):
                 
             self.logger.info(f"获取市场实时概览: {market if market else '全市场'}")
             
-            # 获取实时行情数据
-            df = self.data_provider.get_realtime_daily(ts_code=code_pattern)
+            # 获取实时行情数据（全市场时与行业热力快照共用同一次请求）
+            heatmap = self._get_sector_heatmap() if market is None else None
+            if heatmap is not None:
+                df = heatmap.quotes().copy()
+            else:
+                df = self.data_provider.get_realtime_daily(ts_code=code_pattern)
             
             if df.empty:
                 return {
@@ -1481,6 +1590,34 @@ class VisualStockSystem(QMainWindow):
                 'error': str(e)
             }
             
+    def _get_sector_heatmap(self):
+        """获取盘中行业热力快照，不可用时返回None"""
+        if getattr(self, '_sector_heatmap', None) is None:
+            try:
+                from sector_heatmap import get_sector_heatmap, ALL_MARKET_PATTERN
+                self._sector_heatmap = get_sector_heatmap(
+                    lambda: self.data_provider.get_realtime_daily(ts_code=ALL_MARKET_PATTERN))
+                self._sector_heatmap.warm_up()
+            except Exception as e:
+                self.logger.warning(f"盘中行业热力快照不可用: {str(e)}")
+                self._sector_heatmap = False
+        return self._sector_heatmap or None
+
+    def get_sector_heatmap(self, top_n: int = 10, force: bool = False) -> Dict:
+        """获取盘中热门行业（一次全市场实时行情按行业成分聚合）
+        
+        Args:
+            top_n: 返回的行业数量
+            force: 忽略快照缓存重新取数
+            
+        Returns:
+            与行业集成器get_hot_sectors格式一致的结果
+        """
+        heatmap = self._get_sector_heatmap()
+        if heatmap is None:
+            return {'status': 'error', 'message': '盘中行业热力快照不可用'}
+        return heatmap.get_hot_sectors(top_n=top_n, force=force)
+            
     def get_industry_list(self):
         """获取行业列表"""
         try:
@@ -1493,6 +1630,14 @@ class VisualStockSystem(QMainWindow):
             
     def get_industry_stocks(self, industry_name):
         """获取指定行业的股票列表"""
+        try:
+            # 优先从行业成分索引查询，行业名称来自东方财富行业列表
+            from sector_membership import get_membership_index
+            stocks = get_membership_index().stocks_of_name(industry_name, 'dc')
+            if stocks:
+                return [code.split('.')[0] for code in stocks]
+        except Exception as e:
+            self.logger.warning(f"从行业成分索引获取行业股票失败: {str(e)}")
         try:
             # 使用akshare获取行业成分股
             stocks_df = ak.stock_board_industry_cons_em(symbol=industry_name)
@@ -6,6 +6,7 @@ import argparse
 import sys
 import os
 from datetime import datetime, timedelta
+from chart_render import DEFAULT_MAX_POINTS, decimate_frame
 
 
 # Fix Chinese font display
@@ -26,6 +27,8 @@ def main():
     parser.add_argument('--ts_code', type=str, default='000001.SZ', help='Stock code (default: 000001.SZ)')
     parser.add_argument('--days', type=int, default=60, help='Number of days to analyze (default: 60)')
     parser.add_argument('--output', type=str, help='Output file for the chart (default: None, displays on screen)')
+    parser.add_argument('--max-points', type=int, default=DEFAULT_MAX_POINTS,
+                        help=f'Maximum number of bars to draw, longer histories are decimated (default: {DEFAULT_MAX_POINTS})')
     
     args = parser.parse_args()
     
@@ -59,8 +62,11 @@ def main():
         df['trade_date'] = df['trade_date'].apply(format_date)
         df.set_index(pd.DatetimeIndex(df['trade_date']), inplace=True)
         
+        # Decimate long histories for drawing, the summary below still uses the latest full bar
+        plot_df = decimate_frame(df, args.max_points)
+        
         # Create OHLC dataframe for mplfinance
-        ohlc = df[['open', 'high', 'low', 'close', 'vol']].copy()
+        ohlc = plot_df[['open', 'high', 'low', 'close', 'vol']].copy()
         ohlc.rename(columns={'vol': 'volume'}, inplace=True)
         
         # Create subplots
@@ -72,17 +78,17 @@ def main():
         axes[0].grid(True)
         
         # Add MACD to subplot
-        axes[1].plot(df.index, df['macd_dif'], label='DIF', color='blue')
-        axes[1].plot(df.index, df['macd_dea'], label='DEA', color='orange')
-        axes[1].bar(df.index, df['macd'], label='MACD', color='green')
+        axes[1].plot(plot_df.index, plot_df['macd_dif'], label='DIF', color='blue')
+        axes[1].plot(plot_df.index, plot_df['macd_dea'], label='DEA', color='orange')
+        axes[1].bar(plot_df.index, plot_df['macd'], label='MACD', color='green')
         axes[1].set_title('MACD')
         axes[1].grid(True)
         axes[1].legend()
         
         # Add RSI to subplot
-        axes[2].plot(df.index, df['rsi_6'], label='RSI(6)', color='red')
-        axes[2].plot(df.index, df['rsi_12'], label='RSI(12)', color='blue')
-        axes[2].plot(df.index, df['rsi_24'], label='RSI(24)', color='purple')
+        axes[2].plot(plot_df.index, plot_df['rsi_6'], label='RSI(6)', color='red')
+        axes[2].plot(plot_df.index, plot_df['rsi_12'], label='RSI(12)', color='blue')
+        axes[2].plot(plot_df.index, plot_df['rsi_24'], label='RSI(24)', color='purple')
         axes[2].axhline(y=70, color='r', linestyle='--', alpha=0.3)
         axes[2].axhline(y=30, color='g', linestyle='--', alpha=0.3)
         axes[2].set_title('RSI')
@@ -91,9 +97,9 @@ def main():
         axes[2].legend()
         
         # Add KDJ to subplot
-        axes[3].plot(df.index, df['kdj_k'], label='K', color='blue')
-        axes[3].plot(df.index, df['kdj_d'], label='D', color='orange')
-        axes[3].plot(df.index, df['kdj_j'], label='J', color='green')
+        axes[3].plot(plot_df.index, plot_df['kdj_k'], label='K', color='blue')
+        axes[3].plot(plot_df.index, plot_df['kdj_d'], label='D', color='orange')
+        axes[3].plot(plot_df.index, plot_df['kdj_j'], label='J', color='green')
         axes[3].axhline(y=80, color='r', linestyle='--', alpha=0.3)
         axes[3].axhline(y=20, color='g', linestyle='--', alpha=0.3)
         axes[3].set_title('KDJ')
@@ -9,8 +9,25 @@ class VolumePriceStrategy:
     """体积价格分析策略
     通过分析成交量和价格的关系来识别市场趋势和交易机会
     """
-    def __init__(self):
+    # 策略逻辑版本，评分或信号规则变更时提升，使旧的回测缓存失效
+    VERSION = 2
+    
+    # 可调参数及默认值，参数优化只能在这些参数上寻优
+    PARAMETERS = {
+        'volume_threshold': 1.5,        # 放量突破：成交量相对长期均量的倍数
+        'price_change_threshold': 0.02,  # 量价背离：当日价格变动的最小幅度
+        'ma_period': 20                  # 长期均线周期
+    }
+    
+    def __init__(self, **params):
+        """初始化策略
+        
+        Args:
+            **params: 覆盖PARAMETERS中的参数，其他键忽略
+        """
         self.logger = logging.getLogger('VolumePriceStrategy')
+        self.params = {key: params.get(key, default) for key, default in self.PARAMETERS.items()}
+        self.ma_period = int(self.params['ma_period'])
     
     def analyze(self, data):
         """分析股票的成交量和价格数据
@@ -50,7 +67,7 @@ class VolumePriceStrategy:
             
             # 计算移动平均
             vpr_ma5 = vpr.rolling(window=5).mean()
-            vpr_ma20 = vpr.rolling(window=20).mean()
+            vpr_ma20 = vpr.rolling(window=self.ma_period).mean()
             
             return {
                 'current_ratio': vpr.iloc[-1],
@@ -72,7 +89,7 @@ class VolumePriceStrategy:
             # 计算成交量变化
             volume_change = volume.pct_change()
             volume_ma5 = volume.rolling(window=5).mean()
-            volume_ma20 = volume.rolling(window=20).mean()
+            volume_ma20 = volume.rolling(window=self.ma_period).mean()
             
             # 判断成交量趋势
             recent_volume_trend = 'increasing' if volume_ma5.iloc[-1] > volume_ma20.iloc[-1] else 'decreasing'
@@ -106,7 +123,9 @@ class VolumePriceStrategy:
                 'strength': 0
             }
             
-            # 判断背离
+            # 判断背离，价格变动不足阈值时视为无背离
+            if abs(price_change.iloc[-1]) < self.params['price_change_threshold']:
+                return divergence
             if price_change.iloc[-1] > 0 and volume_change.iloc[-1] < 0:
                 divergence['exists'] = True
                 divergence['type'] = 'negative'
@@ -126,8 +145,8 @@ class VolumePriceStrategy:
         """检查成交量突破"""
         try:
             volume = data['成交量']
-            volume_ma20 = volume.rolling(window=20).mean()
-            volume_std = volume.rolling(window=20).std()
+            volume_ma20 = volume.rolling(window=self.ma_period).mean()
+            threshold = self.params['volume_threshold']
             
             # 计算成交量突破
             breakout = {
@@ -136,15 +155,16 @@ class VolumePriceStrategy:
                 'type': None
             }
             
-            # 判断是否突破2个标准差
-            if volume.iloc[-1] > volume_ma20.iloc[-1] + 2 * volume_std.iloc[-1]:
+            # 判断成交量是否超过均量的threshold倍（或低于1/threshold）
+            ratio = volume.iloc[-1] / volume_ma20.iloc[-1]
+            if ratio >= threshold:
                 breakout['exists'] = True
                 breakout['type'] = 'up'
-                breakout['strength'] = (volume.iloc[-1] - volume_ma20.iloc[-1]) / volume_std.iloc[-1]
-            elif volume.iloc[-1] < volume_ma20.iloc[-1] - 2 * volume_std.iloc[-1]:
+                breakout['strength'] = ratio
+            elif ratio <= 1 / threshold:
                 breakout['exists'] = True
                 breakout['type'] = 'down'
-                breakout['strength'] = (volume_ma20.iloc[-1] - volume.iloc[-1]) / volume_std.iloc[-1]
+                breakout['strength'] = 1 / ratio if ratio > 0 else 0
             
             return breakout
             
@@ -169,7 +189,7 @@ class VolumePriceStrategy:
             
             # 计算A/D线的移动平均
             ad_ma5 = ad.rolling(window=5).mean()
-            ad_ma20 = ad.rolling(window=20).mean()
+            ad_ma20 = ad.rolling(window=self.ma_period).mean()
             
             return {
                 'current': ad.iloc[-1],
@@ -183,7 +203,11 @@ class VolumePriceStrategy:
             return None
     
     def _calculate_strategy_score(self, results):
-        """计算策略综合得分"""
+        """计算策略综合得分
+        
+        Returns:
+            float: 0-100的得分，各项条件满足时按权重计分
+        """
         try:
             # 权重配置
             weights = {
@@ -196,45 +220,40 @@ class VolumePriceStrategy:
             
             score = 0.0
             
-            # 成交量价格比率得分
+            # 成交量价格比率短期均线在长期均线之上
             vpr = results['volume_price_ratio']
-            if vpr['trend'] == 'up':
-                score += weights['volume_price_ratio'] * (vpr['current_ratio'] / vpr['ma20'])
+            if vpr and vpr['trend'] == 'up':
+                score += weights['volume_price_ratio']
             
-            # 成交量趋势得分
+            # 成交量趋势向上
             vt = results['volume_trend']
-            if vt['trend'] == 'increasing':
-                score += weights['volume_trend'] * vt['strength']
+            if vt and vt['trend'] == 'increasing':
+                score += weights['volume_trend']
             
-            # 价格成交量背离得分
+            # 价跌量增的正向背离
             pvd = results['price_volume_divergence']
-            if pvd['divergence_type'] == 'bullish':
-                score += weights['price_volume_divergence'] * pvd['strength']
+            if pvd and pvd['type'] == 'positive':
+                score += weights['price_volume_divergence']
             
-            # 成交量突破得分
+            # 放量突破
             vb = results['volume_breakout']
-            if vb['breakout']:
-                score += weights['volume_breakout'] * vb['strength']
+            if vb and vb['type'] == 'up':
+                score += weights['volume_breakout']
             
-            # 累积分布得分
+            # A/D线向上表示资金积累
             ad = results['accumulation_distribution']
-            if ad['trend'] == 'accumulation':
-                score += weights['accumulation_distribution'] * ad['strength']
+            if ad and ad['trend'] == 'up':
+                score += weights['accumulation_distribution']
             
             # 市场环境调整
             market_condition = self._analyze_market_condition()
             score *= market_condition['adjustment_factor']
             
-            return {
-                'total_score': round(score, 2),
-                'signal_quality': 'high' if score > 0.7 else 'medium' if score > 0.4 else 'low',
-                'market_condition': market_condition['status'],
-                'confidence_level': round(min(score * 100, 100), 1)
-            }
+            return round(score * 100, 2)
             
         except Exception as e:
             self.logger.error(f"计算策略得分时出错: {str(e)}")
-            return None
+            return 0.0
     
     def _analyze_market_condition(self):
         """分析市场环境"""
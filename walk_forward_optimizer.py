@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+滚动前推(Walk-Forward)优化模块
+按滚动或锚定窗口切分训练/测试区间，在每个训练区间内重新寻优，
+并在紧随其后的测试区间上评估样本外表现
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger('WalkForwardOptimizer')
+
+
+@dataclass
+class WalkForwardFold:
+    """单个滚动窗口的训练/测试区间（按行号，右开区间）"""
+    fold_id: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+    def window(self, warmup: int = 0) -> Tuple[int, int]:
+        """指标预计算覆盖的数据窗口，包含训练区间之前最多warmup行的预热数据"""
+        return (max(0, self.train_start - warmup), self.test_end)
+
+
+@dataclass
+class FoldResult:
+    """单个窗口的优化与样本外评估结果"""
+    fold_id: int
+    train_period: Tuple[str, str]
+    test_period: Tuple[str, str]
+    best_parameters: Optional[Dict[str, Any]] = None
+    in_sample: Dict[str, float] = field(default_factory=dict)
+    out_of_sample: Dict[str, float] = field(default_factory=dict)
+    evaluated: int = 0
+    error: Optional[str] = None
+
+
+def generate_walk_forward_splits(n_samples: int, train_size: int, test_size: int,
+                                 step: Optional[int] = None,
+                                 anchored: bool = False) -> List[WalkForwardFold]:
+    """生成滚动前推窗口
+
+    Args:
+        n_samples: 数据总行数
+        train_size: 训练窗口长度（锚定模式下为首个训练窗口长度）
+        test_size: 测试窗口长度
+        step: 窗口前移步长，默认等于测试窗口长度
+        anchored: 是否锚定起点（训练窗口从第0行开始逐步扩大）
+
+    Returns:
+        窗口列表
+    """
+    if train_size <= 0 or test_size <= 0:
+        raise ValueError("训练窗口和测试窗口长度必须为正数")
+    step = step or test_size
+
+    folds = []
+    train_end = train_size
+    while train_end + test_size <= n_samples:
+        train_start = 0 if anchored else train_end - train_size
+        folds.append(WalkForwardFold(
+            fold_id=len(folds),
+            train_start=train_start,
+            train_end=train_end,
+            test_start=train_end,
+            test_end=train_end + test_size
+        ))
+        train_end += step
+    return folds
+
+
+def _format_period(data: pd.DataFrame, start: int, end: int) -> Tuple[str, str]:
+    """将行号区间格式化为日期字符串"""
+    index = data.index[start:end]
+    if len(index) == 0:
+        return ('', '')
+    first, last = index[0], index[-1]
+    if isinstance(first, pd.Timestamp):
+        return (first.strftime('%Y-%m-%d'), last.strftime('%Y-%m-%d'))
+    return (str(first), str(last))
+
+
+class WalkForwardOptimizer:
+    """滚动前推优化器
+
+    evaluate_func(data, params, start) 返回指标字典，data的前start行是评估区间之前的预热数据，
+    只用于计算指标，交易和收益只统计第start行及之后；prepare_func(data) 返回带指标的数据，
+    每个窗口只计算一次并缓存，窗口内所有参数组合共用。
+    各窗口在线程池中并行，缓存和评估函数在线程间共享。
+    """
+
+    def __init__(self, evaluate_func: Callable[[pd.DataFrame, Dict[str, Any], int], Dict[str, float]],
+                 prepare_func: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                 metric: str = 'total_return', max_workers: Optional[int] = None,
+                 warmup: int = 60):
+        """初始化优化器
+
+        Args:
+            evaluate_func: 回测评估函数
+            prepare_func: 指标预计算函数（需只依赖历史数据，不得引入未来信息）
+            metric: 寻优目标指标，越大越好
+            max_workers: 并行窗口数
+            warmup: 每个评估区间之前提供给evaluate_func的预热行数，
+                测试区间的预热数据取自紧邻的训练区间
+        """
+        self.evaluate_func = evaluate_func
+        self.prepare_func = prepare_func
+        self.metric = metric
+        self.max_workers = max_workers
+        self.warmup = warmup
+        self._prepared_cache: Dict[Tuple, pd.DataFrame] = {}
+        self._cache_lock = threading.Lock()
+
+    def clear_cache(self):
+        """清空窗口指标缓存"""
+        with self._cache_lock:
+            self._prepared_cache.clear()
+
+    def _get_prepared_window(self, data: pd.DataFrame, fold: WalkForwardFold,
+                             data_key: Any) -> pd.DataFrame:
+        """获取窗口的指标预计算结果（带缓存）"""
+        window_start, window_end = fold.window(self.warmup)
+        window = data.iloc[window_start:window_end]
+        if self.prepare_func is None:
+            return window
+
+        cache_key = (data_key, window_start, window_end)
+        with self._cache_lock:
+            cached = self._prepared_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        prepared = self.prepare_func(window.copy())
+        with self._cache_lock:
+            self._prepared_cache[cache_key] = prepared
+        return prepared
+
+    def _optimize_fold(self, data: pd.DataFrame, fold: WalkForwardFold,
+                       param_grid: List[Dict[str, Any]], data_key: Any) -> FoldResult:
+        """在训练区间寻优，并在测试区间评估最佳参数"""
+        result = FoldResult(
+            fold_id=fold.fold_id,
+            train_period=_format_period(data, fold.train_start, fold.train_end),
+            test_period=_format_period(data, fold.test_start, fold.test_end)
+        )
+        try:
+            prepared = self._get_prepared_window(data, fold, data_key)
+            window_start = fold.window(self.warmup)[0]
+            # 训练区间前是窗口内的预热行；测试区间前取训练区间末尾的warmup行
+            train_warmup = fold.train_start - window_start
+            train_data = prepared.iloc[:fold.train_end - window_start]
+            split = fold.test_start - window_start
+            test_warmup = min(self.warmup, split)
+            test_data = prepared.iloc[split - test_warmup:]
+
+            best_score = None
+            for params in param_grid:
+                try:
+                    metrics = self.evaluate_func(train_data, params, train_warmup)
+                except Exception as e:
+                    logger.warning(f"窗口 {fold.fold_id} 参数 {params} 评估失败: {str(e)}")
+                    continue
+                result.evaluated += 1
+                if not metrics:
+                    continue
+                score = metrics.get(self.metric)
+                if score is None or np.isnan(score):
+                    continue
+                if best_score is None or score > best_score:
+                    best_score = score
+                    result.best_parameters = dict(params)
+                    result.in_sample = metrics
+
+            if result.best_parameters is None:
+                result.error = "训练区间内没有有效的参数组合"
+                return result
+
+            result.out_of_sample = self.evaluate_func(test_data, result.best_parameters, test_warmup) or {}
+        except Exception as e:
+            logger.error(f"窗口 {fold.fold_id} 优化失败: {str(e)}")
+            result.error = str(e)
+        return result
+
+    def run(self, data: pd.DataFrame, param_grid: List[Dict[str, Any]],
+            train_size: int, test_size: int, step: Optional[int] = None,
+            anchored: bool = False, data_key: Any = None) -> Dict[str, Any]:
+        """执行滚动前推优化
+
+        Args:
+            data: 按时间升序排列的行情数据
+            param_grid: 参数组合列表
+            train_size: 训练窗口长度（行数）
+            test_size: 测试窗口长度（行数）
+            step: 窗口前移步长
+            anchored: 是否使用锚定窗口
+            data_key: 数据标识，用于区分不同数据的窗口缓存
+
+        Returns:
+            包含每个窗口结果和样本外汇总的字典
+        """
+        folds = generate_walk_forward_splits(len(data), train_size, test_size, step, anchored)
+        if not folds:
+            raise ValueError(f"数据长度 {len(data)} 不足以切分训练窗口 {train_size} 和测试窗口 {test_size}")
+        if not param_grid:
+            raise ValueError("参数网格为空")
+
+        logger.info(f"开始滚动前推优化: {len(folds)} 个窗口, {len(param_grid)} 组参数, "
+                    f"{'锚定' if anchored else '滚动'}模式")
+
+        max_workers = self.max_workers or min(len(folds), 4)
+        fold_results: List[FoldResult] = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._optimize_fold, data, fold, param_grid, data_key)
+                       for fold in folds]
+            for future in as_completed(futures):
+                fold_results.append(future.result())
+        fold_results.sort(key=lambda r: r.fold_id)
+
+        return {
+            'mode': 'anchored' if anchored else 'rolling',
+            'train_size': train_size,
+            'test_size': test_size,
+            'step': step or test_size,
+            'metric': self.metric,
+            'folds': [asdict(r) for r in fold_results],
+            'summary': self.summarize(fold_results)
+        }
+
+    def summarize(self, fold_results: List[FoldResult]) -> Dict[str, Any]:
+        """汇总各窗口样本外表现"""
+        valid = [r for r in fold_results if r.error is None and r.out_of_sample]
+        summary = {
+            'fold_count': len(fold_results),
+            'valid_folds': len(valid),
+        }
+        if not valid:
+            return summary
+
+        metric_names = set()
+        for r in valid:
+            metric_names.update(k for k, v in r.out_of_sample.items() if isinstance(v, (int, float)))
+        for name in sorted(metric_names):
+            values = [r.out_of_sample[name] for r in valid if isinstance(r.out_of_sample.get(name), (int, float))]
+            summary[f'oos_mean_{name}'] = float(np.mean(values))
+
+        oos_scores = [r.out_of_sample.get(self.metric, 0.0) for r in valid]
+        is_scores = [r.in_sample.get(self.metric, 0.0) for r in valid]
+        summary['oos_positive_ratio'] = float(np.mean([s > 0 for s in oos_scores]))
+        # 样本外/样本内比值，衡量过拟合程度
+        is_mean = float(np.mean(is_scores))
+        summary['efficiency_ratio'] = float(np.mean(oos_scores)) / is_mean if is_mean != 0 else 0.0
+
+        # 参数稳定性：各窗口最优参数出现次数
+        param_counts: Dict[str, List] = {}
+        for r in valid:
+            key = repr(sorted(r.best_parameters.items()))
+            if key not in param_counts:
+                param_counts[key] = [r.best_parameters, 0]
+            param_counts[key][1] += 1
+        best_params, best_count = max(param_counts.values(), key=lambda item: item[1])
+        summary['most_common_parameters'] = best_params
+        summary['most_common_count'] = best_count
+        return summary